@@ -0,0 +1,270 @@
+import os
+import random
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import pytest
+
+from filepack.archive import Archive
+
+# the corpora size in MiB, and the largest archive members count to
+# benchmark; the defaults keep a run short, e.g. for CI
+CORPUS_SIZE_MB = int(os.environ.get("FILEPACK_BENCHMARK_CORPUS_MB", "4"))
+MAX_MEMBERS = int(os.environ.get("FILEPACK_BENCHMARK_MAX_MEMBERS", "1000"))
+
+MEMBERS_COUNTS = [
+    count for count in [10, 1_000, 10_000, 100_000] if count <= MAX_MEMBERS
+]
+SMALL_FILE_SIZE = 1024
+HUGE_FILES_COUNT = 2
+
+# the archive and compressed file sizes appended to, in corpus sizes
+APPEND_SIZE_MULTIPLIERS = [1, 4, 16]
+
+COMPRESSION_LEVELS = [1, 6, 9]
+DATA_CORPORA = ["text", "random", "log"]
+FILES_CORPORA = ["many-small-files", "few-huge-files"]
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua filepack archive"
+).split()
+
+
+def generate_text(size: int, seed: int = 0) -> bytes:
+    generator = random.Random(seed)
+    words = generator.choices(WORDS, k=size // 5 + 1)
+    return " ".join(words).encode()[:size]
+
+
+def generate_random(size: int, seed: int = 0) -> bytes:
+    return random.Random(seed).randbytes(size)
+
+
+def generate_log(size: int, seed: int = 0) -> bytes:
+    generator = random.Random(seed)
+    levels = ["DEBUG", "INFO", "INFO", "INFO", "WARNING", "ERROR"]
+    lines = []
+    total = 0
+    while total < size:
+        line = (
+            f"2024-01-{generator.randint(1, 28):02d}T"
+            f"{generator.randint(0, 23):02d}:{generator.randint(0, 59):02d}"
+            f" {generator.choice(levels)} worker-{generator.randint(1, 64)} "
+            f"request_id={generator.getrandbits(64):016x} "
+            f"latency_ms={generator.randint(1, 5000)}\n"
+        )
+        lines.append(line)
+        total += len(line)
+    return "".join(lines).encode()[:size]
+
+
+GENERATORS: dict[str, Callable[[int, int], bytes]] = {
+    "text": generate_text,
+    "random": generate_random,
+    "log": generate_log,
+}
+
+
+@pytest.fixture(scope="session")
+def corpora_directory(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Path:
+    return tmp_path_factory.mktemp("corpora")
+
+
+@pytest.fixture(scope="session")
+def data_corpus(corpora_directory: Path) -> Callable[[str], Path]:
+    """Returns a function creating (once) a deterministic corpus file."""
+    cache: dict[str, Path] = {}
+
+    def create(kind: str) -> Path:
+        if kind not in cache:
+            path = corpora_directory / f"{kind}.bin"
+            path.write_bytes(GENERATORS[kind](CORPUS_SIZE_MB * 2**20, 0))
+            cache[kind] = path
+        return cache[kind]
+
+    return create
+
+
+@pytest.fixture(scope="session")
+def files_corpus(corpora_directory: Path) -> Callable[[str, int], Path]:
+    """Returns a function creating (once) a deterministic files directory.
+
+    "many-small-files" holds `count` files of SMALL_FILE_SIZE bytes, while
+    "few-huge-files" holds HUGE_FILES_COUNT files sharing the corpus size.
+    """
+    cache: dict[tuple[str, int], Path] = {}
+
+    def create(kind: str, count: int) -> Path:
+        if (kind, count) not in cache:
+            directory = corpora_directory / f"{kind}-{count}"
+            directory.mkdir()
+            if kind == "many-small-files":
+                for index in range(count):
+                    (directory / f"{index:06d}.txt").write_bytes(
+                        generate_text(SMALL_FILE_SIZE, index)
+                    )
+            else:
+                size = CORPUS_SIZE_MB * 2**20 // HUGE_FILES_COUNT
+                for index in range(HUGE_FILES_COUNT):
+                    (directory / f"{index:06d}.log").write_bytes(
+                        generate_log(size, index)
+                    )
+            cache[(kind, count)] = directory
+        return cache[(kind, count)]
+
+    return create
+
+
+@pytest.fixture(scope="session")
+def archive_corpus(
+    corpora_directory: Path, files_corpus: Callable[[str, int], Path]
+) -> Callable[[str, int], Path]:
+    """Returns a function creating (once) an archive of small files."""
+    cache: dict[tuple[str, int], Path] = {}
+
+    def create(archive_type: str, count: int) -> Path:
+        if (archive_type, count) not in cache:
+            path = corpora_directory / f"archive-{count}.{archive_type}"
+            directory = files_corpus("many-small-files", count)
+            create_archive(path, archive_type, sorted(directory.iterdir()))
+            cache[(archive_type, count)] = path
+        return cache[(archive_type, count)]
+
+    return create
+
+
+def create_archive(path: Path, archive_type: str, files: list[Path]) -> None:
+    # adding members one by one reopens the archive each time, which is
+    # quadratic, so the corpora are written with the libraries directly
+    match archive_type:
+        case "tar":
+            import tarfile
+
+            with tarfile.open(path, "w") as tar:
+                for file in files:
+                    tar.add(file, arcname=file.name)
+        case "zip":
+            import zipfile
+
+            with zipfile.ZipFile(path, "w") as zip_file:
+                for file in files:
+                    zip_file.write(file, arcname=file.name)
+        case "7z":
+            from py7zr import SevenZipFile
+
+            with SevenZipFile(path, "w") as seven_zip:
+                for file in files:
+                    seven_zip.write(file, arcname=file.name)
+        case _:
+            raise ValueError(archive_type)
+
+    assert Archive(path=path).path_exists()
+
+
+def directory_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except FileNotFoundError:
+                pass
+    return total
+
+
+def current_rss() -> int:
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ResourceMonitor:
+    """Samples the process RSS and the temp directory usage in a thread.
+
+    While active, tempfile creates its files in a dedicated directory, so
+    the temporary files created by the measured operation can be sized.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._temporary_directory = Path(tempfile.mkdtemp())
+        self._previous_tempdir = tempfile.tempdir
+        self._baseline_rss = 0
+        self.peak_rss = 0
+        self.peak_temp_bytes = 0
+
+    def __enter__(self) -> "ResourceMonitor":
+        tempfile.tempdir = str(self._temporary_directory)
+        self._baseline_rss = current_rss()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._measure()
+        tempfile.tempdir = self._previous_tempdir
+        shutil.rmtree(self._temporary_directory, ignore_errors=True)
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self._interval):
+            self._measure()
+
+    def _measure(self) -> None:
+        self.peak_rss = max(self.peak_rss, current_rss())
+        self.peak_temp_bytes = max(
+            self.peak_temp_bytes, directory_size(self._temporary_directory)
+        )
+
+    @property
+    def peak_rss_delta(self) -> int:
+        return max(self.peak_rss - self._baseline_rss, 0)
+
+
+@pytest.fixture
+def measure(benchmark: Any) -> Iterator[Callable[..., Any]]:
+    """Benchmarks a function, recording throughput, peak RSS and temp usage.
+
+    The returned function takes the function to benchmark, the number of
+    bytes it processes, and optionally a setup function returning its
+    (args, kwargs) for every round.
+    """
+
+    def run(
+        function: Callable[..., Any],
+        processed_bytes: int,
+        setup: Callable[[], Any] | None = None,
+        rounds: int = 3,
+    ) -> Any:
+        with ResourceMonitor() as monitor:
+            result = benchmark.pedantic(
+                function, setup=setup, rounds=rounds, warmup_rounds=0
+            )
+
+        # no stats with --benchmark-disable, which runs every function once
+        if benchmark.stats is None:
+            return result
+
+        mean = benchmark.stats.stats.mean
+        benchmark.extra_info["processed_bytes"] = processed_bytes
+        benchmark.extra_info["throughput_mb_s"] = round(
+            processed_bytes / 2**20 / mean, 2
+        )
+        benchmark.extra_info["peak_rss_delta_bytes"] = monitor.peak_rss_delta
+        benchmark.extra_info["peak_temp_bytes"] = monitor.peak_temp_bytes
+        return result
+
+    yield run
@@ -0,0 +1,123 @@
+"""Benchmarks filepack's magic numbers detection against filetype.guess.
+
+Usage:
+    python benchmarks/detection.py [--files 100000] [--rounds 3]
+"""
+import argparse
+import bz2
+import gzip
+import io
+import lzma
+import tarfile
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Callable
+
+import filetype
+import lz4.frame
+from py7zr import SevenZipFile
+
+from filepack.utils import get_file_type_extension
+
+PAYLOAD = b"filepack detection benchmark payload\n" * 32
+
+
+def make_tar() -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        tar_info = tarfile.TarInfo(name="member.txt")
+        tar_info.size = len(PAYLOAD)
+        tar.addfile(tar_info, io.BytesIO(PAYLOAD))
+    return buffer.getvalue()
+
+
+def make_zip() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, mode="w") as zip_file:
+        zip_file.writestr("member.txt", PAYLOAD)
+    return buffer.getvalue()
+
+
+def make_seven_zip() -> bytes:
+    buffer = io.BytesIO()
+    with SevenZipFile(buffer, mode="w") as seven_zip:
+        seven_zip.writestr(data=PAYLOAD, arcname="member.txt")
+    return buffer.getvalue()
+
+
+TEMPLATES: dict[str, Callable[[], bytes]] = {
+    "gz": lambda: gzip.compress(PAYLOAD),
+    "bz2": lambda: bz2.compress(PAYLOAD),
+    "xz": lambda: lzma.compress(PAYLOAD),
+    "lz4": lambda: lz4.frame.compress(PAYLOAD),
+    "zip": make_zip,
+    "7z": make_seven_zip,
+    "tar": make_tar,
+    "txt": lambda: PAYLOAD,
+}
+
+
+def create_corpus(directory: Path, files: int) -> list[Path]:
+    templates = [template() for template in TEMPLATES.values()]
+    paths = []
+    for index in range(files):
+        path = directory / f"{index}.bin"
+        path.write_bytes(templates[index % len(templates)])
+        paths.append(path)
+    return paths
+
+
+def filepack_detect(path: Path) -> str | None:
+    try:
+        return get_file_type_extension(path=path)
+    except ValueError:
+        return None
+
+
+def filetype_detect(path: Path) -> str | None:
+    file_type = filetype.guess(path)
+    return None if file_type is None else file_type.extension
+
+
+def measure(
+    detect: Callable[[Path], str | None], paths: list[Path], rounds: int
+) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for path in paths:
+            detect(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        paths = create_corpus(Path(temporary_directory), arguments.files)
+
+        for path in paths[: len(TEMPLATES)]:
+            assert filepack_detect(path) == filetype_detect(path), path
+
+        results = {
+            "filepack": measure(filepack_detect, paths, arguments.rounds),
+            "filetype": measure(filetype_detect, paths, arguments.rounds),
+        }
+
+    print(f"{arguments.files} files, best of {arguments.rounds} rounds")
+    for name, seconds in results.items():
+        print(
+            f"{name:>10}: {seconds:8.3f}s "
+            f"({arguments.files / seconds:,.0f} files/s)"
+        )
+    print(f"speedup: {results['filetype'] / results['filepack']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
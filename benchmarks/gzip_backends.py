@@ -0,0 +1,92 @@
+"""Compares the throughput of the gzip backends per compression level.
+
+Usage:
+    python benchmarks/gzip_backends.py [--size-mb 64] [--levels 1 3 6 9]
+                                       [--input PATH]
+"""
+import argparse
+import io
+import random
+import time
+from pathlib import Path
+
+from tabulate import tabulate
+
+from filepack.compressions.gzip import (
+    GZIP_BACKENDS,
+    GzipCompression,
+    available_backends,
+)
+
+
+def generate_log_like_data(size: int) -> bytes:
+    generator = random.Random(0)
+    levels = ["DEBUG", "INFO", "INFO", "INFO", "WARNING", "ERROR"]
+    lines = []
+    total = 0
+    while total < size:
+        line = (
+            f"2024-01-{generator.randint(1, 28):02d}T"
+            f"{generator.randint(0, 23):02d}:{generator.randint(0, 59):02d}"
+            f" {generator.choice(levels)} worker-{generator.randint(1, 64)} "
+            f"request_id={generator.getrandbits(64):016x} "
+            f"latency_ms={generator.randint(1, 5000)}\n"
+        )
+        lines.append(line)
+        total += len(line)
+    return "".join(lines).encode()[:size]
+
+
+def measure(backend: str, level: int, data: bytes) -> dict[str, object]:
+    client = GzipCompression(backend=backend)
+
+    buffer = io.BytesIO()
+    start = time.perf_counter()
+    with client.open(
+        file_path=buffer, mode="wb", compression_level=level
+    ) as compressed:
+        compressed.write(data)
+    compress_seconds = time.perf_counter() - start
+    compressed_data = buffer.getvalue()
+
+    start = time.perf_counter()
+    with client.open(
+        file_path=io.BytesIO(compressed_data), mode="rb"
+    ) as decompressed:
+        assert decompressed.read() == data
+    decompress_seconds = time.perf_counter() - start
+
+    megabytes = len(data) / 2**20
+    return {
+        "backend": backend,
+        "level": level,
+        "compress MB/s": round(megabytes / compress_seconds, 1),
+        "decompress MB/s": round(megabytes / decompress_seconds, 1),
+        "ratio": round(len(data) / len(compressed_data), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 3, 6, 9])
+    parser.add_argument("--input", type=Path)
+    arguments = parser.parse_args()
+
+    data = (
+        arguments.input.read_bytes()
+        if arguments.input is not None
+        else generate_log_like_data(arguments.size_mb * 2**20)
+    )
+
+    results = [
+        measure(backend=backend, level=level, data=data)
+        for level in arguments.levels
+        for backend in available_backends()
+        if level in GZIP_BACKENDS[backend][1]
+    ]
+    print(tabulate(results, headers="keys", tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Measures the cost of importing filepack with `python -X importtime`.
+
+Fails (exit code 1) if the import takes longer than --max-ms, or if any of
+the archive and compression libraries, which are supposed to be imported on
+first use only, are imported eagerly.
+
+Usage:
+    python benchmarks/import_time.py [--statement STATEMENT] [--runs 10]
+                                     [--max-ms 30]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+LAZY_MODULES = [
+    "bz2",
+    "filetype",
+    "gzip",
+    "lz4",
+    "lzma",
+    "py7zr",
+    "tabulate",
+    "tarfile",
+    "zipfile",
+]
+
+
+def import_time(statement: str) -> tuple[float, set[str]]:
+    """Runs the statement in a fresh interpreter.
+
+    Returns:
+        The cumulative import time of filepack in milliseconds, and the
+        names of all the modules imported.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    modules = set()
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        modules.add(name.strip())
+        if name.strip() == "filepack":
+            total_us = int(cumulative)
+    return total_us / 1000, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--statement", default="import filepack")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=30.0)
+    arguments = parser.parse_args()
+
+    timings = []
+    modules: set[str] = set()
+    for _ in range(arguments.runs):
+        milliseconds, modules = import_time(arguments.statement)
+        timings.append(milliseconds)
+
+    median = statistics.median(timings)
+    eager = sorted(
+        module for module in modules if module.split(".")[0] in LAZY_MODULES
+    )
+    print(
+        f"{arguments.statement!r}: median {median:.2f}ms, "
+        f"min {min(timings):.2f}ms over {arguments.runs} runs"
+    )
+
+    failed = False
+    if median > arguments.max_ms:
+        print(f"regression: median above {arguments.max_ms}ms")
+        failed = True
+    if eager and arguments.statement == "import filepack":
+        print(f"regression: eagerly imported {', '.join(eager)}")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
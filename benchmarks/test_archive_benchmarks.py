@@ -0,0 +1,427 @@
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+from conftest import (
+    APPEND_SIZE_MULTIPLIERS,
+    FILES_CORPORA,
+    MEMBERS_COUNTS,
+    create_archive,
+    directory_size,
+)
+
+from filepack import utils
+from filepack.archive import Archive
+from filepack.archives.index_cache import IndexCache, use_index_cache
+from filepack.archives.models import ArchiveType
+
+ARCHIVE_TYPES = [archive_type.value for archive_type in ArchiveType]
+
+
+@pytest.mark.parametrize("count", MEMBERS_COUNTS)
+@pytest.mark.parametrize("archive_type", ARCHIVE_TYPES)
+def test_get_members(
+    archive_type: str,
+    count: int,
+    archive_corpus: Callable[[str, int], Path],
+    measure: Callable[..., Any],
+):
+    archive_path = archive_corpus(archive_type, count)
+
+    members = measure(
+        lambda: Archive(path=archive_path).get_members(),
+        processed_bytes=archive_path.stat().st_size,
+    )
+
+    assert len(members) == count
+
+
+@pytest.mark.parametrize("count", MEMBERS_COUNTS)
+@pytest.mark.parametrize("archive_type", ARCHIVE_TYPES)
+def test_get_members_cached(
+    archive_type: str,
+    count: int,
+    archive_corpus: Callable[[str, int], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    # a new Archive on every round, as a new process would do, listing from
+    # a warm index cache
+    archive_path = archive_corpus(archive_type, count)
+
+    with use_index_cache(IndexCache(directory=tmp_path / "index")):
+        Archive(path=archive_path).get_members()
+        members = measure(
+            lambda: Archive(path=archive_path).get_members(),
+            processed_bytes=archive_path.stat().st_size,
+        )
+
+    assert len(members) == count
+
+
+@pytest.mark.parametrize("count", MEMBERS_COUNTS)
+@pytest.mark.parametrize("archive_type", ARCHIVE_TYPES)
+def test_extract_all(
+    archive_type: str,
+    count: int,
+    archive_corpus: Callable[[str, int], Path],
+    files_corpus: Callable[[str, int], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    archive_path = archive_corpus(archive_type, count)
+
+    def setup() -> tuple[tuple[Path], dict[str, Any]]:
+        target_directory = tmp_path / "extracted"
+        shutil.rmtree(target_directory, ignore_errors=True)
+        return (target_directory,), {}
+
+    measure(
+        lambda target_directory: Archive(path=archive_path).extract_all(
+            target_directory_path=target_directory
+        ),
+        processed_bytes=directory_size(
+            files_corpus("many-small-files", count)
+        ),
+        setup=setup,
+        rounds=1,
+    )
+
+
+@pytest.mark.parametrize("count", MEMBERS_COUNTS)
+@pytest.mark.parametrize("archive_type", ARCHIVE_TYPES)
+def test_extract_member(
+    archive_type: str,
+    count: int,
+    archive_corpus: Callable[[str, int], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    archive_path = archive_corpus(archive_type, count)
+    # the last member is the worst case for sequential formats
+    member_name = f"{count - 1:06d}.txt"
+    member = Archive(path=archive_path).get_member(member_name)
+    assert member is not None
+
+    measure(
+        lambda: Archive(path=archive_path).extract_member(
+            member_name=member_name, target_directory_path=tmp_path
+        ),
+        processed_bytes=member.size,
+    )
+
+
+@pytest.mark.parametrize("count", MEMBERS_COUNTS)
+@pytest.mark.parametrize("archive_type", ARCHIVE_TYPES)
+def test_add_member(
+    archive_type: str,
+    count: int,
+    archive_corpus: Callable[[str, int], Path],
+    data_corpus: Callable[[str], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    archive_path = archive_corpus(archive_type, count)
+    member_path = data_corpus("log")
+
+    def setup() -> tuple[tuple[Path], dict[str, Any]]:
+        copy_path = tmp_path / archive_path.name
+        shutil.copyfile(archive_path, copy_path)
+        return (copy_path,), {}
+
+    measure(
+        lambda path: Archive(path=path).add_member(member_path=member_path),
+        processed_bytes=member_path.stat().st_size,
+        setup=setup,
+    )
+
+
+@pytest.mark.parametrize("count", MEMBERS_COUNTS)
+@pytest.mark.parametrize("archive_type", ARCHIVE_TYPES)
+def test_remove_member(
+    archive_type: str,
+    count: int,
+    archive_corpus: Callable[[str, int], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    archive_path = archive_corpus(archive_type, count)
+
+    def setup() -> tuple[tuple[Path], dict[str, Any]]:
+        copy_path = tmp_path / archive_path.name
+        shutil.copyfile(archive_path, copy_path)
+        return (copy_path,), {}
+
+    measure(
+        lambda path: Archive(path=path).remove_member(
+            member_name=f"{0:06d}.txt"
+        ),
+        processed_bytes=archive_path.stat().st_size,
+        setup=setup,
+        rounds=1,
+    )
+
+
+@pytest.mark.parametrize("kind", FILES_CORPORA)
+@pytest.mark.parametrize("archive_type", ARCHIVE_TYPES)
+def test_add_files_corpus(
+    archive_type: str,
+    kind: str,
+    files_corpus: Callable[[str, int], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    # every add_member call reopens the archive, so keep this small
+    directory = files_corpus(kind, 100)
+    files = sorted(directory.iterdir())
+
+    def setup() -> tuple[tuple[Path], dict[str, Any]]:
+        archive_path = tmp_path / f"archive.{archive_type}"
+        archive_path.unlink(missing_ok=True)
+        return (archive_path,), {}
+
+    def add_all(archive_path: Path) -> None:
+        archive = Archive(path=archive_path)
+        for file in files:
+            archive.add_member(member_path=file)
+
+    measure(
+        add_all,
+        processed_bytes=directory_size(directory),
+        setup=setup,
+        rounds=1,
+    )
+
+
+@pytest.mark.parametrize("multiplier", APPEND_SIZE_MULTIPLIERS)
+@pytest.mark.parametrize("archive_type", ARCHIVE_TYPES)
+def test_append_member(
+    archive_type: str,
+    multiplier: int,
+    data_corpus: Callable[[str], Path],
+    corpora_directory: Path,
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    # the appended member is the same for every archive size, so the means
+    # should be the same too
+    archive_path = corpora_directory / f"append-{multiplier}x.{archive_type}"
+    if not archive_path.exists():
+        directory = corpora_directory / f"append-{multiplier}x"
+        directory.mkdir(exist_ok=True)
+        for index in range(multiplier):
+            if not (link := directory / f"{index:06d}.bin").exists():
+                os.link(data_corpus("random"), link)
+        create_archive(archive_path, archive_type, sorted(directory.iterdir()))
+    member_path = tmp_path / "member.log"
+    member_path.write_bytes(data_corpus("log").read_bytes()[: 2**16])
+
+    def setup() -> tuple[tuple[Path], dict[str, Any]]:
+        copy_path = tmp_path / archive_path.name
+        shutil.copyfile(archive_path, copy_path)
+        return (copy_path,), {}
+
+    measure(
+        lambda path: Archive(path=path).add_member(
+            member_path=member_path, incompressible_policy="compress"
+        ),
+        processed_bytes=member_path.stat().st_size,
+        setup=setup,
+    )
+
+
+def list_with_library(archive_path: Path) -> int:
+    if archive_path.suffix == ".zip":
+        import zipfile
+
+        with zipfile.ZipFile(archive_path) as zip_file:
+            return len(zip_file.infolist())
+
+    import tarfile
+
+    with tarfile.open(archive_path) as tar:
+        return len(tar.getmembers())
+
+
+@pytest.mark.parametrize("count", MEMBERS_COUNTS)
+@pytest.mark.parametrize("engine", ["library", "member-table"])
+@pytest.mark.parametrize(
+    "archive_type", [ArchiveType.ZIP.value, ArchiveType.TAR.value]
+)
+def test_list_members(
+    archive_type: str,
+    engine: str,
+    count: int,
+    archive_corpus: Callable[[str, int], Path],
+    measure: Callable[..., Any],
+):
+    # the zipfile and tarfile listing, against the memory-mapped parsing of
+    # the archive index, without building member objects
+    archive_path = archive_corpus(archive_type, count)
+
+    listed = measure(
+        lambda: (
+            list_with_library(archive_path)
+            if engine == "library"
+            else len(Archive(path=archive_path).get_member_table())  # type: ignore
+        ),
+        processed_bytes=archive_path.stat().st_size,
+    )
+
+    assert listed == count
+
+
+def convert_by_extracting(archive_path: Path, target_path: Path) -> None:
+    extracted = target_path.with_name("extracted")
+    shutil.rmtree(extracted, ignore_errors=True)
+    Archive(path=archive_path).extract_all(target_directory_path=extracted)
+    Archive(path=target_path).add_members(
+        member_paths=sorted(extracted.iterdir())
+    )
+
+
+@pytest.mark.parametrize("engine", ["extract-and-add", "convert-to"])
+@pytest.mark.parametrize("archive_type", ARCHIVE_TYPES)
+def test_convert(
+    archive_type: str,
+    engine: str,
+    archive_corpus: Callable[[str, int], Path],
+    files_corpus: Callable[[str, int], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    # the extraction to disk followed by adding the files, against streaming
+    # every member into the new archive
+    count = MEMBERS_COUNTS[-1]
+    archive_path = archive_corpus(archive_type, count)
+    target_type = (
+        ArchiveType.TAR.value
+        if archive_type == ArchiveType.ZIP.value
+        else ArchiveType.ZIP.value
+    )
+
+    def setup() -> tuple[tuple[Path], dict[str, Any]]:
+        target_path = tmp_path / f"converted.{target_type}"
+        target_path.unlink(missing_ok=True)
+        return (target_path,), {}
+
+    measure(
+        lambda target_path: (
+            convert_by_extracting(archive_path, target_path)
+            if engine == "extract-and-add"
+            else Archive(path=archive_path).convert_to(target_path=target_path)
+        ),
+        processed_bytes=directory_size(
+            files_corpus("many-small-files", count)
+        ),
+        setup=setup,
+        rounds=1,
+    )
+
+
+@pytest.mark.parametrize("zero_copy", [False, True])
+@pytest.mark.parametrize("archive_type", ["tar", "zip"])
+def test_extract_stored(
+    archive_type: str,
+    zero_copy: bool,
+    files_corpus: Callable[[str, int], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # the stored members data copied by the kernel, against through Python
+    # buffers
+    if not zero_copy:
+        monkeypatch.setattr(utils, "_copy_file_range", lambda **kwargs: 0)
+    directory = files_corpus("few-huge-files", 100)
+    archive_path = tmp_path / f"archive.{archive_type}"
+    create_archive(archive_path, archive_type, sorted(directory.iterdir()))
+
+    def setup() -> tuple[tuple[Path], dict[str, Any]]:
+        target_directory = tmp_path / "extracted"
+        shutil.rmtree(target_directory, ignore_errors=True)
+        return (target_directory,), {}
+
+    measure(
+        lambda target_directory: Archive(path=archive_path).extract_all(
+            target_directory_path=target_directory
+        ),
+        processed_bytes=directory_size(directory),
+        setup=setup,
+        rounds=5,
+    )
+
+
+@pytest.mark.parametrize("workers", [0, 1, 4])
+@pytest.mark.parametrize("archive_type", ARCHIVE_TYPES)
+def test_verify(
+    archive_type: str,
+    workers: int,
+    files_corpus: Callable[[str, int], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    # extracting the members to check them (0 workers), against decoding
+    # them into nothing on 1 and 4 threads
+    directory = files_corpus("few-huge-files", 100)
+    archive_path = tmp_path / f"archive.{archive_type}"
+    create_archive(archive_path, archive_type, sorted(directory.iterdir()))
+
+    def setup() -> tuple[tuple[Path], dict[str, Any]]:
+        target_directory = tmp_path / "extracted"
+        shutil.rmtree(target_directory, ignore_errors=True)
+        return (target_directory,), {}
+
+    measure(
+        lambda target_directory: (
+            Archive(path=archive_path).extract_all(
+                target_directory_path=target_directory
+            )
+            if workers == 0
+            else Archive(path=archive_path).verify(workers=workers)
+        ),
+        processed_bytes=directory_size(directory),
+        setup=setup,
+        rounds=3,
+    )
+
+
+def convert_then_split(
+    source: Archive, target_path: Path, volume_size: int
+) -> None:
+    target = source.convert_to(target_path=target_path)
+    target.split(volume_size=volume_size, workers=1)
+    target_path.unlink()
+
+
+@pytest.mark.parametrize("engine", ["convert-then-split", "volumes"])
+@pytest.mark.parametrize("archive_type", ARCHIVE_TYPES)
+def test_volumes(
+    archive_type: str,
+    engine: str,
+    files_corpus: Callable[[str, int], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    # converting to a single archive and then splitting it, against writing
+    # the volumes directly: streamed for tar, split in parallel otherwise
+    directory = files_corpus("few-huge-files", 100)
+    source_path = tmp_path / "source.tar"
+    create_archive(source_path, "tar", sorted(directory.iterdir()))
+    source = Archive(path=source_path)
+    target_path = tmp_path / f"target.{archive_type}"
+    volume_size = 8 * 1024 * 1024
+
+    measure(
+        lambda: (
+            convert_then_split(source, target_path, volume_size)
+            if engine == "convert-then-split"
+            else source.convert_to(
+                target_path=target_path, volume_size=volume_size, workers=4
+            )
+        ),
+        processed_bytes=directory_size(directory),
+        rounds=3,
+    )
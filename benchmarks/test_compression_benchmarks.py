@@ -0,0 +1,343 @@
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+from conftest import APPEND_SIZE_MULTIPLIERS, COMPRESSION_LEVELS, DATA_CORPORA
+
+from filepack import compression
+from filepack.compression import Compression
+from filepack.compressions.models import CompressionType
+from filepack.hashing import Digests, hash_file_digests
+
+COMPRESSION_ALGORITHMS = [
+    compression_type.value for compression_type in CompressionType
+]
+
+
+@pytest.fixture(scope="module")
+def compressed_corpus(
+    data_corpus: Callable[[str], Path],
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Callable[[str, str, int], Path]:
+    cache: dict[tuple[str, str, int], Path] = {}
+    directory = tmp_path_factory.mktemp("compressed")
+
+    def create(kind: str, algorithm: str, level: int) -> Path:
+        if (kind, algorithm, level) not in cache:
+            target_path = directory / f"{kind}-{level}.{algorithm}"
+            Compression(path=data_corpus(kind)).compress(
+                compression_algorithm=algorithm,
+                target_path=target_path,
+                compression_level=level,
+            )
+            cache[(kind, algorithm, level)] = target_path
+        return cache[(kind, algorithm, level)]
+
+    return create
+
+
+@pytest.mark.parametrize("level", COMPRESSION_LEVELS)
+@pytest.mark.parametrize("algorithm", COMPRESSION_ALGORITHMS)
+@pytest.mark.parametrize("kind", DATA_CORPORA)
+def test_compress(
+    kind: str,
+    algorithm: str,
+    level: int,
+    data_corpus: Callable[[str], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    source_path = data_corpus(kind)
+    target_path = tmp_path / f"target.{algorithm}"
+
+    measure(
+        lambda: Compression(path=source_path).compress(
+            compression_algorithm=algorithm,
+            target_path=target_path,
+            compression_level=level,
+        ),
+        processed_bytes=source_path.stat().st_size,
+    )
+
+
+@pytest.mark.parametrize("level", COMPRESSION_LEVELS)
+@pytest.mark.parametrize("algorithm", COMPRESSION_ALGORITHMS)
+@pytest.mark.parametrize("kind", DATA_CORPORA)
+def test_decompress(
+    kind: str,
+    algorithm: str,
+    level: int,
+    compressed_corpus: Callable[[str, str, int], Path],
+    data_corpus: Callable[[str], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    source_path = compressed_corpus(kind, algorithm, level)
+    target_path = tmp_path / "target"
+
+    measure(
+        lambda: Compression(path=source_path).decompress(
+            compression_algorithm=algorithm, target_path=target_path
+        ),
+        processed_bytes=data_corpus(kind).stat().st_size,
+    )
+
+
+@pytest.mark.parametrize("algorithm", COMPRESSION_ALGORITHMS)
+@pytest.mark.parametrize("kind", DATA_CORPORA)
+def test_uncompressed_size(
+    kind: str,
+    algorithm: str,
+    compressed_corpus: Callable[[str, str, int], Path],
+    data_corpus: Callable[[str], Path],
+    measure: Callable[..., Any],
+):
+    source_path = compressed_corpus(kind, algorithm, 6)
+
+    size = measure(
+        lambda: Compression(path=source_path).uncompressed_size(
+            compression_algorithm=algorithm
+        ),
+        processed_bytes=data_corpus(kind).stat().st_size,
+    )
+
+    assert size == data_corpus(kind).stat().st_size
+
+
+@pytest.mark.parametrize("algorithm", COMPRESSION_ALGORITHMS)
+def test_compress_in_place(
+    algorithm: str,
+    data_corpus: Callable[[str], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    source_path = data_corpus("log")
+
+    def setup() -> tuple[tuple[Path], dict[str, Any]]:
+        copy_path = tmp_path / "source.log"
+        shutil.copyfile(source_path, copy_path)
+        return (copy_path,), {}
+
+    measure(
+        lambda path: Compression(path=path).compress(
+            compression_algorithm=algorithm, in_place=True
+        ),
+        processed_bytes=source_path.stat().st_size,
+        setup=setup,
+    )
+
+
+@pytest.mark.parametrize("multiplier", APPEND_SIZE_MULTIPLIERS)
+@pytest.mark.parametrize("algorithm", COMPRESSION_ALGORITHMS)
+def test_append(
+    algorithm: str,
+    multiplier: int,
+    data_corpus: Callable[[str], Path],
+    corpora_directory: Path,
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    # the appended stream is the same for every file size, so the means
+    # should be the same too
+    compressed_path = corpora_directory / f"append-{multiplier}x.{algorithm}"
+    if not compressed_path.exists():
+        source_path = tmp_path / "source"
+        with open(source_path, "wb") as source_file:
+            for _ in range(multiplier):
+                source_file.write(data_corpus("log").read_bytes())
+        Compression(path=source_path).compress(
+            compression_algorithm=algorithm,
+            target_path=compressed_path,
+            compression_level=1,
+        )
+    appended_path = tmp_path / "appended.log"
+    appended_path.write_bytes(data_corpus("log").read_bytes()[: 2**16])
+
+    def setup() -> tuple[tuple[Path], dict[str, Any]]:
+        copy_path = tmp_path / compressed_path.name
+        shutil.copyfile(compressed_path, copy_path)
+        return (copy_path,), {}
+
+    measure(
+        lambda path: Compression(path=path).append(
+            source_path=appended_path, compression_algorithm=algorithm
+        ),
+        processed_bytes=appended_path.stat().st_size,
+        setup=setup,
+    )
+
+
+def recompress_through_disk(
+    source_path: Path, target_path: Path, workers: int
+) -> None:
+    decompressed_path = Compression(path=source_path).decompress(
+        compression_algorithm="bz2",
+        target_path=target_path.with_name("decompressed"),
+    )
+    Compression(path=decompressed_path).compress(
+        compression_algorithm="gz",
+        target_path=target_path,
+        compression_level=6,
+    )
+
+
+@pytest.mark.parametrize("workers", [0, 1, 2, 4])
+@pytest.mark.parametrize("kind", DATA_CORPORA)
+def test_recompress(
+    kind: str,
+    workers: int,
+    compressed_corpus: Callable[[str, str, int], Path],
+    data_corpus: Callable[[str], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    # bz2 to gzip, through a decompressed file on disk (0 workers), against
+    # piping the decoder into the encoder on 1, 2 and 4 threads
+    source_path = compressed_corpus(kind, "bz2", 9)
+    target_path = tmp_path / "target.gz"
+
+    measure(
+        lambda: (
+            recompress_through_disk(source_path, target_path, workers)
+            if workers == 0
+            else Compression(path=source_path).recompress(
+                compression_algorithm="bz2",
+                to_algorithm="gz",
+                target_path=target_path,
+                compression_level=6,
+                workers=workers,
+            )
+        ),
+        processed_bytes=data_corpus(kind).stat().st_size,
+    )
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+@pytest.mark.parametrize("direction", ["compress", "decompress"])
+@pytest.mark.parametrize("kind", DATA_CORPORA)
+def test_pipeline(
+    kind: str,
+    direction: str,
+    pipelined: bool,
+    compressed_corpus: Callable[[str, str, int], Path],
+    data_corpus: Callable[[str], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # reading, encoding and writing on one thread, against three
+    monkeypatch.setattr(
+        compression,
+        "PIPELINE_MIN_FILE_SIZE",
+        0 if pipelined else float("inf"),
+    )
+    target_path = tmp_path / "target"
+
+    measure(
+        lambda: (
+            Compression(path=data_corpus(kind)).compress(
+                compression_algorithm="gz",
+                target_path=target_path,
+                compression_level=6,
+            )
+            if direction == "compress"
+            else Compression(path=compressed_corpus(kind, "gz", 6)).decompress(
+                compression_algorithm="gz", target_path=target_path
+            )
+        ),
+        processed_bytes=data_corpus(kind).stat().st_size,
+    )
+
+
+def compress_then_hash(source_path: Path, target_path: Path) -> None:
+    Compression(path=source_path).compress(
+        compression_algorithm="gz",
+        target_path=target_path,
+        compression_level=6,
+    )
+    hash_file_digests(path=source_path, algorithms=["sha256"])
+    hash_file_digests(path=target_path, algorithms=["sha256"])
+
+
+@pytest.mark.parametrize("single_pass", [False, True])
+@pytest.mark.parametrize("kind", DATA_CORPORA)
+def test_digests(
+    kind: str,
+    single_pass: bool,
+    data_corpus: Callable[[str], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    # compressing then reading both files again to hash them, against
+    # hashing in threads while compressing
+    source_path = data_corpus(kind)
+    target_path = tmp_path / "target.gz"
+
+    measure(
+        lambda: (
+            Compression(path=source_path).compress(
+                compression_algorithm="gz",
+                target_path=target_path,
+                compression_level=6,
+                digests=Digests(algorithms=["sha256"]),
+            )
+            if single_pass
+            else compress_then_hash(source_path, target_path)
+        ),
+        processed_bytes=source_path.stat().st_size,
+    )
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+@pytest.mark.parametrize("format", ["stream", "blocked"])
+def test_blocked_compress(
+    format: str,
+    workers: int,
+    data_corpus: Callable[[str], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    # a single gzip stream against independent blocks compressed by workers
+    source_path = data_corpus("text")
+
+    measure(
+        lambda: Compression(path=source_path).compress(
+            compression_algorithm="gz",
+            target_path=tmp_path / "target.gz",
+            compression_level=6,
+            format=format,
+            workers=workers,
+        ),
+        processed_bytes=source_path.stat().st_size,
+    )
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_blocked_splits(
+    workers: int,
+    data_corpus: Callable[[str], Path],
+    measure: Callable[..., Any],
+    tmp_path: Path,
+):
+    # decompressing a blocked file by splits, one per worker
+    source_path = data_corpus("text")
+    compressed_file = Compression(
+        path=Compression(path=source_path).compress(
+            compression_algorithm="gz",
+            target_path=tmp_path / "target.gz",
+            compression_level=6,
+            format="blocked",
+        )
+    )
+
+    def decompress_splits() -> None:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in executor.map(
+                lambda split: sum(map(len, compressed_file.read_split(split))),
+                compressed_file.splits(workers),
+            ):
+                pass
+
+    measure(decompress_splits, processed_bytes=source_path.stat().st_size)
@@ -1,4 +1,32 @@
 # flake8: noqa
-from filepack.archive import Archive
-from filepack.compression import Compression
-from filepack.filepack import FilePack
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from filepack.archive import Archive
+    from filepack.compression import Compression
+    from filepack.filepack import FilePack
+
+# the public classes are imported on first access, so that importing
+# filepack doesn't pay for the archive and compression libraries
+_LAZY_ATTRIBUTES = {
+    "Archive": "filepack.archive",
+    "Compression": "filepack.compression",
+    "FilePack": "filepack.filepack",
+}
+
+__all__ = ["Archive", "Compression", "FilePack"]
+
+
+def __getattr__(name: str) -> Any:
+    if (module_name := _LAZY_ATTRIBUTES.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -0,0 +1,5 @@
+import sys
+
+from filepack.cli import main
+
+sys.exit(main())
@@ -1,29 +1,82 @@
-import tempfile
+from contextlib import ExitStack
+from dataclasses import replace
 from pathlib import Path
-from typing import Optional
-
-from tabulate import tabulate
+from typing import Iterable, Optional
 
+from filepack.archives.consts import DEDUP_MANIFEST_PREFIX
+from filepack.archives.dedup import (
+    DedupReport,
+    find_duplicates,
+    read_manifest,
+    remove_duplicate,
+    restore_duplicates,
+    write_manifest,
+)
 from filepack.archives.exceptions import (
     ArchiveMemberDoesNotExist,
+    FailedToAddNewMembersToArchive,
     FailedToAddNewMemberToArchive,
+    FailedToConvertArchive,
     FailedToExtractArchiveMember,
     FailedToExtractArchiveMembers,
     FailedToGetArchiveMember,
     FailedToGetArchiveMembers,
     FailedToRemoveArchiveMember,
     FailedToRemoveArchiveMembers,
+    FailedToSplitArchive,
+    FailedToSyncArchive,
+    FailedToVerifyArchive,
 )
+from filepack.archives.index_cache import (
+    IndexCacheEntry,
+    archive_key,
+    get_index_cache,
+)
+from filepack.archives.listing import MemberTable
 from filepack.archives.models import (
     AbsractArchiveClient,
     AbstractArchiveMember,
-    ArchiveType,
+    AbstractArchiveObject,
+    MemberCompression,
+    MemberEntry,
+    MemberStreams,
+)
+from filepack.archives.registry import archives_registry
+from filepack.archives.sync import (
+    SyncReport,
+    compare_directory,
+    directory_files,
+)
+from filepack.compressions.compressibility import (
+    CompressibilityReport,
+    IncompressiblePolicy,
+    check_compressibility,
 )
-from filepack.archives.seven_zip import SevenZipClient
-from filepack.archives.tar import TarClient
-from filepack.archives.zip import ZipClient
 from filepack.consts import ERROR_MESSAGE_NOT_SUPPORTED
+from filepack.hashing import hash_file
+from filepack.instrumentation import (
+    instrumented,
+    record_archive_open,
+    record_bytes_read,
+    record_bytes_written,
+    record_codec,
+    record_temp_file,
+)
+from filepack.limits import LimitExceeded, get_limits
+from filepack.progress import ProgressCallback, ProgressTracker
+from filepack.registry import Capability
 from filepack.utils import get_file_type_extension, reraise_as
+from filepack.verification import VerificationReport, describe
+from filepack.volumes import (
+    VolumeCallback,
+    VolumeWriter,
+    file_size,
+    is_split_set,
+    remove_file,
+    remove_stale_volumes,
+    split_file,
+    volume_path,
+)
 
 
 class Archive:
@@ -38,32 +91,28 @@ class Archive:
             ValueError: If the archive type is unsupported.
         """
         self._path = Path(path)
+        self._index_cache_entry: Optional[IndexCacheEntry] = None
 
         # if doesn't exist, try to infer the desired type from the extension
         if not self._path.exists():
-            try:
-                self._type = ArchiveType(self._path.suffix.lstrip("."))
-            except Exception:
-                raise ValueError(ERROR_MESSAGE_NOT_SUPPORTED)
+            self._type = self._path.suffix.lstrip(".")
+
+        # if listed before, get the type detected then
+        elif (index_cache := get_index_cache()) is not None and (
+            entry := index_cache.load(archive_path=self._path)
+        ) is not None:
+            self._index_cache_entry = entry
+            self._type = entry.archive_type
 
         # if exist, get the type according to magic numbers
         else:
-            self._type = ArchiveType(get_file_type_extension(path=self._path))
+            self._type = str(get_file_type_extension(path=self._path))
 
-        self._client: AbsractArchiveClient
+        if (registration := archives_registry.get(self._type)) is None:
+            raise ValueError(ERROR_MESSAGE_NOT_SUPPORTED)
 
-        match self._type:
-            case ArchiveType.TAR:
-                self._client = TarClient()
-
-            case ArchiveType.ZIP:
-                self._client = ZipClient()
-
-            case ArchiveType.SEVEN_ZIP:
-                self._client = SevenZipClient()
-
-            case _:
-                raise ValueError(ERROR_MESSAGE_NOT_SUPPORTED)
+        self._capabilities = registration.capabilities
+        self._client: AbsractArchiveClient = registration.get_client()
 
     @property
     def path(self) -> Path:
@@ -75,6 +124,16 @@ class Archive:
         """
         return self._path
 
+    @property
+    def archive_capabilities(self) -> Capability:
+        """
+        Returns the capabilities of the archive format.
+
+        Returns:
+            The capability flags registered for the archive type.
+        """
+        return self._capabilities
+
     @property
     def size(self) -> int:
         """
@@ -86,7 +145,7 @@ class Archive:
         if not self.path_exists():
             return 0
 
-        return self._path.stat().st_size
+        return file_size(self._path)
 
     def path_exists(self):
         """
@@ -109,6 +168,7 @@ class Archive:
         """
         return self.get_member(member_name=member_name) is not None
 
+    @instrumented("archive.get_members")
     @reraise_as(FailedToGetArchiveMembers)
     def get_members(self) -> list[AbstractArchiveMember]:
         """
@@ -123,14 +183,38 @@ class Archive:
         if not self.path_exists():
             return []
 
-        with self._client.open(
-            file_path=self._path, mode="r"
-        ) as archive_object:
+        if (table := self._read_member_table()) is not None:
+            return table.members(client=self._client, archive_path=self._path)
+
+        with self._open(file_path=self._path, mode="r") as archive_object:
             return [
                 archive_object
                 for archive_object in archive_object.get_members()
             ]
 
+    @instrumented("archive.get_member_table")
+    @reraise_as(FailedToGetArchiveMembers)
+    def get_member_table(self) -> Optional[MemberTable]:
+        """
+        Lists the members of the archive into a table, with one array per field (names, sizes, offsets, ...).
+
+        The archive is memory-mapped and its index parsed directly, which is much faster and lighter than
+        get_members for archives of many members.
+
+        Returns:
+            The members table, or None if the format has no such listing (7z), the archive is a split set, or it
+            uses features it doesn't handle (e.g. sparse tar members). With an index cache, every archive but split
+            sets has a table.
+
+        Raises:
+            FailedToGetArchiveMembers: If there's an issue listing the archive members.
+        """
+        if not self.path_exists():
+            return MemberTable()
+
+        return self._read_member_table()
+
+    @instrumented("archive.get_member")
     @reraise_as(FailedToGetArchiveMember)
     def get_member(self, member_name: str) -> Optional[AbstractArchiveMember]:
         """
@@ -139,23 +223,45 @@ class Archive:
         Args:
             member_name: The name of the archive member to retrieve.
 
+        A member left out by add_members deduplication is found as the member holding its data, named after
+        its original.
+
         Returns:
             The archive member if found, otherwise None.
 
         Raises:
             FailedToGetArchiveMember: If there's an issue retrieving the member.
         """
+        if (member := self._get_member(member_name=member_name)) is not None:
+            return member
+
+        if (original := self._dedup_duplicates().get(member_name)) is None:
+            return None
+
+        return self._get_member(member_name=original)
+
+    def _get_member(self, member_name: str) -> Optional[AbstractArchiveMember]:
         if not self.path_exists():
             return None
 
-        with self._client.open(
-            file_path=self._path, mode="r"
-        ) as archive_object:
+        if (table := self._read_member_table()) is not None:
+            if (index := table.index(member_name)) is None:
+                return None
+            return table.member(
+                index=index, client=self._client, archive_path=self._path
+            )
+
+        with self._open(file_path=self._path, mode="r") as archive_object:
             return archive_object.get_member(member_name=member_name)
 
+    @instrumented("archive.extract_all")
     @reraise_as(FailedToExtractArchiveMembers)
     def extract_all(
-        self, target_directory_path: str | Path, in_place: bool = False
+        self,
+        target_directory_path: str | Path,
+        in_place: bool = False,
+        progress: Optional[ProgressCallback] = None,
+        check_crc: bool = False,
     ):
         """
         Extracts all members from the archive to a target directory.
@@ -163,27 +269,71 @@ class Archive:
         Args:
             target_directory_path: The directory path to extract the archive members to.
             in_place: If True, deletes the archive after extraction.
+            progress: A function called, at a bounded rate, with the size of the extracted members and the last extracted member.
+            check_crc: If True, the members copied without being decoded (zip members stored without compression)
+                are read back to check their CRC, as decoded members are.
 
         Raises:
             FailedToExtractArchiveMembers: If there's an issue extracting the archive members.
+            LimitExceeded: If the members sizes exceed the decompressed size or ratio limits.
         """
-        if self.get_members() == []:
+        if (members := self.get_members()) == []:
             return
 
-        with self._client.open(self._path, "r") as archive_object:
+        total_bytes = sum(member.size or 0 for member in members)
+        get_limits().check_decompressed_size(
+            decompressed_size=total_bytes, compressed_size=self.size
+        )
+        tracker = (
+            ProgressTracker(callback=progress, total_bytes=total_bytes)
+            if progress
+            else None
+        )
+
+        def on_member_extracted(member: AbstractArchiveMember) -> None:
+            if tracker is not None:
+                tracker.advance(size=member.size or 0, member=member.name)
+
+        with self._open(self._path, "r") as archive_object:
+            archive_object.check_copied_data = check_crc
             archive_object.extract_all(
-                target_directory_path=Path(target_directory_path)
+                target_directory_path=Path(target_directory_path),
+                on_member_extracted=on_member_extracted,
             )
+        record_bytes_written(total_bytes)
+
+        # restore the duplicates left out by add_members deduplication
+        for member in members:
+            if member.name.startswith(DEDUP_MANIFEST_PREFIX):
+                manifest_path = Path(target_directory_path) / member.name
+                if missing := restore_duplicates(
+                    directory=Path(target_directory_path),
+                    duplicates=read_manifest(manifest_path),
+                ):
+                    import warnings
+
+                    warnings.warn(
+                        f"the originals of the deduplicated members {missing} are missing from {self._path}",
+                        stacklevel=3,
+                    )
+                manifest_path.unlink()
+                if not any(manifest_path.parent.iterdir()):
+                    manifest_path.parent.rmdir()
+
+        if tracker is not None:
+            tracker.finish()
 
         if in_place:
             self._path.unlink()
 
+    @instrumented("archive.extract_member")
     @reraise_as(FailedToExtractArchiveMember)
     def extract_member(
         self,
         member_name: str,
         target_directory_path: str | Path,
         in_place: bool = False,
+        check_crc: bool = False,
     ):
         """
         Extracts a specific member from the archive to a target directory.
@@ -192,30 +342,211 @@ class Archive:
             member_name: The name of the archive member to extract.
             target_directory_path: The path to extract the archive member to.
             in_place: If True, deletes the archive member after extraction.
+            check_crc: If True, the members copied without being decoded (zip members stored without compression)
+                are read back to check their CRC, as decoded members are.
 
         Raises:
             FailedToExtractArchiveMember: If there's an issue extracting the archive member.
+            LimitExceeded: If the member size exceeds the decompressed size or ratio limits.
         """
-        if self.get_member(member_name=member_name) is None:
-            raise ArchiveMemberDoesNotExist()
+        if (member := self._get_member(member_name=member_name)) is None:
+            if (original := self._dedup_duplicates().get(member_name)) is None:
+                raise ArchiveMemberDoesNotExist()
+
+            self._extract_duplicate(
+                member_name=member_name,
+                original_member_name=original,
+                target_directory_path=Path(target_directory_path),
+            )
+            return
 
-        with self._client.open(self._path, "r") as archive_object:
+        get_limits().check_decompressed_size(
+            decompressed_size=member.size or 0, compressed_size=self.size
+        )
+
+        with self._open(self._path, "r") as archive_object:
+            archive_object.check_copied_data = check_crc
             archive_object.extract_member(
                 member_name=member_name,
                 target_directory_path=Path(target_directory_path),
             )
+        record_bytes_written(member.size or 0)
 
         if in_place:
             self.remove_member(member_name=member_name)
 
+    @instrumented("archive.extract_members")
+    @reraise_as(FailedToExtractArchiveMembers)
+    def extract_members(
+        self,
+        member_names: Iterable[str],
+        target_directory_path: str | Path,
+        progress: Optional[ProgressCallback] = None,
+        check_crc: bool = False,
+    ):
+        """
+        Extracts members from the archive to a target directory, opening it once.
+
+        The members of a 7z solid block are extracted together, so that every block is decoded once.
+
+        Args:
+            member_names: The names of the archive members to extract.
+            target_directory_path: The directory path to extract the archive members to.
+            progress: A function called, at a bounded rate, with the size of the extracted members and the last
+                extracted member.
+            check_crc: If True, the members copied without being decoded (zip members stored without compression)
+                are read back to check their CRC, as decoded members are.
+
+        Raises:
+            FailedToExtractArchiveMembers: If there's an issue extracting the archive members.
+            LimitExceeded: If the members sizes exceed the decompressed size or ratio limits.
+        """
+        member_names = list(member_names)
+        members = {member.name: member for member in self.get_members()}
+
+        duplicates = {}
+        if missing := [name for name in member_names if name not in members]:
+            dedup_duplicates = self._dedup_duplicates()
+            if any(name not in dedup_duplicates for name in missing):
+                raise ArchiveMemberDoesNotExist()
+            duplicates = {name: dedup_duplicates[name] for name in missing}
+
+        total_bytes = sum(
+            members[name].size or 0 for name in member_names if name in members
+        )
+        get_limits().check_decompressed_size(
+            decompressed_size=total_bytes, compressed_size=self.size
+        )
+        tracker = (
+            ProgressTracker(callback=progress, total_bytes=total_bytes)
+            if progress
+            else None
+        )
+
+        def on_member_extracted(member: AbstractArchiveMember) -> None:
+            if tracker is not None:
+                tracker.advance(size=member.size or 0, member=member.name)
+
+        with self._open(self._path, "r") as archive_object:
+            archive_object.check_copied_data = check_crc
+            archive_object.extract_members(
+                member_names=[
+                    name for name in member_names if name in members
+                ],
+                target_directory_path=Path(target_directory_path),
+                on_member_extracted=on_member_extracted,
+            )
+        record_bytes_written(total_bytes)
+
+        for member_name, original_member_name in duplicates.items():
+            self._extract_duplicate(
+                member_name=member_name,
+                original_member_name=original_member_name,
+                target_directory_path=Path(target_directory_path),
+            )
+
+        if tracker is not None:
+            tracker.finish()
+
+    @instrumented("archive.verify")
+    @reraise_as(FailedToVerifyArchive)
+    def verify(
+        self,
+        workers: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> VerificationReport:
+        """
+        Checks the archive by decoding its members, without writing them anywhere.
+
+        Zip members are checked against their CRC32, 7z members against their CRC as their block is decoded,
+        and tar headers against their checksum, tar archives having no checksums of the data. Zip members and
+        7z blocks are decoded in parallel, and the checks stop at the first corrupted member.
+
+        Args:
+            workers: The number of threads decoding members at once. If None, the CPU count.
+            progress: A function called, at a bounded rate, with the size of the checked members and the last
+                checked member.
+
+        Returns:
+            The report of the check, telling the first corrupted member and where in it the corruption is.
+
+        Raises:
+            FailedToVerifyArchive: If the archive doesn't exist, or there's an issue reading it.
+        """
+        if not self._path.exists():
+            raise FileNotFoundError(self._path)
+
+        workers = get_limits().workers(workers)
+        tracker: Optional[ProgressTracker] = None
+        checked_members = checked_bytes = 0
+        report: Optional[VerificationReport] = None
+        try:
+            if progress:
+                tracker = ProgressTracker(
+                    callback=progress,
+                    total_bytes=sum(
+                        member.size or 0 for member in self.get_members()
+                    ),
+                )
+
+            with self._open(self._path, "r") as archive_object:
+                for check in archive_object.verify_members(workers=workers):
+                    if check.error is not None:
+                        report = VerificationReport(
+                            checked_members=checked_members,
+                            checked_bytes=checked_bytes,
+                            error=check.error,
+                            member=check.name,
+                            offset=check.offset,
+                        )
+                        break
+
+                    checked_members += 1
+                    checked_bytes += check.size
+                    if tracker is not None:
+                        tracker.advance(size=check.size, member=check.name)
+        except LimitExceeded:
+            raise
+        except Exception as error:
+            # e.g. a corrupted zip central directory, or 7z header
+            report = VerificationReport(
+                checked_members=checked_members,
+                checked_bytes=checked_bytes,
+                error=describe(error),
+            )
+        record_bytes_read(self.size)
+
+        if tracker is not None:
+            tracker.finish()
+
+        return report or VerificationReport(
+            checked_members=checked_members, checked_bytes=checked_bytes
+        )
+
+    @instrumented("archive.add_member")
     @reraise_as(FailedToAddNewMemberToArchive)
-    def add_member(self, member_path: str | Path, in_place: bool = False):
+    def add_member(
+        self,
+        member_path: str | Path,
+        in_place: bool = False,
+        progress: Optional[ProgressCallback] = None,
+        incompressible_policy: Optional[str] = None,
+    ) -> Optional[CompressibilityReport]:
         """
         Adds a new member to the archive.
 
         Args:
             member_path: The path to the file to be added to the archive.
             in_place: If True, deletes the file after adding it to the archive.
+            progress: A function called before and after the member is added.
+            incompressible_policy: If None, the member is added as the format writes members by default (stored
+                for zip), without checking the file. Otherwise, formats compressing members one by one (zip)
+                compress it, and what to do with an incompressible file (e.g. JPEG, MP4, high entropy data) is
+                set: "store" or "fast" set how it is written, "skip" leaves it out, and "compress" skips the
+                check.
+
+        Returns:
+            The compressibility report of the file, if it was checked.
 
         Raises:
             FailedToAddNewMemberToArchive: If there's an issue adding the new member to the archive.
@@ -225,48 +556,565 @@ class Archive:
         if not member_path.exists():
             raise FileNotFoundError()
 
-        with self._client.open(self._path, "a") as archive_object:
-            archive_object.add_member(member_path=member_path)
+        report = None
+        compression = MemberCompression.DEFAULT
+
+        if incompressible_policy is not None:
+            policy = IncompressiblePolicy(incompressible_policy)
+            compression = MemberCompression.DEFLATED
+            if policy is IncompressiblePolicy.SKIP or (
+                policy is not IncompressiblePolicy.COMPRESS
+                and Capability.MEMBER_COMPRESSION in self._capabilities
+            ):
+                report = check_compressibility(path=member_path)
+
+        if report is not None and report.incompressible:
+            match policy:
+                case IncompressiblePolicy.SKIP:
+                    return report
+                case IncompressiblePolicy.STORE:
+                    compression = MemberCompression.STORED
+                case IncompressiblePolicy.FAST:
+                    compression = MemberCompression.FAST
+
+        size = member_path.stat().st_size
+        tracker = (
+            ProgressTracker(callback=progress, total_bytes=size)
+            if progress
+            else None
+        )
+        if tracker is not None:
+            tracker.advance(size=0, member=member_path.name)
+
+        with self._open(self._path, "a") as archive_object:
+            archive_object.add_member(
+                member_path=member_path, compression=compression
+            )
+        record_bytes_read(size)
+
+        if tracker is not None:
+            tracker.advance(size=size)
+            tracker.finish()
 
         if in_place:
             member_path.unlink()
 
+        return report
+
+    @instrumented("archive.add_members")
+    @reraise_as(FailedToAddNewMembersToArchive)
+    def add_members(
+        self,
+        member_paths: Iterable[str | Path],
+        base_directory_path: str | Path | None = None,
+        deduplicate: bool = False,
+        hash_algorithm: Optional[str] = None,
+        in_place: bool = False,
+        progress: Optional[ProgressCallback] = None,
+    ) -> DedupReport:
+        """
+        Adds new members to the archive, opening it once.
+
+        With deduplication, files with the same content are stored once: tar archives get hard link members
+        for the duplicates, other formats a manifest member, used by extract_all and extract_member to
+        restore them.
+
+        Args:
+            member_paths: The paths to the files to be added to the archive.
+            base_directory_path: The directory the members names are relative to. If None, members are
+                named after the files names.
+            deduplicate: If True, stores the data of identical files once.
+            hash_algorithm: The algorithm comparing the files contents, "blake3", "xxh3_128" or "blake2b".
+                If None, the fastest installed one is used.
+            in_place: If True, deletes the files after adding them to the archive.
+            progress: A function called, at a bounded rate, with the size of the added files and the last
+                added member.
+
+        Returns:
+            The deduplication report.
+
+        Raises:
+            FailedToAddNewMembersToArchive: If there's an issue adding the new members to the archive.
+        """
+        members = []
+        for member_path in map(Path, member_paths):
+            if not member_path.exists():
+                raise FileNotFoundError(member_path)
+
+            name = (
+                member_path.relative_to(base_directory_path).as_posix()
+                if base_directory_path is not None
+                else member_path.name
+            )
+            members.append((member_path, name))
+
+        if deduplicate:
+            report = find_duplicates(
+                members=members, hash_algorithm=hash_algorithm
+            )
+        else:
+            total_bytes = sum(path.stat().st_size for path, _ in members)
+            report = DedupReport(
+                files=len(members),
+                unique_files=len(members),
+                total_bytes=total_bytes,
+                unique_bytes=total_bytes,
+            )
+
+        tracker = (
+            ProgressTracker(callback=progress, total_bytes=report.total_bytes)
+            if progress
+            else None
+        )
+        manifest_duplicates = {}
+
+        with self._open(self._path, "a") as archive_object:
+            for member_path, name in members:
+                if (original := report.duplicates.get(name)) is None:
+                    archive_object.add_member(
+                        member_path=member_path, arcname=name
+                    )
+                elif not archive_object.add_link(
+                    member_path=member_path,
+                    arcname=name,
+                    target_arcname=original,
+                ):
+                    manifest_duplicates[name] = original
+
+                if tracker is not None:
+                    tracker.advance(
+                        size=member_path.stat().st_size, member=name
+                    )
+
+            if manifest_duplicates:
+                self._add_manifest(
+                    archive_object=archive_object,
+                    duplicates=manifest_duplicates,
+                )
+        record_bytes_read(report.total_bytes)
+
+        if tracker is not None:
+            tracker.finish()
+
+        if in_place:
+            for member_path, _ in members:
+                member_path.unlink()
+
+        return report
+
+    @instrumented("archive.sync_from")
+    @reraise_as(FailedToSyncArchive)
+    def sync_from(
+        self,
+        directory_path: str | Path,
+        compare_contents: bool = False,
+        hash_algorithm: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> SyncReport:
+        """
+        Updates the archive to mirror a directory, adding only the new and changed files.
+
+        Files are compared to the members by size and modification time. When there are only new files,
+        they are appended to the archive. Otherwise, the archive is rewritten once: unchanged members are
+        copied as is, without being decompressed, when the format allows it (zip, tar), and are added from
+        the directory otherwise (7z).
+
+        Args:
+            directory_path: The directory to mirror, the members names being the files relative paths.
+            compare_contents: If True, the files with the same size and modification time as their member
+                are also compared by content.
+            hash_algorithm: The algorithm comparing the contents, "blake3", "xxh3_128" or "blake2b". If None,
+                the fastest installed one is used.
+            progress: A function called, at a bounded rate, with the size of the added files and the last
+                added member.
+
+        Returns:
+            The report of the added, changed, removed and unchanged members.
+
+        Raises:
+            FailedToSyncArchive: If there's an issue updating the archive.
+            LimitExceeded: If rewriting the archive needs more temporary space than allowed.
+        """
+        directory_path = Path(directory_path)
+
+        if not directory_path.is_dir():
+            raise NotADirectoryError(directory_path)
+
+        files = directory_files(directory=directory_path)
+        # the duplicates left out by add_members deduplication are compared
+        # as their original, and the manifests listing them aren't files
+        duplicates = self._dedup_duplicates()
+        report = compare_directory(
+            members=[
+                member
+                for member in self.get_members()
+                if not member.name.startswith(DEDUP_MANIFEST_PREFIX)
+            ],
+            files=files,
+            duplicates=duplicates,
+        )
+
+        unchanged_files = [
+            name
+            for name in report.unchanged
+            if files[name.rstrip("/")].is_file()
+        ]
+        if compare_contents and unchanged_files:
+            modified = self._modified_members(
+                member_names=unchanged_files,
+                files=files,
+                hash_algorithm=hash_algorithm,
+                duplicates=duplicates,
+            )
+            report.changed = sorted(report.changed + modified)
+            report.unchanged = [
+                name for name in report.unchanged if name not in modified
+            ]
+
+        if report.up_to_date:
+            return report
+
+        added_names = report.added + report.changed
+        total_bytes = sum(files[name].stat().st_size for name in added_names)
+        tracker = (
+            ProgressTracker(callback=progress, total_bytes=total_bytes)
+            if progress
+            else None
+        )
+
+        def add_files(archive_object: AbstractArchiveObject) -> None:
+            for name in added_names:
+                archive_object.add_member(
+                    member_path=files[name], arcname=name
+                )
+                if tracker is not None:
+                    tracker.advance(
+                        size=files[name].stat().st_size, member=name
+                    )
+
+        if not report.changed and not report.removed:
+            with self._open(self._path, "a") as archive_object:
+                add_files(archive_object)
+        else:
+            report.rewritten = True
+
+            with get_limits().temporary_directory(
+                required_bytes=self.size + total_bytes
+            ) as temporary_directory:
+                record_temp_file()
+                new_archive_path = Path(temporary_directory) / "new_archive"
+
+                # the duplicates of kept originals stay in a new manifest,
+                # the others are added from their files
+                unchanged = set(report.unchanged)
+                kept_duplicates = {
+                    name: original
+                    for name, original in duplicates.items()
+                    if name in unchanged and original in unchanged
+                }
+                with self._open(self._path, "r") as archive_object, self._open(
+                    new_archive_path, "w"
+                ) as new_archive_object:
+                    for name in report.unchanged:
+                        if name in kept_duplicates:
+                            continue
+                        if name not in duplicates and (
+                            new_archive_object.copy_member(
+                                source=archive_object, member_name=name
+                            )
+                        ):
+                            report.copied_raw += 1
+                        elif (path := files[name.rstrip("/")]).is_dir():
+                            new_archive_object.add_member_stream(
+                                entry=MemberEntry(
+                                    name=name.rstrip("/"),
+                                    size=0,
+                                    mtime=path.stat().st_mtime,
+                                    is_directory=True,
+                                ),
+                                stream=None,
+                            )
+                        else:
+                            new_archive_object.add_member(
+                                member_path=files[name], arcname=name
+                            )
+                    add_files(new_archive_object)
+                    if kept_duplicates:
+                        self._add_manifest(
+                            archive_object=new_archive_object,
+                            duplicates=kept_duplicates,
+                        )
+                record_bytes_written(new_archive_path.stat().st_size)
+
+                import shutil
+
+                # the temp directory may be on another file system
+                shutil.move(new_archive_path, self._path)
+        record_bytes_read(total_bytes)
+
+        if tracker is not None:
+            tracker.finish()
+
+        return report
+
+    @instrumented("archive.convert_to")
+    @reraise_as(FailedToConvertArchive)
+    def convert_to(
+        self,
+        target_path: str | Path,
+        target_type: Optional[str] = None,
+        compression: MemberCompression = MemberCompression.DEFAULT,
+        workers: Optional[int] = 1,
+        progress: Optional[ProgressCallback] = None,
+        volume_size: Optional[int] = None,
+        on_volume: Optional[VolumeCallback] = None,
+    ) -> "Archive":
+        """
+        Converts the archive to another format, streaming every member from this archive into the new one.
+
+        Members are read and written in one pass, in bounded memory, without being extracted to the file system.
+        Names, directories and modification times are kept, and links are stored as copies of their targets. The
+        new archive is written next to the target path and moved there once complete.
+
+        Args:
+            target_path: The path of the new archive, replaced if it exists.
+            target_type: The type of the new archive, "zip", "tar" or "7z". If None, it is inferred from the
+                target path extension.
+            compression: How the members are compressed, in formats compressing members one by one (zip).
+            workers: The number of threads compressing small zip members in parallel. If None, the CPU count.
+            progress: A function called, at a bounded rate, with the size of the converted members and the last
+                converted member.
+            volume_size: If given, the new archive is split into volumes of this size, numbered from 001 after the
+                target path. Tar archives are streamed into the volumes, each complete before the next one is
+                started; zip and 7z writers seek back into what they wrote, so these archives are written first,
+                and then split into volumes copied in parallel.
+            on_volume: A function called with the path of every volume once complete, e.g. to upload it.
+
+        Returns:
+            The new archive, read from its first volume when split.
+
+        Raises:
+            FailedToConvertArchive: If there's an issue converting the archive.
+        """
+        import os
+        import uuid
+
+        target_path = Path(target_path)
+        target_type = target_type or target_path.suffix.lstrip(".")
+
+        if (registration := archives_registry.get(target_type)) is None:
+            raise ValueError(ERROR_MESSAGE_NOT_SUPPORTED)
+
+        if not self.path_exists():
+            raise FileNotFoundError(self._path)
+
+        if target_path.resolve() == self._path.resolve():
+            raise ValueError("the archive can't be converted in place")
+
+        tracker = (
+            ProgressTracker(
+                callback=progress,
+                total_bytes=sum(
+                    member.size or 0 for member in self.get_members()
+                ),
+            )
+            if progress
+            else None
+        )
+
+        def on_member_added(entry: MemberEntry) -> None:
+            if tracker is not None:
+                tracker.advance(size=entry.size, member=entry.name)
+
+        client = registration.get_client()
+        workers = get_limits().workers(workers)
+        streamed = (
+            volume_size is not None
+            and Capability.STREAMING in registration.capabilities
+        )
+        # written in the target directory, so that moving it is atomic
+        new_archive_path = target_path.with_name(
+            f".{target_path.name}.{uuid.uuid4().hex}"
+        )
+        try:
+            with self._open(
+                file_path=self._path, mode="r"
+            ) as archive_object, ExitStack() as stack:
+                record_archive_open()
+                record_codec(target_type)
+                if streamed:
+                    new_archive_object = client.open_stream(
+                        stream=stack.enter_context(
+                            VolumeWriter(
+                                path=target_path,
+                                volume_size=volume_size,  # type: ignore
+                                on_volume=on_volume,
+                            )
+                        ),
+                        file_path=target_path,
+                    )
+                else:
+                    new_archive_object = client.open(
+                        file_path=new_archive_path, mode="w"
+                    )
+                with new_archive_object:
+                    new_archive_object.add_member_streams(
+                        streams=archive_object.iter_member_streams(),
+                        compression=compression,
+                        workers=workers,
+                        on_member_added=on_member_added,
+                    )
+            if volume_size is None:
+                os.replace(new_archive_path, target_path)
+            elif not streamed:
+                split_file(
+                    path=new_archive_path,
+                    volume_size=volume_size,
+                    target_path=target_path,
+                    workers=workers,
+                    on_volume=on_volume,
+                )
+                new_archive_path.unlink()
+        except BaseException:
+            new_archive_path.unlink(missing_ok=True)
+            if volume_size is not None:
+                remove_stale_volumes(path=target_path, count=0)
+            raise
+
+        if volume_size is not None:
+            target_path = volume_path(target_path, 1)
+        record_bytes_read(self.size)
+        record_bytes_written(file_size(target_path))
+
+        if tracker is not None:
+            tracker.finish()
+
+        return Archive(path=target_path)
+
+    @instrumented("archive.split")
+    @reraise_as(FailedToSplitArchive)
+    def split(
+        self,
+        volume_size: int,
+        target_path: str | Path | None = None,
+        workers: Optional[int] = None,
+        on_volume: Optional[VolumeCallback] = None,
+    ) -> list[Path]:
+        """
+        Splits the archive into volumes of a given size, which Archive reads back from the first one.
+
+        Every volume is a range of the archive, and the volumes are copied in parallel, by the kernel where the
+        file system allows it. The archive is left in place.
+
+        Args:
+            volume_size: The size of every volume but the last one.
+            target_path: The path the volumes are numbered after, from 001. If None, the archive path.
+            workers: The number of volumes copied at once. If None, the CPU count.
+            on_volume: A function called with the path of every volume once complete, in order.
+
+        Returns:
+            The paths of the volumes.
+
+        Raises:
+            FailedToSplitArchive: If the archive doesn't exist, is already split, or there's an issue copying it.
+        """
+        if not self.path_exists():
+            raise FileNotFoundError(self._path)
+
+        if is_split_set(self._path):
+            raise ValueError("the archive is already split")
+
+        volumes = split_file(
+            path=self._path,
+            volume_size=volume_size,
+            target_path=Path(target_path) if target_path else None,
+            workers=get_limits().workers(workers),
+            on_volume=on_volume,
+        )
+
+        record_bytes_read(self.size)
+        record_bytes_written(self.size)
+        return volumes
+
+    @instrumented("archive.remove_member")
     @reraise_as(FailedToRemoveArchiveMember)
     def remove_member(self, member_name: str):
         """
         Removes a specific member from the archive.
 
+        The members left out by add_members deduplication are removed from its manifest, and removing their
+        original keeps its data under the name of one of them.
+
         Args:
             member_name: The name of the archive member to remove.
 
         Raises:
             FailedToRemoveArchiveMember: If there's an issue removing the archive member.
+            LimitExceeded: If rewriting the archive needs more temporary space than allowed.
         """
         if not self.member_exist(member_name=member_name):
             raise ArchiveMemberDoesNotExist()
 
-        with tempfile.TemporaryDirectory() as temporary_directory:
-            temporary_directory_members_path = (
-                Path(temporary_directory) / "files"
-            )
-            temporary_directory_members_path.mkdir()
-
-            for member in self.get_members():
-                if not member.name == member_name:
-                    with self._client.open(self._path, "r") as archive_object:
-                        archive_object.extract_member(
-                            member_name=member.name,
-                            target_directory_path=temporary_directory_members_path,
-                        )
+        # a removed original of duplicates left out by deduplication is kept
+        # under the name of one of them, holding the data of the others
+        removed = member_name.rstrip("/")
+        duplicates, promoted = remove_duplicate(
+            duplicates=self._dedup_duplicates(), name=removed
+        )
+        member_names = [
+            member.name
+            for member in self.get_members()
+            if not member.name == member_name
+            and not member.name.startswith(DEDUP_MANIFEST_PREFIX)
+        ]
 
+        def kept_streams(
+            archive_object: AbstractArchiveObject, copied: set[str]
+        ) -> MemberStreams:
+            for entry, stream in archive_object.iter_member_streams():
+                if entry.name == removed:
+                    if promoted is not None:
+                        yield replace(entry, name=promoted), stream
+                elif entry.name not in copied and not entry.name.startswith(
+                    DEDUP_MANIFEST_PREFIX
+                ):
+                    yield entry, stream
+
+        # the kept members are copied as is where the format allows it (zip,
+        # tar), and streamed from the archive otherwise (7z)
+        with get_limits().temporary_directory(
+            required_bytes=self.size
+        ) as temporary_directory:
+            record_temp_file()
             new_archive_path = Path(temporary_directory) / "new_archive"
 
-            with self._client.open(new_archive_path, "w") as new_file:
-                for file in temporary_directory_members_path.iterdir():
-                    new_file.add_member(member_path=file)
+            with self._open(self._path, "r") as archive_object, self._open(
+                new_archive_path, "w"
+            ) as new_archive_object:
+                copied = {
+                    name.rstrip("/")
+                    for name in member_names
+                    if new_archive_object.copy_member(
+                        source=archive_object, member_name=name
+                    )
+                }
+                if promoted is not None or len(copied) < len(member_names):
+                    new_archive_object.add_member_streams(
+                        streams=kept_streams(archive_object, copied=copied)
+                    )
+                if duplicates:
+                    self._add_manifest(
+                        archive_object=new_archive_object,
+                        duplicates=duplicates,
+                    )
+            record_bytes_written(new_archive_path.stat().st_size)
+
+            import shutil
 
-            new_archive_path.rename(self._path)
+            # the temp directory may be on another file system
+            shutil.move(new_archive_path, self._path)
 
+    @instrumented("archive.remove_all")
     @reraise_as(FailedToRemoveArchiveMembers)
     def remove_all(self):
         """
@@ -278,12 +1126,166 @@ class Archive:
         if not self.path_exists():
             return None
 
-        self._path.unlink()
+        remove_file(self._path)
+        if (index_cache := get_index_cache()) is not None:
+            index_cache.discard(archive_path=self._path)
+
+    def _dedup_duplicates(self) -> dict[str, str]:
+        """Returns the duplicates listed by the dedup manifests members."""
+        manifest_names = [
+            member.name
+            for member in self.get_members()
+            if member.name.startswith(DEDUP_MANIFEST_PREFIX)
+        ]
+        if not manifest_names:
+            return {}
+
+        duplicates = {}
+        with get_limits().temporary_directory() as temporary_directory:
+            record_temp_file()
+            with self._open(self._path, "r") as archive_object:
+                for manifest_name in manifest_names:
+                    archive_object.extract_member(
+                        member_name=manifest_name,
+                        target_directory_path=Path(temporary_directory),
+                    )
+                    duplicates.update(
+                        read_manifest(
+                            Path(temporary_directory) / manifest_name
+                        )
+                    )
+        return duplicates
+
+    def _modified_members(
+        self,
+        member_names: list[str],
+        files: dict[str, Path],
+        hash_algorithm: Optional[str],
+        duplicates: dict[str, str],
+    ) -> list[str]:
+        """Returns the members whose content differs from their file, the
+        duplicates left out by deduplication being read from their
+        original."""
+        with get_limits().temporary_directory(
+            required_bytes=sum(
+                files[name].stat().st_size for name in member_names
+            )
+        ) as temporary_directory:
+            record_temp_file()
+            with self._open(self._path, "r") as archive_object:
+                for name in {
+                    duplicates.get(name, name) for name in member_names
+                }:
+                    archive_object.extract_member(
+                        member_name=name,
+                        target_directory_path=Path(temporary_directory),
+                    )
+
+            return [
+                name
+                for name in member_names
+                if hash_file(
+                    Path(temporary_directory) / duplicates.get(name, name),
+                    algorithm=hash_algorithm,
+                )
+                != hash_file(files[name], algorithm=hash_algorithm)
+            ]
+
+    @staticmethod
+    def _add_manifest(
+        archive_object: AbstractArchiveObject, duplicates: dict[str, str]
+    ) -> None:
+        """Adds a dedup manifest member listing duplicates by their original."""
+        import uuid
+
+        with get_limits().temporary_directory() as temporary_directory:
+            record_temp_file()
+            manifest_path = Path(temporary_directory) / "manifest"
+            write_manifest(path=manifest_path, duplicates=duplicates)
+            archive_object.add_member(
+                member_path=manifest_path,
+                arcname=f"{DEDUP_MANIFEST_PREFIX}{uuid.uuid4().hex}.json",
+            )
+
+    def _extract_duplicate(
+        self,
+        member_name: str,
+        original_member_name: str,
+        target_directory_path: Path,
+    ):
+        with get_limits().temporary_directory() as temporary_directory:
+            record_temp_file()
+            with self._open(self._path, "r") as archive_object:
+                archive_object.extract_member(
+                    member_name=original_member_name,
+                    target_directory_path=Path(temporary_directory),
+                )
+
+            import shutil
+
+            target_path = target_directory_path / member_name
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(
+                Path(temporary_directory) / original_member_name, target_path
+            )
+            record_bytes_written(target_path.stat().st_size)
+
+    def _read_member_table(self) -> Optional[MemberTable]:
+        if is_split_set(self._path):
+            # the listings map, and the index cache keys, a single file
+            return None
+
+        if (index_cache := get_index_cache()) is None:
+            return self._parse_member_table()
+
+        key = archive_key(self._path)
+        entry = self._index_cache_entry
+        if entry is None or entry.key != key:
+            entry = index_cache.load(archive_path=self._path, key=key)
+
+        if entry is None:
+            table = self._parse_member_table()
+            if table is None:
+                with self._open(
+                    file_path=self._path, mode="r"
+                ) as archive_object:
+                    table = MemberTable.from_members(
+                        archive_object.get_members()
+                    )
+            entry = index_cache.store(
+                archive_path=self._path,
+                archive_type=self._type,
+                key=key,
+                table=table,
+            )
+
+        self._index_cache_entry = entry
+        return entry.table
+
+    def _parse_member_table(self) -> Optional[MemberTable]:
+        table = self._client.read_member_table(file_path=self._path)
+        if table is not None:
+            record_archive_open()
+            record_codec(self._type)
+            record_bytes_read(self.size)
+        return table
+
+    def _open(self, file_path: Path, mode: str) -> AbstractArchiveObject:
+        if mode != "r" and is_split_set(self._path):
+            raise ValueError(
+                "split archives can't be modified, convert them first"
+            )
+
+        record_archive_open()
+        record_codec(self._type)
+        return self._client.open(file_path=file_path, mode=mode)
 
     def print_members(self):
         """
         Prints the metadata of all members in the archive in a tabular format.
         """
+        from tabulate import tabulate
+
         members_metadata = [
             {
                 "name": member.name,
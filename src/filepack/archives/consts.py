@@ -3,3 +3,46 @@ from typing import Final
 TAR_SUFFIX: Final[str] = "tar"
 ZIP_SUFFIX: Final[str] = "zip"
 SEVEN_ZIP_SUFFIX: Final[str] = "7z"
+
+ZIP_MAGIC_NUMBERS: Final[tuple[bytes, ...]] = (
+    b"PK\x03\x04",  # local file header
+    b"PK\x05\x06",  # end of central directory (empty archive)
+    b"PK\x07\x08",  # spanned archive marker
+)
+SEVEN_ZIP_MAGIC_NUMBER: Final[bytes] = b"7z\xbc\xaf\x27\x1c"
+TAR_MAGIC_NUMBER: Final[bytes] = b"ustar"
+TAR_MAGIC_NUMBER_OFFSET: Final[int] = 257
+TAR_BLOCK_SIZE: Final[int] = 512
+
+ZIP_END_OF_CENTRAL_DIRECTORY_SIGNATURE: Final[bytes] = b"PK\x05\x06"
+ZIP64_END_OF_CENTRAL_DIRECTORY_SIGNATURE: Final[bytes] = b"PK\x06\x06"
+ZIP64_END_OF_CENTRAL_DIRECTORY_LOCATOR_SIGNATURE: Final[bytes] = b"PK\x06\x07"
+ZIP_CENTRAL_DIRECTORY_SIGNATURE: Final[bytes] = b"PK\x01\x02"
+ZIP_MAX_COMMENT_SIZE: Final[int] = 0xFFFF
+
+# 7z members are streamed through queues of this many chunks, read in
+# buffers of this size
+SEVEN_ZIP_STREAM_QUEUE_SIZE: Final[int] = 4
+SEVEN_ZIP_STREAM_CHUNK_SIZE: Final[int] = 1024 * 1024
+
+MEMBER_MTIME_FORMAT: Final[str] = "%a, %d %b %Y %H:%M:%S UTC"
+
+ZIP_FAST_COMPRESSION_LEVEL: Final[int] = 1
+# the zip members up to this size are read in memory to be compressed in
+# parallel, when converting archives with several workers
+ZIP_PARALLEL_MEMBER_SIZE: Final[int] = 4 * 1024 * 1024
+# the fixed size part of a zip local file header
+ZIP_LOCAL_FILE_HEADER_SIZE: Final[int] = 30
+
+# the members listing the duplicate members of a deduplicated archive, in
+# formats without links, one per add_members call
+DEDUP_MANIFEST_PREFIX: Final[str] = ".filepack-dedup/"
+DEDUP_MANIFEST_VERSION: Final[int] = 1
+
+# zip archives store modification times with a two seconds resolution
+SYNC_MTIME_TOLERANCE: Final[float] = 2.0
+
+# the member tables cached by IndexCache
+INDEX_CACHE_MAGIC_NUMBER: Final[bytes] = b"FPINDEX\x00"
+INDEX_CACHE_VERSION: Final[int] = 1
+INDEX_CACHE_SUFFIX: Final[str] = ".filepack-index"
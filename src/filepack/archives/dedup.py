@@ -0,0 +1,158 @@
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from filepack.archives.consts import DEDUP_MANIFEST_VERSION
+from filepack.hashing import default_hash_algorithm, hash_file
+from filepack.limits import get_limits
+
+
+@dataclass
+class DedupReport:
+    """The outcome of adding files to an archive with deduplication."""
+
+    files: int = 0
+    unique_files: int = 0
+    total_bytes: int = 0
+    unique_bytes: int = 0
+    hash_algorithm: Optional[str] = None
+    # duplicate member name -> name of the member holding its data
+    duplicates: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.total_bytes - self.unique_bytes
+
+    @property
+    def dedup_ratio(self) -> float:
+        """The total size over the stored size, 1.0 without duplicates."""
+        if self.unique_bytes == 0:
+            return 1.0
+
+        return self.total_bytes / self.unique_bytes
+
+
+def find_duplicates(
+    members: list[tuple[Path, str]], hash_algorithm: Optional[str] = None
+) -> DedupReport:
+    """Finds the files with the same content as a preceding file.
+
+    Only files sharing their size with another file are hashed, in a thread
+    pool.
+
+    Args:
+        members: The (file path, member name) pairs, in adding order.
+        hash_algorithm: The hash algorithm, or None for the fastest one.
+
+    Returns:
+        The report, mapping every duplicate to the first file of its content.
+    """
+    hash_algorithm = hash_algorithm or default_hash_algorithm()
+    sizes = [path.stat().st_size for path, _ in members]
+
+    paths_by_size: dict[int, list[Path]] = defaultdict(list)
+    for (path, _), size in zip(members, sizes):
+        paths_by_size[size].append(path)
+    candidates = [
+        path
+        for paths in paths_by_size.values()
+        if len(paths) > 1
+        for path in paths
+    ]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(
+        max_workers=get_limits().workers(len(candidates))
+    ) as executor:
+        digests = dict(
+            zip(
+                candidates,
+                executor.map(
+                    lambda path: hash_file(path, algorithm=hash_algorithm),
+                    candidates,
+                ),
+            )
+        )
+
+    report = DedupReport(hash_algorithm=hash_algorithm)
+    originals: dict[tuple[int, str], str] = {}
+    for (path, name), size in zip(members, sizes):
+        report.files += 1
+        report.total_bytes += size
+
+        if (digest := digests.get(path)) is not None:
+            if (original := originals.get((size, digest))) is not None:
+                report.duplicates[name] = original
+                continue
+            originals[(size, digest)] = name
+
+        report.unique_files += 1
+        report.unique_bytes += size
+
+    return report
+
+
+def write_manifest(path: Path, duplicates: dict[str, str]) -> None:
+    path.write_text(
+        json.dumps(
+            {"version": DEDUP_MANIFEST_VERSION, "duplicates": duplicates}
+        )
+    )
+
+
+def read_manifest(path: Path) -> dict[str, str]:
+    manifest = json.loads(path.read_text())
+    if manifest.get("version") != DEDUP_MANIFEST_VERSION:
+        raise ValueError(
+            f"unsupported dedup manifest version {manifest.get('version')}"
+        )
+
+    return manifest["duplicates"]
+
+
+def restore_duplicates(
+    directory: Path, duplicates: dict[str, str]
+) -> list[str]:
+    """Copies the extracted originals to their duplicates paths.
+
+    Returns:
+        The duplicates whose original wasn't extracted, left out.
+    """
+    import shutil
+
+    missing = []
+    for name, original in duplicates.items():
+        if not (directory / original).is_file():
+            missing.append(name)
+            continue
+        target = directory / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(directory / original, target)
+    return missing
+
+
+def remove_duplicate(
+    duplicates: dict[str, str], name: str
+) -> tuple[dict[str, str], Optional[str]]:
+    """Returns the duplicates left once a member is removed, and, when it is
+    the original of some, the one of them promoted to hold their data."""
+    kept = {
+        duplicate: original
+        for duplicate, original in duplicates.items()
+        if duplicate != name
+    }
+    copies = sorted(
+        duplicate for duplicate, original in kept.items() if original == name
+    )
+    if not copies:
+        return kept, None
+
+    promoted = copies[0]
+    del kept[promoted]
+    return {
+        duplicate: promoted if original == name else original
+        for duplicate, original in kept.items()
+    }, promoted
@@ -28,3 +28,23 @@ class FailedToRemoveArchiveMembers(Exception):
 
 class ArchiveMemberDoesNotExist(Exception):
     pass
+
+
+class FailedToAddNewMembersToArchive(Exception):
+    pass
+
+
+class FailedToSyncArchive(Exception):
+    pass
+
+
+class FailedToConvertArchive(Exception):
+    pass
+
+
+class FailedToSplitArchive(Exception):
+    pass
+
+
+class FailedToVerifyArchive(Exception):
+    pass
@@ -0,0 +1,272 @@
+import os
+import struct
+import sys
+from array import array
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from filepack.archives.consts import (
+    INDEX_CACHE_MAGIC_NUMBER,
+    INDEX_CACHE_SUFFIX,
+    INDEX_CACHE_VERSION,
+)
+from filepack.archives.listing import MemberTable
+
+# magic number, version, flags, archive type, the archive's inode, size and
+# modification time in nanoseconds, members count, names size
+_HEADER = struct.Struct("<8sHH8sQQqQQ")
+_HAS_CRCS = 0x1
+_HAS_BLOCKS = 0x2
+# the columns are written in the byte order of the writing machine
+_BIG_ENDIAN = 0x4
+_NATIVE_BYTE_ORDER = _BIG_ENDIAN if sys.byteorder == "big" else 0
+_NAMES_SEPARATOR = "\x00"
+
+ArchiveKey = tuple[int, int, int]
+
+
+def archive_key(archive_path: Path) -> ArchiveKey:
+    """Returns the inode, size and modification time of the archive."""
+    stat = archive_path.stat()
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+@dataclass(frozen=True)
+class IndexCacheEntry:
+    archive_type: str
+    key: ArchiveKey
+    table: MemberTable
+
+
+@dataclass(frozen=True)
+class IndexCache:
+    """Caches the member tables of archives on disk, in a compact binary format.
+
+    An entry is used only while the archive keeps the inode, size and
+    modification time it was listed with, so a modified archive is listed
+    again. The cache is an optimization: unreadable entries are ignored,
+    and entries that can't be written are skipped.
+    """
+
+    # the directory of the entries, named after the archives paths; None
+    # to write them next to the archives, as sidecar files
+    directory: Optional[str | Path] = None
+
+    def index_path(self, archive_path: Path) -> Path:
+        if self.directory is None:
+            return archive_path.with_name(
+                archive_path.name + INDEX_CACHE_SUFFIX
+            )
+
+        import hashlib
+
+        digest = hashlib.sha256(
+            str(archive_path.resolve()).encode("utf-8", "surrogateescape")
+        ).hexdigest()
+        return Path(self.directory) / (digest + INDEX_CACHE_SUFFIX)
+
+    def load(
+        self, archive_path: Path, key: Optional[ArchiveKey] = None
+    ) -> Optional[IndexCacheEntry]:
+        """
+        Loads the cached member table of the archive.
+
+        Args:
+            archive_path: The path of the archive.
+            key: The current key of the archive, if already known.
+
+        Returns:
+            The entry, or None if there's none or the archive has changed since it was written.
+        """
+        try:
+            if key is None:
+                key = archive_key(archive_path)
+
+            # the columns are copied into arrays, so the entry is read at
+            # once rather than mapped
+            data = self.index_path(archive_path).read_bytes()
+        except (OSError, ValueError):
+            return None
+
+        try:
+            return _read_entry(data=memoryview(data), key=key)
+        except (struct.error, ValueError, UnicodeDecodeError):
+            return None
+
+    def store(
+        self,
+        archive_path: Path,
+        archive_type: str,
+        key: ArchiveKey,
+        table: MemberTable,
+    ) -> IndexCacheEntry:
+        """
+        Writes the member table of the archive, replacing its previous entry atomically.
+
+        Args:
+            archive_path: The path of the archive.
+            archive_type: The detected type of the archive.
+            key: The key of the archive when the table was read.
+            table: The member table.
+
+        Returns:
+            The stored entry.
+        """
+        entry = IndexCacheEntry(
+            archive_type=archive_type, key=key, table=table
+        )
+        if any(_NAMES_SEPARATOR in name for name in table.names):
+            return entry
+
+        import tempfile
+
+        index_path = self.index_path(archive_path)
+        names = _NAMES_SEPARATOR.join(table.names).encode(
+            "utf-8", "surrogateescape"
+        )
+        flags = _NATIVE_BYTE_ORDER
+        columns = [
+            table.sizes,
+            table.compressed_sizes,
+            table.offsets,
+            table.mtimes,
+        ]
+        if table.crcs is not None:
+            flags |= _HAS_CRCS
+            columns.append(table.crcs)
+        if table.blocks is not None:
+            flags |= _HAS_BLOCKS
+            columns.append(table.blocks)
+
+        temporary_path: Optional[str] = None
+        try:
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                dir=index_path.parent, prefix=index_path.name, delete=False
+            ) as file:
+                temporary_path = file.name
+                file.write(
+                    _HEADER.pack(
+                        INDEX_CACHE_MAGIC_NUMBER,
+                        INDEX_CACHE_VERSION,
+                        flags,
+                        archive_type.encode(),
+                        *key,
+                        len(table),
+                        len(names),
+                    )
+                )
+                for column in columns:
+                    file.write(column.tobytes())
+                file.write(names)
+            os.replace(temporary_path, index_path)
+        except OSError:
+            if temporary_path is not None:
+                with suppress(OSError):
+                    os.unlink(temporary_path)
+
+        return entry
+
+    def discard(self, archive_path: Path) -> None:
+        """Removes the entry of the archive, if any."""
+        with suppress(OSError):
+            self.index_path(archive_path).unlink()
+
+
+def _read_entry(
+    data: memoryview, key: ArchiveKey
+) -> Optional[IndexCacheEntry]:
+    (
+        magic_number,
+        version,
+        flags,
+        archive_type,
+        *entry_key,
+        count,
+        names_size,
+    ) = _HEADER.unpack_from(data)
+    if (
+        magic_number != INDEX_CACHE_MAGIC_NUMBER
+        or version != INDEX_CACHE_VERSION
+        or flags & _BIG_ENDIAN != _NATIVE_BYTE_ORDER
+        or tuple(entry_key) != key
+    ):
+        return None
+
+    position = _HEADER.size
+
+    def read_column(typecode: str) -> array:
+        nonlocal position
+        column = array(typecode)
+        end = position + column.itemsize * count
+        column.frombytes(data[position:end])
+        if len(column) != count:
+            raise ValueError("truncated index")
+        position = end
+        return column
+
+    table = MemberTable(
+        sizes=read_column("Q"),
+        compressed_sizes=read_column("Q"),
+        offsets=read_column("Q"),
+        mtimes=read_column("d"),
+    )
+    if flags & _HAS_CRCS:
+        table.crcs = read_column("I")
+    if flags & _HAS_BLOCKS:
+        table.blocks = read_column("q")
+
+    names_end = position + names_size
+    if names_end != len(data):
+        raise ValueError("truncated index")
+    table.names = (
+        bytes(data[position:names_end])
+        .decode("utf-8", "surrogateescape")
+        .split(_NAMES_SEPARATOR)
+        if count
+        else []
+    )
+    if len(table.names) != count:
+        raise ValueError("corrupted index")
+
+    return IndexCacheEntry(
+        archive_type=archive_type.rstrip(b"\x00").decode(),
+        key=key,
+        table=table,
+    )
+
+
+_default_index_cache: Optional[IndexCache] = None
+_current_index_cache: ContextVar[Optional[IndexCache]] = ContextVar(
+    "filepack_index_cache", default=None
+)
+
+
+def get_index_cache() -> Optional[IndexCache]:
+    """Returns the index cache of the current context, or the global one."""
+    index_cache = _current_index_cache.get()
+    return index_cache if index_cache is not None else _default_index_cache
+
+
+def set_index_cache(index_cache: Optional[IndexCache]) -> None:
+    """Sets the global index cache, None to disable it."""
+    global _default_index_cache
+    _default_index_cache = index_cache
+
+
+@contextmanager
+def use_index_cache(index_cache: IndexCache) -> Iterator[IndexCache]:
+    """Caches the member tables of the archives listed inside the block.
+
+    Usage:
+        with use_index_cache(IndexCache(directory="/var/cache/filepack")):
+            Archive("dataset.tar").get_members()
+    """
+    token = _current_index_cache.set(index_cache)
+    try:
+        yield index_cache
+    finally:
+        _current_index_cache.reset(token)
@@ -0,0 +1,506 @@
+import mmap
+import struct
+from array import array
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from filepack.archives.consts import (
+    MEMBER_MTIME_FORMAT,
+    TAR_BLOCK_SIZE,
+    ZIP64_END_OF_CENTRAL_DIRECTORY_LOCATOR_SIGNATURE,
+    ZIP64_END_OF_CENTRAL_DIRECTORY_SIGNATURE,
+    ZIP_CENTRAL_DIRECTORY_SIGNATURE,
+    ZIP_END_OF_CENTRAL_DIRECTORY_SIGNATURE,
+    ZIP_MAX_COMMENT_SIZE,
+)
+from filepack.archives.models import (
+    AbsractArchiveClient,
+    AbstractArchiveMember,
+)
+
+_ZIP_END_OF_CENTRAL_DIRECTORY = struct.Struct("<4s4H2LH")
+_ZIP64_END_OF_CENTRAL_DIRECTORY_LOCATOR = struct.Struct("<4sLQL")
+_ZIP64_END_OF_CENTRAL_DIRECTORY = struct.Struct("<4sQ2H2L4Q")
+_ZIP_CENTRAL_DIRECTORY_ENTRY = struct.Struct("<4s4B4HL2L5H2L")
+_ZIP_EXTRA_FIELD_HEADER = struct.Struct("<2H")
+_ZIP64_EXTRA_FIELD_ID = 1
+_ZIP_UTF8_FLAG = 0x800
+_ZIP32_MAX = 0xFFFFFFFF
+
+# the tar member types handled by the parser; others, e.g. sparse files,
+# are listed by tarfile
+_TAR_DATA_TYPES = (b"0", b"\x00", b"7")
+_TAR_NO_DATA_TYPES = (b"1", b"2", b"3", b"4", b"5", b"6")
+_TAR_DIRECTORY_TYPE = b"5"
+_TAR_GNU_LONG_NAME_TYPE = b"L"
+_TAR_GNU_LONG_LINK_TYPE = b"K"
+_TAR_PAX_TYPE = b"x"
+_TAR_PAX_GLOBAL_TYPE = b"g"
+_TAR_ZERO_BLOCK = bytes(TAR_BLOCK_SIZE)
+
+
+@dataclass
+class MemberTable:
+    """The members of an archive, one array per field."""
+
+    names: list[str] = field(default_factory=list)
+    sizes: array = field(default_factory=lambda: array("Q"))
+    compressed_sizes: array = field(default_factory=lambda: array("Q"))
+    # the offsets of the members headers in the archive
+    offsets: array = field(default_factory=lambda: array("Q"))
+    # the modification times, in seconds since the epoch
+    mtimes: array = field(default_factory=lambda: array("d"))
+    # the CRC-32 of the members data, for formats storing it
+    crcs: Optional[array] = None
+    # the 7z solid blocks of the members, -1 for members without data
+    blocks: Optional[array] = None
+    _indexes: Optional[dict[str, int]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def index(self, name: str) -> Optional[int]:
+        """Returns the index of the last member of the name, if any."""
+        if self._indexes is None:
+            self._indexes = {
+                name: index for index, name in enumerate(self.names)
+            }
+
+        return self._indexes.get(name)
+
+    @classmethod
+    def from_members(
+        cls, members: list[AbstractArchiveMember]
+    ) -> "MemberTable":
+        """Builds the table of members listed by the format library.
+
+        The offsets and compressed sizes, which the members don't hold, are
+        set to 0.
+        """
+        table = cls(
+            names=[member.name for member in members],
+            sizes=array("Q", [member.size or 0 for member in members]),
+            compressed_sizes=array("Q", bytes(8 * len(members))),
+            offsets=array("Q", bytes(8 * len(members))),
+            mtimes=array("d", [member.timestamp for member in members]),
+        )
+        if any(member.block is not None for member in members):
+            table.blocks = array(
+                "q",
+                [
+                    -1 if member.block is None else member.block
+                    for member in members
+                ],
+            )
+        return table
+
+    def block(self, index: int) -> Optional[int]:
+        if self.blocks is None or self.blocks[index] < 0:
+            return None
+
+        return self.blocks[index]
+
+    def member(
+        self, index: int, client: AbsractArchiveClient, archive_path: Path
+    ) -> "IndexedMember":
+        return IndexedMember(
+            client=client,
+            archive_path=archive_path,
+            name=self.names[index],
+            size=self.sizes[index],
+            timestamp=self.mtimes[index],
+            block=self.block(index),
+        )
+
+    def members(
+        self, client: AbsractArchiveClient, archive_path: Path
+    ) -> list[AbstractArchiveMember]:
+        if self.blocks is not None:
+            return [
+                self.member(
+                    index=index, client=client, archive_path=archive_path
+                )
+                for index in range(len(self))
+            ]
+
+        return [
+            IndexedMember(
+                client=client,
+                archive_path=archive_path,
+                name=name,
+                size=size,
+                timestamp=mtime,
+            )
+            for name, size, mtime in zip(self.names, self.sizes, self.mtimes)
+        ]
+
+
+class IndexedMember(AbstractArchiveMember):
+    """A member listed by a MemberTable, its mtime formatted on demand."""
+
+    def __init__(
+        self,
+        client: AbsractArchiveClient,
+        archive_path: Path,
+        name: str,
+        size: int,
+        timestamp: float,
+        block: Optional[int] = None,
+    ) -> None:
+        super().__init__(
+            client=client,
+            archive_path=archive_path,
+            name=name,
+            size=size,
+            mtime="",
+            block=block,
+        )
+        self._timestamp = timestamp
+
+    @property
+    def mtime(self) -> str:
+        return datetime.fromtimestamp(
+            self._timestamp, tz=timezone.utc
+        ).strftime(MEMBER_MTIME_FORMAT)
+
+    @property
+    def timestamp(self) -> float:
+        return self._timestamp
+
+
+@contextmanager
+def _map(path: Path) -> Iterator[memoryview]:
+    with open(path, "rb") as file:
+        if file.seek(0, 2) == 0:
+            yield memoryview(b"")
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
+
+
+def _fallback_on_error(
+    reader: Callable[[memoryview], MemberTable],
+) -> Callable[[Path], Optional[MemberTable]]:
+    def read(path: Path) -> Optional[MemberTable]:
+        with _map(path) as data:
+            # handled before the file is unmapped, so that the traceback
+            # doesn't hold views of it
+            try:
+                return reader(data)
+            except (struct.error, ValueError, IndexError, OverflowError):
+                return None
+
+    read.__doc__ = reader.__doc__
+    return read
+
+
+def _dos_timestamp(
+    cache: dict[tuple[int, int], float], date: int, time: int
+) -> float:
+    # archives hold few distinct times, so they are converted once
+    if (timestamp := cache.get((date, time))) is None:
+        timestamp = cache[(date, time)] = datetime(
+            (date >> 9) + 1980,
+            (date >> 5) & 0xF,
+            date & 0x1F,
+            time >> 11,
+            (time >> 5) & 0x3F,
+            (time & 0x1F) * 2,
+        ).timestamp()
+    return timestamp
+
+
+def _read_zip(data: memoryview) -> MemberTable:
+    """Parses the end of central directory record and the central directory.
+
+    Returns:
+        The members table.
+
+    Raises:
+        ValueError: If the archive is malformed or uses unsupported features,
+            in which case zipfile lists it instead.
+    """
+    tail_start = max(
+        len(data) - _ZIP_END_OF_CENTRAL_DIRECTORY.size - ZIP_MAX_COMMENT_SIZE,
+        0,
+    )
+    end_offset = bytes(data[tail_start:]).rfind(
+        ZIP_END_OF_CENTRAL_DIRECTORY_SIGNATURE
+    )
+    if end_offset < 0:
+        raise ValueError("no end of central directory record")
+    end_offset += tail_start
+
+    (
+        _,
+        disk,
+        _,
+        _,
+        entries,
+        directory_size,
+        directory_offset,
+        _,
+    ) = _ZIP_END_OF_CENTRAL_DIRECTORY.unpack_from(data, end_offset)
+    directory_end = end_offset
+
+    locator_offset = end_offset - _ZIP64_END_OF_CENTRAL_DIRECTORY_LOCATOR.size
+    if locator_offset >= 0 and bytes(
+        data[locator_offset:end_offset]
+    ).startswith(ZIP64_END_OF_CENTRAL_DIRECTORY_LOCATOR_SIGNATURE):
+        zip64_end_offset = end_offset - (
+            _ZIP64_END_OF_CENTRAL_DIRECTORY_LOCATOR.size
+            + _ZIP64_END_OF_CENTRAL_DIRECTORY.size
+        )
+        zip64_end = _ZIP64_END_OF_CENTRAL_DIRECTORY.unpack_from(
+            data, zip64_end_offset
+        )
+        if zip64_end[0] != ZIP64_END_OF_CENTRAL_DIRECTORY_SIGNATURE:
+            raise ValueError("bad zip64 end of central directory record")
+        disk = zip64_end[4]
+        entries, directory_size, directory_offset = zip64_end[7:10]
+        directory_end = zip64_end_offset
+
+    if disk != 0:
+        raise ValueError("multi-disk archives are not supported")
+
+    # data prepended to the archive, e.g. by self-extracting archives,
+    # shifts every offset
+    shift = directory_end - directory_size - directory_offset
+    position = directory_offset + shift
+
+    table = MemberTable(crcs=array("I"))
+    times: dict[tuple[int, int], float] = {}
+    entry = _ZIP_CENTRAL_DIRECTORY_ENTRY
+    for _ in range(entries):
+        (
+            signature,
+            _,
+            _,
+            _,
+            _,
+            flags,
+            _,
+            time,
+            date,
+            crc,
+            compressed_size,
+            size,
+            name_length,
+            extra_length,
+            comment_length,
+            _,
+            _,
+            _,
+            header_offset,
+        ) = entry.unpack_from(data, position)
+        if signature != ZIP_CENTRAL_DIRECTORY_SIGNATURE:
+            raise ValueError("bad central directory entry")
+
+        position += entry.size
+        name_end = position + name_length
+        name = bytes(data[position:name_end])
+        position = name_end
+        extra_end = position + extra_length
+
+        if _ZIP32_MAX in (size, compressed_size, header_offset):
+            size, compressed_size, header_offset = _read_zip64_extra(
+                data[position:extra_end],
+                size,
+                compressed_size,
+                header_offset,
+            )
+        position = extra_end + comment_length
+
+        decoded_name = name.decode(
+            "utf-8" if flags & _ZIP_UTF8_FLAG else "cp437"
+        )
+        table.names.append(decoded_name.split("\x00", 1)[0])
+        table.sizes.append(size)
+        table.compressed_sizes.append(compressed_size)
+        table.offsets.append(header_offset + shift)
+        table.mtimes.append(_dos_timestamp(times, date, time))
+        table.crcs.append(crc)  # type: ignore
+
+    return table
+
+
+def _read_zip64_extra(
+    extra: memoryview, size: int, compressed_size: int, header_offset: int
+) -> tuple[int, int, int]:
+    position = 0
+    while position + _ZIP_EXTRA_FIELD_HEADER.size <= len(extra):
+        field_id, field_size = _ZIP_EXTRA_FIELD_HEADER.unpack_from(
+            extra, position
+        )
+        position += _ZIP_EXTRA_FIELD_HEADER.size
+        if field_id == _ZIP64_EXTRA_FIELD_ID:
+            # only the fields overflowing the central directory entry are
+            # stored, in this order
+            values = iter(
+                struct.unpack_from(f"<{field_size // 8}Q", extra, position)
+            )
+            if size == _ZIP32_MAX:
+                size = next(values)
+            if compressed_size == _ZIP32_MAX:
+                compressed_size = next(values)
+            if header_offset == _ZIP32_MAX:
+                header_offset = next(values)
+            return size, compressed_size, header_offset
+        position += field_size
+
+    raise ValueError("missing zip64 extra field")
+
+
+def _tar_string(field: memoryview) -> str:
+    return bytes(field).split(b"\x00", 1)[0].decode("utf-8", "surrogateescape")
+
+
+def _tar_number(field: memoryview) -> int:
+    if field[0] in (0o200, 0o377):
+        # base-256, for numbers too large for the octal digits
+        number = int.from_bytes(field[1:], "big")
+        if field[0] == 0o377:
+            number -= 256 ** (len(field) - 1)
+        return number
+
+    digits = bytes(field).split(b"\x00", 1)[0].strip()
+    return int(digits or b"0", 8)
+
+
+def _tar_pax_records(data: bytes) -> dict[str, str]:
+    records = {}
+    position = 0
+    while position < len(data) and data[position] != 0:
+        space = data.index(b" ", position)
+        length = int(data[position:space])
+        record_end = position + length
+        # the record is "<length> <key>=<value>\n"
+        key_start, value_end = space + 1, record_end - 1
+        key, value = data[key_start:value_end].split(b"=", 1)
+        records[key.decode("utf-8")] = value.decode("utf-8", "surrogateescape")
+        position = record_end
+    return records
+
+
+def _read_tar(data: memoryview) -> MemberTable:
+    """Parses the chain of ustar, GNU and pax headers.
+
+    Zero blocks are skipped, like tarfile does for the archives concatenated
+    by appends.
+
+    Returns:
+        The members table.
+
+    Raises:
+        ValueError: If the archive is malformed or uses unsupported features,
+            in which case tarfile lists it instead.
+    """
+    table = MemberTable()
+    global_records: dict[str, str] = {}
+    records: dict[str, str] = {}
+    long_name: Optional[str] = None
+    # the offset of the first header of a member, which is an extended
+    # header preceding its ustar header, if any
+    member_offset: Optional[int] = None
+    position = 0
+
+    while position + TAR_BLOCK_SIZE <= len(data):
+        data_offset = position + TAR_BLOCK_SIZE
+        header = data[position:data_offset]
+        if header == _TAR_ZERO_BLOCK:
+            position += TAR_BLOCK_SIZE
+            continue
+
+        checksum = _tar_number(header[148:156])
+        if checksum != sum(header) - sum(header[148:156]) + 8 * 0x20:
+            raise ValueError("bad header checksum")
+
+        size = _tar_number(header[124:136])
+        member_type = bytes(header[156:157])
+        content_end = data_offset + size
+        data_end = data_offset + -(-size // TAR_BLOCK_SIZE) * TAR_BLOCK_SIZE
+
+        if member_type in (_TAR_PAX_TYPE, _TAR_PAX_GLOBAL_TYPE):
+            pax_records = _tar_pax_records(
+                bytes(data[data_offset:content_end])
+            )
+            if any(key.startswith("GNU.sparse.") for key in pax_records):
+                raise ValueError("sparse members are not supported")
+            if member_type == _TAR_PAX_GLOBAL_TYPE:
+                global_records.update(pax_records)
+            else:
+                records.update(pax_records)
+                member_offset = (
+                    position if member_offset is None else member_offset
+                )
+            position = data_end
+            continue
+
+        if member_type in (_TAR_GNU_LONG_NAME_TYPE, _TAR_GNU_LONG_LINK_TYPE):
+            if member_type == _TAR_GNU_LONG_NAME_TYPE:
+                long_name = _tar_string(data[data_offset:content_end])
+            member_offset = (
+                position if member_offset is None else member_offset
+            )
+            position = data_end
+            continue
+
+        if member_offset is None:
+            member_offset = position
+
+        if member_type in _TAR_DATA_TYPES:
+            position = data_end
+        elif member_type in _TAR_NO_DATA_TYPES:
+            position = data_offset
+        else:
+            raise ValueError(f"unsupported member type {member_type!r}")
+
+        name = _tar_string(header[0:100])
+        if member_type == b"\x00" and name.endswith("/"):
+            member_type = _TAR_DIRECTORY_TYPE
+        if member_type == _TAR_DIRECTORY_TYPE:
+            name = name.rstrip("/")
+        if prefix := _tar_string(header[345:500]):
+            name = f"{prefix}/{name}"
+        if long_name is not None:
+            name = long_name
+
+        mtime: float = _tar_number(header[136:148])
+        member_records = {**global_records, **records}
+        if "path" in member_records:
+            name = member_records["path"]
+        if "size" in member_records:
+            size = int(member_records["size"])
+            if member_type in _TAR_DATA_TYPES:
+                position = (
+                    data_offset + -(-size // TAR_BLOCK_SIZE) * TAR_BLOCK_SIZE
+                )
+        if "mtime" in member_records:
+            mtime = float(member_records["mtime"])
+        if member_type == _TAR_DIRECTORY_TYPE:
+            name = name.rstrip("/")
+
+        table.names.append(name)
+        table.sizes.append(size)
+        table.compressed_sizes.append(table.sizes[-1])
+        table.offsets.append(member_offset)
+        table.mtimes.append(mtime)
+        records = {}
+        long_name = None
+        member_offset = None
+
+    return table
+
+
+read_zip_table = _fallback_on_error(_read_zip)
+read_tar_table = _fallback_on_error(_read_tar)
@@ -1,12 +1,25 @@
-import tempfile
 from abc import ABC, abstractmethod
+from contextlib import ExitStack
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import IO, TYPE_CHECKING, Callable, Iterable, Iterator, Optional
 
-from filepack.archives.consts import SEVEN_ZIP_SUFFIX, TAR_SUFFIX, ZIP_SUFFIX
+from filepack.archives.consts import (
+    MEMBER_MTIME_FORMAT,
+    SEVEN_ZIP_SUFFIX,
+    TAR_SUFFIX,
+    ZIP_SUFFIX,
+)
 from filepack.archives.types import ArchiveObjectTypes
-from filepack.utils import get_file_type_extension
+from filepack.instrumentation import record_archive_open, record_temp_file
+from filepack.limits import get_limits
+from filepack.utils import guess_file_type_extension
+from filepack.verification import drain
+
+if TYPE_CHECKING:
+    from filepack.archives.listing import MemberTable
 
 
 class ArchiveType(Enum):
@@ -17,6 +30,48 @@ class ArchiveType(Enum):
     SEVEN_ZIP = SEVEN_ZIP_SUFFIX
 
 
+class MemberCompression(Enum):
+    """How a new member is compressed, in formats compressing members one by one."""
+
+    # the format's default, stored for zip as zipfile writes members
+    DEFAULT = "default"
+    # stored uncompressed
+    STORED = "stored"
+    # compressed at the default level
+    DEFLATED = "deflated"
+    # compressed at the fastest level
+    FAST = "fast"
+
+
+@dataclass(frozen=True)
+class MemberEntry:
+    """A member streamed from one archive to another."""
+
+    # without the trailing slash of zip directories
+    name: str
+    size: int
+    # the modification time, in seconds since the epoch
+    mtime: float
+    is_directory: bool = False
+
+
+MemberStreams = Iterable[tuple[MemberEntry, Optional[IO[bytes]]]]
+
+
+@dataclass(frozen=True)
+class MemberCheck:
+    """The result of decoding an archive member to check it."""
+
+    # None when the corruption can't be tied to a member, e.g. a tar header
+    name: Optional[str]
+    # the decompressed bytes checked
+    size: int
+    error: Optional[str] = None
+    # where the corruption was found: in the decompressed data of the
+    # member, or in the archive when the member is unknown
+    offset: Optional[int] = None
+
+
 class UnknownFileType:
     """Represents an unknown file type within an archive."""
 
@@ -30,24 +85,76 @@ class AbstractArchiveObject(ABC):
         archive_object: ArchiveObjectTypes,
         client: "AbsractArchiveClient",
         path: Path,
+        stream: Optional[IO[bytes]] = None,
     ) -> None:
         self._archive_object = archive_object
         self._client = client
         self._path = path
+        # the file read by the archive object when opened from a stream
+        # rather than a path (e.g. a split set), closed with it
+        self._stream = stream
+        # the stream the archive is copied to once closed, with the
+        # temporary directory holding it, when the format can't be written
+        # to a stream directly
+        self._spool: Optional[tuple[IO[bytes], ExitStack]] = None
+        # whether member data extracted without being decoded (e.g. stored
+        # zip members copied by the kernel) is read back to check it
+        self.check_copied_data = False
 
     def __enter__(self) -> "AbstractArchiveObject":
         self._archive_object = self._archive_object.__enter__()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        return self._archive_object.__exit__(exc_type, exc_value, traceback)
+        try:
+            result = self._archive_object.__exit__(
+                exc_type, exc_value, traceback
+            )
+            if self._spool is not None and exc_type is None:
+                import shutil
 
-    def extract_all(self, target_directory_path: Path):
-        for member in self.get_members():
+                with open(self._path, "rb") as archive_file:
+                    shutil.copyfileobj(
+                        archive_file,
+                        self._spool[0],
+                        get_limits().buffer_size,
+                    )
+            return result
+        finally:
+            if self._stream is not None:
+                self._stream.close()
+            if self._spool is not None:
+                self._spool[1].close()
+
+    def extract_all(
+        self,
+        target_directory_path: Path,
+        on_member_extracted: Optional[
+            Callable[["AbstractArchiveMember"], None]
+        ] = None,
+    ):
+        self.extract_members(
+            member_names=[member.name for member in self.get_members()],
+            target_directory_path=target_directory_path,
+            on_member_extracted=on_member_extracted,
+        )
+
+    def extract_members(
+        self,
+        member_names: list[str],
+        target_directory_path: Path,
+        on_member_extracted: Optional[
+            Callable[["AbstractArchiveMember"], None]
+        ] = None,
+    ):
+        members = {member.name: member for member in self.get_members()}
+        for member_name in member_names:
             self.extract_member(
-                member_name=member.name,
+                member_name=member_name,
                 target_directory_path=target_directory_path,
             )
+            if on_member_extracted is not None:
+                on_member_extracted(members[member_name])
 
     def get_member(
         self, member_name: str
@@ -70,15 +177,194 @@ class AbstractArchiveObject(ABC):
         pass
 
     @abstractmethod
-    def add_member(self, member_path: Path):
+    def add_member(
+        self,
+        member_path: Path,
+        compression: MemberCompression = MemberCompression.DEFAULT,
+        arcname: Optional[str] = None,
+    ):
         pass
 
+    def add_link(
+        self, member_path: Path, arcname: str, target_arcname: str
+    ) -> bool:
+        """Adds a member sharing the data of an already added member, with
+        the metadata of its own file.
+
+        Returns:
+            False if the format has no such members, in which case nothing
+            is added.
+        """
+        return False
+
+    def copy_member(
+        self, source: "AbstractArchiveObject", member_name: str
+    ) -> bool:
+        """Copies a member of another archive of the same format as is.
+
+        Returns:
+            False if the member can't be copied without being extracted, in
+            which case nothing is added.
+        """
+        return False
+
+    def iter_member_streams(
+        self,
+    ) -> Iterator[tuple[MemberEntry, Optional[IO[bytes]]]]:
+        """Reads the members one after the other, in the archive order.
+
+        Formats that can't stream their members extract them one by one to
+        temporary files.
+
+        Yields:
+            The members, with a file reading their data (None for
+            directories), valid until the next member is read.
+        """
+        for member in self.get_members():
+            with get_limits().temporary_directory(
+                required_bytes=member.size or 0
+            ) as temporary_directory:
+                record_temp_file()
+                self.extract_member(
+                    member_name=member.name,
+                    target_directory_path=Path(temporary_directory),
+                )
+                member_path = Path(temporary_directory) / member.name
+                entry = MemberEntry(
+                    name=member.name.rstrip("/"),
+                    size=member.size or 0,
+                    mtime=member.timestamp,
+                    is_directory=member_path.is_dir(),
+                )
+                if entry.is_directory:
+                    yield entry, None
+                else:
+                    with open(member_path, "rb") as member_file:
+                        yield entry, member_file
+
+    def add_member_stream(
+        self,
+        entry: MemberEntry,
+        stream: Optional[IO[bytes]],
+        compression: MemberCompression = MemberCompression.DEFAULT,
+    ):
+        """Adds a member whose data is read from a file, up to its end.
+
+        Formats that can't add a member from a file add it from a temporary
+        file.
+        """
+        import os
+        import shutil
+
+        with get_limits().temporary_directory(
+            required_bytes=entry.size
+        ) as temporary_directory:
+            record_temp_file()
+            member_path = Path(temporary_directory) / "member"
+            if entry.is_directory or stream is None:
+                member_path.mkdir()
+            else:
+                with open(member_path, "wb") as member_file:
+                    shutil.copyfileobj(
+                        stream, member_file, get_limits().buffer_size
+                    )
+            os.utime(member_path, (entry.mtime, entry.mtime))
+            self.add_member(
+                member_path=member_path,
+                compression=compression,
+                arcname=entry.name,
+            )
+
+    def add_member_streams(
+        self,
+        streams: MemberStreams,
+        compression: MemberCompression = MemberCompression.DEFAULT,
+        workers: int = 1,
+        on_member_added: Optional[Callable[[MemberEntry], None]] = None,
+    ):
+        """Adds members read from files, in order.
+
+        Args:
+            streams: The members and the files reading their data.
+            compression: How the members are compressed, in formats
+                compressing members one by one.
+            workers: The number of threads that may compress members, in
+                formats compressing members one by one.
+            on_member_added: Called with every added member.
+        """
+        for entry, stream in streams:
+            self.add_member_stream(
+                entry=entry, stream=stream, compression=compression
+            )
+            if on_member_added is not None:
+                on_member_added(entry)
+
+    def verify_members(self, workers: int = 1) -> Iterator[MemberCheck]:
+        """Decodes the members, checking their data, in the archive order.
+
+        The checks stop after the first corrupted member. Formats checking
+        members independently may decode up to workers of them at once.
+        """
+        for entry, stream in self.iter_member_streams():
+            if stream is None:
+                continue
+
+            size, error = drain(
+                source=stream, buffer_size=get_limits().buffer_size
+            )
+            yield MemberCheck(
+                name=entry.name,
+                size=size,
+                error=error,
+                offset=size if error is not None else None,
+            )
+            if error is not None:
+                return
+
 
 class AbsractArchiveClient(ABC):
     @abstractmethod
     def open(self, file_path: Path, mode: str) -> AbstractArchiveObject:
         pass
 
+    def open_stream(
+        self, stream: IO[bytes], file_path: Path
+    ) -> AbstractArchiveObject:
+        """Opens a new archive written to a forward-only stream.
+
+        Formats without the STREAMING capability write the archive to a
+        temporary file, copied to the stream once the archive is closed.
+
+        Args:
+            stream: The stream written to, left open.
+            file_path: The path of the file the stream stands for.
+        """
+        stack = ExitStack()
+        try:
+            temporary_directory = stack.enter_context(
+                get_limits().temporary_directory()
+            )
+            record_temp_file()
+            archive_object = self.open(
+                file_path=Path(temporary_directory) / file_path.name,
+                mode="w",
+            )
+        except BaseException:
+            stack.close()
+            raise
+
+        archive_object._spool = (stream, stack)
+        return archive_object
+
+    def read_member_table(self, file_path: Path) -> Optional["MemberTable"]:
+        """Lists the members without opening the archive with its library.
+
+        Returns:
+            None if the format has no such listing, or if the archive uses
+            features it doesn't handle, in which case open is used instead.
+        """
+        return None
+
 
 class AbstractArchiveMember(ABC):
     def __init__(
@@ -88,12 +374,14 @@ class AbstractArchiveMember(ABC):
         name: str,
         size: int,
         mtime: str,
+        block: Optional[int] = None,
     ) -> None:
         self._client = client
         self._archive_path = archive_path
         self._name = name
         self._size = size
         self._mtime = mtime
+        self._block = block
 
     @property
     def name(self) -> str:
@@ -107,10 +395,32 @@ class AbstractArchiveMember(ABC):
     def mtime(self) -> str:
         return self._mtime
 
+    @property
+    def block(self) -> Optional[int]:
+        """The index of the solid block holding the member, if any.
+
+        The members of a solid block are compressed together, and reading
+        one decodes the block from its beginning.
+        """
+        return self._block
+
+    @property
+    def timestamp(self) -> float:
+        """The modification time, in seconds since the epoch."""
+        return (
+            datetime.strptime(self._mtime, MEMBER_MTIME_FORMAT)
+            .replace(tzinfo=timezone.utc)
+            .timestamp()
+        )
+
     @property
     def type(self) -> str:
+        record_archive_open()
         with self._client.open(self._archive_path, "r") as archive_object:
-            with tempfile.TemporaryDirectory() as temporary_directory:
+            with get_limits().temporary_directory(
+                required_bytes=self._size or 0
+            ) as temporary_directory:
+                record_temp_file()
                 temporary_directory_path = (
                     Path(temporary_directory) / self._name
                 )
@@ -120,7 +430,7 @@ class AbstractArchiveMember(ABC):
                 )
 
                 try:
-                    type = get_file_type_extension(
+                    type = guess_file_type_extension(
                         path=temporary_directory_path
                     )
                     return type if type is not None else str(UnknownFileType())
@@ -0,0 +1,67 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import Enum
+from typing import Iterator, Optional
+
+
+class SevenZipFilter(Enum):
+    """The compression methods of 7z blocks."""
+
+    LZMA2 = "lzma2"
+    ZSTD = "zstd"
+    # stored uncompressed
+    COPY = "copy"
+
+
+@dataclass(frozen=True)
+class SevenZipOptions:
+    """How new 7z archive members are written.
+
+    py7zr's defaults (one LZMA2 block per writing session) are used for the
+    options left to None.
+    """
+
+    # the uncompressed bytes after which a new solid block is started:
+    # reading a member decodes its block up to it, so smaller blocks make
+    # reading one member cheaper, at the cost of the compression ratio
+    solid_block_size: Optional[int] = None
+    # the compression method of the new blocks
+    compression_filter: Optional[SevenZipFilter] = None
+    # the LZMA2 preset (0-9), or the zstd level (1-22)
+    compression_level: Optional[int] = None
+
+
+_default_seven_zip_options = SevenZipOptions()
+_current_seven_zip_options: ContextVar[Optional[SevenZipOptions]] = ContextVar(
+    "filepack_seven_zip_options", default=None
+)
+
+
+def get_seven_zip_options() -> SevenZipOptions:
+    """Returns the 7z options of the current context, or the global ones."""
+    options = _current_seven_zip_options.get()
+    return options if options is not None else _default_seven_zip_options
+
+
+def set_seven_zip_options(options: SevenZipOptions) -> None:
+    """Sets the global 7z options, used outside of use_seven_zip_options."""
+    global _default_seven_zip_options
+    _default_seven_zip_options = options
+
+
+@contextmanager
+def use_seven_zip_options(
+    options: SevenZipOptions,
+) -> Iterator[SevenZipOptions]:
+    """Applies 7z options to the archives written inside the block.
+
+    Usage:
+        with use_seven_zip_options(SevenZipOptions(solid_block_size=2**26)):
+            Archive("backup.7z").add_members(paths)
+    """
+    token = _current_seven_zip_options.set(options)
+    try:
+        yield options
+    finally:
+        _current_seven_zip_options.reset(token)
@@ -0,0 +1,55 @@
+from typing import TYPE_CHECKING, Final
+
+from filepack.archives.consts import (
+    SEVEN_ZIP_MAGIC_NUMBER,
+    SEVEN_ZIP_SUFFIX,
+    TAR_MAGIC_NUMBER,
+    TAR_MAGIC_NUMBER_OFFSET,
+    TAR_SUFFIX,
+    ZIP_MAGIC_NUMBERS,
+    ZIP_SUFFIX,
+)
+from filepack.registry import Capability, Registry, Signature
+
+if TYPE_CHECKING:
+    from filepack.archives.models import AbsractArchiveClient
+
+ARCHIVES_ENTRY_POINT_GROUP: Final[str] = "filepack.archives"
+
+archives_registry: "Registry[AbsractArchiveClient]" = Registry(
+    entry_point_group=ARCHIVES_ENTRY_POINT_GROUP
+)
+
+# adding members costs the size of the new data, plus rewriting the index:
+# the zip central directory and the 7z header are written again after the new
+# members, and the tar end-of-archive blocks are overwritten by them
+archives_registry.register(
+    name=ZIP_SUFFIX,
+    client="filepack.archives.zip:ZipClient",
+    signatures=tuple(
+        Signature(magic_number=magic_number)
+        for magic_number in ZIP_MAGIC_NUMBERS
+    ),
+    capabilities=Capability.SEEKABLE
+    | Capability.PARALLEL
+    | Capability.MEMBER_COMPRESSION
+    | Capability.APPENDABLE,
+)
+archives_registry.register(
+    name=TAR_SUFFIX,
+    client="filepack.archives.tar:TarClient",
+    signatures=(
+        Signature(
+            magic_number=TAR_MAGIC_NUMBER, offset=TAR_MAGIC_NUMBER_OFFSET
+        ),
+    ),
+    capabilities=Capability.SEEKABLE
+    | Capability.STREAMING
+    | Capability.APPENDABLE,
+)
+archives_registry.register(
+    name=SEVEN_ZIP_SUFFIX,
+    client="filepack.archives.seven_zip:SevenZipClient",
+    signatures=(Signature(magic_number=SEVEN_ZIP_MAGIC_NUMBER),),
+    capabilities=Capability.SOLID | Capability.APPENDABLE,
+)
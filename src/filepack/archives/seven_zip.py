@@ -1,14 +1,47 @@
+import io
+import threading
 from pathlib import Path
-from typing import cast
+from queue import Empty, Full, Queue
+from typing import IO, Any, Callable, Iterator, Optional, cast
 
-from py7zr import FileInfo, SevenZipFile
+from py7zr import (
+    FILTER_COPY,
+    FILTER_LZMA2,
+    FILTER_ZSTD,
+    FileInfo,
+    SevenZipFile,
+)
+from py7zr.exceptions import CrcError
+from py7zr.helpers import ArchiveTimestamp
+from py7zr.io import NullIOFactory, Py7zIO, WriterFactory
+from py7zr.py7zr import FileInfoDict, MemberType
 
+from filepack.archives.consts import (
+    MEMBER_MTIME_FORMAT,
+    SEVEN_ZIP_STREAM_CHUNK_SIZE,
+    SEVEN_ZIP_STREAM_QUEUE_SIZE,
+)
 from filepack.archives.models import (
     AbsractArchiveClient,
     AbstractArchiveMember,
     AbstractArchiveObject,
+    MemberCheck,
+    MemberCompression,
+    MemberEntry,
+)
+from filepack.archives.options import (
+    SevenZipFilter,
+    SevenZipOptions,
+    get_seven_zip_options,
 )
 from filepack.archives.types import ArchiveObjectTypes
+from filepack.pipeline import map_ordered
+from filepack.verification import describe
+from filepack.volumes import is_split_set, open_volumes
+
+# the seconds between two checks of the other thread's state, while waiting
+# on a queue
+_QUEUE_POLL_INTERVAL = 0.1
 
 
 class SevenZipObject(AbstractArchiveObject):
@@ -17,38 +50,438 @@ class SevenZipObject(AbstractArchiveObject):
         archive_object: ArchiveObjectTypes,
         client: AbsractArchiveClient,
         archive_path: Path,
+        options: Optional[SevenZipOptions] = None,
+        stream: Optional[IO[bytes]] = None,
     ) -> None:
         super().__init__(
-            archive_object=archive_object, client=client, path=archive_path
+            archive_object=archive_object,
+            client=client,
+            path=archive_path,
+            stream=stream,
         )
         assert isinstance(self._archive_object, SevenZipFile)
         self._archive_object = cast(SevenZipFile, self._archive_object)
+        self._options = options or SevenZipOptions()
+        # the uncompressed bytes written to the current block
+        self._block_size = 0
 
     def get_members(self) -> list[AbstractArchiveMember]:
+        archive_object = cast(SevenZipFile, self._archive_object)
+        main_streams = archive_object.header.main_streams
+        blocks_indexes = (
+            {
+                id(folder): index
+                for index, folder in enumerate(main_streams.unpackinfo.folders)
+            }
+            if main_streams is not None
+            else {}
+        )
+        blocks = [
+            blocks_indexes.get(id(file.folder))
+            for file in archive_object.files
+        ]
+
         return [
             SevenZipMember(
                 member=seven_zip_info_object,
                 client=self._client,
                 archive_path=self._path,
+                block=block,
+            )
+            for seven_zip_info_object, block in zip(
+                archive_object.list(), blocks
             )
-            for seven_zip_info_object in self._archive_object.list()  # type: ignore
         ]
 
     def extract_member(self, member_name: str, target_directory_path: Path):
         self._archive_object.extract(  # type: ignore
             targets=[member_name], path=target_directory_path
         )
+        # rewind, so that following extractions decode from the beginning
+        self._archive_object.reset()  # type: ignore
+
+    def extract_members(
+        self,
+        member_names: list[str],
+        target_directory_path: Path,
+        on_member_extracted: Optional[
+            Callable[[AbstractArchiveMember], None]
+        ] = None,
+    ):
+        # a block is decoded from its beginning up to the last requested
+        # member, so the members of a block are extracted together
+        members = {member.name: member for member in self.get_members()}
+        names_by_block: dict[Optional[int], list[str]] = {}
+        for member_name in member_names:
+            names_by_block.setdefault(members[member_name].block, []).append(
+                member_name
+            )
+
+        for names in names_by_block.values():
+            self._archive_object.extract(  # type: ignore
+                targets=names, path=target_directory_path
+            )
+            self._archive_object.reset()  # type: ignore
+
+            if on_member_extracted is not None:
+                for name in names:
+                    on_member_extracted(members[name])
+
+    def verify_members(self, workers: int = 1) -> Iterator[MemberCheck]:
+        # every member of a block is checked against its CRC as the block is
+        # decoded, and the blocks are decoded in parallel, from their own
+        # archive objects
+        blocks: dict[int, list[AbstractArchiveMember]] = {}
+        for member in self.get_members():
+            if member.block is not None:
+                blocks.setdefault(member.block, []).append(member)
+
+        def verify(members: list[AbstractArchiveMember]) -> list[MemberCheck]:
+            try:
+                with open_volumes(self._path) as file, SevenZipFile(
+                    file, mode="r"
+                ) as archive_object:
+                    archive_object.extract(
+                        targets=[member.name for member in members],
+                        factory=NullIOFactory(),
+                    )
+            except CrcError as error:
+                checks: list[MemberCheck] = []
+                for member in members:
+                    if member.name == error.args[2]:
+                        return checks + [
+                            MemberCheck(
+                                name=member.name, size=0, error=describe(error)
+                            )
+                        ]
+                    checks.append(
+                        MemberCheck(name=member.name, size=member.size)
+                    )
+                return checks
+            except Exception as error:
+                return [
+                    MemberCheck(
+                        name=None,
+                        size=0,
+                        error=f"{describe(error)}, in the block of "
+                        f"{members[0].name}",
+                    )
+                ]
+
+            return [
+                MemberCheck(name=member.name, size=member.size)
+                for member in members
+            ]
+
+        for checks in map_ordered(verify, blocks.values(), workers=workers):
+            yield from checks
+            if checks and checks[-1].error is not None:
+                return
+
+    def add_member(
+        self,
+        member_path: Path,
+        compression: MemberCompression = MemberCompression.DEFAULT,
+        arcname: Optional[str] = None,
+    ):
+        size = member_path.stat().st_size
+        self._reserve_block(size=size)
+        self._archive_object.write(  # type: ignore
+            file=member_path, arcname=arcname or member_path.name
+        )
+        self._block_size += size
+
+    def iter_member_streams(
+        self,
+    ) -> Iterator[tuple[MemberEntry, Optional[IO[bytes]]]]:
+        archive_object = cast(SevenZipFile, self._archive_object)
+        entries = {
+            info.filename: MemberEntry(
+                name=info.filename,
+                size=info.uncompressed,
+                mtime=(
+                    info.creationtime.timestamp()
+                    if info.creationtime is not None
+                    else 0.0
+                ),
+                is_directory=info.is_directory,
+            )
+            for info in archive_object.list()
+        }
+        # py7zr creates the directories without handing them over
+        for entry in entries.values():
+            if entry.is_directory:
+                yield entry, None
+
+        streamer = _MemberStreamer(archive_object=archive_object)
+        try:
+            for name, member_file in streamer:
+                yield entries[name], member_file
+                # the data left unread is skipped
+                while member_file.read(SEVEN_ZIP_STREAM_CHUNK_SIZE):
+                    pass
+        finally:
+            streamer.close()
+            archive_object.reset()
+
+    def add_member_stream(
+        self,
+        entry: MemberEntry,
+        stream: Optional[IO[bytes]],
+        compression: MemberCompression = MemberCompression.DEFAULT,
+    ):
+        if not _writes_streams(cast(SevenZipFile, self._archive_object)):
+            # added from a temporary file, through the py7zr API
+            super().add_member_stream(
+                entry=entry, stream=stream, compression=compression
+            )
+            return
+
+        self._reserve_block(size=entry.size)
+        archive_object = cast(SevenZipFile, self._archive_object)
+        timestamp = ArchiveTimestamp.from_datetime(entry.mtime)
+
+        # as SevenZipFile.writef does, without measuring the data by seeking
+        # the stream, and with the member's modification time
+        folder = archive_object.header.initialize()
+        file_info = FileInfoDict(
+            origin=None,
+            filename=Path(entry.name).as_posix(),
+            creationtime=timestamp,
+            lastwritetime=timestamp,
+            lastaccesstime=timestamp,
+        )
+        if entry.is_directory or stream is None:
+            file_info["emptystream"] = True
+            file_info["attributes"] = MemberType.DIRECTORY.attributes()
+        else:
+            file_info["data"] = stream
+            file_info["uncompressed"] = entry.size
+            file_info["emptystream"] = False
+            file_info["attributes"] = MemberType.FILE.attributes()
+        archive_object.header.files_info.files.append(file_info)
+        archive_object.header.files_info.emptyfiles.append(
+            file_info["emptystream"]
+        )
+        archive_object.files.append(file_info)
+        archive_object.worker.archive(
+            archive_object.fp, archive_object.files, folder, deref=False
+        )
+        self._block_size += entry.size
 
-    def add_member(self, member_path: Path):
-        self._archive_object.write(file=member_path, arcname=member_path.name)  # type: ignore
+    def _reserve_block(self, size: int) -> None:
+        """Starts a new block if the member doesn't fit in the current one."""
+        solid_block_size = self._options.solid_block_size
+        if (
+            solid_block_size is not None
+            and self._block_size > 0
+            and self._block_size + size > solid_block_size
+        ):
+            self._start_block()
+
+    def _start_block(self) -> None:
+        # py7zr writes the members of a writing session in one block, and
+        # the members appended by a new session in a new one
+        self._archive_object.close()  # type: ignore
+        self._archive_object = SevenZipFile(
+            file=self._path, mode="a", filters=filters(self._options)
+        )
+        self._block_size = 0
+
+
+def _writes_streams(archive_object: SevenZipFile) -> bool:
+    """Whether the py7zr internals add_member_stream relies on, which aren't
+    part of its API, are there. pyproject.toml bounds py7zr to the versions
+    they were checked against."""
+    header = getattr(archive_object, "header", None)
+    worker = getattr(archive_object, "worker", None)
+    return (
+        callable(getattr(header, "initialize", None))
+        and hasattr(header, "files_info")
+        and callable(getattr(worker, "archive", None))
+    )
+
+
+class _MemberPipe(Py7zIO):
+    """Hands the data of a member, decoded by py7zr, over to its reader."""
+
+    def __init__(self, streamer: "_MemberStreamer") -> None:
+        self._streamer = streamer
+        self._chunks: Queue[Optional[bytes]] = Queue(
+            maxsize=SEVEN_ZIP_STREAM_QUEUE_SIZE
+        )
+        self._size = 0
+        self._closed = False
+
+    def write(self, s: bytes | bytearray) -> int:
+        self._put(bytes(s))
+        self._size += len(s)
+        return len(s)
+
+    def read(self, size: Optional[int] = None) -> bytes:
+        return b""
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return 0
+
+    def flush(self) -> None:
+        pass
+
+    def size(self) -> int:
+        return self._size
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._put(None)
+
+    def get(self) -> Optional[bytes]:
+        """Returns the next chunk of data, None at the end of the member."""
+        while True:
+            try:
+                return self._chunks.get(timeout=_QUEUE_POLL_INTERVAL)
+            except Empty:
+                self._streamer.check()
+
+    def _put(self, chunk: Optional[bytes]) -> None:
+        # blocks while the reader is behind, until it is closed
+        while True:
+            if self._streamer.cancelled.is_set():
+                raise EOFError("the member reading was cancelled")
+            try:
+                self._chunks.put(chunk, timeout=_QUEUE_POLL_INTERVAL)
+                return
+            except Full:
+                continue
+
+
+class _PipeReader(io.RawIOBase):
+    def __init__(self, pipe: _MemberPipe) -> None:
+        self._pipe = pipe
+        self._chunk = b""
+        self._ended = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._chunk and not self._ended:
+            chunk = self._pipe.get()
+            if chunk is None:
+                self._ended = True
+            else:
+                self._chunk = chunk
+
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
+
+
+class _MemberStreamer(WriterFactory):
+    """Reads the members of a 7z archive as streams, in bounded memory.
+
+    py7zr decodes the members in a thread, writing their data to pipes of
+    a few chunks, which are read in the order py7zr creates them.
+    """
+
+    def __init__(self, archive_object: SevenZipFile) -> None:
+        self._archive_object = archive_object
+        self._pipes: Queue[Optional[tuple[str, _MemberPipe]]] = Queue()
+        self._error: Optional[BaseException] = None
+        self._finished = threading.Event()
+        self.cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._extract, daemon=True)
+
+    def create(self, filename: str) -> Py7zIO:
+        pipe = _MemberPipe(streamer=self)
+        self._pipes.put((filename, pipe))
+        return pipe
+
+    def check(self) -> None:
+        """Raises the error of the decoding thread, once it failed."""
+        if self._error is not None:
+            raise self._error
+        if self._finished.is_set():
+            raise EOFError("the member data is truncated")
+
+    def close(self) -> None:
+        self.cancelled.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def __iter__(self) -> Iterator[tuple[str, IO[bytes]]]:
+        self._thread.start()
+        while True:
+            try:
+                item = self._pipes.get(timeout=_QUEUE_POLL_INTERVAL)
+            except Empty:
+                if self._finished.is_set() and self._pipes.empty():
+                    self.check()
+                continue
+
+            if item is None:
+                return
+            name, pipe = item
+            yield name, cast(
+                IO[bytes],
+                io.BufferedReader(
+                    _PipeReader(pipe=pipe),
+                    buffer_size=SEVEN_ZIP_STREAM_CHUNK_SIZE,
+                ),
+            )
+
+    def _extract(self) -> None:
+        try:
+            self._archive_object.extract(factory=self)
+            self._pipes.put(None)
+        except BaseException as error:
+            self._error = error
+        finally:
+            self._finished.set()
+
+
+def filters(options: SevenZipOptions) -> Optional[list[dict[str, int]]]:
+    """Returns the py7zr filters chain of the options, None for defaults."""
+    if options.compression_filter is None:
+        if options.compression_level is None:
+            return None
+
+        return [{"id": FILTER_LZMA2, "preset": options.compression_level}]
+
+    match options.compression_filter:
+        case SevenZipFilter.LZMA2:
+            lzma2_filter = {"id": FILTER_LZMA2}
+            if options.compression_level is not None:
+                lzma2_filter["preset"] = options.compression_level
+            return [lzma2_filter]
+        case SevenZipFilter.ZSTD:
+            zstd_filter = {"id": FILTER_ZSTD}
+            if options.compression_level is not None:
+                zstd_filter["level"] = options.compression_level
+            return [zstd_filter]
+        case SevenZipFilter.COPY:
+            return [{"id": FILTER_COPY}]
 
 
 class SevenZipClient(AbsractArchiveClient):
     def open(self, file_path: Path, mode: str) -> AbstractArchiveObject:
+        options = get_seven_zip_options()
+        stream = (
+            open_volumes(file_path)
+            if mode == "r" and is_split_set(file_path)
+            else None
+        )
         return SevenZipObject(
-            archive_object=SevenZipFile(file=file_path, mode=mode),
+            archive_object=SevenZipFile(
+                file=stream or file_path,
+                mode=mode,
+                filters=filters(options) if mode != "r" else None,
+            ),
             client=self,
             archive_path=file_path,
+            options=options,
+            stream=stream,
         )
 
 
@@ -58,11 +491,13 @@ class SevenZipMember(AbstractArchiveMember):
         member: FileInfo,
         client: AbsractArchiveClient,
         archive_path: Path,
+        block: Optional[int] = None,
     ) -> None:
         super().__init__(
             client=client,
             archive_path=archive_path,
             name=member.filename,
-            size=member.compressed,
-            mtime=member.creationtime.strftime("%a, %d %b %Y %H:%M:%S UTC"),
+            size=member.uncompressed,
+            mtime=member.creationtime.strftime(MEMBER_MTIME_FORMAT),
+            block=block,
         )
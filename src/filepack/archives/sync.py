@@ -0,0 +1,89 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from filepack.archives.consts import SYNC_MTIME_TOLERANCE
+from filepack.archives.models import AbstractArchiveMember
+
+
+@dataclass
+class SyncReport:
+    """The members names an archive sync added, replaced, removed and kept."""
+
+    added: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    # False when the archive was appended to, or left as is
+    rewritten: bool = False
+    # the unchanged members copied without being decompressed
+    copied_raw: int = 0
+
+    @property
+    def up_to_date(self) -> bool:
+        return not (self.added or self.changed or self.removed)
+
+
+def directory_files(directory: Path) -> dict[str, Path]:
+    """Returns the files and directories under a directory, by their posix
+    relative path."""
+    return {
+        path.relative_to(directory).as_posix(): path
+        for path in sorted(directory.rglob("*"))
+        if path.is_file() or path.is_dir()
+    }
+
+
+def compare_directory(
+    members: list[AbstractArchiveMember],
+    files: dict[str, Path],
+    duplicates: Optional[dict[str, str]] = None,
+) -> SyncReport:
+    """Compares the files to the members by size and modification time.
+
+    Directory members are kept as long as their directory exists, and
+    directories without a member aren't added, their files being what is
+    compared.
+
+    Args:
+        members: The archive members.
+        files: The files and directories, by their relative path.
+        duplicates: The members left out by deduplication, by name, compared
+            as their original.
+
+    Returns:
+        The report, without the members contents compared, the members being
+        named as in the archive (e.g. with the trailing slash of zip
+        directories).
+    """
+    # the members by relative path, and the names they have in the archive
+    index = {member.name.rstrip("/"): member for member in members}
+    member_names = {member.name.rstrip("/"): member.name for member in members}
+    for name, original in (duplicates or {}).items():
+        if original in index:
+            index[name] = index[original]
+            member_names[name] = name
+    report = SyncReport(
+        removed=[member_names[name] for name in index if name not in files]
+    )
+
+    for name, path in files.items():
+        member = index.get(name)
+        if path.is_dir():
+            if member is not None:
+                report.unchanged.append(member_names[name])
+            continue
+        if member is None:
+            report.added.append(name)
+            continue
+
+        stat = path.stat()
+        if (
+            stat.st_size != (member.size or 0)
+            or abs(stat.st_mtime - member.timestamp) >= SYNC_MTIME_TOLERANCE
+        ):
+            report.changed.append(member_names[name])
+        else:
+            report.unchanged.append(member_names[name])
+
+    return report
@@ -1,14 +1,25 @@
+import os
+import tarfile
 from datetime import datetime, timezone
 from pathlib import Path
-from tarfile import TarFile, TarInfo
-from typing import Literal, cast
+from tarfile import BLOCKSIZE, DIRTYPE, LNKTYPE, NUL, TarFile, TarInfo
+from typing import IO, Iterator, Literal, Optional, cast
 
+from filepack.archives.consts import MEMBER_MTIME_FORMAT
+from filepack.archives.listing import MemberTable, read_tar_table
 from filepack.archives.models import (
     AbsractArchiveClient,
     AbstractArchiveMember,
     AbstractArchiveObject,
+    MemberCheck,
+    MemberCompression,
+    MemberEntry,
 )
 from filepack.archives.types import ArchiveObjectTypes
+from filepack.limits import get_limits
+from filepack.utils import copy_range
+from filepack.verification import describe
+from filepack.volumes import is_split_set, open_volumes
 
 
 class TarObject(AbstractArchiveObject):
@@ -17,9 +28,13 @@ class TarObject(AbstractArchiveObject):
         archive_object: ArchiveObjectTypes,
         client: AbsractArchiveClient,
         archive_path: Path,
+        stream: Optional[IO[bytes]] = None,
     ) -> None:
         super().__init__(
-            archive_object=archive_object, client=client, path=archive_path
+            archive_object=archive_object,
+            client=client,
+            path=archive_path,
+            stream=stream,
         )
         assert isinstance(self._archive_object, TarFile)
         self._archive_object = cast(TarFile, self._archive_object)
@@ -39,8 +54,170 @@ class TarObject(AbstractArchiveObject):
             member=member_name, path=target_directory_path
         )
 
-    def add_member(self, member_path: Path):
-        self._archive_object.add(name=member_path, arcname=member_path.name)  # type: ignore
+    def add_member(
+        self,
+        member_path: Path,
+        compression: MemberCompression = MemberCompression.DEFAULT,
+        arcname: Optional[str] = None,
+    ):
+        self._archive_object.add(  # type: ignore
+            name=member_path, arcname=arcname or member_path.name
+        )
+
+    def iter_member_streams(
+        self,
+    ) -> Iterator[tuple[MemberEntry, Optional[IO[bytes]]]]:
+        tar = cast(TarFile, self._archive_object)
+        for info in tar:
+            if info.isdir():
+                yield MemberEntry(
+                    name=info.name, size=0, mtime=info.mtime, is_directory=True
+                ), None
+                continue
+
+            data_info = info
+            if info.islnk() or info.issym():
+                # links are streamed as copies of their targets
+                try:
+                    data_info = tar._find_link_target(info)  # type: ignore
+                except KeyError:
+                    continue
+            # devices, fifos and links to directories have no data
+            if not data_info.isreg():
+                continue
+
+            member_file = tar.extractfile(data_info)
+            assert member_file is not None
+            with member_file:
+                yield MemberEntry(
+                    name=info.name, size=data_info.size, mtime=info.mtime
+                ), member_file
+
+    def verify_members(self, workers: int = 1) -> Iterator[MemberCheck]:
+        # tar archives have no checksums of the data, so the headers are
+        # checked, and the data is only checked to be there
+        tar = cast(TarFile, self._archive_object)
+        fileobj = cast(IO[bytes], tar.fileobj)
+        archive_size = fileobj.seek(0, os.SEEK_END)
+        position = 0
+        while True:
+            fileobj.seek(position)
+            # the offset past the member is set while reading its header
+            tar.offset = position
+            try:
+                info = TarInfo.fromtarfile(tar)
+            except tarfile.EOFHeaderError:  # type: ignore[attr-defined]
+                # the end-of-archive blocks, possibly followed by another
+                # archive appended to this one
+                position += BLOCKSIZE
+                continue
+            except tarfile.EmptyHeaderError:  # type: ignore[attr-defined]
+                return
+            except tarfile.HeaderError as error:
+                yield MemberCheck(
+                    name=None, size=0, error=describe(error), offset=position
+                )
+                return
+
+            size = info.size if info.isreg() else 0
+            # past the data of the member, padded to blocks
+            if tar.offset > archive_size:
+                available = max(min(size, archive_size - info.offset_data), 0)
+                yield MemberCheck(
+                    name=info.name,
+                    size=available,
+                    error="EOFError: the archive ends within the member",
+                    offset=available,
+                )
+                return
+
+            yield MemberCheck(name=info.name, size=size)
+            position = tar.offset
+
+    def add_member_stream(
+        self,
+        entry: MemberEntry,
+        stream: Optional[IO[bytes]],
+        compression: MemberCompression = MemberCompression.DEFAULT,
+    ):
+        info = TarInfo(name=entry.name)
+        info.mtime = entry.mtime  # type: ignore
+        if entry.is_directory or stream is None:
+            info.type = DIRTYPE
+            info.mode = 0o755
+            self._archive_object.addfile(info)  # type: ignore
+            return
+
+        info.size = entry.size
+        info.mode = 0o644
+        self._archive_object.addfile(info, stream)  # type: ignore
+
+    def add_link(
+        self, member_path: Path, arcname: str, target_arcname: str
+    ) -> bool:
+        # with the duplicate's own mode, owner and modification time, as
+        # add_member would store them
+        tar = cast(TarFile, self._archive_object)
+        link = tar.gettarinfo(name=member_path, arcname=arcname)
+        link.type = LNKTYPE
+        link.linkname = target_arcname
+        link.size = 0
+        tar.addfile(link)
+        return True
+
+    def copy_member(
+        self, source: AbstractArchiveObject, member_name: str
+    ) -> bool:
+        if not isinstance(source, TarObject):
+            return False
+
+        source_tar = cast(TarFile, source._archive_object)
+        target_tar = cast(TarFile, self._archive_object)
+        info = source_tar.getmember(member_name)
+        if not info.isreg() or info.sparse is not None:
+            target_tar.addfile(
+                info, source_tar.extractfile(info) if info.isreg() else None
+            )
+            return True
+
+        # the header is kept as is, and the data range copied by the kernel,
+        # as TarFile.addfile would write them
+        header = info.tobuf(
+            target_tar.format, target_tar.encoding, target_tar.errors
+        )
+        target_fileobj = cast(IO[bytes], target_tar.fileobj)
+        target_fileobj.write(header)
+        copy_range(
+            source=cast(IO[bytes], source_tar.fileobj),
+            target=target_fileobj,
+            offset=info.offset_data,
+            size=info.size,
+            buffer_size=get_limits().buffer_size,
+        )
+        blocks, remainder = divmod(info.size, BLOCKSIZE)
+        if remainder:
+            target_fileobj.write(NUL * (BLOCKSIZE - remainder))
+            blocks += 1
+        target_tar.offset += len(header) + blocks * BLOCKSIZE
+        target_tar.members.append(info)  # type: ignore
+        return True
+
+
+class _TarFile(TarFile):
+    """A tar file extracting the data of its members with copy_range."""
+
+    def makefile(self, tarinfo, targetpath):
+        if tarinfo.sparse is not None:
+            return super().makefile(tarinfo, targetpath)
+
+        with open(targetpath, "wb") as target:
+            copy_range(
+                source=cast(IO[bytes], self.fileobj),
+                target=target,
+                offset=tarinfo.offset_data,
+                size=tarinfo.size,
+                buffer_size=get_limits().buffer_size,
+            )
 
 
 class TarClient(AbsractArchiveClient):
@@ -49,12 +226,67 @@ class TarClient(AbsractArchiveClient):
             raise ValueError("mode must be one of ['r', 'a', 'w', 'x']")
 
         mode = cast(Literal["r", "a", "w", "x"], mode)
+        stream = None
+        if mode == "r":
+            if is_split_set(file_path):
+                stream = open_volumes(file_path)
+            # archives appended to by concatenation, e.g. with a new stream
+            # of a compressed tar, hold end-of-archive blocks between parts
+            archive_object: TarFile = _TarFile(
+                name=file_path, mode=mode, fileobj=stream, ignore_zeros=True
+            )
+        elif mode == "a" and file_path.exists() and file_path.stat().st_size:
+            archive_object = self._open_for_append(file_path=file_path)
+        else:
+            archive_object = TarFile(name=file_path, mode=mode)
+
         return TarObject(
-            archive_object=TarFile(name=file_path, mode=mode),
+            archive_object=archive_object,
             client=self,
             archive_path=file_path,
+            stream=stream,
         )
 
+    def open_stream(
+        self, stream: IO[bytes], file_path: Path
+    ) -> AbstractArchiveObject:
+        return TarObject(
+            archive_object=TarFile(name=file_path, mode="w", fileobj=stream),
+            client=self,
+            archive_path=file_path,
+        )
+
+    @staticmethod
+    def _open_for_append(file_path: Path) -> TarFile:
+        """Opens an archive to write new members right after the last one.
+
+        The end-of-archive blocks are trimmed, and written again after the
+        new members, so that appending costs the size of the new data.
+        """
+        with TarFile(name=file_path, mode="r", ignore_zeros=True) as tar:
+            members = tar.getmembers()
+
+        end = 0
+        if members:
+            last = members[-1]
+            end = last.offset_data + -(-last.size // BLOCKSIZE) * BLOCKSIZE
+
+        file = open(file_path, "r+b")
+        try:
+            file.seek(end)
+            file.truncate()
+            archive_object = TarFile(fileobj=file, mode="w")
+        except BaseException:
+            file.close()
+            raise
+
+        # close the file with the archive, as if it opened it
+        archive_object._extfileobj = False  # type: ignore
+        return archive_object
+
+    def read_member_table(self, file_path: Path) -> Optional[MemberTable]:
+        return read_tar_table(file_path)
+
 
 class TarMember(AbstractArchiveMember):
     def __init__(
@@ -67,5 +299,5 @@ class TarMember(AbstractArchiveMember):
             size=member.size,
             mtime=datetime.fromtimestamp(
                 member.mtime, tz=timezone.utc
-            ).strftime("%a, %d %b %Y %H:%M:%S UTC"),
+            ).strftime(MEMBER_MTIME_FORMAT),
         )
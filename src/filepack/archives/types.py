@@ -1,7 +1,9 @@
-from tarfile import TarFile
-from typing import Union
-from zipfile import ZipFile
+from typing import TYPE_CHECKING, Union
 
-from py7zr import SevenZipFile
+if TYPE_CHECKING:
+    from tarfile import TarFile
+    from zipfile import ZipFile
 
-ArchiveObjectTypes = Union[TarFile, SevenZipFile, ZipFile]
+    from py7zr import SevenZipFile
+
+ArchiveObjectTypes = Union["TarFile", "SevenZipFile", "ZipFile"]
@@ -1,14 +1,46 @@
+import copy
+import struct
+import time
+import zipfile
+import zlib
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import cast
-from zipfile import ZipFile, ZipInfo
+from typing import IO, TYPE_CHECKING, Callable, Iterator, Optional, cast
+from zipfile import ZIP64_LIMIT, ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
 
+from filepack.archives.consts import (
+    MEMBER_MTIME_FORMAT,
+    ZIP_FAST_COMPRESSION_LEVEL,
+    ZIP_LOCAL_FILE_HEADER_SIZE,
+    ZIP_PARALLEL_MEMBER_SIZE,
+)
+from filepack.archives.listing import MemberTable, read_zip_table
 from filepack.archives.models import (
     AbsractArchiveClient,
     AbstractArchiveMember,
     AbstractArchiveObject,
+    MemberCheck,
+    MemberCompression,
+    MemberEntry,
+    MemberStreams,
 )
 from filepack.archives.types import ArchiveObjectTypes
+from filepack.limits import get_limits
+from filepack.pipeline import map_ordered
+from filepack.utils import copy_range
+from filepack.verification import describe, drain
+from filepack.volumes import is_split_set, open_volumes
+
+# the oldest and latest times of the zip format
+_ZIP_MIN_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+_ZIP_MAX_DATE_TIME = (2107, 12, 31, 23, 59, 58)
+_ZIP_FILE_MODE = 0o644 << 16
+_ZIP_DIRECTORY_MODE = 0o40755 << 16
+_ZIP_ENCRYPTED = 0x1
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
 
 
 class ZipObject(AbstractArchiveObject):
@@ -17,9 +49,13 @@ class ZipObject(AbstractArchiveObject):
         archive_object: ArchiveObjectTypes,
         client: AbsractArchiveClient,
         archive_path: Path,
+        stream: Optional[IO[bytes]] = None,
     ) -> None:
         super().__init__(
-            archive_object=archive_object, client=client, path=archive_path
+            archive_object=archive_object,
+            client=client,
+            path=archive_path,
+            stream=stream,
         )
         assert isinstance(self._archive_object, ZipFile)
         self._archive_object = cast(ZipFile, self._archive_object)
@@ -35,24 +71,348 @@ class ZipObject(AbstractArchiveObject):
         ]
 
     def extract_member(self, member_name: str, target_directory_path: Path):
+        if isinstance(self._archive_object, _ZipFile):
+            self._archive_object.check_crc = self.check_copied_data
         self._archive_object.extract(  # type: ignore
             member=member_name, path=target_directory_path
         )
 
-    def add_member(self, member_path: Path):
+    def add_member(
+        self,
+        member_path: Path,
+        compression: MemberCompression = MemberCompression.DEFAULT,
+        arcname: Optional[str] = None,
+    ):
         self._archive_object.write(  # type: ignore
-            filename=member_path, arcname=member_path.name
+            filename=member_path,
+            arcname=arcname or member_path.name,
+            compress_type=_compress_type(compression),
+            compresslevel=_compress_level(compression),
+        )
+
+    def iter_member_streams(
+        self,
+    ) -> Iterator[tuple[MemberEntry, Optional[IO[bytes]]]]:
+        zip_file = cast(ZipFile, self._archive_object)
+        for info in zip_file.infolist():
+            entry = MemberEntry(
+                name=info.filename.rstrip("/"),
+                size=info.file_size,
+                mtime=datetime(*info.date_time).timestamp(),
+                is_directory=info.is_dir(),
+            )
+            if entry.is_directory:
+                yield entry, None
+            else:
+                with zip_file.open(info) as member_file:
+                    yield entry, member_file
+
+    def verify_members(self, workers: int = 1) -> Iterator[MemberCheck]:
+        zip_file = cast(ZipFile, self._archive_object)
+        buffer_size = get_limits().buffer_size
+
+        def verify(info: ZipInfo) -> MemberCheck:
+            # reading a member to its end checks its CRC, and zlib releases
+            # the GIL while inflating and computing it
+            try:
+                with zip_file.open(info) as member_file:
+                    size, error = drain(
+                        source=member_file, buffer_size=buffer_size
+                    )
+            except Exception as open_error:
+                size, error = 0, describe(open_error)
+            return MemberCheck(
+                name=info.filename,
+                size=size,
+                error=error,
+                offset=size if error is not None else None,
+            )
+
+        for check in map_ordered(
+            verify,
+            (info for info in zip_file.infolist() if not info.is_dir()),
+            workers=workers,
+        ):
+            yield check
+            if check.error is not None:
+                return
+
+    def add_member_stream(
+        self,
+        entry: MemberEntry,
+        stream: Optional[IO[bytes]],
+        compression: MemberCompression = MemberCompression.DEFAULT,
+    ):
+        zip_file = cast(ZipFile, self._archive_object)
+        info = _zip_info(entry)
+        if entry.is_directory or stream is None:
+            zip_file.mkdir(info)
+            return
+
+        info.compress_type = _compress_type(compression)
+        info._compresslevel = _compress_level(compression)  # type: ignore
+
+        import shutil
+
+        with zip_file.open(
+            info, mode="w", force_zip64=entry.size > ZIP64_LIMIT
+        ) as member_file:
+            shutil.copyfileobj(stream, member_file, get_limits().buffer_size)
+
+    def add_member_streams(
+        self,
+        streams: MemberStreams,
+        compression: MemberCompression = MemberCompression.DEFAULT,
+        workers: int = 1,
+        on_member_added: Optional[Callable[[MemberEntry], None]] = None,
+    ):
+        if workers <= 1 or _compress_type(compression) == ZIP_STORED:
+            return super().add_member_streams(
+                streams=streams,
+                compression=compression,
+                workers=workers,
+                on_member_added=on_member_added,
+            )
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        level = _compress_level(compression)
+        # the members being compressed, written in order once compressed;
+        # at most one per worker is held in memory
+        pending: deque[tuple[MemberEntry, "Future"]] = deque()
+
+        def write_pending(keep: int) -> None:
+            while len(pending) > keep:
+                entry, future = pending.popleft()
+                self._write_deflated(entry, *future.result())
+                if on_member_added is not None:
+                    on_member_added(entry)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for entry, stream in streams:
+                if (
+                    entry.is_directory
+                    or stream is None
+                    or entry.size > ZIP_PARALLEL_MEMBER_SIZE
+                ):
+                    write_pending(keep=0)
+                    self.add_member_stream(
+                        entry=entry, stream=stream, compression=compression
+                    )
+                    if on_member_added is not None:
+                        on_member_added(entry)
+                    continue
+
+                data = stream.read(entry.size)
+                if len(data) != entry.size:
+                    raise EOFError(f"truncated member {entry.name}")
+                # zlib releases the GIL while compressing
+                pending.append((entry, executor.submit(_deflate, data, level)))
+                write_pending(keep=workers)
+            write_pending(keep=0)
+
+    def copy_member(
+        self, source: AbstractArchiveObject, member_name: str
+    ) -> bool:
+        if not isinstance(source, ZipObject):
+            return False
+
+        source_zip = cast(ZipFile, source._archive_object)
+        source_info = source_zip.getinfo(member_name)
+
+        info = copy.copy(source_info)
+        # the sizes and CRC go in the local header, without a data
+        # descriptor, and FileHeader adds the zip64 field (id 1) again if
+        # needed
+        info.flag_bits &= ~zipfile._MASK_USE_DATA_DESCRIPTOR  # type: ignore
+        info.extra = zipfile._strip_extra(info.extra, (1,))  # type: ignore
+
+        source_fp = cast(IO[bytes], source_zip.fp)
+        offset = _data_offset(source_fp, source_info)
+        self._write_raw(
+            info=info,
+            write_data=lambda target_fp: copy_range(
+                source=source_fp,
+                target=target_fp,
+                offset=offset,
+                size=info.compress_size,
+                buffer_size=get_limits().buffer_size,
+            ),
         )
+        return True
+
+    def _write_deflated(
+        self, entry: MemberEntry, data: bytes, crc: int, size: int
+    ) -> None:
+        info = _zip_info(entry)
+        info.compress_type = ZIP_DEFLATED
+        info.CRC = crc
+        info.file_size = size
+        info.compress_size = len(data)
+        self._write_raw(
+            info=info, write_data=lambda target_fp: target_fp.write(data)
+        )
+
+    def _write_raw(
+        self, info: ZipInfo, write_data: Callable[[IO[bytes]], object]
+    ) -> None:
+        """Writes a member of already compressed data, with its header.
+
+        The sizes and CRC of the info are those of the data, which
+        write_data writes to the archive file.
+        """
+        target_zip = cast(ZipFile, self._archive_object)
+        target_fp = cast(IO[bytes], target_zip.fp)
+        assert target_fp is not None
+        target_fp.seek(target_zip.start_dir)  # type: ignore
+        info.header_offset = target_fp.tell()
+        target_fp.write(info.FileHeader())
+        write_data(target_fp)
+
+        target_zip.start_dir = target_fp.tell()  # type: ignore
+        target_zip.filelist.append(info)
+        target_zip.NameToInfo[info.filename] = info
+        target_zip._didModify = True  # type: ignore
+
+
+def _data_offset(fp: IO[bytes], info: ZipInfo) -> int:
+    """Returns the offset of the data of a member in the archive file."""
+    # the local header may have another extra field than the central
+    # directory one, so the data offset is read from it
+    fp.seek(info.header_offset)
+    header = fp.read(ZIP_LOCAL_FILE_HEADER_SIZE)
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    return (
+        info.header_offset
+        + ZIP_LOCAL_FILE_HEADER_SIZE
+        + name_length
+        + extra_length
+    )
+
+
+def _compress_type(compression: MemberCompression) -> int:
+    return (
+        ZIP_DEFLATED
+        if compression in (MemberCompression.DEFLATED, MemberCompression.FAST)
+        else ZIP_STORED
+    )
+
+
+def _compress_level(compression: MemberCompression) -> Optional[int]:
+    return (
+        ZIP_FAST_COMPRESSION_LEVEL
+        if compression is MemberCompression.FAST
+        else None
+    )
+
+
+def _zip_info(entry: MemberEntry) -> ZipInfo:
+    # zip archives store local times, as zipfile writes them
+    date_time = min(
+        max(time.localtime(entry.mtime)[:6], _ZIP_MIN_DATE_TIME),
+        _ZIP_MAX_DATE_TIME,
+    )
+    if entry.is_directory:
+        info = ZipInfo(filename=entry.name + "/", date_time=date_time)
+        info.external_attr = _ZIP_DIRECTORY_MODE
+        # not set by ZipFile.mkdir before python 3.12
+        info.CRC = info.compress_size = 0
+    else:
+        info = ZipInfo(filename=entry.name, date_time=date_time)
+        info.external_attr = _ZIP_FILE_MODE
+        info.file_size = entry.size
+    return info
+
+
+def _deflate(data: bytes, level: Optional[int]) -> tuple[bytes, int, int]:
+    """Returns the raw deflate stream, the CRC and the size of the data."""
+    compressor = zlib.compressobj(
+        zlib.Z_DEFAULT_COMPRESSION if level is None else level,
+        zlib.DEFLATED,
+        -zlib.MAX_WBITS,
+    )
+    return (
+        compressor.compress(data) + compressor.flush(),
+        zlib.crc32(data),
+        len(data),
+    )
+
+
+class _ZipFile(ZipFile):
+    """A zip file extracting its stored members with copy_range.
+
+    Overrides the private ZipFile._extract_member, which every extraction
+    goes through (tests/test_copy_range.py checks it still does).
+    """
+
+    # whether the copied data is read back to check its CRC-32, which
+    # zipfile checks while decoding
+    check_crc = False
+
+    def _extract_member(self, member, targetpath, pwd):
+        if not isinstance(member, ZipInfo):
+            member = self.getinfo(member)
+        if (
+            member.is_dir()
+            or member.compress_type != ZIP_STORED
+            or member.flag_bits & _ZIP_ENCRYPTED
+        ):
+            return super()._extract_member(member, targetpath, pwd)
+
+        # ZipFile extracts an empty copy of the member, checking its local
+        # header and creating the target path as it does for any member,
+        # and its data range is then copied into it
+        empty_member = copy.copy(member)
+        empty_member.file_size = empty_member.compress_size = 0
+        empty_member.CRC = 0
+        targetpath = super()._extract_member(empty_member, targetpath, pwd)
+
+        fp = cast(IO[bytes], self.fp)
+        with open(targetpath, "wb") as target:
+            copy_range(
+                source=fp,
+                target=target,
+                offset=_data_offset(fp, member),
+                size=member.compress_size,
+                buffer_size=get_limits().buffer_size,
+            )
+        # the data didn't go through ZipExtFile, which checks the CRC-32, so
+        # it is read back when asked to, from the page cache
+        if self.check_crc and _file_crc(targetpath) != member.CRC:
+            raise zipfile.BadZipFile(
+                f"Bad CRC-32 for file {member.filename!r}"
+            )
+        return targetpath
+
+
+def _file_crc(path: str) -> int:
+    crc = 0
+    buffer_size = get_limits().buffer_size
+    with open(path, "rb") as file:
+        while chunk := file.read(buffer_size):
+            crc = zlib.crc32(chunk, crc)
+    return crc
 
 
 class ZipClient(AbsractArchiveClient):
     def open(self, file_path: Path, mode: str) -> AbstractArchiveObject:
+        stream = (
+            open_volumes(file_path)
+            if mode == "r" and is_split_set(file_path)
+            else None
+        )
         return ZipObject(
-            archive_object=ZipFile(file=file_path, mode=mode),  # type: ignore
+            archive_object=_ZipFile(
+                file=stream or file_path, mode=mode  # type: ignore
+            ),
             client=self,
             archive_path=file_path,
+            stream=stream,
         )
 
+    def read_member_table(self, file_path: Path) -> Optional[MemberTable]:
+        return read_zip_table(file_path)
+
 
 class ZipMember(AbstractArchiveMember):
     def __init__(
@@ -65,5 +425,5 @@ class ZipMember(AbstractArchiveMember):
             size=member.file_size,
             mtime=datetime.fromtimestamp(
                 datetime(*member.date_time).timestamp(), tz=timezone.utc
-            ).strftime("%a, %d %b %Y %H:%M:%S UTC"),
+            ).strftime(MEMBER_MTIME_FORMAT),
         )
@@ -0,0 +1,499 @@
+"""filepack - compress, decompress and manage archives.
+
+Usage:
+    filepack compress [--jobs=N] [--progress] [--in-place] [--algorithm=ALGORITHM]
+                      [--level=LEVEL] [--output=PATH] [--volume-size=BYTES]
+                      [--format=FORMAT] <path>...
+    filepack decompress [--jobs=N] [--progress] [--in-place] [--algorithm=ALGORITHM]
+                        [--output=PATH] <path>...
+    filepack list <archive>...
+    filepack extract [--jobs=N] [--progress] [--in-place] [--directory=DIRECTORY]
+                     [--member=NAME]... <archive>...
+    filepack add [--in-place] <archive> <path>...
+    filepack remove <archive> <member>...
+    filepack info <path>...
+    filepack verify [--jobs=N] [--progress] [--algorithm=ALGORITHM] <path>...
+    filepack bench [--jobs=N] [--algorithms=ALGORITHMS] [--levels=LEVELS] <path>...
+    filepack (-h | --help)
+
+Options:
+    -h --help                       Show this screen.
+    -j N --jobs=N                   Number of paths processed concurrently [default: 1].
+    -p --progress                   Report progress and throughput to stderr.
+    -i --in-place                   Delete the source after it was processed.
+    -a ALGORITHM --algorithm=ALGORITHM
+                                    Compression algorithm (gz, bz2, xz, lz4). Detected
+                                    from the file content when decompressing or
+                                    verifying.
+    -l LEVEL --level=LEVEL          Compression level [default: 9].
+    -o PATH --output=PATH           Output path, "-" for stdout. Only valid with a
+                                    single input path.
+    --volume-size=BYTES             Split the compressed file into volumes of this
+                                    size, numbered from .001.
+    --format=FORMAT                 "stream", or "blocked" for gzip in independent
+                                    blocks (BGZF), compressed in parallel
+                                    [default: stream].
+    -C DIRECTORY --directory=DIRECTORY
+                                    Directory to extract to [default: .].
+    -m NAME --member=NAME           Extract only the given members.
+    --algorithms=ALGORITHMS         Comma separated algorithms to benchmark
+                                    [default: gz,bz2,xz,lz4].
+    --levels=LEVELS                 Comma separated levels to benchmark [default: 1,6,9].
+
+Paths may be glob patterns. A "-" path reads from stdin and, unless --output
+is given, writes to stdout. --in-place, --volume-size and --format can't be
+used with stdin or stdout.
+"""
+import glob
+import io
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Any, Callable, Iterable, Optional
+
+from docopt import docopt
+
+from filepack.archive import Archive
+from filepack.archives.exceptions import FailedToGetArchiveMembers
+from filepack.compression import Compression
+from filepack.compressions.bgzf import CompressionFormat
+from filepack.compressions.exceptions import CompressionTypeNotSupported
+from filepack.compressions.registry import compressions_registry
+from filepack.limits import get_limits
+from filepack.utils import (
+    detect_file_type_extension,
+    get_file_type_extension,
+    magic_numbers_read_size,
+)
+
+STANDARD_STREAM_PATH = "-"
+
+
+class ProgressReporter:
+    """Reports the number of processed paths and bytes, and the throughput."""
+
+    def __init__(
+        self, total_paths: int, enabled: bool, stream: IO[str] = sys.stderr
+    ) -> None:
+        self._total_paths = total_paths
+        self._enabled = enabled
+        self._stream = stream
+        self._done_paths = 0
+        self._done_bytes = 0
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def advance(self, size: int) -> None:
+        with self._lock:
+            self._done_paths += 1
+            self._done_bytes += size
+            if self._enabled:
+                self._stream.write(f"\r{self.summary()}")
+                self._stream.flush()
+
+    def finish(self) -> None:
+        if self._enabled:
+            self._stream.write("\n")
+            self._stream.flush()
+
+    def summary(self) -> str:
+        elapsed = max(time.monotonic() - self._start, 1e-9)
+        return (
+            f"[{self._done_paths}/{self._total_paths}] "
+            f"{format_size(self._done_bytes)} "
+            f"{format_size(self._done_bytes / elapsed)}/s"
+        )
+
+
+def format_size(size: float) -> str:
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TiB"
+
+
+def expand_paths(patterns: Iterable[str]) -> list[str]:
+    """Expands glob patterns, keeping plain paths and "-" as they are."""
+    paths = []
+    for pattern in patterns:
+        if pattern != STANDARD_STREAM_PATH and glob.has_magic(pattern):
+            paths.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            paths.append(pattern)
+    return paths
+
+
+def run_jobs(
+    function: Callable[[str], int],
+    paths: list[str],
+    jobs: int,
+    progress: ProgressReporter,
+) -> int:
+    """Runs the function on every path, with up to `jobs` paths at a time.
+
+    The function returns the number of bytes it processed. Codecs release
+    the GIL, so threads are enough for using multiple cores.
+
+    Returns:
+        The number of paths that failed.
+    """
+
+    def run(path: str) -> bool:
+        try:
+            progress.advance(function(path))
+            return True
+        except Exception as e:
+            cause = e.__cause__ if e.__cause__ is not None else e
+            print(f"filepack: {path}: {cause}", file=sys.stderr)
+            return False
+
+    with ThreadPoolExecutor(
+        max_workers=get_limits().workers(jobs)
+    ) as executor:
+        results = list(executor.map(run, paths))
+
+    progress.finish()
+    return results.count(False)
+
+
+def copy_stream(
+    source: IO[bytes],
+    target: IO[bytes],
+    algorithm: str,
+    mode: str,
+    compression_level: int,
+) -> int:
+    """Compresses (mode "wb") or decompresses (mode "rb") between streams.
+
+    Returns:
+        The number of bytes read from the source.
+    """
+    client = compressions_registry.get_client(algorithm)
+    counting_source = CountingReader(source)
+
+    if mode == "wb":
+        with client.open(
+            file_path=target,  # type: ignore
+            mode="wb",
+            compression_level=compression_level,
+        ) as compressed_file:
+            shutil.copyfileobj(counting_source, compressed_file)
+    else:
+        with client.open(
+            file_path=counting_source, mode="rb"  # type: ignore
+        ) as compressed_file:
+            shutil.copyfileobj(compressed_file, target)
+
+    target.flush()
+    return counting_source.bytes_read
+
+
+class CountingReader(io.RawIOBase):
+    """A readable stream wrapper counting the bytes read through it."""
+
+    def __init__(self, stream: IO[bytes]) -> None:
+        self._stream = stream
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        data = self._stream.read(len(buffer))
+        buffer[: len(data)] = data
+        self.bytes_read += len(data)
+        return len(data)
+
+
+def compress(path: str, arguments: dict[str, Any]) -> int:
+    algorithm = arguments["--algorithm"]
+    compression_level = int(arguments["--level"])
+    output = arguments["--output"]
+
+    if path == STANDARD_STREAM_PATH:
+        with open_output(output) as target:
+            return copy_stream(
+                sys.stdin.buffer, target, algorithm, "wb", compression_level
+            )
+
+    size = Path(path).stat().st_size
+    if output == STANDARD_STREAM_PATH:
+        with open(path, "rb") as source:
+            copy_stream(
+                source, sys.stdout.buffer, algorithm, "wb", compression_level
+            )
+        return size
+
+    volume_size = arguments["--volume-size"]
+    Compression(path=path).compress(
+        compression_algorithm=algorithm,
+        target_path=output,
+        in_place=arguments["--in-place"],
+        compression_level=compression_level,
+        volume_size=int(volume_size) if volume_size else None,
+        format=arguments["--format"],
+    )
+    return size
+
+
+def decompress(path: str, arguments: dict[str, Any]) -> int:
+    algorithm = arguments["--algorithm"]
+    output = arguments["--output"]
+
+    if path == STANDARD_STREAM_PATH:
+        source = io.BufferedReader(sys.stdin.buffer)  # type: ignore
+        if algorithm is None:
+            algorithm = detect_file_type_extension(
+                header=source.peek(magic_numbers_read_size())
+            )
+        if algorithm is None:
+            raise CompressionTypeNotSupported("unrecognized input")
+        with open_output(output) as target:
+            return copy_stream(source, target, algorithm, "rb", 0)
+
+    if algorithm is None:
+        algorithm = get_file_type_extension(path=Path(path))
+
+    size = Path(path).stat().st_size
+    if output == STANDARD_STREAM_PATH:
+        with open(path, "rb") as compressed_file:
+            copy_stream(compressed_file, sys.stdout.buffer, algorithm, "rb", 0)
+        return size
+
+    Compression(path=path).decompress(
+        compression_algorithm=algorithm,
+        target_path=output,
+        in_place=arguments["--in-place"],
+    )
+    return size
+
+
+def open_output(output: Optional[str]) -> IO[bytes]:
+    if output is None or output == STANDARD_STREAM_PATH:
+        return open(sys.stdout.fileno(), "wb", closefd=False)
+    return open(output, "wb")
+
+
+def extract(path: str, arguments: dict[str, Any]) -> int:
+    archive = Archive(path=path)
+    directory = Path(arguments["--directory"])
+
+    if not arguments["--member"]:
+        archive.extract_all(
+            target_directory_path=directory, in_place=arguments["--in-place"]
+        )
+    else:
+        for member_name in arguments["--member"]:
+            archive.extract_member(
+                member_name=member_name, target_directory_path=directory
+            )
+
+    return archive.size
+
+
+def verify(path: str, arguments: dict[str, Any]) -> int:
+    file_type = arguments["--algorithm"] or get_file_type_extension(
+        path=Path(path)
+    )
+    if file_type in compressions_registry.names():
+        report = Compression(path=path).verify(compression_algorithm=file_type)
+    else:
+        report = Archive(path=path).verify()
+
+    if not report.intact:
+        location = f" at {report.offset}" if report.offset is not None else ""
+        if report.member is not None:
+            location = f" in {report.member}{location}"
+        raise ValueError(f"corrupted{location}: {report.error}")
+
+    return Path(path).stat().st_size
+
+
+def list_members(paths: list[str]) -> int:
+    from tabulate import tabulate
+
+    for path in paths:
+        members = Archive(path=path).get_members()
+        if len(paths) > 1:
+            print(f"{path}:")
+        print(
+            tabulate(
+                [
+                    {
+                        "name": member.name,
+                        "mtime": member.mtime,
+                        "size": member.size,
+                    }
+                    for member in members
+                ],
+                headers="keys",
+            )
+        )
+    return 0
+
+
+def info(paths: list[str]) -> int:
+    from tabulate import tabulate
+
+    rows = []
+    for path in paths:
+        try:
+            file_type = get_file_type_extension(path=Path(path))
+        except ValueError:
+            file_type = None
+
+        row: dict[str, Any] = {
+            "path": path,
+            "type": file_type or "unknown",
+            "size": Path(path).stat().st_size,
+            "members": "",
+        }
+        if file_type is not None:
+            try:
+                row["members"] = len(Archive(path=path).get_members())
+            except (ValueError, FailedToGetArchiveMembers):
+                row["members"] = "unreadable"
+        rows.append(row)
+
+    print(tabulate(rows, headers="keys"))
+    return 0
+
+
+def bench(paths: list[str], arguments: dict[str, Any]) -> int:
+    from tabulate import tabulate
+
+    candidates = [
+        (path, algorithm, int(level))
+        for path in paths
+        for algorithm in arguments["--algorithms"].split(",")
+        for level in arguments["--levels"].split(",")
+    ]
+
+    def measure(candidate: tuple[str, str, int]) -> dict[str, Any]:
+        path, algorithm, level = candidate
+        data = Path(path).read_bytes()
+        buffer = io.BytesIO()
+
+        start = time.perf_counter()
+        copy_stream(io.BytesIO(data), buffer, algorithm, "wb", level)
+        compress_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        copy_stream(
+            io.BytesIO(buffer.getvalue()), io.BytesIO(), algorithm, "rb", 0
+        )
+        decompress_seconds = time.perf_counter() - start
+
+        megabytes = len(data) / 2**20
+        return {
+            "path": path,
+            "algorithm": algorithm,
+            "level": level,
+            "ratio": round(len(data) / max(len(buffer.getvalue()), 1), 2),
+            "compress MB/s": round(megabytes / compress_seconds, 1),
+            "decompress MB/s": round(megabytes / decompress_seconds, 1),
+        }
+
+    with ThreadPoolExecutor(
+        max_workers=get_limits().workers(int(arguments["--jobs"]))
+    ) as executor:
+        rows = list(executor.map(measure, candidates))
+
+    print(tabulate(rows, headers="keys"))
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    arguments = docopt(__doc__, argv=argv)
+
+    try:
+        return run(arguments)
+    except Exception as e:
+        cause = e.__cause__ if e.__cause__ is not None else e
+        print(f"filepack: {cause}", file=sys.stderr)
+        return 1
+
+
+def run(arguments: dict[str, Any]) -> int:
+    if arguments["list"]:
+        return list_members(expand_paths(arguments["<archive>"]))
+
+    if arguments["info"]:
+        return info(expand_paths(arguments["<path>"]))
+
+    if arguments["bench"]:
+        return bench(expand_paths(arguments["<path>"]), arguments)
+
+    if arguments["add"]:
+        archive = Archive(path=arguments["<archive>"][0])
+        for path in expand_paths(arguments["<path>"]):
+            archive.add_member(
+                member_path=path, in_place=arguments["--in-place"]
+            )
+        return 0
+
+    if arguments["remove"]:
+        archive = Archive(path=arguments["<archive>"][0])
+        for member_name in arguments["<member>"]:
+            archive.remove_member(member_name=member_name)
+        return 0
+
+    if arguments["extract"]:
+        paths = expand_paths(arguments["<archive>"])
+        function = extract
+    elif arguments["verify"]:
+        paths = expand_paths(arguments["<path>"])
+        function = verify
+    else:
+        paths = expand_paths(arguments["<path>"])
+        function = compress if arguments["compress"] else decompress
+
+        if arguments["--output"] is not None and len(paths) > 1:
+            print("filepack: --output requires a single path", file=sys.stderr)
+            return 2
+
+        if arguments["compress"] and arguments["--algorithm"] is None:
+            print("filepack: --algorithm is required", file=sys.stderr)
+            return 2
+
+        # the standard streams are copied through the codec as they are
+        if STANDARD_STREAM_PATH in (*paths, arguments["--output"]) and (
+            options := [
+                option
+                for option, given in (
+                    ("--in-place", arguments["--in-place"]),
+                    ("--volume-size", arguments["--volume-size"] is not None),
+                    (
+                        "--format",
+                        arguments["--format"]
+                        != CompressionFormat.STREAM.value,
+                    ),
+                )
+                if given
+            ]
+        ):
+            print(
+                f"filepack: {', '.join(options)} can't be used with the "
+                "standard streams",
+                file=sys.stderr,
+            )
+            return 2
+
+    progress = ProgressReporter(
+        total_paths=len(paths), enabled=arguments["--progress"]
+    )
+    failures = run_jobs(
+        function=lambda path: function(path, arguments),
+        paths=paths,
+        jobs=int(arguments["--jobs"]),
+        progress=progress,
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
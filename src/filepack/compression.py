@@ -1,23 +1,86 @@
 import os
-import shutil
-import tempfile
+from contextlib import ExitStack, nullcontext
 from pathlib import Path
-
-from filepack.compressions.bzip2 import BzipCompression
+from typing import IO, Iterator, Optional
+
+from filepack.compressions.bgzf import (
+    BgzfWriter,
+    CompressionFormat,
+    Split,
+    gzi_index_path,
+    plan_splits,
+    read_split,
+    write_gzi_index,
+)
+from filepack.compressions.compressibility import (
+    CompressibilityReport,
+    IncompressiblePolicy,
+    check_compressibility,
+)
+from filepack.compressions.consts import (
+    FASTEST_COMPRESSION_LEVELS,
+    GZIP_SUFFIX,
+    RECOMPRESSION_BLOCK_SIZE,
+)
 from filepack.compressions.exceptions import (
     CompressionTypeNotSupported,
+    FailedToAppendToFile,
     FailedToCompressFile,
     FailedToDecompressFile,
     FailedToGetCompressedSize,
     FailedToGetUncompressedSize,
+    FailedToRecompressFile,
+    FailedToSplitFile,
+    FailedToVerifyFile,
     FileAlreadyCompressed,
     FileNotCompressed,
 )
-from filepack.compressions.gzip import GzipCompression
-from filepack.compressions.lz4 import LZ4Compression
 from filepack.compressions.models import AbstractCompression, CompressionType
-from filepack.compressions.xz import XZCompression
-from filepack.utils import get_file_type_extension, reraise_as
+from filepack.compressions.registry import compressions_registry
+from filepack.compressions.tuning import TuningDecision, TuningTarget, tune
+from filepack.consts import PIPELINE_MIN_FILE_SIZE
+from filepack.hashing import Digests, HashingSink, hash_file_digests
+from filepack.instrumentation import (
+    instrumented,
+    record_bytes_read,
+    record_bytes_written,
+    record_codec,
+)
+from filepack.limits import LimitExceeded, get_limits
+from filepack.pipeline import (
+    Chunk,
+    ChunksReader,
+    ReadAhead,
+    WriteBehind,
+    map_ordered,
+    pipelined_copy,
+    read_chunks,
+    rechunk,
+)
+from filepack.progress import ProgressCallback, ProgressTracker
+from filepack.registry import Capability
+from filepack.utils import (
+    CountingSink,
+    NamedStream,
+    ReadableStream,
+    TeeReader,
+    TeeStream,
+    WritableStream,
+    copy_stream,
+    get_file_type_extension,
+    reraise_as,
+)
+from filepack.verification import VerificationReport, describe, drain
+from filepack.volumes import (
+    VolumeCallback,
+    VolumeWriter,
+    file_size,
+    is_split_set,
+    open_volumes,
+    remove_file,
+    split_set_base,
+    volume_path,
+)
 
 
 class Compression:
@@ -46,6 +109,7 @@ class Compression:
         """
         return self._path
 
+    @instrumented("compression.uncompressed_size")
     @reraise_as(FailedToGetUncompressedSize)
     def uncompressed_size(self, compression_algorithm: str) -> int:
         """
@@ -59,17 +123,35 @@ class Compression:
 
         Raises:
             FailedToGetUncompressedSize: If there's an error while retrieving the uncompressed size.
+            LimitExceeded: If the decompressed data exceeds the size or ratio limits.
         """
         if not self.is_compressed(compression_algorithm=compression_algorithm):
             return self._path.stat().st_size
 
-        with tempfile.NamedTemporaryFile() as temporary_file:
-            self.decompress(
-                target_path=temporary_file.name,
-                compression_algorithm=compression_algorithm,
-            )
-            return Path(temporary_file.name).stat().st_size
+        compression_client = self._get_compression_client(
+            compression_algorithm=compression_algorithm
+        )
+        compressed_size = file_size(self._path)
+        limits = get_limits()
+        guard = limits.decompression_guard(compressed_size=compressed_size)
+
+        record_codec(compression_algorithm)
+        record_bytes_read(compressed_size)
 
+        # the data is decompressed into a sink counting its size, rather
+        # than into a temporary file
+        with open_volumes(self._path) as compressed_file:
+            with compression_client.open(
+                file_path=compressed_file, mode="r"  # type: ignore
+            ) as compression_object:
+                return copy_stream(
+                    source=compression_object,
+                    target=CountingSink(),
+                    buffer_size=limits.buffer_size,
+                    progress=guard.advance,
+                )
+
+    @instrumented("compression.compressed_size")
     @reraise_as(FailedToGetCompressedSize)
     def compressed_size(
         self, compression_algorithm: str, compression_level: int | None = None
@@ -88,21 +170,44 @@ class Compression:
             FailedToGetCompressedSize: If there's an error while retrieving the compressed size.
         """
         if self.is_compressed(compression_algorithm=compression_algorithm):
-            return self._path.stat().st_size
+            return file_size(self._path)
 
         if compression_level is None:
             raise ValueError(
                 "compression_level is manadatory for calculating compressed file size"
             )
 
-        with tempfile.NamedTemporaryFile() as temporary_file:
-            self.compress(
-                target_path=temporary_file.name,
-                compression_algorithm=compression_algorithm,
-                compression_level=compression_level,
+        compression_client = self._get_compression_client(
+            compression_algorithm=compression_algorithm
+        )
+        compressed_file_sink = CountingSink(
+            name=str(
+                self._path.parent
+                / f"{self._path.name}.{compression_algorithm}"
             )
-            return Path(temporary_file.name).stat().st_size
+        )
+
+        record_codec(compression_algorithm)
+
+        # the data is compressed into a sink counting its size, rather than
+        # into a temporary file
+        with open(file=self._path, mode="rb") as uncompressed_file:
+            with compression_client.open(
+                file_path=compressed_file_sink,  # type: ignore
+                mode="wb",
+                compression_level=compression_level,
+            ) as compressed_file:
+                record_bytes_read(
+                    copy_stream(
+                        source=uncompressed_file,
+                        target=compressed_file,
+                        buffer_size=get_limits().buffer_size,
+                    )
+                )
+
+        return compressed_file_sink.size
 
+    @instrumented("compression.compression_ratio")
     def compression_ratio(self, compression_algorithm: str) -> str:
         """
         Returns the compression ratio for the file using the specified algorithm.
@@ -122,12 +227,15 @@ class Compression:
         )
         return f"{ratio}:1"
 
+    @instrumented("compression.decompress")
     @reraise_as(FailedToDecompressFile)
     def decompress(
         self,
         compression_algorithm: str,
         target_path: str | Path | None = None,
         in_place: bool = False,
+        progress: Optional[ProgressCallback] = None,
+        digests: Optional[Digests] = None,
     ) -> Path:
         """
         Decompresses the file using the specified compression algorithm.
@@ -136,18 +244,23 @@ class Compression:
             compression_algorithm: The algorithm used to decompress the file.
             target_path: The path where the decompressed file will be saved. If None, uses the same directory.
             in_place: If True, replaces the compressed file with the decompressed file.
+            progress: A function called, at a bounded rate, with the number of decompressed bytes written.
+            digests: Filled with the digests of the decompressed data and of the compressed file, hashed in a thread
+                while decompressing rather than by reading the files again.
 
         Returns:
             The path to the decompressed file.
 
         Raises:
             FailedToDecompressFile: If there's an error during decompression.
+            LimitExceeded: If the decompressed data exceeds the size or ratio limits.
         """
         if not self.is_compressed(compression_algorithm=compression_algorithm):
             raise FileNotCompressed()
 
         if target_path is None:
-            target_path = self._path.parent / self._path.stem
+            base_path = split_set_base(self._path)
+            target_path = base_path.parent / base_path.stem
         else:
             target_path = Path(target_path)
 
@@ -155,18 +268,93 @@ class Compression:
             compression_algorithm=compression_algorithm
         )
 
-        with compression_client.open(
-            file_path=self._path, mode="r"
-        ) as compression_object:
-            with open(file=target_path, mode="wb") as target_file:
-                shutil.copyfileobj(fsrc=compression_object, fdst=target_file)
+        compressed_size = file_size(self._path)
+        limits = get_limits()
+        guard = limits.decompression_guard(compressed_size=compressed_size)
+        tracker = ProgressTracker(callback=progress) if progress else None
+
+        def on_chunk(size: int) -> None:
+            guard.advance(size)
+            if tracker is not None:
+                tracker.advance(size)
+
+        record_codec(compression_algorithm)
+        record_bytes_read(compressed_size)
+
+        plaintext_hashes, compressed_hashes = self._hashing_sinks(digests)
+        pipelined = self._pipelined(size=compressed_size)
+        try:
+            with ExitStack() as stack:
+                source: str | Path | ReadableStream = self._path
+                if (
+                    pipelined
+                    or digests is not None
+                    or is_split_set(self._path)
+                ):
+                    source = stack.enter_context(open_volumes(self._path))
+                if pipelined:
+                    source = ChunksReader(
+                        chunks=stack.enter_context(
+                            ReadAhead(
+                                source=source,  # type: ignore
+                                buffer_size=limits.buffer_size,
+                            )
+                        )
+                    )
+                if digests is not None:
+                    source = TeeReader(
+                        source=source,  # type: ignore
+                        copy=stack.enter_context(
+                            WriteBehind(target=compressed_hashes)
+                        ),
+                    )
+                compression_object = stack.enter_context(
+                    compression_client.open(
+                        file_path=source, mode="r"  # type: ignore
+                    )
+                )
+                target: WritableStream = stack.enter_context(
+                    open(file=target_path, mode="wb")
+                )
+                if pipelined:
+                    target = stack.enter_context(WriteBehind(target=target))
+                if digests is not None:
+                    target = TeeStream(
+                        stream=target,
+                        copy=stack.enter_context(
+                            WriteBehind(target=plaintext_hashes)
+                        ),
+                    )
+                record_bytes_written(
+                    copy_stream(
+                        source=compression_object,
+                        target=target,
+                        buffer_size=limits.buffer_size,
+                        progress=on_chunk,
+                    )
+                )
+                if isinstance(source, TeeReader):
+                    # data past the end of the compressed stream, if any
+                    while source.read(limits.buffer_size):
+                        pass
+        except LimitExceeded:
+            target_path.unlink(missing_ok=True)
+            raise
+
+        if tracker is not None:
+            tracker.finish()
+
+        if digests is not None:
+            digests.plaintext = plaintext_hashes.hexdigests()
+            digests.compressed = compressed_hashes.hexdigests()
 
         if in_place:
-            self._path.unlink()
+            remove_file(self._path)
             self._path = target_path
 
-        return self._path
+        return target_path
 
+    @instrumented("compression.compress")
     @reraise_as(FailedToCompressFile)
     def compress(
         self,
@@ -174,6 +362,14 @@ class Compression:
         target_path: str | Path | None = None,
         in_place: bool = False,
         compression_level: int = 9,
+        progress: Optional[ProgressCallback] = None,
+        incompressible_policy: str = IncompressiblePolicy.COMPRESS.value,
+        digests: Optional[Digests] = None,
+        volume_size: Optional[int] = None,
+        on_volume: Optional[VolumeCallback] = None,
+        format: str = CompressionFormat.STREAM.value,
+        block_index: bool = False,
+        workers: Optional[int] = None,
     ) -> Path:
         """
         Compresses the file using the specified algorithm and compression level.
@@ -183,9 +379,26 @@ class Compression:
             target_path: The path where the compressed file will be saved. If None, adds the algorithm as a suffix.
             in_place: If True, replaces the original file with the compressed version.
             compression_level: The level of compression to apply, where 9 is maximum compression.
+            progress: A function called, at a bounded rate, with the number of uncompressed bytes read.
+            incompressible_policy: What to do with an incompressible file (e.g. JPEG, MP4, high entropy data):
+                "store" and "skip" leave it uncompressed, "fast" compresses it at the fastest level, and
+                "compress" skips the check. check_compressibility tells why a file is incompressible.
+            digests: Filled with the digests of the uncompressed data and of the compressed file, hashed in a thread
+                while compressing rather than by reading the files again. Both are the file digests when it is
+                left uncompressed.
+            volume_size: If given, the compressed file is split into volumes of this size, numbered from 001 after
+                the target path, which decompress reads back from the first one.
+            on_volume: A function called with the path of every volume once complete, e.g. to upload it while the
+                next ones are written.
+            format: "stream" writes a single compressed stream. "blocked" writes gzip as independent blocks of at
+                most 64 KiB (BGZF, as bgzip writes them), compressed in parallel, which any gzip decoder reads and
+                which splits divides for parallel decompression.
+            block_index: If True, the offsets of the blocks are written next to the compressed file, in a .gzi
+                index as bgzip -i writes it, so that splits doesn't read the block headers.
+            workers: The number of blocks compressed at once, for the blocked format. If None, the limits decide.
 
         Returns:
-            The path to the compressed file.
+            The path to the compressed file or to its first volume, or to the original file when left uncompressed.
 
         Raises:
             FailedToCompressFile: If there's an error during compression.
@@ -193,6 +406,26 @@ class Compression:
         if self.is_compressed(compression_algorithm=compression_algorithm):
             raise FileAlreadyCompressed()
 
+        blocked = CompressionFormat(format) is CompressionFormat.BLOCKED
+        if blocked and compression_algorithm != GZIP_SUFFIX:
+            raise ValueError("the blocked format is only written with gzip")
+
+        policy = IncompressiblePolicy(incompressible_policy)
+        if (
+            policy is not IncompressiblePolicy.COMPRESS
+            and check_compressibility(path=self._path).incompressible
+        ):
+            if policy is not IncompressiblePolicy.FAST:
+                if digests is not None:
+                    digests.plaintext = digests.compressed = hash_file_digests(
+                        path=self._path, algorithms=digests.algorithms
+                    )
+                return self._path
+
+            compression_level = FASTEST_COMPRESSION_LEVELS.get(
+                compression_algorithm, 1
+            )
+
         if target_path is None:
             target_path = (
                 self._path.parent
@@ -206,22 +439,522 @@ class Compression:
             compression_algorithm=compression_algorithm
         )
 
-        with open(file=self._path, mode="rb") as uncompressed_file:
+        record_codec(compression_algorithm)
+        size = self._path.stat().st_size
+        tracker = (
+            ProgressTracker(callback=progress, total_bytes=size)
+            if progress
+            else None
+        )
+
+        plaintext_hashes, compressed_hashes = self._hashing_sinks(digests)
+        pipelined = self._pipelined(size=size)
+        with ExitStack() as stack:
+            uncompressed_file = stack.enter_context(
+                open(file=self._path, mode="rb")
+            )
+            target: str | Path | NamedStream = target_path
+            if (
+                pipelined
+                or blocked
+                or digests is not None
+                or volume_size is not None
+            ):
+                target_file: WritableStream = (
+                    stack.enter_context(open(file=target_path, mode="wb"))
+                    if volume_size is None
+                    else stack.enter_context(
+                        VolumeWriter(
+                            path=target_path,
+                            volume_size=volume_size,
+                            on_volume=on_volume,
+                        )
+                    )
+                )
+                if digests is not None:
+                    target_file = TeeStream(
+                        stream=target_file,
+                        copy=stack.enter_context(
+                            WriteBehind(target=compressed_hashes)
+                        ),
+                    )
+                if pipelined:
+                    target_file = stack.enter_context(
+                        WriteBehind(target=target_file)
+                    )
+                target = NamedStream(stream=target_file, name=str(target_path))
+            compressed_file: WritableStream = stack.enter_context(
+                BgzfWriter(
+                    target=target,  # type: ignore
+                    compression_level=compression_level,
+                    workers=get_limits().workers(workers),
+                )
+                if blocked
+                else compression_client.open(
+                    file_path=target,  # type: ignore
+                    mode="wb",
+                    compression_level=compression_level,
+                )
+            )
+            sink = compressed_file
+            if digests is not None:
+                sink = TeeStream(
+                    stream=compressed_file,
+                    copy=stack.enter_context(
+                        WriteBehind(target=plaintext_hashes)
+                    ),
+                )
+            record_bytes_read(
+                (pipelined_copy if pipelined else copy_stream)(
+                    source=uncompressed_file,
+                    target=sink,
+                    buffer_size=get_limits().buffer_size,
+                    progress=tracker.advance if tracker else None,
+                )
+            )
+        if blocked and block_index:
+            assert isinstance(compressed_file, BgzfWriter)
+            write_gzi_index(
+                path=gzi_index_path(target_path), index=compressed_file.index
+            )
+        if volume_size is not None:
+            target_path = volume_path(target_path, 1)
+        record_bytes_written(file_size(target_path))
+
+        if tracker is not None:
+            tracker.finish()
+
+        if digests is not None:
+            digests.plaintext = plaintext_hashes.hexdigests()
+            digests.compressed = compressed_hashes.hexdigests()
+
+        if in_place:
+            os.remove(self._path)
+            self._path = target_path
+
+        return target_path
+
+    @instrumented("compression.append")
+    @reraise_as(FailedToAppendToFile)
+    def append(
+        self,
+        source_path: str | Path,
+        compression_algorithm: str,
+        compression_level: int = 9,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Path:
+        """
+        Appends the content of a file to the compressed file, as a new compressed stream.
+
+        The existing data is not read nor rewritten, since every algorithm decodes concatenated streams as a
+        single one. Appending a tar archive to a compressed tar archive gives a compressed archive of the
+        members of both, the end-of-archive blocks between them being skipped when reading it.
+
+        Args:
+            source_path: The path to the uncompressed file to append.
+            compression_algorithm: The algorithm the file is compressed with.
+            compression_level: The level of compression of the new stream, where 9 is maximum compression.
+            progress: A function called, at a bounded rate, with the number of uncompressed bytes read.
+
+        Returns:
+            The path to the compressed file.
+
+        Raises:
+            FailedToAppendToFile: If there's an error during compression.
+        """
+        if not self.is_compressed(compression_algorithm=compression_algorithm):
+            raise FileNotCompressed()
+
+        if is_split_set(self._path):
+            raise ValueError("can't append to a split set")
+
+        source_path = Path(source_path)
+        compression_client = self._get_compression_client(
+            compression_algorithm=compression_algorithm
+        )
+
+        record_codec(compression_algorithm)
+        tracker = (
+            ProgressTracker(
+                callback=progress, total_bytes=source_path.stat().st_size
+            )
+            if progress
+            else None
+        )
+        size = self._path.stat().st_size
+
+        with open(file=source_path, mode="rb") as uncompressed_file:
             with compression_client.open(
-                file_path=target_path,
-                mode="wb",
+                file_path=self._path,
+                mode="ab",
                 compression_level=compression_level,
             ) as compressed_file:
-                shutil.copyfileobj(
-                    fsrc=uncompressed_file, fdst=compressed_file
+                record_bytes_read(
+                    copy_stream(
+                        source=uncompressed_file,
+                        target=compressed_file,
+                        buffer_size=get_limits().buffer_size,
+                        progress=tracker.advance if tracker else None,
+                    )
                 )
+        record_bytes_written(self._path.stat().st_size - size)
 
-            if in_place:
-                os.remove(self._path)
-                self._path = target_path
+        if tracker is not None:
+            tracker.finish()
 
         return self._path
 
+    @instrumented("compression.recompress")
+    @reraise_as(FailedToRecompressFile)
+    def recompress(
+        self,
+        compression_algorithm: str,
+        to_algorithm: str,
+        target_path: str | Path | None = None,
+        in_place: bool = False,
+        compression_level: int = 9,
+        workers: Optional[int] = 2,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Path:
+        """
+        Compresses the file with another algorithm or level, piping the decompressed data into the compressor.
+
+        The decompressed data is never written to disk, and the new file is written next to the target path and
+        moved there once complete. With 2 workers, decompression and compression run on separate threads,
+        connected by a bounded queue. With more, the decompressed data is also split into blocks of 8 MiB that
+        are compressed in parallel, as concatenated streams, which every algorithm decodes as a single one.
+
+        Args:
+            compression_algorithm: The algorithm the file is compressed with.
+            to_algorithm: The algorithm to compress the file with.
+            target_path: The path where the recompressed file will be saved. If None, the algorithm suffix of the
+                file is replaced with the new one.
+            in_place: If True, replaces the original file with the recompressed version.
+            compression_level: The level of compression to apply, where 9 is maximum compression.
+            workers: The number of threads decompressing and compressing the data. If None, the CPU count.
+            progress: A function called, at a bounded rate, with the number of decompressed bytes recompressed.
+
+        Returns:
+            The path to the recompressed file.
+
+        Raises:
+            FailedToRecompressFile: If there's an error during decompression or compression.
+            LimitExceeded: If the decompressed data exceeds the size or ratio limits.
+        """
+        import uuid
+
+        if not self.is_compressed(compression_algorithm=compression_algorithm):
+            raise FileNotCompressed()
+
+        if target_path is None:
+            base_path = split_set_base(self._path)
+            stem = (
+                base_path.stem
+                if base_path.suffix == f".{compression_algorithm}"
+                else base_path.name
+            )
+            target_path = base_path.parent / f"{stem}.{to_algorithm}"
+        else:
+            target_path = Path(target_path)
+
+        if target_path.resolve() == self._path.resolve():
+            raise ValueError("the target path is the file path")
+
+        source_client = self._get_compression_client(
+            compression_algorithm=compression_algorithm
+        )
+        target_client = self._get_compression_client(
+            compression_algorithm=to_algorithm
+        )
+
+        compressed_size = file_size(self._path)
+        limits = get_limits()
+        workers = limits.workers(workers)
+        guard = limits.decompression_guard(compressed_size=compressed_size)
+        tracker = ProgressTracker(callback=progress) if progress else None
+
+        def tracked(chunks: Iterator[Chunk]) -> Iterator[Chunk]:
+            for chunk in chunks:
+                if tracker is not None:
+                    tracker.advance(len(chunk))
+                yield chunk
+
+        def compress_block(block: bytes) -> bytes:
+            import io
+
+            compressed_block = io.BytesIO()
+            with target_client.open(
+                file_path=compressed_block,  # type: ignore
+                mode="wb",
+                compression_level=compression_level,
+            ) as compressed_file:
+                compressed_file.write(block)
+            return compressed_block.getvalue()
+
+        record_codec(compression_algorithm)
+        record_codec(to_algorithm)
+        record_bytes_read(compressed_size)
+
+        # written in the target directory, so that moving it is atomic
+        new_path = target_path.with_name(
+            f".{target_path.name}.{uuid.uuid4().hex}"
+        )
+        try:
+            with ExitStack() as stack:
+                decompressed_file = stack.enter_context(
+                    source_client.open(
+                        file_path=stack.enter_context(  # type: ignore
+                            open_volumes(self._path)
+                        ),
+                        mode="r",
+                    )
+                )
+                target_file = stack.enter_context(open(new_path, mode="wb"))
+                reader = (
+                    ReadAhead(
+                        source=decompressed_file,
+                        buffer_size=limits.buffer_size,
+                        on_chunk=guard.advance,
+                    )
+                    if workers > 1
+                    else nullcontext(
+                        read_chunks(
+                            source=decompressed_file,
+                            buffer_size=limits.buffer_size,
+                            on_chunk=guard.advance,
+                        )
+                    )
+                )
+                with reader as chunks:
+                    if workers > 2:
+                        for compressed_block in map_ordered(
+                            compress_block,
+                            blocks=rechunk(
+                                tracked(chunks), size=RECOMPRESSION_BLOCK_SIZE
+                            ),
+                            workers=workers - 1,
+                        ):
+                            target_file.write(compressed_block)
+                    else:
+                        with target_client.open(
+                            file_path=NamedStream(  # type: ignore
+                                stream=target_file, name=str(target_path)
+                            ),
+                            mode="wb",
+                            compression_level=compression_level,
+                        ) as compressed_file:
+                            for chunk in tracked(chunks):
+                                compressed_file.write(chunk)
+            os.replace(new_path, target_path)
+        except BaseException:
+            new_path.unlink(missing_ok=True)
+            raise
+
+        record_bytes_written(target_path.stat().st_size)
+
+        if tracker is not None:
+            tracker.finish()
+
+        if in_place:
+            remove_file(self._path)
+            self._path = target_path
+
+        return target_path
+
+    @instrumented("compression.verify")
+    @reraise_as(FailedToVerifyFile)
+    def verify(
+        self,
+        compression_algorithm: str,
+        progress: Optional[ProgressCallback] = None,
+    ) -> VerificationReport:
+        """
+        Checks the file by decompressing it, without writing the decompressed data anywhere.
+
+        The decoders check the data as they go: gzip against the CRC32 and size of every stream, xz against
+        the checksum of every block and stream, bz2 against the CRC of every block, and lz4 against the content
+        checksum of frames written with one, as compress writes them. A truncated file is found corrupted too.
+
+        Args:
+            compression_algorithm: The algorithm the file is compressed with.
+            progress: A function called, at a bounded rate, with the number of decompressed bytes checked.
+
+        Returns:
+            The report of the check, telling where in the decompressed data the corruption was found.
+
+        Raises:
+            FailedToVerifyFile: If the file doesn't exist, or there's an issue reading it.
+        """
+        if not self.is_compressed(compression_algorithm=compression_algorithm):
+            raise FileNotCompressed()
+
+        compression_client = self._get_compression_client(
+            compression_algorithm=compression_algorithm
+        )
+
+        compressed_size = file_size(self._path)
+        limits = get_limits()
+        tracker = ProgressTracker(callback=progress) if progress else None
+
+        record_codec(compression_algorithm)
+        record_bytes_read(compressed_size)
+
+        with ExitStack() as stack:
+            source: str | Path | IO[bytes] | ChunksReader = self._path
+            if self._pipelined(size=compressed_size) or is_split_set(
+                self._path
+            ):
+                source = stack.enter_context(open_volumes(self._path))
+            if self._pipelined(size=compressed_size):
+                # the file is read ahead while the data is decoded
+                source = ChunksReader(
+                    chunks=stack.enter_context(
+                        ReadAhead(
+                            source=source,  # type: ignore
+                            buffer_size=limits.buffer_size,
+                        )
+                    )
+                )
+            try:
+                decompressed_file = stack.enter_context(
+                    compression_client.open(
+                        file_path=source, mode="r"  # type: ignore
+                    )
+                )
+            except Exception as open_error:
+                return VerificationReport(
+                    checked_members=0,
+                    checked_bytes=0,
+                    error=describe(open_error),
+                    offset=0,
+                )
+            size, error = drain(
+                source=decompressed_file,
+                buffer_size=limits.buffer_size,
+                progress=tracker.advance if tracker else None,
+            )
+
+        if tracker is not None:
+            tracker.finish()
+
+        return VerificationReport(
+            checked_members=0,
+            checked_bytes=size,
+            error=error,
+            offset=size if error is not None else None,
+        )
+
+    @instrumented("compression.splits")
+    @reraise_as(FailedToSplitFile)
+    def splits(self, n: int) -> list[Split]:
+        """
+        Divides a blocked gzip file into parts of about equal size, made of whole lines, which decompress on their own.
+
+        Every part is a range of whole blocks of the file, found from its .gzi index if there is one, or else from
+        the block headers, without decompressing the file. Only the blocks around the cuts are decompressed, to move
+        every cut past the end of a line, so that N workers each read their own part with read_split.
+
+        Args:
+            n: The number of parts. Fewer are returned for a file with fewer lines or blocks.
+
+        Returns:
+            The parts, in order, covering all the uncompressed data once.
+
+        Raises:
+            FailedToSplitFile: If the file isn't a blocked gzip file, or there's an issue reading it.
+        """
+        if not self.is_compressed(compression_algorithm=GZIP_SUFFIX):
+            raise FileNotCompressed()
+        if n < 1:
+            raise ValueError("the number of splits must be positive")
+
+        return plan_splits(path=self._path, count=n)
+
+    def read_split(self, split: Split) -> Iterator[bytes]:
+        """
+        Decompresses a part of a blocked gzip file, returned by splits, reading only its blocks.
+
+        Args:
+            split: The part to decompress.
+
+        Returns:
+            The uncompressed data of the part, in chunks of at most a block.
+
+        Raises:
+            ValueError: If a block of the part is corrupted.
+            EOFError: If the file is truncated.
+        """
+        record_codec(GZIP_SUFFIX)
+        record_bytes_read(split.end - split.start)
+        guard = get_limits().decompression_guard(
+            compressed_size=split.end - split.start
+        )
+        for chunk in read_split(path=self._path, split=split):
+            guard.advance(len(chunk))
+            yield chunk
+
+    @instrumented("compression.auto_compress")
+    @reraise_as(FailedToCompressFile)
+    def auto_compress(
+        self,
+        target: str = TuningTarget.BALANCED.value,
+        budget_mb_s: Optional[float] = None,
+        target_path: str | Path | None = None,
+        in_place: bool = False,
+        candidates: Optional[list[tuple[CompressionType, int]]] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> TuningDecision:
+        """
+        Compresses the file with the algorithm and level best suited to a target.
+
+        Candidate algorithm and level pairs are benchmarked on a sample of the file, and
+        the decision is cached for the following files with the same extension and content type.
+
+        Args:
+            target: "speed", "ratio" or "balanced" (the fastest candidate with an output close to the smallest).
+            budget_mb_s: The minimal compression throughput, in MB/s of input.
+            target_path: The path where the compressed file will be saved. If None, adds the algorithm as a suffix.
+            in_place: If True, replaces the original file with the compressed version.
+            candidates: The (algorithm, level) pairs to try. If None, all the available algorithms are tried.
+            progress: A function called, at a bounded rate, with the number of uncompressed bytes read.
+
+        Returns:
+            The decision, with the trials it is based on and the compressed file path.
+
+        Raises:
+            FailedToCompressFile: If there's an error during compression.
+        """
+        decision = tune(
+            path=self._path,
+            target=TuningTarget(target),
+            budget_mb_s=budget_mb_s,
+            candidates=candidates,
+        )
+        if target_path is None:
+            target_path = (
+                self._path.parent / f"{self._path.name}.{decision.algorithm}"
+            )
+
+        decision.path = Path(target_path)
+        self.compress(
+            compression_algorithm=decision.algorithm,
+            target_path=decision.path,
+            in_place=in_place,
+            compression_level=decision.level,
+            progress=progress,
+        )
+
+        return decision
+
+    def check_compressibility(self) -> CompressibilityReport:
+        """
+        Checks whether the file is worth compressing, from its content type and entropy.
+
+        Returns:
+            The report, with the reason of the verdict.
+        """
+        return check_compressibility(path=self._path)
+
     def is_compressed(self, compression_algorithm: str) -> bool:
         """
         Checks if the file is compressed using the specified algorithm.
@@ -237,23 +970,45 @@ class Compression:
         except ValueError:
             return False
 
+    @staticmethod
+    def compression_capabilities(compression_algorithm: str) -> Capability:
+        """
+        Returns the capabilities of a compression algorithm.
+
+        Args:
+            compression_algorithm: The compression algorithm.
+
+        Returns:
+            The capability flags registered for the algorithm.
+
+        Raises:
+            CompressionTypeNotSupported: If the algorithm isn't registered.
+        """
+        registration = compressions_registry.get(compression_algorithm)
+        if registration is None:
+            raise CompressionTypeNotSupported()
+
+        return registration.capabilities
+
     def _get_compression_client(
         self, compression_algorithm: str
     ) -> AbstractCompression:
         try:
-            match CompressionType(compression_algorithm):
-                case CompressionType.GZIP:
-                    return GzipCompression()
-
-                case CompressionType.BZ2:
-                    return BzipCompression()
-
-                case CompressionType.LZ4:
-                    return LZ4Compression()
-
-                case CompressionType.XZ:
-                    return XZCompression()
-                case _:
-                    raise CompressionTypeNotSupported()
+            return compressions_registry.get_client(compression_algorithm)
         except Exception:
             raise CompressionTypeNotSupported()
+
+    @staticmethod
+    def _hashing_sinks(
+        digests: Optional[Digests],
+    ) -> tuple[HashingSink, HashingSink]:
+        """The sinks hashing the uncompressed data and the compressed file,
+        created before any file is written so unknown algorithms fail early."""
+        algorithms = digests.algorithms if digests is not None else ()
+        return HashingSink(algorithms), HashingSink(algorithms)
+
+    @staticmethod
+    def _pipelined(size: int) -> bool:
+        # reading, encoding and writing a large file on separate threads
+        # makes its time the slowest of the three, rather than their sum
+        return size >= PIPELINE_MIN_FILE_SIZE and get_limits().workers(3) > 1
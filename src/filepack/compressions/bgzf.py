@@ -0,0 +1,396 @@
+import struct
+import zlib
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import IO, Iterator
+
+from filepack.compressions.consts import (
+    BGZF_BLOCK_SIZE,
+    BGZF_EOF_BLOCK,
+    BGZF_HEADER_SIZE,
+    BGZF_MAGIC_NUMBER,
+    BGZF_MAX_BLOCK_SIZE,
+    GZI_INDEX_SUFFIX,
+)
+from filepack.utils import WritableStream
+from filepack.volumes import open_volumes, split_set_base
+
+# blocked gzip files (BGZF, as bgzip writes them) are concatenated gzip
+# members of at most 64 KiB, each holding the size of its compressed block
+# in an extra field, so that blocks are found without decompressing them and
+# any range of blocks decompresses on its own. Stock gzip reads them as a
+# multi-member gzip file.
+
+# gzip header with the BC extra subfield: magic number, deflate, FEXTRA,
+# mtime, xfl, os (unknown), XLEN, "BC", SLEN, then the block size minus 1
+BGZF_HEADER = struct.Struct("<4BI2BH2BHH")
+# gzip trailer: the CRC-32 and the size of the uncompressed data
+GZIP_TRAILER = struct.Struct("<II")
+GZI_ENTRY = struct.Struct("<QQ")
+GZI_COUNT = struct.Struct("<Q")
+
+
+class CompressionFormat(Enum):
+    # a single gzip stream, or the stream of any other algorithm
+    STREAM = "stream"
+    # independent gzip blocks of at most 64 KiB, compressed in parallel
+    BLOCKED = "blocked"
+
+
+@dataclass(frozen=True)
+class Split:
+    """A part of a blocked gzip file, which decompresses on its own, made of
+    whole lines of the uncompressed data."""
+
+    # the range of the compressed file holding the part: whole blocks
+    start: int
+    end: int
+    # the offset of the part in the uncompressed data
+    offset: int
+    # the uncompressed bytes of the first block before the part
+    skip: int
+    size: int
+
+
+def compress_block(data: bytes, compression_level: int) -> bytes:
+    """Compresses up to BGZF_BLOCK_SIZE bytes into a BGZF block."""
+    compressor = zlib.compressobj(
+        compression_level, zlib.DEFLATED, -zlib.MAX_WBITS
+    )
+    deflated = compressor.compress(data) + compressor.flush()
+    if (
+        BGZF_HEADER_SIZE + len(deflated) + GZIP_TRAILER.size
+        > BGZF_MAX_BLOCK_SIZE
+    ):
+        # incompressible data grows past the block size limit, stored
+        # blocks don't
+        compressor = zlib.compressobj(0, zlib.DEFLATED, -zlib.MAX_WBITS)
+        deflated = compressor.compress(data) + compressor.flush()
+
+    block_size = BGZF_HEADER_SIZE + len(deflated) + GZIP_TRAILER.size
+    return b"".join(
+        (
+            BGZF_HEADER.pack(
+                31, 139, 8, 4, 0, 0, 255, 6, 66, 67, 2, block_size - 1
+            ),
+            deflated,
+            GZIP_TRAILER.pack(zlib.crc32(data), len(data)),
+        )
+    )
+
+
+class BgzfWriter:
+    """A writable stream compressing its data into BGZF blocks, in parallel.
+
+    Blocks are compressed by a thread pool, zlib releasing the GIL, and
+    written in order, at most workers blocks ahead of the writes.
+
+    Usage:
+        with BgzfWriter(target=target_file, workers=4) as writer:
+            copy_stream(source=source_file, target=writer)
+        writer.index
+    """
+
+    def __init__(
+        self,
+        target: WritableStream,
+        compression_level: int = 9,
+        workers: int = 1,
+    ) -> None:
+        """
+        Args:
+            target: The stream the blocks are written to.
+            compression_level: The zlib level of every block.
+            workers: The number of blocks compressed at once, inline if 1.
+        """
+        self.name = getattr(target, "name", None)
+        # the compressed and uncompressed offsets of every block
+        self.index: list[tuple[int, int]] = []
+        self._target = target
+        self._compression_level = compression_level
+        self._workers = workers
+        self._buffer = bytearray()
+        self._compressed_offset = 0
+        self._uncompressed_offset = 0
+        self._executor = (
+            ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        )
+        self._pending: deque[tuple[int, Future]] = deque()
+
+    def __enter__(self) -> "BgzfWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        elif self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        if len(self._buffer) >= BGZF_BLOCK_SIZE:
+            view = memoryview(self._buffer)
+            offset = 0
+            while len(view) - offset >= BGZF_BLOCK_SIZE:
+                end = offset + BGZF_BLOCK_SIZE
+                self._submit(bytes(view[offset:end]))
+                offset = end
+            remaining = bytes(view[offset:])
+            view.release()
+            self._buffer = bytearray(remaining)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def writable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        """Compresses the buffered data, then writes the pending blocks and the
+        EOF block."""
+        if self._buffer:
+            self._submit(bytes(self._buffer))
+            self._buffer = bytearray()
+        self._write_pending(keep=0)
+        self._target.write(BGZF_EOF_BLOCK)
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def _submit(self, data: bytes) -> None:
+        if self._executor is None:
+            self._write_block(
+                size=len(data),
+                block=compress_block(data, self._compression_level),
+            )
+            return
+
+        self._pending.append(
+            (
+                len(data),
+                self._executor.submit(
+                    compress_block, data, self._compression_level
+                ),
+            )
+        )
+        self._write_pending(keep=self._workers)
+
+    def _write_pending(self, keep: int) -> None:
+        while len(self._pending) > keep:
+            size, future = self._pending.popleft()
+            self._write_block(size=size, block=future.result())
+
+    def _write_block(self, size: int, block: bytes) -> None:
+        self.index.append((self._compressed_offset, self._uncompressed_offset))
+        self._target.write(block)
+        self._compressed_offset += len(block)
+        self._uncompressed_offset += size
+
+
+def gzi_index_path(path: Path) -> Path:
+    """Returns the path of the block index of a BGZF file, or of the file
+    split into the set starting at path."""
+    base = split_set_base(path)
+    return base.with_name(f"{base.name}.{GZI_INDEX_SUFFIX}")
+
+
+def write_gzi_index(path: Path, index: list[tuple[int, int]]) -> None:
+    """Writes a block index as bgzip -i does: the number of entries, then the
+    compressed and uncompressed offsets of every block but the first one, as
+    little-endian 64-bit integers."""
+    entries = index[1:]
+    with open(path, "wb") as index_file:
+        index_file.write(GZI_COUNT.pack(len(entries)))
+        for entry in entries:
+            index_file.write(GZI_ENTRY.pack(*entry))
+
+
+def read_gzi_index(path: Path) -> list[tuple[int, int]]:
+    """Reads a block index written by write_gzi_index or bgzip -i, with the
+    first block.
+
+    Raises:
+        ValueError: If the index is truncated.
+    """
+    data = path.read_bytes()
+    (count,) = GZI_COUNT.unpack_from(data)
+    if len(data) != GZI_COUNT.size + count * GZI_ENTRY.size:
+        raise ValueError(f"the block index {path} is truncated")
+    entries = [
+        GZI_ENTRY.unpack_from(data, GZI_COUNT.size + number * GZI_ENTRY.size)
+        for number in range(count)
+    ]
+    return [(0, 0), *entries]
+
+
+def _block_size(header: bytes, offset: int) -> int:
+    if (
+        len(header) != BGZF_HEADER_SIZE
+        or header[:4] != BGZF_MAGIC_NUMBER
+        or header[12:14] != b"BC"
+    ):
+        raise ValueError(f"no BGZF block at offset {offset}")
+    return BGZF_HEADER.unpack(header)[-1] + 1
+
+
+def scan_blocks(file: IO[bytes]) -> list[tuple[int, int]]:
+    """Returns the compressed and uncompressed offsets of every non-empty
+    block of a BGZF file, read from the block headers and trailers.
+
+    Raises:
+        ValueError: If the file isn't a BGZF file.
+    """
+    index = []
+    compressed_offset = uncompressed_offset = 0
+    file.seek(0)
+    while header := file.read(BGZF_HEADER_SIZE):
+        block_size = _block_size(header, compressed_offset)
+        file.seek(compressed_offset + block_size - 4)
+        (size,) = struct.unpack("<I", file.read(4))
+        if size:
+            index.append((compressed_offset, uncompressed_offset))
+        compressed_offset += block_size
+        uncompressed_offset += size
+        file.seek(compressed_offset)
+    return index
+
+
+def iter_blocks(file: IO[bytes], start: int, end: int) -> Iterator[bytes]:
+    """Decompresses the BGZF blocks of a file range, one by one, checking
+    their CRC-32.
+
+    Raises:
+        ValueError: If a block is corrupted.
+        EOFError: If the file is truncated.
+    """
+    offset = start
+    file.seek(start)
+    while offset < end:
+        block_size = _block_size(file.read(BGZF_HEADER_SIZE), offset)
+        block = file.read(block_size - BGZF_HEADER_SIZE)
+        if len(block) != block_size - BGZF_HEADER_SIZE:
+            raise EOFError(f"the BGZF block at offset {offset} is truncated")
+        deflated_size = len(block) - GZIP_TRAILER.size
+        crc, size = GZIP_TRAILER.unpack_from(block, deflated_size)
+        data = zlib.decompress(
+            memoryview(block)[:deflated_size], -zlib.MAX_WBITS
+        )
+        if len(data) != size or zlib.crc32(data) != crc:
+            raise ValueError(f"the BGZF block at offset {offset} is corrupted")
+        yield data
+        offset += block_size
+
+
+class BlockIndex:
+    """The blocks of a BGZF file, from its .gzi index if there is one, or
+    from the block headers."""
+
+    def __init__(self, file: IO[bytes], path: Path) -> None:
+        index_path = gzi_index_path(path)
+        entries = (
+            read_gzi_index(index_path)
+            if index_path.exists()
+            else scan_blocks(file)
+        )
+        # the end of the data, before the EOF block
+        end = file.seek(0, 2)
+        file.seek(max(0, end - len(BGZF_EOF_BLOCK)))
+        if file.read() == BGZF_EOF_BLOCK:
+            end -= len(BGZF_EOF_BLOCK)
+        # bgzip indexes the EOF block too
+        entries = [entry for entry in entries if entry[0] < end]
+        size = 0
+        if entries:
+            file.seek(end - 4)
+            (last_size,) = struct.unpack("<I", file.read(4))
+            size = entries[-1][1] + last_size
+        # then the end of the blocks and the uncompressed size
+        self.compressed_offsets = [entry[0] for entry in entries] + [end]
+        self.uncompressed_offsets = [entry[1] for entry in entries] + [size]
+
+    @property
+    def uncompressed_size(self) -> int:
+        return self.uncompressed_offsets[-1]
+
+    def line_start(self, file: IO[bytes], offset: int) -> int:
+        """Returns the offset of the first line starting at or after the first
+        block starting at or after an uncompressed offset."""
+        block = bisect_left(self.uncompressed_offsets, offset)
+        if block == 0:
+            return 0
+
+        # the line starts past the first newline from the last byte of the
+        # previous block on
+        position = self.uncompressed_offsets[block - 1]
+        start = self.uncompressed_offsets[block] - 1 - position
+        for data in iter_blocks(
+            file,
+            start=self.compressed_offsets[block - 1],
+            end=self.compressed_offsets[-1],
+        ):
+            if (newline := data.find(b"\n", start)) != -1:
+                return position + newline + 1
+            position += len(data)
+            start = 0
+        return self.uncompressed_size
+
+    def split(self, start: int, end: int) -> Split:
+        """Returns the split holding an uncompressed range."""
+        first = bisect_left(self.uncompressed_offsets, start + 1) - 1
+        last = bisect_left(self.uncompressed_offsets, end)
+        return Split(
+            start=self.compressed_offsets[first],
+            end=self.compressed_offsets[last],
+            offset=start,
+            skip=start - self.uncompressed_offsets[first],
+            size=end - start,
+        )
+
+
+def plan_splits(path: Path, count: int) -> list[Split]:
+    """Divides a BGZF file into at most count splits of about equal size,
+    starting on block boundaries where lines allow.
+
+    Raises:
+        ValueError: If the file isn't a BGZF file.
+    """
+    with open_volumes(path) as file:
+        index = BlockIndex(file=file, path=path)
+        total = index.uncompressed_size
+        cuts = [0]
+        for number in range(1, count):
+            cut = index.line_start(file, offset=total * number // count)
+            if cuts[-1] < cut < total:
+                cuts.append(cut)
+    cuts.append(total)
+    return [
+        index.split(start=start, end=end)
+        for start, end in zip(cuts, cuts[1:])
+        if start < end
+    ]
+
+
+def read_split(path: Path, split: Split) -> Iterator[bytes]:
+    """Decompresses a split of a BGZF file, in chunks of at most a block.
+
+    Raises:
+        ValueError: If a block is corrupted.
+        EOFError: If the file is truncated.
+    """
+    skip, remaining = split.skip, split.size
+    with open_volumes(path) as file:
+        for data in iter_blocks(file, start=split.start, end=split.end):
+            if skip >= len(data):
+                skip -= len(data)
+                continue
+            end = skip + remaining
+            chunk = data[skip:end]
+            skip = 0
+            remaining -= len(chunk)
+            yield chunk
+            if not remaining:
+                return
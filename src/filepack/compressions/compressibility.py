@@ -0,0 +1,111 @@
+import math
+from collections import Counter
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Optional
+
+from filepack.compressions.consts import (
+    COMPRESSIBILITY_SAMPLE_CHUNK_SIZE,
+    COMPRESSIBILITY_SAMPLE_CHUNKS,
+    INCOMPRESSIBLE_ENTROPY_THRESHOLD,
+    INCOMPRESSIBLE_FILE_TYPES,
+)
+from filepack.utils import detect_file_type_extension, read_sample
+
+
+class IncompressiblePolicy(Enum):
+    """What to do with data that is not worth compressing."""
+
+    # compress it anyway, without checking
+    COMPRESS = "compress"
+    # keep it uncompressed: compress leaves the file as is, and zip
+    # archives store the member
+    STORE = "store"
+    # compress it at the fastest level
+    FAST = "fast"
+    # leave it out: compress leaves the file as is, and add_member does
+    # not add it
+    SKIP = "skip"
+
+
+@dataclass(frozen=True)
+class CompressibilityReport:
+    """Whether a file is worth compressing, and why."""
+
+    incompressible: bool
+    reason: str
+    # the content type detected from the file header, if any
+    content_type: Optional[str]
+    # the Shannon entropy of the sample, in bits per byte
+    entropy: float
+
+
+def entropy(data: bytes) -> float:
+    """Returns the Shannon entropy of the data, in bits per byte."""
+    if not data:
+        return 0.0
+
+    size = len(data)
+    return -sum(
+        count / size * math.log2(count / size)
+        for count in Counter(data).values()
+    )
+
+
+def detect_content_type(header: bytes) -> Optional[str]:
+    if (content_type := detect_file_type_extension(header)) is not None:
+        return content_type
+
+    import filetype
+
+    file_type = filetype.guess(header)
+    return file_type.extension if file_type is not None else None
+
+
+def check_compressibility(path: str | Path) -> CompressibilityReport:
+    """Checks whether a file is worth compressing.
+
+    A file is incompressible when its content type is a known compressed
+    format (e.g. JPEG, MP4, zip), or when the entropy of a sample is close
+    to the 8 bits per byte of random data.
+
+    Args:
+        path: The filesystem path to the file.
+
+    Returns:
+        The report, with the reason of the verdict.
+    """
+    sample = read_sample(
+        path=Path(path),
+        chunks=COMPRESSIBILITY_SAMPLE_CHUNKS,
+        chunk_size=COMPRESSIBILITY_SAMPLE_CHUNK_SIZE,
+    )
+    content_type = detect_content_type(sample)
+    sample_entropy = entropy(sample)
+
+    if content_type in INCOMPRESSIBLE_FILE_TYPES:
+        return CompressibilityReport(
+            incompressible=True,
+            reason=f"the content type {content_type} is already compressed",
+            content_type=content_type,
+            entropy=sample_entropy,
+        )
+
+    if sample_entropy >= INCOMPRESSIBLE_ENTROPY_THRESHOLD:
+        return CompressibilityReport(
+            incompressible=True,
+            reason=(
+                f"the entropy of {sample_entropy:.2f} bits per byte is over "
+                f"{INCOMPRESSIBLE_ENTROPY_THRESHOLD}"
+            ),
+            content_type=content_type,
+            entropy=sample_entropy,
+        )
+
+    return CompressibilityReport(
+        incompressible=False,
+        reason=f"the entropy is {sample_entropy:.2f} bits per byte",
+        content_type=content_type,
+        entropy=sample_entropy,
+    )
@@ -4,3 +4,63 @@ GZIP_SUFFIX: Final[str] = "gz"
 BZ2_SUFFIX: Final[str] = "bz2"
 LZ4_SUFFIX: Final[str] = "lz4"
 XZ_SUFFIX: Final[str] = "xz"
+
+GZIP_MAGIC_NUMBER: Final[bytes] = b"\x1f\x8b\x08"
+BZ2_MAGIC_NUMBER: Final[bytes] = b"BZh"
+LZ4_MAGIC_NUMBER: Final[bytes] = b"\x04\x22\x4d\x18"
+XZ_MAGIC_NUMBER: Final[bytes] = b"\xfd7zXZ\x00"
+
+# the uncompressed size of the streams that recompression compresses in
+# parallel, one per worker
+RECOMPRESSION_BLOCK_SIZE: Final[int] = 8 * 1024 * 1024
+
+# BGZF blocks hold at most this much data, so that every compressed block
+# fits in 64 KiB, as bgzip writes them
+BGZF_BLOCK_SIZE: Final[int] = 0xFF00
+BGZF_MAX_BLOCK_SIZE: Final[int] = 0x10000
+# a gzip header with the BC extra subfield holding the block size
+BGZF_HEADER_SIZE: Final[int] = 18
+BGZF_MAGIC_NUMBER: Final[bytes] = b"\x1f\x8b\x08\x04"
+# the empty block ending every BGZF file
+BGZF_EOF_BLOCK: Final[bytes] = bytes.fromhex(
+    "1f8b08040000000000ff0600424302001b0003000000000000000000"
+)
+# the suffix of the block index written next to a BGZF file, as bgzip -i
+# names it
+GZI_INDEX_SUFFIX: Final[str] = "gzi"
+
+ISAL_GZIP_BACKEND: Final[str] = "isal"
+ZLIB_NG_GZIP_BACKEND: Final[str] = "zlib_ng"
+STDLIB_GZIP_BACKEND: Final[str] = "gzip"
+
+# the auto-tuner compresses a sample made of chunks spread over the file
+TUNING_SAMPLE_CHUNKS: Final[int] = 4
+TUNING_SAMPLE_CHUNK_SIZE: Final[int] = 256 * 1024
+# the balanced target picks the fastest candidate whose output is at most
+# this much larger than the smallest output
+TUNING_BALANCED_SIZE_TOLERANCE: Final[float] = 0.1
+# the number of tuning decisions kept, the least recently used being evicted
+TUNING_CACHE_MAX_ENTRIES: Final[int] = 256
+
+# content types whose data is already compressed: images, video, audio,
+# archives and compressed files
+INCOMPRESSIBLE_FILE_TYPES: Final[frozenset[str]] = frozenset(
+    (
+        "jpg png gif webp heic avif jxr jpx "
+        "mp4 m4v mkv webm mov avi flv mp3 m4a aac ogg opus flac amr "
+        "zip 7z rar gz bz2 xz lz4 zst br lz lzma Z cab epub docx xlsx pptx "
+        "odt ods odp jar apk woff woff2"
+    ).split()
+)
+# data above this Shannon entropy, in bits per byte, is considered
+# incompressible
+INCOMPRESSIBLE_ENTROPY_THRESHOLD: Final[float] = 7.5
+COMPRESSIBILITY_SAMPLE_CHUNKS: Final[int] = 4
+COMPRESSIBILITY_SAMPLE_CHUNK_SIZE: Final[int] = 16 * 1024
+# the level of every algorithm that trades the most ratio for speed
+FASTEST_COMPRESSION_LEVELS: Final[dict[str, int]] = {
+    GZIP_SUFFIX: 1,
+    BZ2_SUFFIX: 1,
+    XZ_SUFFIX: 0,
+    LZ4_SUFFIX: 0,
+}
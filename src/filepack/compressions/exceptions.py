@@ -24,3 +24,19 @@ class FailedToCompressFile(Exception):
 
 class CompressionTypeNotSupported(Exception):
     pass
+
+
+class FailedToAppendToFile(Exception):
+    pass
+
+
+class FailedToRecompressFile(Exception):
+    pass
+
+
+class FailedToVerifyFile(Exception):
+    pass
+
+
+class FailedToSplitFile(Exception):
+    pass
@@ -1,31 +1,142 @@
-import gzip
+import importlib
+from functools import cache
 from pathlib import Path
-from typing import TextIO
+from types import ModuleType
+from typing import TYPE_CHECKING, Final, Optional, TextIO
 
+from filepack.compressions.consts import (
+    ISAL_GZIP_BACKEND,
+    STDLIB_GZIP_BACKEND,
+    ZLIB_NG_GZIP_BACKEND,
+)
 from filepack.compressions.models import AbstractCompression
 
+if TYPE_CHECKING:
+    import gzip
+
+# backend name -> (module providing a gzip compatible open(), levels),
+# ordered by preference when picking a backend automatically. Level 0 is
+# left to zlib, with which it means stored, while ISA-L compresses at it
+GZIP_BACKENDS: Final[dict[str, tuple[str, range]]] = {
+    ISAL_GZIP_BACKEND: ("isal.igzip", range(1, 4)),
+    ZLIB_NG_GZIP_BACKEND: ("zlib_ng.gzip_ng", range(0, 10)),
+    STDLIB_GZIP_BACKEND: ("gzip", range(0, 10)),
+}
+
+
+@cache
+def _import_backend(backend: str) -> Optional[ModuleType]:
+    try:
+        return importlib.import_module(GZIP_BACKENDS[backend][0])
+    except ImportError:
+        return None
+
+
+def available_backends() -> list[str]:
+    """Returns the names of the importable gzip backends, by preference."""
+    return [
+        backend
+        for backend in GZIP_BACKENDS
+        if _import_backend(backend) is not None
+    ]
+
 
 class GzipCompression(AbstractCompression):
-    """Represents a compression operation for files using the gzip algorithm."""
+    """Represents a compression operation for files using the gzip algorithm.
+
+    The gzip stream is produced by the fastest importable backend supporting
+    the requested compression level: ISA-L (`isal`, levels 1-3), zlib-ng
+    (`zlib_ng`), then the standard library (`gzip`). All backends read and
+    write standard gzip files. Level 0 stores the data uncompressed, as zlib
+    does, so it is never written by ISA-L, whose level 0 compresses.
+    """
+
+    def __init__(self, backend: Optional[str] = None) -> None:
+        """
+        Args:
+            backend: The backend to always use, instead of picking one.
+
+        Raises:
+            ValueError: If the backend is unknown.
+        """
+        if backend is not None and backend not in GZIP_BACKENDS:
+            raise ValueError(
+                f"unknown gzip backend {backend}, "
+                f"must be one of {list(GZIP_BACKENDS)}"
+            )
+
+        self._backend = backend
+
+    @property
+    def backend(self) -> Optional[str]:
+        return self._backend
 
     def open(
         self,
         file_path: str | Path,
         mode: str = "r",
         compression_level=9,
-    ) -> gzip.GzipFile | TextIO:
+        backend: Optional[str] = None,
+    ) -> "gzip.GzipFile | TextIO":
         """Opens a file with gzip compression.
 
         Args:
             file_path: The path to the file.
             mode: The mode in which to open the file. Defaults to 'r' for reading.
             compression_level: The compression level, defaults to 9 for maximum compression.
+            backend: The backend to use for this file, overriding the one the
+                client was created with.
 
         Returns:
-            A GzipFile object that can be used to read or write to the file.
+            A GzipFile like object that can be used to read or write to the file.
         """
-        return gzip.open(
+        backend = self.select_backend(
+            mode=mode,
+            compression_level=compression_level,
+            backend=backend or self._backend,
+        )
+        module = _import_backend(backend)
+        assert module is not None
+
+        return module.open(
             filename=file_path,
             mode=mode,
             compresslevel=compression_level,
         )
+
+    @staticmethod
+    def select_backend(
+        mode: str = "r",
+        compression_level: int = 9,
+        backend: Optional[str] = None,
+    ) -> str:
+        """Returns the name of the backend used for the given mode and level.
+
+        Args:
+            mode: The mode in which the file is opened.
+            compression_level: The compression level.
+            backend: A backend that must be used. If None, the first importable
+                backend supporting the compression level is picked.
+
+        Raises:
+            ValueError: If the requested backend can't be used.
+        """
+        writing = "r" not in mode
+
+        if backend is not None:
+            if backend not in GZIP_BACKENDS:
+                raise ValueError(f"unknown gzip backend {backend}")
+            if _import_backend(backend) is None:
+                raise ValueError(f"gzip backend {backend} is not installed")
+            if writing and compression_level not in GZIP_BACKENDS[backend][1]:
+                raise ValueError(
+                    f"gzip backend {backend} doesn't support "
+                    f"compression level {compression_level}"
+                )
+            return backend
+
+        for backend in available_backends():
+            if not writing or compression_level in GZIP_BACKENDS[backend][1]:
+                return backend
+
+        return STDLIB_GZIP_BACKEND
@@ -29,4 +29,6 @@ class LZ4Compression(AbstractCompression):
             filename=file_path,
             mode=mode,
             compression_level=compression_level,
+            # checked when reading the frames
+            content_checksum=True,
         )
@@ -0,0 +1,58 @@
+from typing import TYPE_CHECKING, Final
+
+from filepack.compressions.consts import (
+    BZ2_MAGIC_NUMBER,
+    BZ2_SUFFIX,
+    GZIP_MAGIC_NUMBER,
+    GZIP_SUFFIX,
+    LZ4_MAGIC_NUMBER,
+    LZ4_SUFFIX,
+    XZ_MAGIC_NUMBER,
+    XZ_SUFFIX,
+)
+from filepack.registry import Capability, Registry, Signature
+
+if TYPE_CHECKING:
+    from filepack.compressions.models import AbstractCompression
+
+COMPRESSIONS_ENTRY_POINT_GROUP: Final[str] = "filepack.compressions"
+
+compressions_registry: "Registry[AbstractCompression]" = Registry(
+    entry_point_group=COMPRESSIONS_ENTRY_POINT_GROUP
+)
+
+# all the built-in codecs decode concatenated streams as a single stream,
+# so a file can be compressed as independent chunks in parallel, and
+# appended to with a new stream
+compressions_registry.register(
+    name=GZIP_SUFFIX,
+    client="filepack.compressions.gzip:GzipCompression",
+    signatures=(Signature(magic_number=GZIP_MAGIC_NUMBER),),
+    capabilities=Capability.STREAMING
+    | Capability.PARALLEL
+    | Capability.APPENDABLE,
+)
+compressions_registry.register(
+    name=BZ2_SUFFIX,
+    client="filepack.compressions.bzip2:BzipCompression",
+    signatures=(Signature(magic_number=BZ2_MAGIC_NUMBER),),
+    capabilities=Capability.STREAMING
+    | Capability.PARALLEL
+    | Capability.APPENDABLE,
+)
+compressions_registry.register(
+    name=XZ_SUFFIX,
+    client="filepack.compressions.xz:XZCompression",
+    signatures=(Signature(magic_number=XZ_MAGIC_NUMBER),),
+    capabilities=Capability.STREAMING
+    | Capability.PARALLEL
+    | Capability.APPENDABLE,
+)
+compressions_registry.register(
+    name=LZ4_SUFFIX,
+    client="filepack.compressions.lz4:LZ4Compression",
+    signatures=(Signature(magic_number=LZ4_MAGIC_NUMBER),),
+    capabilities=Capability.STREAMING
+    | Capability.PARALLEL
+    | Capability.APPENDABLE,
+)
@@ -0,0 +1,323 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Optional
+
+from filepack.compressions.consts import (
+    TUNING_BALANCED_SIZE_TOLERANCE,
+    TUNING_CACHE_MAX_ENTRIES,
+    TUNING_SAMPLE_CHUNK_SIZE,
+    TUNING_SAMPLE_CHUNKS,
+)
+from filepack.compressions.models import CompressionType
+from filepack.compressions.registry import compressions_registry
+from filepack.limits import get_limits
+from filepack.utils import (
+    CountingSink,
+    detect_file_type_extension,
+    read_sample,
+)
+
+
+class TuningTarget(Enum):
+    """What the auto-tuner optimizes for."""
+
+    # the highest throughput
+    SPEED = "speed"
+    # the smallest output
+    RATIO = "ratio"
+    # the fastest candidate whose output is close to the smallest one
+    BALANCED = "balanced"
+
+
+DEFAULT_CANDIDATES: list[tuple[CompressionType, int]] = [
+    (CompressionType.LZ4, 0),
+    (CompressionType.LZ4, 9),
+    (CompressionType.GZIP, 1),
+    (CompressionType.GZIP, 6),
+    (CompressionType.GZIP, 9),
+    (CompressionType.BZ2, 1),
+    (CompressionType.BZ2, 9),
+    (CompressionType.XZ, 1),
+    (CompressionType.XZ, 6),
+]
+
+
+@dataclass(frozen=True)
+class TrialResult:
+    """The measurements of compressing the sample with one candidate."""
+
+    algorithm: str
+    level: int
+    sample_size: int
+    compressed_size: int
+    # the CPU time of the compressing thread, which is not skewed by the
+    # other trials running at the same time
+    cpu_time: float
+
+    @property
+    def ratio(self) -> float:
+        return self.sample_size / max(self.compressed_size, 1)
+
+    @property
+    def throughput_mb_s(self) -> float:
+        return self.sample_size / 2**20 / max(self.cpu_time, 1e-9)
+
+
+@dataclass
+class TuningDecision:
+    """The chosen algorithm and level, with the trials it is based on."""
+
+    algorithm: str
+    level: int
+    target: TuningTarget
+    budget_mb_s: Optional[float]
+    file_class: tuple[str, str]
+    trials: list[TrialResult] = field(default_factory=list)
+    # False when no candidate reached the throughput budget, in which case
+    # the fastest one is chosen
+    budget_met: bool = True
+    # True when the decision was taken for an earlier file of the same class
+    cached: bool = False
+    # the compressed file, once the decision is applied
+    path: Optional[Path] = None
+
+    @property
+    def trial(self) -> Optional[TrialResult]:
+        """The trial of the chosen candidate."""
+        return next(
+            (
+                trial
+                for trial in self.trials
+                if (trial.algorithm, trial.level)
+                == (self.algorithm, self.level)
+            ),
+            None,
+        )
+
+    def summary(self) -> str:
+        lines = [
+            f"chose {self.algorithm} level {self.level} for "
+            f"{self.target.value} (class {'/'.join(self.file_class)}"
+            f"{', cached' if self.cached else ''}"
+            f"{', budget not met' if not self.budget_met else ''})"
+        ]
+        for trial in sorted(
+            self.trials, key=lambda trial: trial.compressed_size
+        ):
+            lines.append(
+                f"  {trial.algorithm:>4} {trial.level:>2}: "
+                f"ratio {trial.ratio:.2f}, {trial.throughput_mb_s:.1f} MB/s"
+            )
+        return "\n".join(lines)
+
+
+class TuningCache:
+    """Decisions keyed by file class, target and budget.
+
+    Holds at most max_entries decisions, evicting the least recently used.
+    """
+
+    def __init__(self, max_entries: int = TUNING_CACHE_MAX_ENTRIES) -> None:
+        self._decisions: OrderedDict[tuple, TuningDecision] = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._decisions)
+
+    def get(self, key: tuple) -> Optional[TuningDecision]:
+        with self._lock:
+            decision = self._decisions.get(key)
+            if decision is not None:
+                self._decisions.move_to_end(key)
+            return decision
+
+    def set(self, key: tuple, decision: TuningDecision) -> None:
+        with self._lock:
+            self._decisions[key] = decision
+            self._decisions.move_to_end(key)
+            while len(self._decisions) > self._max_entries:
+                self._decisions.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._decisions.clear()
+
+
+default_tuning_cache = TuningCache()
+
+
+def file_class(path: Path, sample: bytes) -> tuple[str, str]:
+    """The extension and the content type detected from the magic numbers.
+
+    The content type is only told apart for the archive and compression
+    formats filepack detects, and is "unknown" for any other content, so
+    such files are classed by their extension alone.
+    """
+    content_type = detect_file_type_extension(sample) or "unknown"
+    return (path.suffix.lstrip(".").lower(), content_type)
+
+
+def run_trial(algorithm: str, level: int, sample: bytes) -> TrialResult:
+    client = compressions_registry.get_client(algorithm)
+    sink = CountingSink()
+    start = time.thread_time()
+    with client.open(
+        file_path=sink,  # type: ignore
+        mode="wb",
+        compression_level=level,
+    ) as compressed_file:
+        compressed_file.write(sample)
+    cpu_time = time.thread_time() - start
+
+    return TrialResult(
+        algorithm=algorithm,
+        level=level,
+        sample_size=len(sample),
+        compressed_size=sink.size,
+        cpu_time=cpu_time,
+    )
+
+
+def choose(
+    trials: list[TrialResult],
+    target: TuningTarget,
+    budget_mb_s: Optional[float],
+) -> tuple[TrialResult, bool]:
+    """Picks the best trial for the target, among those within the budget.
+
+    Returns:
+        The chosen trial, and whether it is within the budget.
+    """
+    eligible = [
+        trial
+        for trial in trials
+        if budget_mb_s is None or trial.throughput_mb_s >= budget_mb_s
+    ]
+    if not eligible:
+        return max(trials, key=lambda trial: trial.throughput_mb_s), False
+
+    match target:
+        case TuningTarget.SPEED:
+            chosen = max(eligible, key=lambda trial: trial.throughput_mb_s)
+        case TuningTarget.RATIO:
+            chosen = min(
+                eligible,
+                key=lambda trial: (
+                    trial.compressed_size,
+                    -trial.throughput_mb_s,
+                ),
+            )
+        case TuningTarget.BALANCED:
+            smallest = min(trial.compressed_size for trial in eligible)
+            chosen = max(
+                (
+                    trial
+                    for trial in eligible
+                    if trial.compressed_size
+                    <= smallest * (1 + TUNING_BALANCED_SIZE_TOLERANCE)
+                ),
+                key=lambda trial: trial.throughput_mb_s,
+            )
+
+    return chosen, True
+
+
+def tune(
+    path: Path,
+    target: TuningTarget = TuningTarget.BALANCED,
+    budget_mb_s: Optional[float] = None,
+    candidates: Optional[list[tuple[CompressionType, int]]] = None,
+    cache: Optional[TuningCache] = default_tuning_cache,
+) -> TuningDecision:
+    """Chooses a compression algorithm and level for a file.
+
+    The candidates compress a sample of the file in parallel, unless a
+    decision was already taken for a file of the same class, with the same
+    target, budget and candidates.
+
+    Args:
+        path: The file to compress.
+        target: What to optimize for.
+        budget_mb_s: The minimal compression throughput, in MB/s of input.
+        candidates: The (algorithm, level) pairs to try. Defaults to
+            DEFAULT_CANDIDATES, without the unavailable algorithms.
+        cache: The decisions cache, or None to always run the trials.
+
+    Returns:
+        The decision, with the trials it is based on.
+    """
+    sample = read_sample(
+        path=path,
+        chunks=TUNING_SAMPLE_CHUNKS,
+        chunk_size=TUNING_SAMPLE_CHUNK_SIZE,
+    )
+    if candidates is None:
+        candidates = [
+            (algorithm, level)
+            for algorithm, level in DEFAULT_CANDIDATES
+            if algorithm.value in compressions_registry.names()
+        ]
+
+    # a decision only holds for the candidates it was chosen among
+    key = (
+        file_class(path, sample),
+        target,
+        budget_mb_s,
+        tuple(
+            sorted(
+                (CompressionType(algorithm).value, level)
+                for algorithm, level in candidates
+            )
+        ),
+    )
+
+    if cache is not None and (decision := cache.get(key)) is not None:
+        return TuningDecision(
+            algorithm=decision.algorithm,
+            level=decision.level,
+            target=decision.target,
+            budget_mb_s=decision.budget_mb_s,
+            file_class=decision.file_class,
+            trials=decision.trials,
+            budget_met=decision.budget_met,
+            cached=True,
+        )
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(
+        max_workers=get_limits().workers(len(candidates))
+    ) as executor:
+        trials = list(
+            executor.map(
+                lambda candidate: run_trial(
+                    algorithm=CompressionType(candidate[0]).value,
+                    level=candidate[1],
+                    sample=sample,
+                ),
+                candidates,
+            )
+        )
+
+    chosen, budget_met = choose(
+        trials=trials, target=target, budget_mb_s=budget_mb_s
+    )
+    decision = TuningDecision(
+        algorithm=chosen.algorithm,
+        level=chosen.level,
+        target=target,
+        budget_mb_s=budget_mb_s,
+        file_class=key[0],
+        trials=trials,
+        budget_met=budget_met,
+    )
+    if cache is not None:
+        cache.set(key, decision)
+
+    return decision
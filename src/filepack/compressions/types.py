@@ -1,8 +1,12 @@
-from bz2 import BZ2File
-from gzip import GzipFile
-from lzma import LZMAFile
-from typing import Union
+from typing import TYPE_CHECKING, Union
 
-from lz4.frame import LZ4FrameFile
+if TYPE_CHECKING:
+    from bz2 import BZ2File
+    from gzip import GzipFile
+    from lzma import LZMAFile
 
-CompressionObjectTypes = Union[GzipFile, LZ4FrameFile, LZMAFile, BZ2File]
+    from lz4.frame import LZ4FrameFile
+
+CompressionObjectTypes = Union[
+    "GzipFile", "LZ4FrameFile", "LZMAFile", "BZ2File"
+]
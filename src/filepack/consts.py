@@ -3,3 +3,30 @@ from typing import Final
 ERROR_MESSAGE_NOT_SUPPORTED: Final[
     str
 ] = "the given file inferred type is not supported"
+
+MAGIC_NUMBERS_READ_SIZE: Final[int] = 512
+
+DISABLE_PLUGINS_ENVIRONMENT_VARIABLE: Final[str] = "FILEPACK_DISABLE_PLUGINS"
+
+COPY_BUFFER_SIZE: Final[int] = 1024 * 1024
+
+# the minimal time, in seconds, between two progress reports
+PROGRESS_REPORT_INTERVAL: Final[float] = 0.1
+
+THROUGHPUT_WINDOW: Final[float] = 5.0
+
+BLAKE3_HASH_ALGORITHM: Final[str] = "blake3"
+XXH3_HASH_ALGORITHM: Final[str] = "xxh3_128"
+BLAKE2B_HASH_ALGORITHM: Final[str] = "blake2b"
+SHA256_HASH_ALGORITHM: Final[str] = "sha256"
+CRC32C_HASH_ALGORITHM: Final[str] = "crc32c"
+
+# the chunks held between two threads of a pipeline
+PIPELINE_QUEUE_DEPTH: Final[int] = 4
+
+# the file size from which compression and decompression read, encode and
+# write the data on separate threads
+PIPELINE_MIN_FILE_SIZE: Final[int] = 8 * 1024 * 1024
+
+# the suffix of the first volume of a split set, numbered from 001
+FIRST_VOLUME_SUFFIX: Final[str] = ".001"
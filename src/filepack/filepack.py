@@ -1,7 +1,10 @@
 from pathlib import Path
+from typing import Optional
 
 from filepack.archive import Archive
 from filepack.compression import Compression
+from filepack.progress import ProgressCallback
+from filepack.verification import VerificationReport
 
 
 class FilePack(Archive, Compression):
@@ -25,3 +28,29 @@ class FilePack(Archive, Compression):
                 "the given path can't be used for archiving or compression",
                 errors,
             )
+
+    def verify(
+        self,
+        compression_algorithm: Optional[str] = None,
+        workers: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> VerificationReport:
+        """
+        Checks the file as a compressed file when a compression algorithm is given, and as an archive otherwise.
+
+        Args:
+            compression_algorithm: The algorithm the file is compressed with, if it's a compressed file.
+            workers: The number of threads decoding archive members at once. If None, the CPU count.
+            progress: A function called, at a bounded rate, with the number of decompressed bytes checked.
+
+        Returns:
+            The report of the check.
+        """
+        if compression_algorithm is not None:
+            return Compression.verify(
+                self,
+                compression_algorithm=compression_algorithm,
+                progress=progress,
+            )
+
+        return Archive.verify(self, workers=workers, progress=progress)
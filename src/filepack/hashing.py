@@ -0,0 +1,174 @@
+import importlib
+from dataclasses import dataclass, field
+from functools import cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Final, Iterable, Optional, Sequence
+
+from filepack.consts import (
+    BLAKE2B_HASH_ALGORITHM,
+    BLAKE3_HASH_ALGORITHM,
+    CRC32C_HASH_ALGORITHM,
+    SHA256_HASH_ALGORITHM,
+    XXH3_HASH_ALGORITHM,
+)
+from filepack.limits import get_limits
+
+# hash algorithm -> module providing it, ordered by preference when picking
+# an algorithm automatically
+HASH_ALGORITHMS: Final[dict[str, str]] = {
+    BLAKE3_HASH_ALGORITHM: "blake3",
+    XXH3_HASH_ALGORITHM: "xxhash",
+    BLAKE2B_HASH_ALGORITHM: "hashlib",
+    SHA256_HASH_ALGORITHM: "hashlib",
+    CRC32C_HASH_ALGORITHM: "crc32c",
+}
+
+
+@cache
+def _import_hash_module(algorithm: str) -> Optional[ModuleType]:
+    try:
+        return importlib.import_module(HASH_ALGORITHMS[algorithm])
+    except ImportError:
+        return None
+
+
+def available_hash_algorithms() -> list[str]:
+    """Returns the names of the importable hash algorithms, by preference."""
+    return [
+        algorithm
+        for algorithm in HASH_ALGORITHMS
+        if _import_hash_module(algorithm) is not None
+    ]
+
+
+def default_hash_algorithm() -> str:
+    """The fastest importable algorithm: BLAKE3, XXH3 then BLAKE2b."""
+    return available_hash_algorithms()[0]
+
+
+def new_hasher(algorithm: Optional[str] = None) -> Any:
+    """Returns a hashlib like object of the algorithm.
+
+    Args:
+        algorithm: The hash algorithm, or None for the default one.
+
+    Raises:
+        ValueError: If the algorithm is unknown or not installed.
+    """
+    algorithm = algorithm or default_hash_algorithm()
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(
+            f"unknown hash algorithm {algorithm}, "
+            f"must be one of {list(HASH_ALGORITHMS)}"
+        )
+
+    if (module := _import_hash_module(algorithm)) is None:
+        raise ValueError(f"the {algorithm} hash algorithm is not installed")
+
+    if algorithm == BLAKE3_HASH_ALGORITHM:
+        return module.blake3()
+
+    if algorithm == XXH3_HASH_ALGORITHM:
+        return module.xxh3_128()
+
+    if algorithm == SHA256_HASH_ALGORITHM:
+        return module.sha256()
+
+    if algorithm == CRC32C_HASH_ALGORITHM:
+        return _Crc32c(crc32c=module.crc32c)
+
+    return module.blake2b()
+
+
+def hash_file(path: str | Path, algorithm: Optional[str] = None) -> str:
+    """Returns the hex digest of a file content.
+
+    Args:
+        path: The filesystem path to the file.
+        algorithm: The hash algorithm, or None for the default one.
+    """
+    hasher = new_hasher(algorithm)
+    buffer_size = get_limits().buffer_size
+    with open(path, "rb") as file:
+        while chunk := file.read(buffer_size):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class _Crc32c:
+    """A hashlib like CRC-32C, over the function of the crc32c module."""
+
+    def __init__(self, crc32c: Any) -> None:
+        self._crc32c = crc32c
+        self._value = 0
+
+    def update(self, data: bytes) -> None:
+        self._value = self._crc32c(data, self._value)
+
+    def hexdigest(self) -> str:
+        return f"{self._value:08x}"
+
+
+@dataclass
+class Digests:
+    """Digests of a file, computed while compressing or decompressing it in
+    the same pass over its data.
+
+    Usage:
+        digests = Digests(algorithms=["sha256"])
+        Compression(path).compress("gz", digests=digests)
+        digests.plaintext["sha256"], digests.compressed["sha256"]
+    """
+
+    algorithms: Sequence[str]
+    # algorithm -> hex digest of the uncompressed data
+    plaintext: dict[str, str] = field(default_factory=dict)
+    # algorithm -> hex digest of the compressed file
+    compressed: dict[str, str] = field(default_factory=dict)
+
+
+class HashingSink:
+    """A writable stream discarding its data, only hashing it with several
+    algorithms.
+
+    Raises:
+        ValueError: If an algorithm is unknown or not installed.
+    """
+
+    def __init__(self, algorithms: Iterable[str]) -> None:
+        self._hashers = {
+            algorithm: new_hasher(algorithm) for algorithm in algorithms
+        }
+
+    def write(self, data: bytes) -> int:
+        for hasher in self._hashers.values():
+            hasher.update(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def hexdigests(self) -> dict[str, str]:
+        return {
+            algorithm: hasher.hexdigest()
+            for algorithm, hasher in self._hashers.items()
+        }
+
+
+def hash_file_digests(
+    path: str | Path, algorithms: Iterable[str]
+) -> dict[str, str]:
+    """Returns the hex digests of a file content by algorithm, reading it
+    once.
+
+    Args:
+        path: The filesystem path to the file.
+        algorithms: The hash algorithms.
+    """
+    sink = HashingSink(algorithms)
+    buffer_size = get_limits().buffer_size
+    with open(path, "rb") as file:
+        while chunk := file.read(buffer_size):
+            sink.write(chunk)
+    return sink.hexdigests()
@@ -0,0 +1,296 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+SPAN_NAME_PREFIX = "filepack"
+
+OperationHook = Callable[["OperationEvent"], None]
+
+_hooks: list[OperationHook] = []
+_hooks_lock = threading.Lock()
+_current_operation: ContextVar[Optional["OperationEvent"]] = ContextVar(
+    "filepack_current_operation", default=None
+)
+
+
+@dataclass
+class OperationEvent:
+    """Measurements of a single filepack operation.
+
+    Operations nest (e.g. Archive.remove_member lists the archive members),
+    in which case the measurements of the inner operation are also counted
+    in the outer one.
+
+    The CPU time is the process's, so that it counts the threads compressing
+    in parallel (e.g. with workers > 1). It includes the CPU time of any
+    other thread running meanwhile, e.g. of concurrent operations.
+    """
+
+    # OpenTelemetry style span name, e.g. "filepack.compression.compress"
+    name: str
+    start_time_ns: int = 0
+    end_time_ns: int = 0
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    archive_opens: int = 0
+    temp_files_created: int = 0
+    codec: Optional[str] = None
+    error: Optional[BaseException] = None
+    parent: Optional["OperationEvent"] = field(default=None, repr=False)
+
+    @property
+    def attributes(self) -> dict[str, Any]:
+        """The measurements, as OpenTelemetry span attributes."""
+        attributes: dict[str, Any] = {
+            "filepack.wall_time_s": self.wall_time,
+            "filepack.cpu_time_s": self.cpu_time,
+            "filepack.bytes_read": self.bytes_read,
+            "filepack.bytes_written": self.bytes_written,
+            "filepack.archive_opens": self.archive_opens,
+            "filepack.temp_files_created": self.temp_files_created,
+        }
+        if self.codec is not None:
+            attributes["filepack.codec"] = self.codec
+        if self.error is not None:
+            attributes["error.type"] = type(self.error).__name__
+        return attributes
+
+
+def add_hook(hook: OperationHook) -> None:
+    """Registers a function called with the event of every finished operation.
+
+    Instrumentation is disabled, and costs nothing, as long as no hook is
+    registered. Hooks are called on the thread that ran the operation, and
+    exceptions raised by hooks are ignored.
+    """
+    with _hooks_lock:
+        _hooks.append(hook)
+
+
+def remove_hook(hook: OperationHook) -> None:
+    with _hooks_lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+
+def instrumented(
+    name: str,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """A decorator that measures each call of a function as an operation.
+
+    Args:
+        name: The operation name, appended to the "filepack." span prefix.
+    """
+    span_name = f"{SPAN_NAME_PREFIX}.{name}"
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _hooks:
+                return func(*args, **kwargs)
+
+            event = OperationEvent(
+                name=span_name, parent=_current_operation.get()
+            )
+            token = _current_operation.set(event)
+            event.start_time_ns = time.time_ns()
+            start_wall_time = time.perf_counter()
+            start_cpu_time = time.process_time()
+            try:
+                return func(*args, **kwargs)
+            except BaseException as e:
+                event.error = e
+                raise
+            finally:
+                event.cpu_time = time.process_time() - start_cpu_time
+                event.wall_time = time.perf_counter() - start_wall_time
+                event.end_time_ns = time.time_ns()
+                _current_operation.reset(token)
+                _emit(event)
+
+        return wrapper
+
+    return decorator
+
+
+def _emit(event: OperationEvent) -> None:
+    for hook in list(_hooks):
+        try:
+            hook(event)
+        except Exception:
+            pass
+
+
+def _record(attribute: str, value: int) -> None:
+    event = _current_operation.get()
+    while event is not None:
+        setattr(event, attribute, getattr(event, attribute) + value)
+        event = event.parent
+
+
+def record_bytes_read(size: int) -> None:
+    _record("bytes_read", size)
+
+
+def record_bytes_written(size: int) -> None:
+    _record("bytes_written", size)
+
+
+def record_archive_open() -> None:
+    _record("archive_opens", 1)
+
+
+def record_temp_file() -> None:
+    _record("temp_files_created", 1)
+
+
+def record_codec(codec: str) -> None:
+    event = _current_operation.get()
+    while event is not None:
+        if event.codec is None:
+            event.codec = codec
+        event = event.parent
+
+
+@dataclass
+class OperationMetrics:
+    count: int = 0
+    errors: int = 0
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    archive_opens: int = 0
+    temp_files_created: int = 0
+
+
+class MetricsCollector:
+    """A hook aggregating operation events per operation and codec.
+
+    Usage:
+        collector = MetricsCollector()
+        add_hook(collector)
+        ...
+        collector.write_prometheus("/var/lib/node_exporter/filepack.prom")
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[tuple[str, str], OperationMetrics] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: OperationEvent) -> None:
+        key = (event.name, event.codec or "")
+        with self._lock:
+            metrics = self._metrics.setdefault(key, OperationMetrics())
+            metrics.count += 1
+            metrics.errors += event.error is not None
+            metrics.wall_time += event.wall_time
+            metrics.cpu_time += event.cpu_time
+            metrics.bytes_read += event.bytes_read
+            metrics.bytes_written += event.bytes_written
+            metrics.archive_opens += event.archive_opens
+            metrics.temp_files_created += event.temp_files_created
+
+    @property
+    def metrics(self) -> dict[tuple[str, str], OperationMetrics]:
+        """The aggregated metrics, keyed by (operation name, codec)."""
+        with self._lock:
+            return {
+                key: OperationMetrics(**vars(metrics))
+                for key, metrics in self._metrics.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+    def to_prometheus(self) -> str:
+        """Returns the metrics in the Prometheus text exposition format."""
+        families = [
+            ("operations_total", "Finished operations.", "count"),
+            ("operation_errors_total", "Failed operations.", "errors"),
+            (
+                "operation_wall_seconds_total",
+                "Wall time spent in operations.",
+                "wall_time",
+            ),
+            (
+                "operation_cpu_seconds_total",
+                "CPU time spent in operations.",
+                "cpu_time",
+            ),
+            ("read_bytes_total", "Bytes read by operations.", "bytes_read"),
+            (
+                "written_bytes_total",
+                "Bytes written by operations.",
+                "bytes_written",
+            ),
+            (
+                "archive_opens_total",
+                "Archives opened by operations.",
+                "archive_opens",
+            ),
+            (
+                "temp_files_created_total",
+                "Temporary files and directories created by operations.",
+                "temp_files_created",
+            ),
+        ]
+        metrics = self.metrics
+        lines = []
+        for family, description, attribute in families:
+            lines.append(f"# HELP filepack_{family} {description}")
+            lines.append(f"# TYPE filepack_{family} counter")
+            for (operation, codec), operation_metrics in sorted(
+                metrics.items()
+            ):
+                labels = f'operation="{operation}",codec="{codec}"'
+                value = getattr(operation_metrics, attribute)
+                lines.append(f"filepack_{family}{{{labels}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str | Path) -> None:
+        """Atomically writes the metrics for the node exporter textfile collector."""
+        import tempfile
+
+        path = Path(path)
+        with tempfile.NamedTemporaryFile(
+            mode="w", dir=path.parent, prefix=f".{path.name}", delete=False
+        ) as temporary_file:
+            temporary_file.write(self.to_prometheus())
+        os.replace(temporary_file.name, path)
+
+
+def opentelemetry_hook(tracer: Any = None) -> OperationHook:
+    """Returns a hook reporting every operation as an OpenTelemetry span.
+
+    Requires the opentelemetry-api package.
+
+    Args:
+        tracer: The tracer creating the spans. If None, the "filepack"
+            tracer of the global tracer provider is used.
+    """
+    from opentelemetry import trace
+
+    if tracer is None:
+        tracer = trace.get_tracer(SPAN_NAME_PREFIX)
+
+    def hook(event: OperationEvent) -> None:
+        span = tracer.start_span(
+            name=event.name,
+            start_time=event.start_time_ns,
+            attributes=event.attributes,
+        )
+        if event.error is not None:
+            span.record_exception(event.error)
+            span.set_status(trace.Status(trace.StatusCode.ERROR))
+        span.end(end_time=event.end_time_ns)
+
+    return hook
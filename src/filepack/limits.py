@@ -0,0 +1,167 @@
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from filepack.consts import COPY_BUFFER_SIZE
+
+
+class LimitExceeded(Exception):
+    """Raised when an operation would exceed one of the configured limits.
+
+    Unlike other errors, limit errors are not wrapped by the operation
+    specific exceptions, so that they can be handled on their own.
+    """
+
+
+class TempSpaceLimitExceeded(LimitExceeded):
+    pass
+
+
+class DecompressedSizeLimitExceeded(LimitExceeded):
+    pass
+
+
+class CompressionRatioLimitExceeded(LimitExceeded):
+    pass
+
+
+@dataclass(frozen=True)
+class Limits:
+    """Resource limits enforced by the Archive and Compression operations.
+
+    Every limit is disabled when None.
+    """
+
+    # the bytes that an operation may write to temporary files
+    max_temp_bytes: Optional[int] = None
+    # the directory of the temporary files, instead of the default one
+    temp_directory: Optional[str | Path] = None
+    # the size of the in-memory buffers used to copy streams
+    max_buffer_size: Optional[int] = None
+    # the number of threads or processes that an operation may use
+    max_workers: Optional[int] = None
+    # the bytes that decompression or extraction may produce
+    max_decompressed_size: Optional[int] = None
+    # the ratio between the decompressed and the compressed sizes that
+    # decompression or extraction may reach, against decompression bombs
+    max_compression_ratio: Optional[float] = None
+
+    @property
+    def buffer_size(self) -> int:
+        if self.max_buffer_size is None:
+            return COPY_BUFFER_SIZE
+
+        return max(min(self.max_buffer_size, COPY_BUFFER_SIZE), 1)
+
+    def workers(self, requested: Optional[int] = None) -> int:
+        """Returns the number of workers to use for the requested number.
+
+        Args:
+            requested: The requested number of workers. If None, the CPU
+                count is requested.
+        """
+        workers = requested or os.cpu_count() or 1
+        if self.max_workers is not None:
+            workers = min(workers, self.max_workers)
+
+        return max(workers, 1)
+
+    def check_temp_bytes(self, size: int) -> None:
+        if self.max_temp_bytes is not None and size > self.max_temp_bytes:
+            raise TempSpaceLimitExceeded(
+                f"the operation needs {size} bytes of temporary space, "
+                f"over the limit of {self.max_temp_bytes} bytes"
+            )
+
+    def check_decompressed_size(
+        self, decompressed_size: int, compressed_size: int
+    ) -> None:
+        if (
+            self.max_decompressed_size is not None
+            and decompressed_size > self.max_decompressed_size
+        ):
+            raise DecompressedSizeLimitExceeded(
+                f"the decompressed size exceeds the limit of "
+                f"{self.max_decompressed_size} bytes"
+            )
+
+        if (
+            self.max_compression_ratio is not None
+            and decompressed_size
+            > self.max_compression_ratio * max(compressed_size, 1)
+        ):
+            raise CompressionRatioLimitExceeded(
+                f"the compression ratio exceeds the limit of "
+                f"{self.max_compression_ratio}:1"
+            )
+
+    def decompression_guard(
+        self, compressed_size: int
+    ) -> "DecompressionGuard":
+        return DecompressionGuard(limits=self, compressed_size=compressed_size)
+
+    def temporary_directory(self, required_bytes: int = 0) -> Any:
+        """Creates a temporary directory, once the required space is allowed.
+
+        Args:
+            required_bytes: The bytes that will be written in the directory.
+
+        Returns:
+            A tempfile.TemporaryDirectory in the temp directory of the limits.
+        """
+        import tempfile
+
+        self.check_temp_bytes(required_bytes)
+        return tempfile.TemporaryDirectory(dir=self.temp_directory)
+
+
+class DecompressionGuard:
+    """Counts decompressed bytes, failing as soon as a limit is exceeded."""
+
+    def __init__(self, limits: Limits, compressed_size: int) -> None:
+        self._limits = limits
+        self._compressed_size = compressed_size
+        self.decompressed_size = 0
+
+    def advance(self, size: int) -> None:
+        self.decompressed_size += size
+        self._limits.check_decompressed_size(
+            decompressed_size=self.decompressed_size,
+            compressed_size=self._compressed_size,
+        )
+
+
+_default_limits = Limits()
+_current_limits: ContextVar[Optional[Limits]] = ContextVar(
+    "filepack_limits", default=None
+)
+
+
+def get_limits() -> Limits:
+    """Returns the limits of the current context, or the global limits."""
+    limits = _current_limits.get()
+    return limits if limits is not None else _default_limits
+
+
+def set_limits(limits: Limits) -> None:
+    """Sets the global limits, used outside of use_limits blocks."""
+    global _default_limits
+    _default_limits = limits
+
+
+@contextmanager
+def use_limits(limits: Limits) -> Iterator[Limits]:
+    """Applies limits to the operations called inside the block.
+
+    Usage:
+        with use_limits(Limits(max_decompressed_size=2**30)):
+            Compression(path).decompress("gz")
+    """
+    token = _current_limits.set(limits)
+    try:
+        yield limits
+    finally:
+        _current_limits.reset(token)
@@ -0,0 +1,312 @@
+import io
+import threading
+from collections import deque
+from queue import Empty, Full, Queue
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    TypeVar,
+)
+
+from filepack.consts import PIPELINE_QUEUE_DEPTH
+from filepack.utils import ReadableStream, WritableStream
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# the seconds between two checks of the other thread's state, while waiting
+# on a queue
+_QUEUE_POLL_INTERVAL = 0.1
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# a chunk read from a stream, a view of a reused buffer when read into one
+Chunk = bytes | memoryview
+
+
+class ReadAhead:
+    """Reads a stream in a thread, ahead of its consumer.
+
+    The chunks are handed over through a queue of a few chunks, so that the
+    reading (e.g. decompression) of the next chunks overlaps the processing
+    of the current one, in bounded memory. Streams supporting readinto
+    (e.g. files) are read into a few buffers reused from chunk to chunk, so
+    a chunk is only valid until the next one is taken. Errors of the reading
+    thread are raised by the consumer.
+
+    Usage:
+        with ReadAhead(source=decompressed_file, buffer_size=2**20) as chunks:
+            for chunk in chunks:
+                compressed_file.write(chunk)
+    """
+
+    def __init__(
+        self,
+        source: ReadableStream,
+        buffer_size: int,
+        depth: int = PIPELINE_QUEUE_DEPTH,
+        on_chunk: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        """
+        Args:
+            source: The stream to read.
+            buffer_size: The size of the chunks read from the source.
+            depth: The number of chunks read ahead.
+            on_chunk: Called in the reading thread with the size of every chunk, e.g. to enforce limits.
+        """
+        self._source = source
+        self._buffer_size = buffer_size
+        self._on_chunk = on_chunk
+        self._chunks: Queue[Chunk | BaseException | None] = Queue(
+            maxsize=depth
+        )
+        # the chunks in the queue, the one being consumed and the one being
+        # read
+        self._buffers: Optional[Queue[bytearray]] = None
+        if hasattr(source, "readinto"):
+            self._buffers = Queue()
+            for _ in range(depth + 2):
+                self._buffers.put(bytearray(buffer_size))
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._read, daemon=True)
+
+    def __enter__(self) -> Iterator[Chunk]:
+        self._thread.start()
+        return self._iterate()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._cancelled.set()
+        self._thread.join()
+
+    def _iterate(self) -> Iterator[Chunk]:
+        while (item := self._chunks.get()) is not None:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+            if self._buffers is not None and isinstance(item, memoryview):
+                self._buffers.put(item.obj)  # type: ignore
+
+    def _read(self) -> None:
+        try:
+            while chunk := self._next_chunk():
+                if self._on_chunk is not None:
+                    self._on_chunk(len(chunk))
+                if not self._put(chunk):
+                    return
+            self._put(None)
+        except BaseException as error:
+            self._put(error)
+
+    def _next_chunk(self) -> Optional[Chunk]:
+        if self._buffers is None:
+            return self._source.read(self._buffer_size)
+
+        buffer = self._get_buffer()
+        if buffer is None:
+            return None
+        size = self._source.readinto(buffer)  # type: ignore
+        if not size:
+            return None
+        return memoryview(buffer)[:size]
+
+    def _get_buffer(self) -> Optional[bytearray]:
+        assert self._buffers is not None
+        while not self._cancelled.is_set():
+            try:
+                return self._buffers.get(timeout=_QUEUE_POLL_INTERVAL)
+            except Empty:
+                continue
+        return None
+
+    def _put(self, item: Chunk | BaseException | None) -> bool:
+        # blocks while the consumer is behind, until it stops consuming
+        while not self._cancelled.is_set():
+            try:
+                self._chunks.put(item, timeout=_QUEUE_POLL_INTERVAL)
+                return True
+            except Full:
+                continue
+        return False
+
+
+class ChunksReader(io.RawIOBase):
+    """A readable stream over chunks, e.g. of ReadAhead, for a codec to read."""
+
+    def __init__(self, chunks: Iterator[Chunk]) -> None:
+        self._chunks = chunks
+        self._chunk: Chunk = b""
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore
+        if self._position == len(self._chunk):
+            self._chunk = next(self._chunks, b"")
+            self._position = 0
+
+        start = self._position
+        size = min(len(buffer), len(self._chunk) - start)
+        end = start + size
+        buffer[:size] = self._chunk[start:end]
+        self._position = end
+        return size
+
+
+class WriteBehind:
+    """A writable stream writing to another one in a thread.
+
+    The written chunks are handed over through a queue of a few chunks, so
+    that writing them (e.g. to a slow disk) overlaps producing the next ones.
+    Errors of the writing thread are raised by the next write, and by close.
+
+    Usage:
+        with WriteBehind(target=target_file) as writer:
+            copy_stream(source=decompressed_file, target=writer)
+    """
+
+    def __init__(
+        self, target: WritableStream, depth: int = PIPELINE_QUEUE_DEPTH
+    ) -> None:
+        """
+        Args:
+            target: The stream to write to.
+            depth: The number of chunks written behind.
+        """
+        self._target = target
+        self._chunks: Queue[Optional[bytes]] = Queue(maxsize=depth)
+        self._error: Optional[BaseException] = None
+        self._abandoned = False
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "WriteBehind":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+            return
+
+        # the written chunks are abandoned, so the writing stops early
+        self._abandoned = True
+        if self._thread.is_alive():
+            self._chunks.put(None)
+            self._thread.join()
+
+    def write(self, data: Chunk) -> int:
+        self._raise_error()
+        # the chunk may be a reused buffer, copied before being queued
+        self._chunks.put(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        # waits for the written chunks to be written
+        self._chunks.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._chunks.put(None)
+            self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _write(self) -> None:
+        while True:
+            chunk = self._chunks.get()
+            try:
+                if chunk is None:
+                    return
+                if self._error is None and not self._abandoned:
+                    self._target.write(chunk)
+            except BaseException as error:
+                self._error = error
+            finally:
+                self._chunks.task_done()
+
+
+def pipelined_copy(
+    source: ReadableStream,
+    target: WritableStream,
+    buffer_size: int,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Copies a stream into another one, as copy_stream does, reading the
+    source in a thread ahead of the writes.
+
+    Returns:
+        The number of bytes copied.
+    """
+    copied = 0
+    with ReadAhead(source=source, buffer_size=buffer_size) as chunks:
+        for chunk in chunks:
+            target.write(chunk)  # type: ignore
+            copied += len(chunk)
+            if progress is not None:
+                progress(len(chunk))
+
+    return copied
+
+
+def read_chunks(
+    source: ReadableStream,
+    buffer_size: int,
+    on_chunk: Optional[Callable[[int], None]] = None,
+) -> Iterator[bytes]:
+    """Reads a stream in chunks, in the calling thread, as ReadAhead does."""
+    while chunk := source.read(buffer_size):
+        if on_chunk is not None:
+            on_chunk(len(chunk))
+        yield chunk
+
+
+def rechunk(chunks: Iterable[Chunk], size: int) -> Iterator[bytes]:
+    """Groups chunks into blocks of the size, the last one being smaller."""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= size:
+            yield bytes(buffer[:size])
+            del buffer[:size]
+
+    if buffer:
+        yield bytes(buffer)
+
+
+def map_ordered(
+    function: Callable[[T], R],
+    blocks: Iterable[T],
+    workers: int,
+) -> Iterator[R]:
+    """Applies a function to blocks in a thread pool, yielding in order.
+
+    At most one block per worker is submitted ahead of the one yielded, so
+    that memory stays bounded however fast the blocks are produced. The
+    function should release the GIL, as codecs do.
+    """
+    if workers <= 1:
+        yield from map(function, blocks)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    pending: deque["Future[R]"] = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for block in blocks:
+                pending.append(executor.submit(function, block))
+                if len(pending) > workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,183 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from filepack.consts import PROGRESS_REPORT_INTERVAL, THROUGHPUT_WINDOW
+
+
+@dataclass(frozen=True)
+class Progress:
+    """A progress report of a long-running operation."""
+
+    bytes_done: int
+    # None when the size of the operation is not known in advance, e.g.
+    # when decompressing
+    total_bytes: Optional[int] = None
+    # the archive member being processed, for archive operations
+    member: Optional[str] = None
+    finished: bool = False
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """The done fraction of the operation, if its total is known."""
+        if self.total_bytes is None:
+            return None
+
+        if self.total_bytes == 0:
+            return 1.0
+
+        return min(self.bytes_done / self.total_bytes, 1.0)
+
+
+ProgressCallback = Callable[[Progress], None]
+
+
+class ProgressTracker:
+    """Accumulates processed bytes and reports them at a bounded rate.
+
+    The callback is called at most once per interval while the operation
+    runs, and always once more, with finished set, when it completes.
+    """
+
+    def __init__(
+        self,
+        callback: ProgressCallback,
+        total_bytes: Optional[int] = None,
+        interval: float = PROGRESS_REPORT_INTERVAL,
+    ) -> None:
+        self._callback = callback
+        self._total_bytes = total_bytes
+        self._interval = interval
+        self._bytes_done = 0
+        self._member: Optional[str] = None
+        self._last_report = float("-inf")
+
+    def advance(self, size: int, member: Optional[str] = None) -> None:
+        self._bytes_done += size
+        if member is not None:
+            self._member = member
+
+        now = time.monotonic()
+        if now - self._last_report >= self._interval:
+            self._last_report = now
+            self._report(finished=False)
+
+    def finish(self) -> None:
+        self._report(finished=True)
+
+    def _report(self, finished: bool) -> None:
+        self._callback(
+            Progress(
+                bytes_done=self._bytes_done,
+                total_bytes=self._total_bytes,
+                member=self._member,
+                finished=finished,
+            )
+        )
+
+
+class ThroughputMeter:
+    """A progress callback computing the throughput and the ETA.
+
+    The throughput is measured over a sliding time window, so that the ETA
+    follows changes in speed. One meter can be passed to several operations
+    running one after the other, e.g. the members of a batch, with the
+    total set to the size of the whole batch.
+
+    Usage:
+        meter = ThroughputMeter()
+        compression.compress("gz", progress=meter)
+        ...
+        meter.throughput, meter.eta
+    """
+
+    def __init__(
+        self,
+        total_bytes: Optional[int] = None,
+        window: float = THROUGHPUT_WINDOW,
+        callback: Optional[ProgressCallback] = None,
+    ) -> None:
+        """
+        Args:
+            total_bytes: The total size of the measured operations. If None,
+                the total reported by the operations is used.
+            window: The length, in seconds, of the throughput window.
+            callback: A progress callback to forward the reports to.
+        """
+        self._total_bytes = total_bytes
+        self._window = window
+        self._callback = callback
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        # the bytes done by the finished operations
+        self._finished_bytes = 0
+        self._current_bytes = 0
+        self._current_total: Optional[int] = None
+        self._samples: deque[tuple[float, int]] = deque([(self._start, 0)])
+
+    def __call__(self, progress: Progress) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._current_bytes = progress.bytes_done
+            self._current_total = progress.total_bytes
+            if progress.finished:
+                self._finished_bytes += progress.bytes_done
+                self._current_bytes = 0
+                self._current_total = None
+
+            self._samples.append((now, self.bytes_done))
+            while (
+                len(self._samples) > 2
+                and now - self._samples[1][0] >= self._window
+            ):
+                self._samples.popleft()
+
+        if self._callback is not None:
+            self._callback(progress)
+
+    @property
+    def bytes_done(self) -> int:
+        return self._finished_bytes + self._current_bytes
+
+    @property
+    def total_bytes(self) -> Optional[int]:
+        if self._total_bytes is not None:
+            return self._total_bytes
+
+        if self._current_total is not None:
+            return self._finished_bytes + self._current_total
+
+        return None
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self._start
+
+    @property
+    def average_throughput(self) -> float:
+        """The throughput since the meter creation, in bytes per second."""
+        return self.bytes_done / max(self.elapsed, 1e-9)
+
+    @property
+    def throughput(self) -> float:
+        """The throughput over the window, in bytes per second."""
+        with self._lock:
+            start_time, start_bytes = self._samples[0]
+            end_time, end_bytes = self._samples[-1]
+
+        if end_time <= start_time:
+            return self.average_throughput
+
+        return (end_bytes - start_bytes) / (end_time - start_time)
+
+    @property
+    def eta(self) -> Optional[float]:
+        """The estimated seconds left, if the total and throughput are known."""
+        total_bytes = self.total_bytes
+        throughput = self.throughput
+        if total_bytes is None or throughput <= 0:
+            return None
+
+        return max(total_bytes - self.bytes_done, 0) / throughput
@@ -0,0 +1,242 @@
+import importlib
+import os
+import threading
+import warnings
+from dataclasses import dataclass, field
+from enum import Flag, auto
+from typing import Any, Callable, Generic, Iterator, Optional, TypeVar
+
+from filepack.consts import DISABLE_PLUGINS_ENVIRONMENT_VARIABLE
+
+ClientType = TypeVar("ClientType")
+
+
+class Capability(Flag):
+    """Flags describing what a format allows, used to choose fast paths."""
+
+    NONE = 0
+    # independently encoded members or streams can be processed concurrently
+    PARALLEL = auto()
+    # a member or offset can be reached without decoding what precedes it
+    SEEKABLE = auto()
+    # can be read and written as a forward-only stream
+    STREAMING = auto()
+    # members share compressed blocks, hence are decoded together
+    SOLID = auto()
+    # every member is compressed on its own, with a method chosen per member
+    MEMBER_COMPRESSION = auto()
+    # data is added at the end, without rewriting what is already there
+    APPENDABLE = auto()
+
+
+@dataclass(frozen=True)
+class Signature:
+    """A magic number found at a fixed offset of a file of a given format."""
+
+    magic_number: bytes
+    offset: int = 0
+
+    @property
+    def end(self) -> int:
+        return self.offset + len(self.magic_number)
+
+    def matches(self, header: bytes) -> bool:
+        return header.startswith(self.magic_number, self.offset)
+
+
+@dataclass
+class Registration(Generic[ClientType]):
+    """A format registered in a Registry.
+
+    Args:
+        name: The format name, which is also its file extension.
+        client: The client class or factory, or an import reference to it
+            in the form "module.path:Attribute", imported on first use.
+        signatures: The magic numbers identifying files of this format.
+        capabilities: What the format allows.
+        priority: Registrations with a higher priority replace registrations
+            of the same name.
+    """
+
+    name: str
+    client: str | Callable[[], ClientType]
+    signatures: tuple[Signature, ...] = ()
+    capabilities: Capability = Capability.NONE
+    priority: int = 0
+    _client_instance: Optional[ClientType] = field(
+        default=None, init=False, repr=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def get_client(self) -> ClientType:
+        """Returns the client of this format, created once and then reused."""
+        if self._client_instance is None:
+            with self._lock:
+                if self._client_instance is None:
+                    factory = (
+                        load_object(self.client)
+                        if isinstance(self.client, str)
+                        else self.client
+                    )
+                    self._client_instance = factory()
+
+        return self._client_instance
+
+    def supports(self, capabilities: Capability) -> bool:
+        return capabilities in self.capabilities
+
+
+class Registry(Generic[ClientType]):
+    """A registry of formats and their clients.
+
+    Besides the built-in formats, formats are registered by the
+    `entry_point_group` entry points of installed packages. Each entry point
+    refers to a callable that is given the registry to register into, e.g.:
+
+        def register(registry: Registry) -> None:
+            registry.register(
+                name="gz",
+                client="my_package.gzip:FastGzipCompression",
+                signatures=(Signature(b"\\x1f\\x8b\\x08"),),
+                capabilities=Capability.STREAMING | Capability.PARALLEL,
+                priority=1,
+            )
+
+    Entry points are loaded on the first lookup, unless the
+    FILEPACK_DISABLE_PLUGINS environment variable is set. A plugin failing to
+    load is skipped with a warning, rather than failing the lookup.
+    """
+
+    def __init__(self, entry_point_group: str) -> None:
+        self._entry_point_group = entry_point_group
+        self._registrations: dict[str, Registration[ClientType]] = {}
+        self._entry_points_loaded = False
+        self._lock = threading.RLock()
+
+    def register(
+        self,
+        name: str,
+        client: str | Callable[[], ClientType],
+        signatures: tuple[Signature, ...] = (),
+        capabilities: Capability = Capability.NONE,
+        priority: int = 0,
+    ) -> Registration[ClientType]:
+        """Registers a format, unless it's registered with a higher priority.
+
+        Returns:
+            The registration in effect for the given name.
+        """
+        registration = Registration(
+            name=name,
+            client=client,
+            signatures=signatures,
+            capabilities=capabilities,
+            priority=priority,
+        )
+
+        with self._lock:
+            existing = self._registrations.get(name)
+            if existing is None or existing.priority <= priority:
+                self._registrations[name] = registration
+            return self._registrations[name]
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            self._registrations.pop(name, None)
+
+    def get(self, name: str) -> Optional[Registration[ClientType]]:
+        self._load_entry_points()
+        return self._registrations.get(name)
+
+    def get_client(self, name: str) -> ClientType:
+        """Returns the client of a registered format.
+
+        Raises:
+            KeyError: If the format isn't registered.
+        """
+        if (registration := self.get(name)) is None:
+            raise KeyError(name)
+        return registration.get_client()
+
+    def names(self) -> list[str]:
+        self._load_entry_points()
+        return list(self._registrations)
+
+    def with_capabilities(
+        self, capabilities: Capability
+    ) -> list[Registration[ClientType]]:
+        return [
+            registration
+            for registration in self
+            if registration.supports(capabilities)
+        ]
+
+    def detect(self, header: bytes) -> Optional[str]:
+        """Returns the name of the first format one of whose signatures matches."""
+        for registration in self:
+            if any(
+                signature.matches(header)
+                for signature in registration.signatures
+            ):
+                return registration.name
+
+        return None
+
+    @property
+    def header_size(self) -> int:
+        """The number of leading bytes needed to match every signature."""
+        return max(
+            (
+                signature.end
+                for registration in self
+                for signature in registration.signatures
+            ),
+            default=0,
+        )
+
+    def __iter__(self) -> Iterator[Registration[ClientType]]:
+        self._load_entry_points()
+        return iter(list(self._registrations.values()))
+
+    def _load_entry_points(self) -> None:
+        if self._entry_points_loaded:
+            return
+
+        with self._lock:
+            if self._entry_points_loaded:
+                return
+            self._entry_points_loaded = True
+
+            if os.environ.get(DISABLE_PLUGINS_ENVIRONMENT_VARIABLE):
+                return
+
+            from importlib.metadata import entry_points
+
+            for entry_point in entry_points(group=self._entry_point_group):
+                try:
+                    entry_point.load()(self)
+                except Exception as e:
+                    warnings.warn(
+                        f"skipping the filepack plugin {entry_point.name!r}, "
+                        f"which failed to load: {e!r}",
+                        RuntimeWarning,
+                        stacklevel=2,
+                    )
+
+
+def load_object(reference: str) -> Any:
+    """Imports a module and returns one of its attributes.
+
+    Used to defer importing the archive and compression libraries until a
+    client that depends on them is actually needed.
+
+    Args:
+        reference: The object reference, in the form "module.path:Attribute".
+
+    Returns:
+        The referenced object.
+    """
+    module_name, _, attribute_name = reference.partition(":")
+    return getattr(importlib.import_module(module_name), attribute_name)
@@ -1,8 +1,12 @@
+import os
 from functools import wraps
 from pathlib import Path
-from typing import Any, Callable, Optional, Type
+from typing import IO, Any, Callable, Optional, Protocol, Type
 
-import filetype
+from filepack.archives.registry import archives_registry
+from filepack.compressions.registry import compressions_registry
+from filepack.consts import COPY_BUFFER_SIZE, MAGIC_NUMBERS_READ_SIZE
+from filepack.limits import LimitExceeded
 
 
 def reraise_as(
@@ -23,6 +27,8 @@ def reraise_as(
         def wrapper(*args: Any, **kwargs: Any) -> Any:
             try:
                 return func(*args, **kwargs)
+            except LimitExceeded:
+                raise
             except Exception as e:
                 raise exception_class(f"an error occurred: {str(e)}") from e
 
@@ -31,9 +37,302 @@ def reraise_as(
     return decorator
 
 
+class ReadableStream(Protocol):
+    def read(self, size: int, /) -> bytes:
+        ...
+
+
+class WritableStream(Protocol):
+    def write(self, data: bytes, /) -> int:
+        ...
+
+
+class NamedStream:
+    """A writable stream standing for a file of another name.
+
+    Some formats (e.g. gzip) store the name of the file in their header,
+    which this keeps when writing to a temporary file.
+    """
+
+    def __init__(self, stream: WritableStream, name: str) -> None:
+        self._stream = stream
+        self.name = name
+
+    def write(self, data: bytes) -> int:
+        return self._stream.write(data)
+
+    def flush(self) -> None:
+        if (flush := getattr(self._stream, "flush", None)) is not None:
+            flush()
+
+
+class CountingSink:
+    """A writable stream discarding its data, only counting its size.
+
+    Args:
+        name: The file name that the stream stands for, which some formats
+            (e.g. gzip) store in their header.
+    """
+
+    def __init__(self, name: str = "") -> None:
+        self.name = name
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def tell(self) -> int:
+        return self.size
+
+    def writable(self) -> bool:
+        return True
+
+
+class TeeStream:
+    """A writable stream writing its data to a stream and to a copy of it
+    (e.g. a hashing one)."""
+
+    def __init__(self, stream: WritableStream, copy: WritableStream) -> None:
+        self._streams = (stream, copy)
+
+    def write(self, data: bytes) -> int:
+        for stream in self._streams:
+            stream.write(data)
+        return len(data)
+
+    def flush(self) -> None:
+        for stream in self._streams:
+            if (flush := getattr(stream, "flush", None)) is not None:
+                flush()
+
+
+class TeeReader:
+    """A readable stream writing the data read from another one to a copy of
+    it (e.g. a hashing one)."""
+
+    def __init__(self, source: ReadableStream, copy: WritableStream) -> None:
+        self._source = source
+        self._copy = copy
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._source.read(size)
+        if data:
+            self._copy.write(data)
+        return data
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:
+        data = self.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        return size
+
+
+def copy_stream(
+    source: ReadableStream,
+    target: WritableStream,
+    buffer_size: int = COPY_BUFFER_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Copies a stream into another one, until the source is exhausted.
+
+    Args:
+        source: The stream to read from.
+        target: The stream to write to.
+        buffer_size: The size of the chunks read from the source.
+        progress: A function called with the size of every copied chunk.
+
+    Returns:
+        The number of bytes copied.
+    """
+    copied = 0
+    while chunk := source.read(buffer_size):
+        target.write(chunk)
+        copied += len(chunk)
+        if progress is not None:
+            progress(len(chunk))
+
+    return copied
+
+
+def copy_range(
+    source: IO[bytes],
+    target: IO[bytes],
+    offset: int,
+    size: int,
+    buffer_size: int = COPY_BUFFER_SIZE,
+) -> None:
+    """Copies a range of a file to the current position of another one.
+
+    Between two files, the kernel copies the range with os.copy_file_range
+    (sharing the blocks on file systems with reflinks) or os.sendfile,
+    without the data going through Python buffers. Other streams, and
+    systems without them, fall back to a buffered copy. Both streams are
+    left right after the range.
+
+    Args:
+        source: The file to copy from.
+        target: The file to copy to.
+        offset: The offset of the range in the source.
+        size: The size of the range.
+        buffer_size: The size of the chunks of a buffered copy.
+
+    Raises:
+        EOFError: If the source ends before the range does.
+    """
+    target.flush()
+    position = target.tell()
+    copied = 0
+    try:
+        source_fd, target_fd = source.fileno(), target.fileno()
+    except (AttributeError, OSError, ValueError):
+        pass
+    else:
+        copied = _copy_file_range(
+            source_fd=source_fd,
+            target_fd=target_fd,
+            offset=offset,
+            position=position,
+            size=size,
+        )
+        target.seek(position + copied)
+
+    source.seek(offset + copied)
+    while copied < size:
+        chunk = source.read(min(size - copied, buffer_size))
+        if not chunk:
+            raise EOFError("the source ended before the range")
+        target.write(chunk)
+        copied += len(chunk)
+
+
+def _copy_file_range(
+    source_fd: int, target_fd: int, offset: int, position: int, size: int
+) -> int:
+    """Copies a range between file descriptors in the kernel, as far as it
+    can, returning the copied size."""
+    copied = 0
+    copy_file_range = getattr(os, "copy_file_range", None)
+    try:
+        while copy_file_range is not None and copied < size:
+            count = copy_file_range(
+                source_fd,
+                target_fd,
+                size - copied,
+                offset + copied,
+                position + copied,
+            )
+            if not count:
+                return copied
+            copied += count
+    except OSError:
+        # e.g. between file systems on older kernels, or not supported by
+        # the file system
+        pass
+
+    sendfile = getattr(os, "sendfile", None)
+    try:
+        if sendfile is not None and copied < size:
+            # sendfile writes at the position of the target descriptor
+            os.lseek(target_fd, position + copied, os.SEEK_SET)
+        while sendfile is not None and copied < size:
+            count = sendfile(
+                target_fd, source_fd, offset + copied, size - copied
+            )
+            if not count:
+                return copied
+            copied += count
+    except OSError:
+        # e.g. to anything but a socket, on some systems
+        pass
+
+    return copied
+
+
+def read_sample(path: Path, chunks: int, chunk_size: int) -> bytes:
+    """Reads chunks spread evenly over a file, or the whole small file.
+
+    Args:
+        path: The filesystem path to the file.
+        chunks: The number of chunks, the first one at the file start.
+        chunk_size: The size of each chunk.
+
+    Returns:
+        The concatenated chunks.
+    """
+    size = path.stat().st_size
+    with open(path, "rb") as file:
+        if size <= chunks * chunk_size or chunks < 2:
+            return file.read(chunks * chunk_size)
+
+        stride = (size - chunk_size) // (chunks - 1)
+        sample = []
+        for index in range(chunks):
+            file.seek(index * stride)
+            sample.append(file.read(chunk_size))
+        return b"".join(sample)
+
+
+def detect_file_type_extension(header: bytes) -> Optional[str]:
+    """Matches the leading bytes of a file against the registered signatures.
+
+    Args:
+        header: The first bytes of the file, at least magic_numbers_read_size()
+            long unless the file itself is shorter.
+
+    Returns:
+        The extension of the matching archive or compression type, or None.
+    """
+    if (extension := archives_registry.detect(header=header)) is not None:
+        return extension
+
+    return compressions_registry.detect(header=header)
+
+
+def magic_numbers_read_size() -> int:
+    """Returns the number of leading bytes needed for detecting file types."""
+    return max(
+        MAGIC_NUMBERS_READ_SIZE,
+        archives_registry.header_size,
+        compressions_registry.header_size,
+    )
+
+
 def get_file_type_extension(path: Path) -> Optional[str]:
     """Determines the file type of a given file and returns its extension.
 
+    Only the archive and compression types supported by filepack are
+    recognized, from a single read of the file header.
+
+    Args:
+        path: The filesystem path to the file.
+
+    Returns:
+        The file extension if recognized, otherwise raises ValueError.
+
+    Raises:
+         ValueError: If the file type is not recognized.
+    """
+    from filepack.volumes import open_volumes
+
+    # the header of a split set may span several volumes
+    with open_volumes(path) as file:
+        header = file.read(magic_numbers_read_size())
+
+    if (extension := detect_file_type_extension(header=header)) is None:
+        raise ValueError("given file type is not recognized")
+    return extension
+
+
+def guess_file_type_extension(path: Path) -> Optional[str]:
+    """Determines the file type of any file known to the filetype package.
+
+    Slower than get_file_type_extension, as it imports and walks the whole
+    filetype matchers registry, hence should be kept off hot paths.
+
     Args:
         path: The filesystem path to the file.
 
@@ -43,6 +342,13 @@ def get_file_type_extension(path: Path) -> Optional[str]:
     Raises:
          ValueError: If the file type is not recognized.
     """
+    try:
+        return get_file_type_extension(path=path)
+    except ValueError:
+        pass
+
+    import filetype
+
     if (file_type := filetype.guess(path)) is None:
         raise ValueError("given file type is not recognized")
     return file_type.extension
@@ -0,0 +1,57 @@
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from filepack.limits import LimitExceeded
+from filepack.utils import CountingSink, ReadableStream, copy_stream
+
+
+@dataclass(frozen=True)
+class VerificationReport:
+    """Whether an archive or a compressed file is intact, or where the first
+    corruption is."""
+
+    # the archive members found intact, before the corrupted one
+    checked_members: int
+    # the decompressed bytes found intact
+    checked_bytes: int
+    error: Optional[str] = None
+    # the corrupted member, for archives
+    member: Optional[str] = None
+    # where the corruption was found: the decompressed bytes of the file or
+    # member read intact before it, to a copy buffer, or the offset in the
+    # archive when the member is unknown
+    offset: Optional[int] = None
+
+    @property
+    def intact(self) -> bool:
+        return self.error is None
+
+
+def describe(error: BaseException) -> str:
+    return f"{type(error).__name__}: {error}"
+
+
+def drain(
+    source: ReadableStream,
+    buffer_size: int,
+    progress: Optional[Callable[[int], None]] = None,
+) -> tuple[int, Optional[str]]:
+    """Reads a decoding stream to its end, so that it checks its data.
+
+    Returns:
+        The size read, and the error that stopped the decoding, if any.
+    """
+    sink = CountingSink()
+    try:
+        copy_stream(
+            source=source,
+            target=sink,
+            buffer_size=buffer_size,
+            progress=progress,
+        )
+    except LimitExceeded:
+        raise
+    except Exception as error:
+        return sink.tell(), describe(error)
+
+    return sink.tell(), None
@@ -0,0 +1,304 @@
+import io
+from bisect import bisect_right
+from pathlib import Path
+from typing import IO, Callable, Optional
+
+from filepack.consts import FIRST_VOLUME_SUFFIX
+from filepack.pipeline import map_ordered
+from filepack.utils import copy_range
+
+# split sets are numbered volumes of a file (name.001, name.002, ...), which
+# concatenated are the file, as 7-Zip and split write them
+
+VolumeCallback = Callable[[Path], None]
+
+
+def volume_path(path: Path, number: int) -> Path:
+    """Returns the path of a volume of a split set, numbered from 1."""
+    return path.with_name(f"{path.name}.{number:03d}")
+
+
+def is_split_set(path: Path) -> bool:
+    """Whether the path is the first volume of a split set."""
+    return path.suffix == FIRST_VOLUME_SUFFIX
+
+
+def split_set_base(path: Path) -> Path:
+    """Returns the path of the file split into the set starting at path,
+    without the volume number, or the path if it isn't a split set."""
+    return path.with_suffix("") if is_split_set(path) else path
+
+
+def volume_paths(path: Path) -> list[Path]:
+    """Returns the volumes of the split set starting at path, in order.
+
+    Raises:
+        FileNotFoundError: If the first volume doesn't exist.
+    """
+    if not path.exists():
+        raise FileNotFoundError(path)
+
+    base = split_set_base(path)
+    paths: list[Path] = []
+    while (volume := volume_path(base, len(paths) + 1)).exists():
+        paths.append(volume)
+    return paths
+
+
+def file_size(path: Path) -> int:
+    """Returns the size of a file, or of all the volumes of a split set."""
+    if not is_split_set(path):
+        return path.stat().st_size
+
+    return sum(volume.stat().st_size for volume in volume_paths(path))
+
+
+def remove_file(path: Path) -> None:
+    """Removes a file, or all the volumes of a split set."""
+    for volume in volume_paths(path) if is_split_set(path) else [path]:
+        volume.unlink()
+
+
+def open_volumes(path: Path) -> IO[bytes]:
+    """Opens a file for reading, or all the volumes of a split set as a
+    single seekable file."""
+    if not is_split_set(path):
+        return open(path, "rb")
+
+    return io.BufferedReader(VolumeReader(paths=volume_paths(path)))
+
+
+def remove_stale_volumes(path: Path, count: int) -> None:
+    """Removes the volumes numbered past count, left by a larger split of
+    the same file, which would be read as part of the set."""
+    while (volume := volume_path(path, count + 1)).exists():
+        volume.unlink()
+        count += 1
+
+
+class VolumeReader(io.RawIOBase):
+    """A readable and seekable stream over the volumes of a split set.
+
+    Only the volume holding the current position is open. Seeking finds the
+    volume holding the new position, without reading the ones before.
+    """
+
+    def __init__(self, paths: list[Path]) -> None:
+        """
+        Args:
+            paths: The volumes, in order.
+        """
+        self.name = str(paths[0])
+        self._paths = paths
+        # the offset of every volume in the set, then the set size
+        self._offsets = [0]
+        for path in paths:
+            self._offsets.append(self._offsets[-1] + path.stat().st_size)
+        self._position = 0
+        self._index: Optional[int] = None
+        self._file: Optional[IO[bytes]] = None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore
+        size = self._offsets[-1]
+        if self._position >= size:
+            return 0
+
+        # the last volume starting at or before the position, skipping empty
+        # ones
+        index = bisect_right(self._offsets, self._position) - 1
+        file = self._volume(index)
+        file.seek(self._position - self._offsets[index])
+        end = min(len(buffer), self._offsets[index + 1] - self._position)
+        read = file.readinto(memoryview(buffer)[:end])  # type: ignore
+        if not read:
+            raise EOFError(f"the volume {self._paths[index]} was truncated")
+        self._position += read
+        return read
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._offsets[-1]
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._position = offset
+        return offset
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        super().close()
+
+    def _volume(self, index: int) -> IO[bytes]:
+        if self._file is None or self._index != index:
+            if self._file is not None:
+                self._file.close()
+            self._file = open(self._paths[index], "rb", buffering=0)
+            self._index = index
+        return self._file
+
+
+class VolumeWriter:
+    """A forward-only writable stream splitting its data into volumes.
+
+    Every volume is closed once full, before the next one is opened, so
+    that it can be uploaded while the next ones are written.
+
+    Usage:
+        with VolumeWriter(path=path, volume_size=2**30) as writer:
+            copy_stream(source=source_file, target=writer)
+        writer.paths
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        volume_size: int,
+        on_volume: Optional[VolumeCallback] = None,
+    ) -> None:
+        """
+        Args:
+            path: The path of the split file, numbered for every volume.
+            volume_size: The size of every volume but the last one.
+            on_volume: A function called with the path of every complete
+                volume.
+
+        Raises:
+            ValueError: If the volume size isn't positive.
+        """
+        if volume_size <= 0:
+            raise ValueError("the volume size must be positive")
+
+        self.name = str(path)
+        self.paths: list[Path] = []
+        self._path = path
+        self._volume_size = volume_size
+        self._on_volume = on_volume
+        self._file: Optional[IO[bytes]] = None
+        self._volume_written = 0
+        self._written = 0
+
+    def __enter__(self) -> "VolumeWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        elif self._file is not None:
+            self._file.close()
+
+    def write(self, data: bytes) -> int:
+        view = memoryview(data)
+        while view:
+            if self._file is None:
+                self._open_volume()
+            assert self._file is not None
+            room = self._volume_size - self._volume_written
+            self._file.write(view[:room])
+            self._volume_written += min(room, len(view))
+            view = view[room:]
+            if self._volume_written == self._volume_size:
+                self._close_volume()
+
+        self._written += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def tell(self) -> int:
+        return self._written
+
+    def writable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        """Closes the last volume, or writes an empty first volume if no data
+        was written."""
+        if self._file is None and not self.paths:
+            self._open_volume()
+        if self._file is not None:
+            self._close_volume()
+        remove_stale_volumes(path=self._path, count=len(self.paths))
+
+    def _open_volume(self) -> None:
+        self.paths.append(volume_path(self._path, len(self.paths) + 1))
+        self._file = open(self.paths[-1], "wb")
+        self._volume_written = 0
+
+    def _close_volume(self) -> None:
+        assert self._file is not None
+        self._file.close()
+        self._file = None
+        if self._on_volume is not None:
+            self._on_volume(self.paths[-1])
+
+
+def split_file(
+    path: Path,
+    volume_size: int,
+    target_path: Optional[Path] = None,
+    workers: int = 1,
+    on_volume: Optional[VolumeCallback] = None,
+) -> list[Path]:
+    """Splits a file into volumes, copied in parallel.
+
+    Every volume is a range of the file, copied by the kernel where it can
+    (see copy_range), from its own file descriptor.
+
+    Args:
+        path: The file to split.
+        volume_size: The size of every volume but the last one.
+        target_path: The path of the split file, numbered for every volume.
+            If None, the volumes are written next to the file.
+        workers: The number of volumes copied at once.
+        on_volume: A function called with the path of every complete volume,
+            in order.
+
+    Returns:
+        The paths of the volumes.
+
+    Raises:
+        ValueError: If the volume size isn't positive.
+    """
+    if volume_size <= 0:
+        raise ValueError("the volume size must be positive")
+
+    target_path = target_path or path
+    size = path.stat().st_size
+    count = max(1, -(-size // volume_size))
+
+    def copy_volume(number: int) -> Path:
+        offset = (number - 1) * volume_size
+        volume = volume_path(target_path, number)
+        with open(path, "rb") as source, open(volume, "wb") as target:
+            copy_range(
+                source=source,
+                target=target,
+                offset=offset,
+                size=min(volume_size, size - offset),
+            )
+        return volume
+
+    paths = []
+    for volume in map_ordered(
+        copy_volume, range(1, count + 1), workers=workers
+    ):
+        paths.append(volume)
+        if on_volume is not None:
+            on_volume(volume)
+
+    remove_stale_volumes(path=target_path, count=count)
+    return paths
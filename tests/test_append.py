@@ -0,0 +1,108 @@
+import os
+import tarfile
+from pathlib import Path
+
+import pytest
+from conftest import ARCHIVE_EXTENSIONS, COMPRESSION_EXTENSIONS
+
+from filepack.archive import Archive
+from filepack.compression import Compression
+from filepack.compressions.consts import GZIP_SUFFIX
+from filepack.compressions.exceptions import FailedToAppendToFile
+from filepack.registry import Capability
+
+
+def write_file(path: Path, content: bytes) -> Path:
+    path.write_bytes(content)
+    return path
+
+
+@pytest.mark.parametrize("extension", ARCHIVE_EXTENSIONS)
+def test_add_member_keeps_existing_data(tmp_path: Path, extension: str):
+    archive = Archive(path=tmp_path / f"archive.{extension}")
+    archive.add_member(
+        member_path=write_file(tmp_path / "big.bin", os.urandom(2**18))
+    )
+    before = archive.path.read_bytes()
+
+    archive.add_member(member_path=write_file(tmp_path / "new.txt", b"new"))
+
+    # the existing members data is left as is, only the index at the end of
+    # the archive, and the 7z start header, are written again
+    after = archive.path.read_bytes()
+    assert after[64 : 2**17] == before[64 : 2**17]
+    assert Capability.APPENDABLE in archive.archive_capabilities
+    assert sorted(member.name for member in archive.get_members()) == [
+        "big.bin",
+        "new.txt",
+    ]
+
+
+def test_tar_append_overwrites_end_of_archive(tmp_path: Path):
+    archive = Archive(path=tmp_path / "archive.tar")
+    for index in range(3):
+        archive.add_member(
+            member_path=write_file(tmp_path / f"{index}.txt", b"x" * 1000)
+        )
+
+    with tarfile.open(archive.path) as tar:
+        assert tar.getnames() == ["0.txt", "1.txt", "2.txt"]
+    # every member takes a header block and a data block, and the archive
+    # is padded to a whole record once
+    assert archive.size == tarfile.RECORDSIZE
+
+
+@pytest.mark.parametrize("compression_algorithm", COMPRESSION_EXTENSIONS)
+def test_append(tmp_path: Path, compression_algorithm: str):
+    compressed_path = Compression(
+        path=write_file(tmp_path / "log", b"first\n")
+    ).compress(compression_algorithm=compression_algorithm)
+    compressed_file = Compression(path=compressed_path)
+    assert Capability.APPENDABLE in Compression.compression_capabilities(
+        compression_algorithm
+    )
+
+    compressed_file.append(
+        source_path=write_file(tmp_path / "more", b"second\n"),
+        compression_algorithm=compression_algorithm,
+    )
+
+    assert compressed_file.uncompressed_size(compression_algorithm) == 13
+    assert compressed_file.decompress(
+        compression_algorithm=compression_algorithm,
+        target_path=tmp_path / "decompressed",
+    ).read_bytes() == (b"first\nsecond\n")
+
+
+def test_append_to_uncompressed_file(txt_file: Path, tmp_path: Path):
+    with pytest.raises(FailedToAppendToFile):
+        Compression(path=txt_file).append(
+            source_path=txt_file, compression_algorithm=GZIP_SUFFIX
+        )
+
+
+def test_append_tar_to_compressed_tar(tmp_path: Path):
+    first = Archive(path=tmp_path / "first.tar")
+    first.add_member(member_path=write_file(tmp_path / "a.txt", b"a"))
+    second = Archive(path=tmp_path / "second.tar")
+    second.add_member(member_path=write_file(tmp_path / "b.txt", b"b"))
+
+    compressed_path = Compression(path=first.path).compress(
+        compression_algorithm=GZIP_SUFFIX
+    )
+    Compression(path=compressed_path).append(
+        source_path=second.path, compression_algorithm=GZIP_SUFFIX
+    )
+    archive = Archive(
+        path=Compression(path=compressed_path).decompress(
+            compression_algorithm=GZIP_SUFFIX,
+            target_path=tmp_path / "both.tar",
+        )
+    )
+    archive.add_member(member_path=write_file(tmp_path / "c.txt", b"c"))
+
+    assert [member.name for member in archive.get_members()] == [
+        "a.txt",
+        "b.txt",
+        "c.txt",
+    ]
@@ -2,6 +2,7 @@ from pathlib import Path
 
 import pytest
 from conftest import ARCHIVE_EXTENSIONS, ARCHIVE_MEMBER_NAME
+from py7zr import SevenZipFile
 
 from filepack.archive import Archive
 from filepack.archives.exceptions import (
@@ -251,6 +252,27 @@ def test_remove_member(archive_file: Path, tmp_path: Path):
     assert "newfile.txt" in [member.name for member in archive.get_members()]
 
 
+@pytest.mark.parametrize("archive_extension", ARCHIVE_EXTENSIONS)
+def test_remove_member_keeps_nested_members(
+    archive_extension: str, tmp_path: Path
+):
+    directory = tmp_path / "directory"
+    (directory / "sub").mkdir(parents=True)
+    (directory / "a.txt").write_text("a")
+    (directory / "sub/b.txt").write_text("b")
+    archive = Archive(path=tmp_path / f"archive.{archive_extension}")
+    archive.sync_from(directory)
+
+    archive.remove_member(member_name="a.txt")
+
+    assert sorted(
+        member.name.rstrip("/") for member in archive.get_members()
+    ) == ["sub/b.txt"]
+    archive.extract_all(target_directory_path=tmp_path / "extracted")
+    assert (tmp_path / "extracted/sub/b.txt").read_text() == "b"
+    assert not (tmp_path / "extracted/a.txt").exists()
+
+
 def test_remove_non_existent_member(archive_file: Path):
     archive = Archive(path=archive_file)
 
@@ -311,3 +333,16 @@ def test_remove_all_no_members_no_archive(
     archive.remove_all()
 
     assert archive.get_members() == []
+
+
+def test_extract_all_solid_seven_zip(tmp_path: Path):
+    archive_path = tmp_path / "solid.7z"
+    with SevenZipFile(archive_path, mode="w") as seven_zip:
+        seven_zip.writestr(data=b"first", arcname="first.txt")
+        seven_zip.writestr(data=b"second", arcname="second.txt")
+
+    extract_to = tmp_path / "extract"
+    Archive(path=archive_path).extract_all(target_directory_path=extract_to)
+
+    assert (extract_to / "first.txt").read_bytes() == b"first"
+    assert (extract_to / "second.txt").read_bytes() == b"second"
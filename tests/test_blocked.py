@@ -0,0 +1,195 @@
+import gzip
+import os
+import struct
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from filepack.compression import Compression
+from filepack.compressions.bgzf import BgzfWriter, Split, read_gzi_index
+from filepack.compressions.consts import BGZF_BLOCK_SIZE, BGZF_EOF_BLOCK
+from filepack.compressions.exceptions import (
+    FailedToCompressFile,
+    FailedToSplitFile,
+)
+from filepack.limits import DecompressedSizeLimitExceeded, Limits, use_limits
+
+CONTENT = b"".join(
+    b"line %d %s\n" % (index, os.urandom(index % 40).hex().encode())
+    for index in range(60000)
+)
+
+
+@pytest.fixture
+def data_file(tmp_path: Path) -> Path:
+    path = tmp_path / "data"
+    path.write_bytes(CONTENT)
+    return path
+
+
+def compress_blocked(path: Path, **kwargs) -> Path:
+    return Compression(path=path).compress(
+        compression_algorithm="gz",
+        compression_level=6,
+        format="blocked",
+        **kwargs,
+    )
+
+
+def block_offsets(path: Path) -> list[int]:
+    data = path.read_bytes()
+    offsets = []
+    offset = 0
+    while offset < len(data):
+        offsets.append(offset)
+        offset += struct.unpack_from("<H", data, offset + 16)[0] + 1
+    return offsets
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_compress_blocked_reads_with_gzip(data_file: Path, workers: int):
+    compressed_path = compress_blocked(data_file, workers=workers)
+
+    data = compressed_path.read_bytes()
+    assert gzip.decompress(data) == CONTENT
+    assert data.endswith(BGZF_EOF_BLOCK)
+    # every block is a gzip member with the BC subfield
+    offsets = block_offsets(compressed_path)
+    assert len(offsets) == -(-len(CONTENT) // BGZF_BLOCK_SIZE) + 1
+    assert all(data[offset + 12 : offset + 14] == b"BC" for offset in offsets)
+
+
+def test_compress_blocked_with_stock_gzip(data_file: Path):
+    compressed_path = compress_blocked(data_file)
+
+    process = subprocess.run(
+        ["gzip", "-dc", str(compressed_path)], capture_output=True, check=True
+    )
+
+    assert process.stdout == CONTENT
+
+
+def test_compress_blocked_in_parallel_writes_the_same_file(
+    data_file: Path, tmp_path: Path
+):
+    inline_path = compress_blocked(
+        data_file, workers=1, target_path=tmp_path / "inline.gz"
+    )
+    parallel_path = compress_blocked(
+        data_file, workers=4, target_path=tmp_path / "parallel.gz"
+    )
+
+    assert inline_path.read_bytes() == parallel_path.read_bytes()
+
+
+def test_compress_blocked_incompressible_data(tmp_path: Path):
+    content = os.urandom(3 * BGZF_BLOCK_SIZE)
+    (tmp_path / "random").write_bytes(content)
+
+    compressed_path = compress_blocked(tmp_path / "random")
+
+    assert gzip.decompress(compressed_path.read_bytes()) == content
+
+
+def test_compress_blocked_empty_file(tmp_path: Path):
+    (tmp_path / "empty").write_bytes(b"")
+
+    compressed_path = compress_blocked(tmp_path / "empty")
+
+    assert compressed_path.read_bytes() == BGZF_EOF_BLOCK
+    assert Compression(path=compressed_path).splits(4) == []
+
+
+def test_block_index(data_file: Path):
+    compressed_path = compress_blocked(data_file, block_index=True)
+
+    index = read_gzi_index(compressed_path.with_name("data.gz.gzi"))
+
+    assert [entry[0] for entry in index] == block_offsets(compressed_path)[:-1]
+    assert [entry[1] for entry in index] == list(
+        range(0, len(CONTENT), BGZF_BLOCK_SIZE)
+    )
+
+
+def test_blocked_format_is_only_gzip(data_file: Path):
+    with pytest.raises(FailedToCompressFile):
+        Compression(path=data_file).compress(
+            compression_algorithm="xz", format="blocked"
+        )
+
+
+@pytest.mark.parametrize("block_index", [False, True])
+@pytest.mark.parametrize("count", [1, 2, 5, 16])
+def test_splits_cover_every_line_once(
+    data_file: Path, block_index: bool, count: int
+):
+    compressed_file = Compression(
+        path=compress_blocked(data_file, block_index=block_index)
+    )
+
+    splits = compressed_file.splits(count)
+    parts = [b"".join(compressed_file.read_split(split)) for split in splits]
+
+    assert len(splits) == count
+    assert b"".join(parts) == CONTENT
+    assert all(part.endswith(b"\n") for part in parts)
+    assert [split.offset for split in splits] == [
+        sum(map(len, parts[:index])) for index in range(count)
+    ]
+    # every split starts in the block holding its first line
+    offsets = block_offsets(compressed_file.path)
+    assert all(split.start in offsets for split in splits)
+    assert all(split.skip < BGZF_BLOCK_SIZE for split in splits)
+
+
+def test_splits_of_a_file_with_few_lines(tmp_path: Path):
+    content = os.urandom(5 * BGZF_BLOCK_SIZE).replace(b"\n", b"") + b"\n"
+    (tmp_path / "data").write_bytes(content)
+    compressed_file = Compression(path=compress_blocked(tmp_path / "data"))
+
+    splits = compressed_file.splits(4)
+
+    assert splits == [
+        Split(
+            start=0,
+            end=block_offsets(compressed_file.path)[-1],
+            offset=0,
+            skip=0,
+            size=len(content),
+        )
+    ]
+
+
+def test_splits_of_a_gzip_stream(data_file: Path):
+    compressed_path = Compression(path=data_file).compress(
+        compression_algorithm="gz"
+    )
+
+    with pytest.raises(FailedToSplitFile):
+        Compression(path=compressed_path).splits(4)
+
+
+def test_read_split_limits(data_file: Path):
+    compressed_file = Compression(path=compress_blocked(data_file))
+    split = compressed_file.splits(1)[0]
+
+    with use_limits(Limits(max_decompressed_size=1000)):
+        with pytest.raises(DecompressedSizeLimitExceeded):
+            list(compressed_file.read_split(split))
+
+
+def test_bgzf_writer_index(tmp_path: Path):
+    with open(tmp_path / "data.gz", "wb") as target:
+        with BgzfWriter(target=target, workers=2) as writer:
+            for _ in range(3):
+                writer.write(b"x" * BGZF_BLOCK_SIZE)
+
+    assert [entry[1] for entry in writer.index] == [
+        0,
+        BGZF_BLOCK_SIZE,
+        2 * BGZF_BLOCK_SIZE,
+    ]
+    assert gzip.decompress((tmp_path / "data.gz").read_bytes()) == (
+        b"x" * 3 * BGZF_BLOCK_SIZE
+    )
@@ -0,0 +1,166 @@
+import gzip
+from pathlib import Path
+
+import pytest
+from conftest import ARCHIVE_MEMBER_NAME, COMPRESSION_EXTENSIONS
+
+from filepack.cli import expand_paths, main
+from filepack.compression import Compression
+
+
+@pytest.mark.parametrize("compression_algorithm", COMPRESSION_EXTENSIONS)
+def test_compress_then_decompress_many_paths(
+    compression_algorithm: str, tmp_path: Path
+):
+    paths = []
+    for index in range(4):
+        path = tmp_path / f"file{index}.txt"
+        path.write_text(f"content {index}\n" * 100)
+        paths.append(path)
+
+    assert (
+        main(
+            [
+                "compress",
+                "-a",
+                compression_algorithm,
+                "-j",
+                "2",
+                "--in-place",
+                str(tmp_path / "*.txt"),
+            ]
+        )
+        == 0
+    )
+    assert not any(path.exists() for path in paths)
+
+    assert (
+        main(
+            [
+                "decompress",
+                "-j",
+                "2",
+                "--in-place",
+                str(tmp_path / f"*.{compression_algorithm}"),
+            ]
+        )
+        == 0
+    )
+    for index, path in enumerate(paths):
+        assert path.read_text() == f"content {index}\n" * 100
+
+
+def test_compress_to_stdout(
+    txt_file: Path, capfdbinary: pytest.CaptureFixture[bytes]
+):
+    assert main(["compress", "-a", "gz", "-o", "-", str(txt_file)]) == 0
+
+    compressed = capfdbinary.readouterr().out
+    assert compressed.startswith(b"\x1f\x8b")
+
+
+@pytest.mark.parametrize(
+    "options",
+    [["--volume-size", "1000"], ["--format", "blocked"], ["--in-place"]],
+)
+def test_compress_rejects_file_options_with_standard_streams(
+    txt_file: Path,
+    options: list[str],
+    capsys: pytest.CaptureFixture[str],
+):
+    assert main(["compress", "-a", "gz", *options, "-"]) == 2
+    assert (
+        main(["compress", "-a", "gz", "-o", "-", *options, str(txt_file)]) == 2
+    )
+    assert options[0] in capsys.readouterr().err
+    assert txt_file.exists()
+
+
+def test_compress_into_volumes(tmp_path: Path):
+    path = tmp_path / "file.txt"
+    content = "".join(f"line {index}\n" for index in range(10000))
+    path.write_text(content)
+
+    assert (
+        main(["compress", "-a", "xz", "--volume-size=1000", "-i", str(path)])
+        == 0
+    )
+    assert (tmp_path / "file.txt.xz.002").exists()
+    assert main(["decompress", str(tmp_path / "file.txt.xz.001")]) == 0
+    assert path.read_text() == content
+
+
+def test_compress_blocked(tmp_path: Path):
+    path = tmp_path / "file.txt"
+    content = "".join(f"line {index}\n" for index in range(100000))
+    path.write_text(content)
+
+    assert main(["compress", "-a", "gz", "--format=blocked", str(path)]) == 0
+    assert len(Compression(path=tmp_path / "file.txt.gz").splits(4)) == 4
+    assert gzip.decompress((tmp_path / "file.txt.gz").read_bytes()) == (
+        content.encode()
+    )
+
+
+def test_decompress_failure_sets_exit_code(tmp_path: Path):
+    assert main(["decompress", str(tmp_path / "missing.gz")]) == 1
+
+
+def test_extract_member(archive_file: Path, tmp_path: Path):
+    target_directory = tmp_path / "extracted"
+
+    assert (
+        main(
+            [
+                "extract",
+                "-C",
+                str(target_directory),
+                "-m",
+                ARCHIVE_MEMBER_NAME,
+                str(archive_file),
+            ]
+        )
+        == 0
+    )
+    assert (target_directory / ARCHIVE_MEMBER_NAME).exists()
+
+
+def test_list(archive_file: Path, capsys: pytest.CaptureFixture[str]):
+    assert main(["list", str(archive_file)]) == 0
+    assert ARCHIVE_MEMBER_NAME in capsys.readouterr().out
+
+
+def test_info_reports_unreadable_archive(
+    archive_file: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+):
+    (tmp_path / "bad.zip").write_bytes(b"PK\x03\x04garbage")
+
+    assert main(["info", str(tmp_path / "bad.zip"), str(archive_file)]) == 0
+
+    output = capsys.readouterr().out
+    assert "unreadable" in output
+    assert str(archive_file) in output
+
+
+def test_expand_paths_keeps_standard_stream_and_plain_paths(tmp_path: Path):
+    (tmp_path / "a.txt").touch()
+
+    assert expand_paths(["-", "plain", str(tmp_path / "*.txt")]) == [
+        "-",
+        "plain",
+        str(tmp_path / "a.txt"),
+    ]
+
+
+def test_verify(
+    archive_file: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+):
+    compressed_path = tmp_path / "data.gz"
+    with gzip.open(compressed_path, "wb") as compressed_file:
+        compressed_file.write(b"data" * 1000)
+
+    assert main(["verify", str(archive_file), str(compressed_path)]) == 0
+
+    compressed_path.write_bytes(compressed_path.read_bytes()[:-4])
+    assert main(["verify", str(compressed_path)]) == 1
+    assert "corrupted at 0: EOFError" in capsys.readouterr().err
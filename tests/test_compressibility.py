@@ -0,0 +1,140 @@
+import random
+from pathlib import Path
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+import pytest
+
+from filepack.archive import Archive
+from filepack.compression import Compression
+from filepack.compressions.compressibility import (
+    check_compressibility,
+    entropy,
+)
+from filepack.compressions.consts import GZIP_SUFFIX
+from filepack.compressions.gzip import GzipCompression
+
+JPEG_HEADER = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00"
+
+
+@pytest.fixture
+def random_file(tmp_path: Path) -> Path:
+    path = tmp_path / "random.bin"
+    path.write_bytes(random.Random(0).randbytes(2**18))
+    return path
+
+
+@pytest.fixture
+def jpeg_file(tmp_path: Path) -> Path:
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(JPEG_HEADER + b"\x00" * 4096)
+    return path
+
+
+@pytest.fixture
+def text_file(tmp_path: Path) -> Path:
+    path = tmp_path / "text.txt"
+    path.write_bytes(b"filepack compresses text well\n" * 1000)
+    return path
+
+
+def test_entropy():
+    assert entropy(b"") == 0
+    assert entropy(b"a" * 100) == 0
+    assert entropy(bytes(range(256))) == 8
+
+
+def test_check_compressibility(
+    random_file: Path, jpeg_file: Path, text_file: Path
+):
+    random_report = check_compressibility(random_file)
+    jpeg_report = check_compressibility(jpeg_file)
+    text_report = check_compressibility(text_file)
+
+    assert random_report.incompressible
+    assert "entropy" in random_report.reason
+    assert jpeg_report.incompressible
+    assert jpeg_report.content_type == "jpg"
+    assert "jpg" in jpeg_report.reason
+    assert not text_report.incompressible
+
+
+@pytest.mark.parametrize("policy", ["store", "skip"])
+def test_compress_leaves_incompressible_file(random_file: Path, policy: str):
+    path = Compression(path=random_file).compress(
+        compression_algorithm=GZIP_SUFFIX, incompressible_policy=policy
+    )
+
+    assert path == random_file
+    assert not Path(f"{random_file}.{GZIP_SUFFIX}").exists()
+
+
+def test_compress_incompressible_file_fast(
+    random_file: Path, monkeypatch: pytest.MonkeyPatch
+):
+    levels = []
+    original_open = GzipCompression.open
+
+    def open(self, file_path, mode="r", compression_level=9, backend=None):
+        levels.append(compression_level)
+        return original_open(self, file_path, mode, compression_level, backend)
+
+    monkeypatch.setattr(GzipCompression, "open", open)
+
+    path = Compression(path=random_file).compress(
+        compression_algorithm=GZIP_SUFFIX, incompressible_policy="fast"
+    )
+
+    assert path == Path(f"{random_file}.{GZIP_SUFFIX}")
+    assert levels == [1]
+
+
+def test_compress_compressible_file_with_policy(text_file: Path):
+    path = Compression(path=text_file).compress(
+        compression_algorithm=GZIP_SUFFIX, incompressible_policy="skip"
+    )
+
+    assert path == Path(f"{text_file}.{GZIP_SUFFIX}")
+
+
+def test_zip_stores_incompressible_members(
+    tmp_path: Path, jpeg_file: Path, text_file: Path
+):
+    archive = Archive(path=tmp_path / "test.zip")
+
+    jpeg_report = archive.add_member(
+        member_path=jpeg_file, incompressible_policy="store"
+    )
+    archive.add_member(member_path=text_file, incompressible_policy="store")
+
+    assert jpeg_report is not None and jpeg_report.incompressible
+    with ZipFile(archive.path) as zip_file:
+        assert zip_file.getinfo(jpeg_file.name).compress_type == ZIP_STORED
+        assert zip_file.getinfo(text_file.name).compress_type == ZIP_DEFLATED
+
+
+def test_add_member_keeps_zip_default_without_policy(
+    tmp_path: Path, text_file: Path
+):
+    archive = Archive(path=tmp_path / "test.zip")
+
+    report = archive.add_member(member_path=text_file)
+
+    assert report is None
+    with ZipFile(archive.path) as zip_file:
+        assert zip_file.getinfo(text_file.name).compress_type == ZIP_STORED
+
+
+def test_add_member_skips_incompressible_member(
+    tmp_path: Path, text_file: Path, random_file: Path
+):
+    archive = Archive(path=tmp_path / "test.tar")
+    archive.add_member(member_path=text_file)
+
+    report = archive.add_member(
+        member_path=random_file, incompressible_policy="skip"
+    )
+
+    assert report is not None and report.incompressible
+    assert [member.name for member in archive.get_members()] == [
+        text_file.name
+    ]
@@ -1,3 +1,4 @@
+import gzip
 from pathlib import Path
 
 import pytest
@@ -8,6 +9,11 @@ from filepack.compressions.exceptions import (
     FailedToCompressFile,
     FailedToDecompressFile,
 )
+from filepack.compressions.gzip import (
+    GZIP_BACKENDS,
+    GzipCompression,
+    available_backends,
+)
 
 
 @pytest.mark.parametrize("compression_algorithm", COMPRESSION_EXTENSIONS)
@@ -82,6 +88,23 @@ def test_compress_file_in_place_should_be_successful(
     assert not txt_file.exists()
 
 
+@pytest.mark.parametrize("compression_algorithm", COMPRESSION_EXTENSIONS)
+def test_compress_and_decompress_return_written_path(
+    compression_algorithm: str, txt_file: Path, tmp_path: Path
+):
+    compressed_path = Compression(path=txt_file).compress(
+        compression_algorithm=compression_algorithm
+    )
+    decompressed_path = Compression(path=compressed_path).decompress(
+        target_path=tmp_path / "decompressed.txt",
+        compression_algorithm=compression_algorithm,
+    )
+
+    assert compressed_path == Path(f"{txt_file}.{compression_algorithm}")
+    assert decompressed_path == tmp_path / "decompressed.txt"
+    assert decompressed_path.read_bytes() == txt_file.read_bytes()
+
+
 @pytest.mark.parametrize("compression_algorithm", COMPRESSION_EXTENSIONS)
 def test_decompress_raises_error_for_non_compressed_files(
     compression_algorithm: str, txt_file: Path
@@ -136,3 +159,69 @@ def test_decompress_file_in_place_should_be_successful(
     )
     assert target_file.read_bytes() == txt_file.read_bytes()
     assert not compressed_file.exists()
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("compression_level", [1, 6, 9])
+def test_gzip_backends_write_standard_gzip(
+    backend: str, compression_level: int, txt_file: Path, tmp_path: Path
+):
+    client = GzipCompression(backend=backend)
+    target_file = tmp_path / "target.gz"
+
+    try:
+        compressed_file = client.open(
+            file_path=target_file,
+            mode="wb",
+            compression_level=compression_level,
+        )
+    except ValueError:
+        assert compression_level not in GZIP_BACKENDS[backend][1]
+        return
+
+    with compressed_file:
+        compressed_file.write(txt_file.read_bytes())
+
+    assert gzip.decompress(target_file.read_bytes()) == txt_file.read_bytes()
+    with client.open(file_path=target_file, mode="rb") as compressed_file:
+        assert compressed_file.read() == txt_file.read_bytes()
+
+
+def test_gzip_backend_selection_falls_back_to_stdlib(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(
+        "filepack.compressions.gzip.available_backends", lambda: ["gzip"]
+    )
+
+    assert GzipCompression.select_backend(mode="wb") == "gzip"
+    assert GzipCompression.select_backend(mode="rb") == "gzip"
+
+
+def test_gzip_backend_selection_respects_compression_level(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(
+        "filepack.compressions.gzip.available_backends",
+        lambda: ["isal", "gzip"],
+    )
+
+    assert (
+        GzipCompression.select_backend(mode="wb", compression_level=1)
+        == "isal"
+    )
+    assert (
+        GzipCompression.select_backend(mode="wb", compression_level=9)
+        == "gzip"
+    )
+    # zlib stores the data at level 0, while ISA-L compresses it
+    assert (
+        GzipCompression.select_backend(mode="wb", compression_level=0)
+        == "gzip"
+    )
+    assert GzipCompression.select_backend(mode="rb") == "isal"
+
+
+def test_gzip_unknown_backend_raises_error():
+    with pytest.raises(ValueError):
+        GzipCompression(backend="unknown")
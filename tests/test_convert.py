@@ -0,0 +1,215 @@
+import io
+import os
+import tarfile
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+from py7zr import SevenZipFile
+
+from filepack.archive import Archive
+from filepack.archives import seven_zip
+from filepack.archives.consts import SEVEN_ZIP_SUFFIX, TAR_SUFFIX, ZIP_SUFFIX
+from filepack.archives.exceptions import FailedToConvertArchive
+from filepack.archives.models import MemberCompression
+from filepack.archives.registry import archives_registry
+from filepack.archives.zip import ZipObject
+
+ARCHIVE_TYPES = [ZIP_SUFFIX, TAR_SUFFIX, SEVEN_ZIP_SUFFIX]
+# an even timestamp, which zip archives store exactly
+MTIME = 1_700_000_000
+FILES = {
+    "README": b"readme",
+    "bin/app": b"app" * 1000,
+    "lib/empty": b"",
+    "lib/random.bin": os.urandom(1536 * 1024),
+}
+DIRECTORIES = ["bin", "lib", "share"]
+
+
+@pytest.fixture
+def directory(tmp_path: Path) -> Path:
+    directory = tmp_path / "source"
+    for name in DIRECTORIES:
+        (directory / name).mkdir(parents=True)
+    for name, content in FILES.items():
+        (directory / name).write_bytes(content)
+    for path in directory.rglob("*"):
+        os.utime(path, (MTIME, MTIME))
+    return directory
+
+
+def create_archive(directory: Path, archive_path: Path) -> Archive:
+    names = {
+        path: path.relative_to(directory).as_posix()
+        for path in sorted(directory.rglob("*"))
+    }
+    if archive_path.suffix == ".zip":
+        with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as zip:
+            for path, name in names.items():
+                zip.write(path, arcname=name)
+    elif archive_path.suffix == ".tar":
+        with tarfile.open(archive_path, "w") as tar:
+            for path, name in names.items():
+                tar.add(path, arcname=name, recursive=False)
+    else:
+        with SevenZipFile(archive_path, "w") as seven_zip:
+            for path, name in names.items():
+                seven_zip.write(path, arcname=name)
+    return Archive(path=archive_path)
+
+
+def listing(archive: Archive) -> dict[str, tuple[int, float]]:
+    return {
+        member.name.rstrip("/"): (member.size, member.timestamp)
+        for member in archive.get_members()
+    }
+
+
+def contents(archive: Archive, target_directory_path: Path) -> dict:
+    archive.extract_all(target_directory_path=target_directory_path)
+    return {
+        path.relative_to(target_directory_path).as_posix(): (
+            path.read_bytes() if path.is_file() else None
+        )
+        for path in target_directory_path.rglob("*")
+    }
+
+
+@pytest.mark.parametrize("target_type", ARCHIVE_TYPES)
+@pytest.mark.parametrize("source_type", ARCHIVE_TYPES)
+def test_convert_to(
+    directory: Path, tmp_path: Path, source_type: str, target_type: str
+):
+    source = create_archive(directory, tmp_path / f"source.{source_type}")
+
+    target = source.convert_to(target_path=tmp_path / f"target.{target_type}")
+
+    assert target.path == tmp_path / f"target.{target_type}"
+    assert contents(target, tmp_path / "target") == contents(
+        source, tmp_path / "expected"
+    )
+    assert set(listing(target)) == set(FILES) | set(DIRECTORIES)
+    assert all(
+        abs(timestamp - MTIME) < 1 for _, timestamp in listing(target).values()
+    )
+    assert sorted(
+        path.name for path in tmp_path.iterdir() if path.is_file()
+    ) == sorted([f"source.{source_type}", f"target.{target_type}"])
+
+
+def test_convert_to_seven_zip_without_py7zr_internals(
+    directory: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    # the members are added through the py7zr API when its internals change
+    monkeypatch.setattr(seven_zip, "_writes_streams", lambda _: False)
+    source = create_archive(directory, tmp_path / "source.tar")
+
+    target = source.convert_to(target_path=tmp_path / "target.7z")
+
+    assert contents(target, tmp_path / "target") == contents(
+        source, tmp_path / "expected"
+    )
+    assert set(listing(target)) == set(FILES) | set(DIRECTORIES)
+
+
+@pytest.mark.parametrize("target_type", [ZIP_SUFFIX, SEVEN_ZIP_SUFFIX])
+def test_open_stream_writes_through_temporary_file(
+    directory: Path, tmp_path: Path, target_type: str
+):
+    source = create_archive(directory, tmp_path / "source.tar")
+    stream = io.BytesIO()
+
+    with archives_registry.get_client(TAR_SUFFIX).open(
+        file_path=source.path, mode="r"
+    ) as archive_object:
+        with archives_registry.get_client(target_type).open_stream(
+            stream=stream, file_path=tmp_path / f"target.{target_type}"
+        ) as new_archive_object:
+            new_archive_object.add_member_streams(
+                streams=archive_object.iter_member_streams()
+            )
+
+    (tmp_path / f"target.{target_type}").write_bytes(stream.getvalue())
+    target = Archive(path=tmp_path / f"target.{target_type}")
+    assert contents(target, tmp_path / "target") == contents(
+        source, tmp_path / "expected"
+    )
+
+
+def test_convert_to_explicit_type(directory: Path, tmp_path: Path):
+    source = create_archive(directory, tmp_path / "source.tar")
+
+    target = source.convert_to(
+        target_path=tmp_path / "target.bin", target_type=ZIP_SUFFIX
+    )
+
+    assert zipfile.is_zipfile(target.path)
+
+
+@pytest.mark.parametrize("source_type", ARCHIVE_TYPES)
+def test_convert_to_zip_in_parallel(
+    directory: Path, tmp_path: Path, source_type: str
+):
+    for index in range(20):
+        (directory / f"{index}.txt").write_bytes(b"%d" % index * 1000)
+        os.utime(directory / f"{index}.txt", (MTIME, MTIME))
+    source = create_archive(directory, tmp_path / f"source.{source_type}")
+
+    target = source.convert_to(
+        target_path=tmp_path / "target.zip",
+        compression=MemberCompression.FAST,
+        workers=4,
+    )
+
+    with zipfile.ZipFile(target.path) as zip:
+        assert zip.testzip() is None
+    assert listing(target) == listing(source)
+    assert contents(target, tmp_path / "target") == contents(
+        source, tmp_path / "expected"
+    )
+
+
+def test_convert_to_copies_tar_links(tmp_path: Path):
+    with tarfile.open(tmp_path / "source.tar", "w") as tar:
+        info = tarfile.TarInfo(name="data.txt")
+        info.size = 4
+        info.mtime = time.time()
+        tar.addfile(info, io.BytesIO(b"data"))
+        link = tarfile.TarInfo(name="link.txt")
+        link.type = tarfile.LNKTYPE
+        link.linkname = "data.txt"
+        tar.addfile(link)
+
+    target = Archive(path=tmp_path / "source.tar").convert_to(
+        target_path=tmp_path / "target.zip"
+    )
+
+    with zipfile.ZipFile(target.path) as zip:
+        assert zip.read("link.txt") == b"data"
+
+
+def test_failed_conversion_leaves_no_file(
+    directory: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    source = create_archive(directory, tmp_path / "source.7z")
+
+    def fail(*args, **kwargs):
+        raise OSError("no space left on device")
+
+    monkeypatch.setattr(ZipObject, "add_member_stream", fail)
+
+    with pytest.raises(FailedToConvertArchive):
+        source.convert_to(target_path=tmp_path / "target.zip")
+
+    assert [path.name for path in tmp_path.iterdir() if path.is_file()] == [
+        "source.7z"
+    ]
+
+
+def test_convert_to_unsupported_type(directory: Path, tmp_path: Path):
+    source = create_archive(directory, tmp_path / "source.zip")
+
+    with pytest.raises(FailedToConvertArchive):
+        source.convert_to(target_path=tmp_path / "target.rar")
@@ -0,0 +1,167 @@
+import inspect
+import io
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from filepack.archive import Archive
+from filepack.archives import tar, zip
+from filepack.archives.exceptions import FailedToExtractArchiveMembers
+from filepack.utils import copy_range
+
+DATA = os.urandom(300000)
+
+
+@pytest.fixture
+def source_file(tmp_path: Path) -> Path:
+    path = tmp_path / "source"
+    path.write_bytes(DATA)
+    return path
+
+
+@pytest.fixture(params=["copy_file_range", "sendfile", "buffered"])
+def kernel_copy(
+    request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch
+):
+    # the kernel copies used, falling back from one to the next
+    if request.param != "copy_file_range":
+        monkeypatch.delattr(os, "copy_file_range", raising=False)
+    if request.param == "buffered":
+        monkeypatch.delattr(os, "sendfile", raising=False)
+    return request.param
+
+
+@pytest.fixture
+def spy(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    sizes = []
+
+    def spy_copy_range(**kwargs) -> None:
+        sizes.append(kwargs["size"])
+        copy_range(**kwargs)
+
+    monkeypatch.setattr(tar, "copy_range", spy_copy_range)
+    monkeypatch.setattr(zip, "copy_range", spy_copy_range)
+    return sizes
+
+
+def test_copy_range(source_file: Path, tmp_path: Path, kernel_copy: str):
+    with open(source_file, "rb") as source, open(
+        tmp_path / "target", "wb"
+    ) as target:
+        target.write(b"header")
+        copy_range(source=source, target=target, offset=1000, size=200000)
+        target.write(b"footer")
+        assert source.tell() == 201000
+
+    assert (tmp_path / "target").read_bytes() == (
+        b"header" + DATA[1000:201000] + b"footer"
+    )
+
+
+def test_copy_range_of_streams():
+    target = io.BytesIO()
+
+    copy_range(source=io.BytesIO(DATA), target=target, offset=10, size=1000)
+
+    assert target.getvalue() == DATA[10:1010]
+
+
+def test_copy_range_past_the_end(source_file: Path, tmp_path: Path):
+    with open(source_file, "rb") as source, open(
+        tmp_path / "target", "wb"
+    ) as target:
+        with pytest.raises(EOFError):
+            copy_range(
+                source=source, target=target, offset=1000, size=len(DATA)
+            )
+
+
+def test_extract_tar_member(
+    source_file: Path, tmp_path: Path, kernel_copy: str, spy: list[int]
+):
+    with tarfile.open(tmp_path / "archive.tar", "w") as tar_file:
+        tar_file.add(source_file, arcname="data/source")
+
+    Archive(path=tmp_path / "archive.tar").extract_all(
+        target_directory_path=tmp_path / "target"
+    )
+
+    assert (tmp_path / "target/data/source").read_bytes() == DATA
+    assert spy == [len(DATA)]
+
+
+def test_extract_stored_zip_member(
+    source_file: Path, tmp_path: Path, spy: list[int]
+):
+    with zipfile.ZipFile(tmp_path / "archive.zip", "w") as zip_file:
+        zip_file.write(source_file, arcname="../stored")
+        zip_file.write(
+            source_file, arcname="deflated", compress_type=zipfile.ZIP_DEFLATED
+        )
+
+    archive = Archive(path=tmp_path / "archive.zip")
+    archive.extract_all(target_directory_path=tmp_path / "target")
+
+    assert (tmp_path / "target/stored").read_bytes() == DATA
+    assert (tmp_path / "target/deflated").read_bytes() == DATA
+    assert spy == [len(DATA)]
+
+
+def test_extract_corrupted_stored_zip_member(
+    source_file: Path, tmp_path: Path, spy: list[int]
+):
+    with zipfile.ZipFile(tmp_path / "archive.zip", "w") as zip_file:
+        zip_file.write(source_file, arcname="stored")
+        offset = zip_file.getinfo("stored").header_offset
+    with open(tmp_path / "archive.zip", "r+b") as archive_file:
+        archive_file.seek(offset + 1000)
+        byte = archive_file.read(1)
+        archive_file.seek(offset + 1000)
+        archive_file.write(bytes([byte[0] ^ 0xFF]))
+
+    archive = Archive(path=tmp_path / "archive.zip")
+
+    # copied as is by default, as the CRC-32 is only checked when asked to
+    archive.extract_all(target_directory_path=tmp_path / "unchecked")
+    with pytest.raises(FailedToExtractArchiveMembers, match="CRC"):
+        archive.extract_all(
+            target_directory_path=tmp_path / "target", check_crc=True
+        )
+    assert spy == [len(DATA), len(DATA)]
+
+
+def test_zipfile_extracts_through_private_hook():
+    # _ZipFile overrides ZipFile._extract_member, which must still be what
+    # every extraction calls, with the same arguments
+    assert list(
+        inspect.signature(zipfile.ZipFile._extract_member).parameters
+    ) == ["self", "member", "targetpath", "pwd"]
+    assert "_extract_member" in inspect.getsource(zipfile.ZipFile.extract)
+    assert "_extract_member" in inspect.getsource(zipfile.ZipFile.extractall)
+
+
+@pytest.mark.parametrize("archive_extension", ["tar", "zip"])
+def test_rewrite_copies_members_range(
+    source_file: Path, tmp_path: Path, archive_extension: str, spy: list[int]
+):
+    directory = tmp_path / "directory"
+    directory.mkdir()
+    (directory / "kept").write_bytes(DATA)
+    (directory / "removed").write_bytes(b"removed")
+    archive = Archive(path=tmp_path / f"archive.{archive_extension}")
+    archive.sync_from(directory)
+
+    (directory / "removed").unlink()
+    report = archive.sync_from(directory)
+
+    assert report.copied_raw == 1
+    # copied once, compressed for zip members
+    assert len(spy) == 1
+    archive.extract_all(target_directory_path=tmp_path / "target")
+    assert (tmp_path / "target/kept").read_bytes() == DATA
+    assert sorted(path.name for path in (tmp_path / "target").iterdir()) == [
+        "kept"
+    ]
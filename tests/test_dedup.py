@@ -0,0 +1,272 @@
+import json
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from filepack.archive import Archive
+from filepack.archives.consts import (
+    DEDUP_MANIFEST_PREFIX,
+    DEDUP_MANIFEST_VERSION,
+    SEVEN_ZIP_SUFFIX,
+    TAR_SUFFIX,
+    ZIP_SUFFIX,
+)
+from filepack.hashing import (
+    available_hash_algorithms,
+    default_hash_algorithm,
+    hash_file,
+)
+
+
+@pytest.fixture
+def snapshot(tmp_path: Path) -> Path:
+    directory = tmp_path / "snapshot"
+    for name, content in [
+        ("a/config.json", b'{"retries": 3}'),
+        ("b/config.json", b'{"retries": 3}'),
+        ("c/config.json", b'{"retries": 4}'),
+        ("a/data.bin", b"data" * 1000),
+        ("b/data.bin", b"data" * 1000),
+        ("b/other.bin", b"atad" * 1000),
+    ]:
+        (directory / name).parent.mkdir(parents=True, exist_ok=True)
+        (directory / name).write_bytes(content)
+    return directory
+
+
+def snapshot_files(directory: Path) -> list[Path]:
+    return sorted(path for path in directory.rglob("*") if path.is_file())
+
+
+def test_hash_file_with_every_available_algorithm(txt_file: Path):
+    assert default_hash_algorithm() == available_hash_algorithms()[0]
+    for algorithm in available_hash_algorithms():
+        assert hash_file(txt_file, algorithm=algorithm) == hash_file(
+            txt_file, algorithm=algorithm
+        )
+
+
+def test_hash_file_with_unknown_algorithm(txt_file: Path):
+    with pytest.raises(ValueError):
+        hash_file(txt_file, algorithm="md4")
+
+
+@pytest.mark.parametrize(
+    "extension", [TAR_SUFFIX, ZIP_SUFFIX, SEVEN_ZIP_SUFFIX]
+)
+def test_deduplicated_archive_round_trip(
+    snapshot: Path, tmp_path: Path, extension: str
+):
+    archive = Archive(path=tmp_path / f"snapshot.{extension}")
+
+    report = archive.add_members(
+        member_paths=snapshot_files(snapshot),
+        base_directory_path=snapshot,
+        deduplicate=True,
+    )
+
+    assert report.files == 6
+    assert report.unique_files == 4
+    assert report.duplicates == {
+        "b/config.json": "a/config.json",
+        "b/data.bin": "a/data.bin",
+    }
+    assert report.saved_bytes == 4014
+    assert report.dedup_ratio > 1.4
+
+    extracted = tmp_path / "extracted"
+    archive.extract_all(target_directory_path=extracted)
+    assert [
+        path.relative_to(extracted) for path in snapshot_files(extracted)
+    ] == [path.relative_to(snapshot) for path in snapshot_files(snapshot)]
+    for path in snapshot_files(snapshot):
+        assert (extracted / path.relative_to(snapshot)).read_bytes() == (
+            path.read_bytes()
+        )
+
+    single = tmp_path / "single"
+    archive.extract_member(
+        member_name="b/data.bin", target_directory_path=single
+    )
+    assert (single / "b/data.bin").read_bytes() == b"data" * 1000
+
+
+def test_deduplicated_tar_uses_hard_links(snapshot: Path, tmp_path: Path):
+    archive = Archive(path=tmp_path / "snapshot.tar")
+
+    archive.add_members(
+        member_paths=snapshot_files(snapshot),
+        base_directory_path=snapshot,
+        deduplicate=True,
+    )
+
+    with tarfile.open(archive.path) as tar:
+        link = tar.getmember("b/data.bin")
+        assert link.islnk()
+        assert link.linkname == "a/data.bin"
+    assert not any(
+        member.name.startswith(DEDUP_MANIFEST_PREFIX)
+        for member in archive.get_members()
+    )
+
+
+def test_deduplicated_tar_links_keep_file_metadata(
+    snapshot: Path, tmp_path: Path
+):
+    (snapshot / "b/data.bin").chmod(0o600)
+    os.utime(snapshot / "b/data.bin", (1_600_000_000, 1_600_000_000))
+    archive = Archive(path=tmp_path / "snapshot.tar")
+
+    archive.add_members(
+        member_paths=snapshot_files(snapshot),
+        base_directory_path=snapshot,
+        deduplicate=True,
+    )
+
+    stat = (snapshot / "b/data.bin").stat()
+    with tarfile.open(archive.path) as tar:
+        link = tar.getmember("b/data.bin")
+        assert link.islnk()
+        assert link.mtime == 1_600_000_000
+        assert link.mode == 0o600
+        assert (link.uid, link.gid) == (stat.st_uid, stat.st_gid)
+
+
+def test_deduplicated_zip_uses_manifest(snapshot: Path, tmp_path: Path):
+    archive = Archive(path=tmp_path / "snapshot.zip")
+
+    archive.add_members(
+        member_paths=snapshot_files(snapshot),
+        base_directory_path=snapshot,
+        deduplicate=True,
+    )
+
+    names = [member.name for member in archive.get_members()]
+    assert "b/data.bin" not in names
+    assert any(name.startswith(DEDUP_MANIFEST_PREFIX) for name in names)
+
+
+def test_add_members_without_deduplication(snapshot: Path, tmp_path: Path):
+    archive = Archive(path=tmp_path / "snapshot.zip")
+
+    report = archive.add_members(
+        member_paths=snapshot_files(snapshot), base_directory_path=snapshot
+    )
+
+    assert report.duplicates == {}
+    assert report.dedup_ratio == 1.0
+    assert len(archive.get_members()) == 6
+
+
+def deduplicated_archive(snapshot: Path, archive_path: Path) -> Archive:
+    archive = Archive(path=archive_path)
+    archive.add_members(
+        member_paths=snapshot_files(snapshot),
+        base_directory_path=snapshot,
+        deduplicate=True,
+    )
+    return archive
+
+
+def extracted_files(archive: Archive, directory: Path) -> dict[str, bytes]:
+    archive.extract_all(target_directory_path=directory)
+    return {
+        path.relative_to(directory).as_posix(): path.read_bytes()
+        for path in snapshot_files(directory)
+    }
+
+
+@pytest.mark.parametrize("extension", [ZIP_SUFFIX, SEVEN_ZIP_SUFFIX])
+def test_duplicates_are_members(
+    snapshot: Path, tmp_path: Path, extension: str
+):
+    archive = deduplicated_archive(
+        snapshot, tmp_path / f"snapshot.{extension}"
+    )
+
+    assert archive.member_exist(member_name="b/data.bin")
+    assert archive.get_member(member_name="b/data.bin").name == "a/data.bin"
+
+
+@pytest.mark.parametrize("extension", [ZIP_SUFFIX, SEVEN_ZIP_SUFFIX])
+def test_remove_original_of_duplicates(
+    snapshot: Path, tmp_path: Path, extension: str
+):
+    archive = deduplicated_archive(
+        snapshot, tmp_path / f"snapshot.{extension}"
+    )
+
+    archive.remove_member(member_name="a/data.bin")
+
+    files = extracted_files(archive, tmp_path / "extracted")
+    assert "a/data.bin" not in files
+    assert files["b/data.bin"] == b"data" * 1000
+    assert files["b/config.json"] == b'{"retries": 3}'
+    assert archive.member_exist(member_name="b/data.bin")
+
+
+@pytest.mark.parametrize("extension", [ZIP_SUFFIX, SEVEN_ZIP_SUFFIX])
+def test_remove_duplicate(snapshot: Path, tmp_path: Path, extension: str):
+    archive = deduplicated_archive(
+        snapshot, tmp_path / f"snapshot.{extension}"
+    )
+
+    archive.remove_member(member_name="b/config.json")
+
+    files = extracted_files(archive, tmp_path / "extracted")
+    assert "b/config.json" not in files
+    assert files["a/config.json"] == b'{"retries": 3}'
+    assert files["b/data.bin"] == b"data" * 1000
+
+
+def test_extract_all_skips_duplicates_of_missing_originals(tmp_path: Path):
+    # an original removed by another tool, without updating the manifest
+    with zipfile.ZipFile(tmp_path / "snapshot.zip", "w") as zip_file:
+        zip_file.writestr("a/config.json", b'{"retries": 3}')
+        zip_file.writestr(
+            f"{DEDUP_MANIFEST_PREFIX}manifest.json",
+            json.dumps(
+                {
+                    "version": DEDUP_MANIFEST_VERSION,
+                    "duplicates": {
+                        "b/config.json": "a/config.json",
+                        "b/data.bin": "a/data.bin",
+                    },
+                }
+            ),
+        )
+
+    with pytest.warns(UserWarning, match="b/data.bin"):
+        files = extracted_files(
+            Archive(path=tmp_path / "snapshot.zip"), tmp_path / "extracted"
+        )
+
+    assert files == {
+        "a/config.json": b'{"retries": 3}',
+        "b/config.json": b'{"retries": 3}',
+    }
+
+
+@pytest.mark.parametrize("extension", [ZIP_SUFFIX, SEVEN_ZIP_SUFFIX])
+def test_sync_deduplicated_archive(
+    snapshot: Path, tmp_path: Path, extension: str
+):
+    archive = deduplicated_archive(
+        snapshot, tmp_path / f"snapshot.{extension}"
+    )
+
+    assert archive.sync_from(snapshot, compare_contents=True).up_to_date
+
+    (snapshot / "a/data.bin").unlink()
+    (snapshot / "c/config.json").write_bytes(b'{"retries": 10}')
+    report = archive.sync_from(snapshot)
+
+    assert report.removed == ["a/data.bin"]
+    assert report.changed == ["c/config.json"]
+    assert extracted_files(archive, tmp_path / "extracted") == {
+        path.relative_to(snapshot).as_posix(): path.read_bytes()
+        for path in snapshot_files(snapshot)
+    }
@@ -0,0 +1,122 @@
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+from conftest import COMPRESSION_EXTENSIONS
+
+from filepack import compression
+from filepack.compression import Compression
+from filepack.compressions.consts import GZIP_SUFFIX
+from filepack.compressions.exceptions import FailedToCompressFile
+from filepack.hashing import Digests, HashingSink, hash_file_digests
+
+CONTENT = b"".join(b"line %d\n" % index for index in range(50000)) + (
+    os.urandom(100000)
+)
+
+
+@pytest.fixture(params=[False, True], ids=["buffered", "pipelined"])
+def pipelined(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch):
+    if request.param:
+        monkeypatch.setattr(compression, "PIPELINE_MIN_FILE_SIZE", 0)
+    return request.param
+
+
+@pytest.fixture
+def data_file(tmp_path: Path) -> Path:
+    path = tmp_path / "data"
+    path.write_bytes(CONTENT)
+    return path
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.mark.parametrize("compression_algorithm", COMPRESSION_EXTENSIONS)
+def test_compress_and_decompress_digests(
+    data_file: Path,
+    tmp_path: Path,
+    compression_algorithm: str,
+    pipelined: bool,
+):
+    compress_digests = Digests(algorithms=["sha256", "blake2b"])
+    decompress_digests = Digests(algorithms=["sha256"])
+
+    compressed_path = Compression(path=data_file).compress(
+        compression_algorithm=compression_algorithm,
+        compression_level=1,
+        digests=compress_digests,
+    )
+    Compression(path=compressed_path).decompress(
+        compression_algorithm=compression_algorithm,
+        target_path=tmp_path / "decompressed",
+        digests=decompress_digests,
+    )
+
+    compressed = compressed_path.read_bytes()
+    assert compress_digests.plaintext == {
+        "sha256": sha256(CONTENT),
+        "blake2b": hashlib.blake2b(CONTENT).hexdigest(),
+    }
+    assert compress_digests.compressed["sha256"] == sha256(compressed)
+    assert decompress_digests.plaintext == {"sha256": sha256(CONTENT)}
+    assert decompress_digests.compressed == {"sha256": sha256(compressed)}
+
+
+def test_compress_digests_keep_gzip_file_name(data_file: Path):
+    compressed_path = Compression(path=data_file).compress(
+        compression_algorithm=GZIP_SUFFIX, digests=Digests(["sha256"])
+    )
+
+    assert b"data\x00" in compressed_path.read_bytes()[:64]
+
+
+def test_digests_of_a_stored_file(tmp_path: Path):
+    path = tmp_path / "random"
+    path.write_bytes(os.urandom(200000))
+    digests = Digests(algorithms=["sha256"])
+
+    assert (
+        Compression(path=path).compress(
+            compression_algorithm=GZIP_SUFFIX,
+            incompressible_policy="store",
+            digests=digests,
+        )
+        == path
+    )
+    assert (
+        digests.plaintext
+        == digests.compressed
+        == hash_file_digests(path=path, algorithms=["sha256"])
+    )
+
+
+def test_unknown_digest_algorithm_writes_no_file(data_file: Path):
+    with pytest.raises(FailedToCompressFile):
+        Compression(path=data_file).compress(
+            compression_algorithm=GZIP_SUFFIX, digests=Digests(["md4"])
+        )
+
+    assert not data_file.with_name("data.gz").exists()
+
+
+def test_hashing_sink():
+    sink = HashingSink(["sha256", "blake2b"])
+    sink.write(CONTENT[:1000])
+    sink.write(CONTENT[1000:])
+
+    assert sink.hexdigests() == {
+        "sha256": sha256(CONTENT),
+        "blake2b": hashlib.blake2b(CONTENT).hexdigest(),
+    }
+
+
+def test_crc32c_digest():
+    crc32c = pytest.importorskip("crc32c")
+    sink = HashingSink(["crc32c"])
+    sink.write(CONTENT[:1000])
+    sink.write(CONTENT[1000:])
+
+    assert sink.hexdigests() == {"crc32c": f"{crc32c.crc32c(CONTENT):08x}"}
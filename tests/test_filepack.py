@@ -1,3 +1,5 @@
+import subprocess
+import sys
 from pathlib import Path
 
 import pytest
@@ -133,3 +135,20 @@ def test_compress_then_archive_should_be_successful(
     fp = FilePack(path=uncompressed_file)
     assert not fp.is_compressed(compression_algorithm=compression_algorithm)
     assert uncompressed_file.read_bytes() == txt_file.read_bytes()
+
+
+def test_import_does_not_load_archive_and_compression_libraries():
+    statement = (
+        "import sys, filepack; filepack.Archive; filepack.Compression; "
+        "print(' '.join(sys.modules))"
+    )
+    process = subprocess.run(
+        [sys.executable, "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported_modules = process.stdout.split()
+
+    for module in ["py7zr", "lz4.frame", "tabulate", "filetype", "lzma"]:
+        assert module not in imported_modules
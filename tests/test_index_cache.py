@@ -0,0 +1,111 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from filepack.archive import Archive
+from filepack.archives.index_cache import (
+    IndexCache,
+    get_index_cache,
+    use_index_cache,
+)
+from filepack.archives.listing import IndexedMember
+from filepack.archives.options import SevenZipOptions, use_seven_zip_options
+from filepack.archives.seven_zip import SevenZipClient
+from filepack.archives.tar import TarClient
+
+
+@pytest.fixture
+def files(tmp_path: Path) -> list[Path]:
+    directory = tmp_path / "files"
+    directory.mkdir()
+    paths = []
+    for index in range(3):
+        path = directory / f"{index}.bin"
+        path.write_bytes(os.urandom(1000))
+        paths.append(path)
+    return paths
+
+
+def fail(*args, **kwargs):
+    raise AssertionError("the archive was listed")
+
+
+def test_members_are_loaded_from_the_cache(
+    files: list[Path], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    index_cache = IndexCache(directory=tmp_path / "cache")
+    archive_path = tmp_path / "archive.tar"
+    Archive(path=archive_path).add_members(member_paths=files)
+
+    with use_index_cache(index_cache):
+        listed = Archive(path=archive_path).get_members()
+        monkeypatch.setattr(TarClient, "read_member_table", fail)
+        monkeypatch.setattr(TarClient, "open", fail)
+        cached = Archive(path=archive_path).get_members()
+
+    assert index_cache.index_path(archive_path).exists()
+    assert [(member.name, member.size, member.mtime) for member in cached] == [
+        (member.name, member.size, member.mtime) for member in listed
+    ]
+    assert get_index_cache() is None
+
+
+def test_modified_archive_is_listed_again(files: list[Path], tmp_path: Path):
+    archive = Archive(path=tmp_path / "archive.zip")
+    archive.add_members(member_paths=files[:2])
+
+    with use_index_cache(IndexCache(directory=tmp_path / "cache")):
+        assert len(archive.get_members()) == 2
+        archive.add_member(member_path=files[2])
+        assert len(archive.get_members()) == 3
+        assert archive.get_member("2.bin") is not None
+
+
+def test_seven_zip_blocks_are_cached(
+    files: list[Path], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    archive_path = tmp_path / "archive.7z"
+    with use_seven_zip_options(SevenZipOptions(solid_block_size=2000)):
+        Archive(path=archive_path).add_members(member_paths=files)
+
+    with use_index_cache(IndexCache()):
+        Archive(path=archive_path).get_members()
+        monkeypatch.setattr(SevenZipClient, "open", fail)
+        members = Archive(path=archive_path).get_members()
+
+    assert all(isinstance(member, IndexedMember) for member in members)
+    assert [member.block for member in members] == [0, 0, 1]
+
+
+def test_sidecar_is_removed_with_the_archive(
+    files: list[Path], tmp_path: Path
+):
+    archive = Archive(path=tmp_path / "archive.tar")
+    archive.add_members(member_paths=files)
+    index_cache = IndexCache()
+
+    with use_index_cache(index_cache):
+        archive.get_members()
+        sidecar_path = index_cache.index_path(archive.path)
+        assert sidecar_path.parent == archive.path.parent
+        assert sidecar_path.exists()
+
+        archive.remove_all()
+
+    assert not sidecar_path.exists()
+
+
+def test_corrupted_entry_is_ignored(files: list[Path], tmp_path: Path):
+    index_cache = IndexCache(directory=tmp_path / "cache")
+    archive_path = tmp_path / "archive.tar"
+    Archive(path=archive_path).add_members(member_paths=files)
+
+    with use_index_cache(index_cache):
+        Archive(path=archive_path).get_members()
+        index_path = index_cache.index_path(archive_path)
+        index_path.write_bytes(index_path.read_bytes()[:-5])
+
+        assert index_cache.load(archive_path=archive_path) is None
+        assert len(Archive(path=archive_path).get_members()) == 3
+        assert index_cache.load(archive_path=archive_path) is not None
@@ -0,0 +1,127 @@
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from conftest import ARCHIVE_MEMBER_NAME
+
+from filepack.archive import Archive
+from filepack.archives.consts import TAR_SUFFIX
+from filepack.compression import Compression
+from filepack.compressions.consts import GZIP_SUFFIX
+from filepack.instrumentation import (
+    MetricsCollector,
+    OperationEvent,
+    add_hook,
+    remove_hook,
+)
+
+
+@pytest.fixture
+def events() -> Iterator[list[OperationEvent]]:
+    recorded: list[OperationEvent] = []
+    add_hook(recorded.append)
+    yield recorded
+    remove_hook(recorded.append)
+
+
+def test_compress_reports_bytes_and_codec(
+    events: list[OperationEvent], txt_file: Path
+):
+    Compression(path=txt_file).compress(compression_algorithm=GZIP_SUFFIX)
+
+    [event] = events
+    assert event.name == "filepack.compression.compress"
+    assert event.codec == GZIP_SUFFIX
+    assert event.bytes_read == txt_file.stat().st_size
+    assert (
+        event.bytes_written == Path(f"{txt_file}.{GZIP_SUFFIX}").stat().st_size
+    )
+    assert event.wall_time > 0
+    assert event.error is None
+
+
+def test_failed_operation_reports_error(
+    events: list[OperationEvent], txt_file: Path
+):
+    with pytest.raises(Exception):
+        Compression(path=txt_file).decompress(
+            compression_algorithm=GZIP_SUFFIX
+        )
+
+    assert events[-1].name == "filepack.compression.decompress"
+    assert events[-1].error is not None
+
+
+@pytest.mark.parametrize("archive_file", [TAR_SUFFIX], indirect=True)
+def test_nested_operations_are_counted_in_outer_operation(
+    events: list[OperationEvent], archive_file: Path
+):
+    Archive(path=archive_file).remove_member(member_name=ARCHIVE_MEMBER_NAME)
+
+    remove_event = events[-1]
+    assert remove_event.name == "filepack.archive.remove_member"
+    assert remove_event.codec == TAR_SUFFIX
+    assert remove_event.temp_files_created == 1
+    # the archive and the rewritten one
+    assert (
+        remove_event.archive_opens
+        == sum(event.archive_opens for event in events[:-1]) + 2
+    )
+    assert remove_event.parent is None
+    assert all(event.parent is remove_event for event in events[:-1])
+
+
+def test_no_events_without_hooks(txt_file: Path):
+    collector = MetricsCollector()
+    add_hook(collector)
+    remove_hook(collector)
+
+    Compression(path=txt_file).compress(compression_algorithm=GZIP_SUFFIX)
+
+    assert collector.metrics == {}
+
+
+def test_metrics_collector_prometheus_output(txt_file: Path, tmp_path: Path):
+    collector = MetricsCollector()
+    add_hook(collector)
+    try:
+        compression = Compression(path=txt_file)
+        compression.compress(compression_algorithm=GZIP_SUFFIX)
+    finally:
+        remove_hook(collector)
+
+    metrics = collector.metrics[("filepack.compression.compress", GZIP_SUFFIX)]
+    assert metrics.count == 1
+    assert metrics.bytes_read == txt_file.stat().st_size
+
+    output = tmp_path / "filepack.prom"
+    collector.write_prometheus(output)
+    text = output.read_text()
+    assert "# TYPE filepack_operations_total counter" in text
+    assert (
+        'filepack_operations_total{operation="filepack.compression.compress",'
+        'codec="gz"} 1'
+    ) in text
+
+
+def test_cpu_time_counts_worker_threads(
+    events: list[OperationEvent], tmp_path: Path
+):
+    path = tmp_path / "data.log"
+    path.write_bytes(
+        b"".join(
+            f"request {index} took {index * 7919 % 1000}ms\n".encode()
+            for index in range(200_000)
+        )
+    )
+
+    for workers in (1, 4):
+        Compression(path=path).compress(
+            compression_algorithm=GZIP_SUFFIX,
+            target_path=tmp_path / f"data.{workers}.gz",
+            format="blocked",
+            workers=workers,
+        )
+
+    serial, parallel = events
+    assert parallel.cpu_time > serial.cpu_time / 2
@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import pytest
+from conftest import ARCHIVE_MEMBER_NAME
+
+from filepack.archive import Archive
+from filepack.compression import Compression
+from filepack.compressions.consts import GZIP_SUFFIX
+from filepack.limits import (
+    CompressionRatioLimitExceeded,
+    DecompressedSizeLimitExceeded,
+    Limits,
+    TempSpaceLimitExceeded,
+    get_limits,
+    set_limits,
+    use_limits,
+)
+
+
+@pytest.fixture
+def bomb(tmp_path: Path) -> Path:
+    path = tmp_path / "zeros.bin"
+    path.write_bytes(bytes(2**20))
+    return Compression(path=path).compress(
+        compression_algorithm=GZIP_SUFFIX, in_place=True
+    )
+
+
+def test_decompress_over_size_limit_fails_and_removes_output(
+    bomb: Path, tmp_path: Path
+):
+    target_path = tmp_path / "zeros.out"
+
+    with use_limits(Limits(max_decompressed_size=2**16)):
+        with pytest.raises(DecompressedSizeLimitExceeded):
+            Compression(path=bomb).decompress(
+                compression_algorithm=GZIP_SUFFIX, target_path=target_path
+            )
+
+    assert not target_path.exists()
+
+
+def test_uncompressed_size_over_ratio_limit_fails(bomb: Path):
+    with use_limits(Limits(max_compression_ratio=10)):
+        with pytest.raises(CompressionRatioLimitExceeded):
+            Compression(path=bomb).uncompressed_size(
+                compression_algorithm=GZIP_SUFFIX
+            )
+
+
+def test_sizes_need_no_temporary_space(bomb: Path, txt_file: Path):
+    with use_limits(Limits(max_temp_bytes=0)):
+        assert (
+            Compression(path=bomb).uncompressed_size(
+                compression_algorithm=GZIP_SUFFIX
+            )
+            == 2**20
+        )
+        compressed_size = Compression(path=txt_file).compressed_size(
+            compression_algorithm=GZIP_SUFFIX, compression_level=9
+        )
+
+    Compression(path=txt_file).compress(compression_algorithm=GZIP_SUFFIX)
+    assert compressed_size == Path(f"{txt_file}.{GZIP_SUFFIX}").stat().st_size
+
+
+def test_remove_member_over_temp_limit_fails(archive_file: Path):
+    archive = Archive(path=archive_file)
+
+    with use_limits(Limits(max_temp_bytes=1)):
+        with pytest.raises(TempSpaceLimitExceeded):
+            archive.remove_member(member_name=ARCHIVE_MEMBER_NAME)
+
+    assert archive.member_exist(member_name=ARCHIVE_MEMBER_NAME)
+
+
+def test_remove_member_uses_temp_directory(archive_file: Path, tmp_path: Path):
+    temp_directory = tmp_path / "temp"
+    temp_directory.mkdir()
+
+    archive = Archive(path=archive_file)
+
+    with use_limits(Limits(temp_directory=temp_directory)):
+        archive.remove_member(member_name=ARCHIVE_MEMBER_NAME)
+
+    assert not archive.member_exist(member_name=ARCHIVE_MEMBER_NAME)
+    assert list(temp_directory.iterdir()) == []
+
+
+def test_extract_all_over_size_limit_fails(archive_file: Path, tmp_path: Path):
+    with use_limits(Limits(max_decompressed_size=1)):
+        with pytest.raises(DecompressedSizeLimitExceeded):
+            Archive(path=archive_file).extract_all(
+                target_directory_path=tmp_path / "extracted"
+            )
+
+    assert not (tmp_path / "extracted").exists()
+
+
+def test_global_limits_apply_outside_scopes():
+    limits = Limits(max_workers=2)
+    set_limits(limits)
+    try:
+        assert get_limits() is limits
+        assert get_limits().workers(8) == 2
+
+        with use_limits(Limits()):
+            assert get_limits().workers(8) == 8
+    finally:
+        set_limits(Limits())
@@ -0,0 +1,152 @@
+import io
+import tarfile
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from filepack.archive import Archive
+from filepack.archives.listing import (
+    IndexedMember,
+    read_tar_table,
+    read_zip_table,
+)
+
+LONG_NAME = "long/" * 30 + "name.txt"
+
+
+def add_tar_file(
+    tar: tarfile.TarFile, name: str, content: bytes, mtime: float = 1e9
+) -> None:
+    info = tarfile.TarInfo(name=name)
+    info.size = len(content)
+    info.mtime = mtime
+    tar.addfile(info, io.BytesIO(content))
+
+
+@pytest.mark.parametrize(
+    "tar_format",
+    [tarfile.USTAR_FORMAT, tarfile.GNU_FORMAT, tarfile.PAX_FORMAT],
+)
+def test_tar_table_matches_tarfile(tmp_path: Path, tar_format: int):
+    path = tmp_path / "archive.tar"
+    with tarfile.open(path, "w", format=tar_format) as tar:
+        add_tar_file(tar, "a.txt", b"a" * 700)
+        add_tar_file(tar, "nested/b.txt", b"")
+        directory = tarfile.TarInfo(name="nested/dir")
+        directory.type = tarfile.DIRTYPE
+        tar.addfile(directory)
+        link = tarfile.TarInfo(name="link")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "a.txt"
+        tar.addfile(link)
+        if tar_format != tarfile.USTAR_FORMAT:
+            add_tar_file(tar, LONG_NAME, b"long", mtime=1e9 + 0.5)
+            add_tar_file(tar, "ünïcode.txt", b"u")
+        else:
+            add_tar_file(tar, "prefix/" * 20 + "name.txt", b"prefixed")
+
+    table = read_tar_table(path)
+
+    assert table is not None
+    with tarfile.open(path) as tar:
+        members = tar.getmembers()
+    assert table.names == [member.name for member in members]
+    assert list(table.sizes) == [member.size for member in members]
+    assert list(table.offsets) == [member.offset for member in members]
+    assert list(table.mtimes) == [member.mtime for member in members]
+
+
+def test_tar_table_skips_zero_blocks(tmp_path: Path):
+    parts = []
+    for name in ["a.txt", "b.txt"]:
+        part = io.BytesIO()
+        with tarfile.open(fileobj=part, mode="w") as tar:
+            add_tar_file(tar, name, name.encode())
+        parts.append(part.getvalue())
+    path = tmp_path / "concatenated.tar"
+    path.write_bytes(b"".join(parts))
+
+    table = read_tar_table(path)
+
+    assert table is not None
+    assert table.names == ["a.txt", "b.txt"]
+
+
+def test_tar_table_falls_back_on_bad_checksum(tmp_path: Path):
+    path = tmp_path / "archive.tar"
+    with tarfile.open(path, "w") as tar:
+        add_tar_file(tar, "a.txt", b"a")
+    data = bytearray(path.read_bytes())
+    data[0] = ord("b")
+    path.write_bytes(bytes(data))
+
+    assert read_tar_table(path) is None
+
+
+@pytest.mark.parametrize("prepended", [b"", b"#!/bin/sh\nexit 0\n"])
+def test_zip_table_matches_zipfile(tmp_path: Path, prepended: bytes):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.writestr("a.txt", b"a" * 700)
+        zip_file.writestr("nested/", b"")
+        zip_file.writestr("ünïcode.txt", b"u")
+        zip_file.writestr(
+            zipfile.ZipInfo("stored.bin", date_time=(2020, 2, 29, 23, 59, 58)),
+            b"\x00" * 10,
+        )
+        with zip_file.open("zip64.bin", "w", force_zip64=True) as member:
+            member.write(b"z" * 100)
+        zip_file.comment = b"comment"
+    path = tmp_path / "archive.zip"
+    path.write_bytes(prepended + archive.getvalue())
+
+    table = read_zip_table(path)
+
+    assert table is not None
+    with zipfile.ZipFile(path) as zip_file:
+        infos = zip_file.infolist()
+    assert table.names == [info.filename for info in infos]
+    assert list(table.sizes) == [info.file_size for info in infos]
+    assert list(table.compressed_sizes) == [
+        info.compress_size for info in infos
+    ]
+    assert list(table.offsets) == [info.header_offset for info in infos]
+    assert list(table.crcs) == [info.CRC for info in infos]  # type: ignore
+    assert table.mtimes[3] == datetime(2020, 2, 29, 23, 59, 58).timestamp()
+
+
+def test_empty_zip_table(tmp_path: Path):
+    path = tmp_path / "empty.zip"
+    with zipfile.ZipFile(path, "w"):
+        pass
+
+    table = read_zip_table(path)
+
+    assert table is not None
+    assert len(table) == 0
+
+
+@pytest.mark.parametrize("extension", ["zip", "tar"])
+def test_get_members_uses_member_table(tmp_path: Path, extension: str):
+    archive = Archive(path=tmp_path / f"archive.{extension}")
+    (tmp_path / "a.txt").write_bytes(b"a" * 10)
+    archive.add_member(member_path=tmp_path / "a.txt")
+
+    members = archive.get_members()
+
+    assert [type(member) for member in members] == [IndexedMember]
+    assert (members[0].name, members[0].size) == ("a.txt", 10)
+    assert members[0].mtime.endswith("UTC")
+    assert archive.get_member("a.txt").size == 10  # type: ignore
+    assert archive.get_member("missing.txt") is None
+    assert archive.get_member_table().names == ["a.txt"]  # type: ignore
+
+
+def test_seven_zip_has_no_member_table(archive_file: Path):
+    archive = Archive(path=archive_file)
+    if archive.path.suffix == ".7z":
+        assert archive.get_member_table() is None
+    else:
+        assert archive.get_member_table() is not None
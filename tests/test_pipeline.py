@@ -0,0 +1,114 @@
+import gzip
+import io
+import os
+from pathlib import Path
+
+import pytest
+from conftest import COMPRESSION_EXTENSIONS
+
+from filepack import compression
+from filepack.compression import Compression
+from filepack.compressions.consts import GZIP_SUFFIX
+from filepack.limits import DecompressedSizeLimitExceeded, Limits, use_limits
+from filepack.pipeline import ChunksReader, ReadAhead, WriteBehind
+
+CONTENT = b"".join(b"line %d\n" % index for index in range(50000)) + (
+    os.urandom(100000)
+)
+
+
+@pytest.fixture(autouse=True)
+def pipelined(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(compression, "PIPELINE_MIN_FILE_SIZE", 0)
+
+
+@pytest.fixture
+def data_file(tmp_path: Path) -> Path:
+    path = tmp_path / "data"
+    path.write_bytes(CONTENT)
+    return path
+
+
+class FailingStream(io.BytesIO):
+    def write(self, data) -> int:  # type: ignore
+        raise OSError("no space left on device")
+
+
+@pytest.mark.parametrize("compression_algorithm", COMPRESSION_EXTENSIONS)
+def test_pipelined_compress_and_decompress(
+    data_file: Path, tmp_path: Path, compression_algorithm: str
+):
+    progress = []
+
+    compressed_path = Compression(path=data_file).compress(
+        compression_algorithm=compression_algorithm,
+        compression_level=1,
+        progress=progress.append,
+    )
+    decompressed_path = Compression(path=compressed_path).decompress(
+        compression_algorithm=compression_algorithm,
+        target_path=tmp_path / "decompressed",
+    )
+
+    assert decompressed_path.read_bytes() == CONTENT
+    assert progress[-1].bytes_done == len(CONTENT)
+
+
+def test_pipelined_compress_keeps_gzip_file_name(data_file: Path):
+    compressed_path = Compression(path=data_file).compress(
+        compression_algorithm=GZIP_SUFFIX
+    )
+
+    with gzip.open(compressed_path) as gzip_file:
+        assert gzip_file.read() == CONTENT
+    assert b"data\x00" in compressed_path.read_bytes()[:64]
+
+
+def test_pipelined_decompress_limits(data_file: Path, tmp_path: Path):
+    compressed_path = Compression(path=data_file).compress(
+        compression_algorithm=GZIP_SUFFIX
+    )
+
+    with use_limits(Limits(max_decompressed_size=1000)):
+        with pytest.raises(DecompressedSizeLimitExceeded):
+            Compression(path=compressed_path).decompress(
+                compression_algorithm=GZIP_SUFFIX,
+                target_path=tmp_path / "decompressed",
+            )
+
+    assert not (tmp_path / "decompressed").exists()
+
+
+def test_read_ahead_reuses_buffers():
+    with ReadAhead(
+        source=io.BytesIO(CONTENT), buffer_size=4096, depth=2
+    ) as chunks:
+        buffers = set()
+        data = bytearray()
+        for chunk in chunks:
+            buffers.add(id(chunk.obj))  # type: ignore
+            data += chunk
+
+    assert data == CONTENT
+    assert len(buffers) <= 4
+
+
+def test_chunks_reader_and_write_behind():
+    target = io.BytesIO()
+
+    with ReadAhead(source=io.BytesIO(CONTENT), buffer_size=1000) as chunks:
+        reader = ChunksReader(chunks=chunks)
+        with WriteBehind(target=target) as writer:
+            while data := reader.read(777):
+                writer.write(data)
+
+    assert target.getvalue() == CONTENT
+
+
+def test_write_behind_raises_write_errors():
+    writer = WriteBehind(target=FailingStream())
+
+    with pytest.raises(OSError):
+        for _ in range(100):
+            writer.write(b"data")
+        writer.close()
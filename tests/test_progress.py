@@ -0,0 +1,115 @@
+from pathlib import Path
+
+import pytest
+
+from filepack.archive import Archive
+from filepack.compression import Compression
+from filepack.compressions.consts import GZIP_SUFFIX
+from filepack.progress import Progress, ProgressTracker, ThroughputMeter
+
+
+@pytest.fixture
+def large_file(tmp_path: Path) -> Path:
+    path = tmp_path / "large.txt"
+    path.write_bytes(b"filepack progress " * 200_000)
+    return path
+
+
+def test_compress_reports_progress(large_file: Path):
+    reports: list[Progress] = []
+
+    Compression(path=large_file).compress(
+        compression_algorithm=GZIP_SUFFIX, progress=reports.append
+    )
+
+    size = large_file.stat().st_size
+    assert reports[-1] == Progress(
+        bytes_done=size, total_bytes=size, finished=True
+    )
+    assert all(not report.finished for report in reports[:-1])
+    assert [report.bytes_done for report in reports] == sorted(
+        report.bytes_done for report in reports
+    )
+
+
+def test_decompress_reports_progress_without_total(large_file: Path):
+    compressed_path = Compression(path=large_file).compress(
+        compression_algorithm=GZIP_SUFFIX, in_place=True
+    )
+    reports: list[Progress] = []
+
+    Compression(path=compressed_path).decompress(
+        compression_algorithm=GZIP_SUFFIX, progress=reports.append
+    )
+
+    assert reports[-1].finished
+    assert reports[-1].bytes_done == large_file.stat().st_size
+    assert reports[-1].total_bytes is None
+    assert reports[-1].fraction is None
+
+
+def test_extract_all_reports_members(archive_file: Path, tmp_path: Path):
+    reports: list[Progress] = []
+    archive = Archive(path=archive_file)
+
+    archive.extract_all(
+        target_directory_path=tmp_path / "extracted", progress=reports.append
+    )
+
+    [member] = archive.get_members()
+    assert reports[-1] == Progress(
+        bytes_done=member.size,
+        total_bytes=member.size,
+        member=member.name,
+        finished=True,
+    )
+    assert reports[-1].fraction == 1.0
+
+
+def test_add_member_reports_progress(archive_file: Path, txt_file: Path):
+    reports: list[Progress] = []
+
+    Archive(path=archive_file).add_member(
+        member_path=txt_file, progress=reports.append
+    )
+
+    size = txt_file.stat().st_size
+    assert reports[0] == Progress(
+        bytes_done=0, total_bytes=size, member=txt_file.name
+    )
+    assert reports[-1] == Progress(
+        bytes_done=size, total_bytes=size, member=txt_file.name, finished=True
+    )
+
+
+def test_tracker_rate_limits_reports():
+    reports: list[Progress] = []
+    tracker = ProgressTracker(callback=reports.append, interval=3600)
+
+    for _ in range(100):
+        tracker.advance(size=1)
+    tracker.finish()
+
+    assert [report.bytes_done for report in reports] == [1, 100]
+
+
+def test_throughput_meter_aggregates_operations():
+    meter = ThroughputMeter(total_bytes=300)
+
+    meter(Progress(bytes_done=50, total_bytes=100))
+    meter(Progress(bytes_done=100, total_bytes=100, finished=True))
+    meter(Progress(bytes_done=50, total_bytes=200))
+
+    assert meter.bytes_done == 150
+    assert meter.total_bytes == 300
+    assert meter.throughput > 0
+    assert meter.eta is not None and meter.eta > 0
+
+
+def test_throughput_meter_without_total_has_no_eta():
+    meter = ThroughputMeter()
+
+    meter(Progress(bytes_done=10))
+
+    assert meter.total_bytes is None
+    assert meter.eta is None
@@ -0,0 +1,134 @@
+import gzip
+import os
+from pathlib import Path
+
+import pytest
+from conftest import COMPRESSION_EXTENSIONS
+
+from filepack import compression
+from filepack.compression import Compression
+from filepack.compressions.consts import BZ2_SUFFIX, GZIP_SUFFIX, XZ_SUFFIX
+from filepack.compressions.exceptions import FailedToRecompressFile
+from filepack.limits import DecompressedSizeLimitExceeded, Limits, use_limits
+
+CONTENT = b"".join(b"line %d\n" % index for index in range(20000)) + (
+    os.urandom(50000)
+)
+
+
+def compress(tmp_path: Path, compression_algorithm: str) -> Compression:
+    path = tmp_path / "data"
+    path.write_bytes(CONTENT)
+    return Compression(
+        path=Compression(path=path).compress(
+            compression_algorithm=compression_algorithm, in_place=True
+        )
+    )
+
+
+def decompressed_content(path: Path, compression_algorithm: str) -> bytes:
+    return (
+        Compression(path=path)
+        .decompress(
+            compression_algorithm=compression_algorithm,
+            target_path=path.parent / "decompressed",
+        )
+        .read_bytes()
+    )
+
+
+@pytest.mark.parametrize("to_algorithm", COMPRESSION_EXTENSIONS)
+@pytest.mark.parametrize("compression_algorithm", COMPRESSION_EXTENSIONS)
+def test_recompress(
+    tmp_path: Path, compression_algorithm: str, to_algorithm: str
+):
+    compressed_file = compress(tmp_path, compression_algorithm)
+
+    target_path = compressed_file.recompress(
+        compression_algorithm=compression_algorithm,
+        to_algorithm=to_algorithm,
+        target_path=tmp_path / f"recompressed.{to_algorithm}",
+        compression_level=1,
+    )
+
+    assert Compression(path=target_path).is_compressed(to_algorithm)
+    assert decompressed_content(target_path, to_algorithm) == CONTENT
+
+
+@pytest.mark.parametrize("workers", [1, 2, 4])
+def test_recompress_workers(
+    tmp_path: Path, workers: int, monkeypatch: pytest.MonkeyPatch
+):
+    # several blocks, compressed as concatenated streams
+    monkeypatch.setattr(compression, "RECOMPRESSION_BLOCK_SIZE", 2**16)
+    compressed_file = compress(tmp_path, BZ2_SUFFIX)
+    progress = []
+
+    target_path = compressed_file.recompress(
+        compression_algorithm=BZ2_SUFFIX,
+        to_algorithm=XZ_SUFFIX,
+        workers=workers,
+        progress=progress.append,
+    )
+
+    assert target_path == tmp_path / "data.xz"
+    assert decompressed_content(target_path, XZ_SUFFIX) == CONTENT
+    assert progress[-1].finished
+    assert progress[-1].bytes_done == len(CONTENT)
+
+
+def test_recompress_keeps_gzip_file_name(tmp_path: Path):
+    compressed_file = compress(tmp_path, BZ2_SUFFIX)
+
+    target_path = compressed_file.recompress(
+        compression_algorithm=BZ2_SUFFIX, to_algorithm=GZIP_SUFFIX
+    )
+
+    with gzip.open(target_path) as gzip_file:
+        gzip_file.read(1)
+    header = target_path.read_bytes()[:64]
+    assert b"data\x00" in header
+
+
+def test_recompress_in_place(tmp_path: Path):
+    compressed_file = compress(tmp_path, GZIP_SUFFIX)
+
+    compressed_file.recompress(
+        compression_algorithm=GZIP_SUFFIX,
+        to_algorithm=BZ2_SUFFIX,
+        in_place=True,
+    )
+
+    assert compressed_file.path == tmp_path / "data.bz2"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["data.bz2"]
+
+
+@pytest.mark.parametrize("workers", [1, 2, 4])
+def test_failed_recompression_leaves_no_file(tmp_path: Path, workers: int):
+    compressed_file = compress(tmp_path, GZIP_SUFFIX)
+    data = compressed_file.path.read_bytes()
+    compressed_file.path.write_bytes(data[: len(data) // 2])
+
+    with pytest.raises(FailedToRecompressFile):
+        compressed_file.recompress(
+            compression_algorithm=GZIP_SUFFIX,
+            to_algorithm=XZ_SUFFIX,
+            workers=workers,
+        )
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["data.gz"]
+
+
+@pytest.mark.parametrize("workers", [1, 2, 4])
+def test_recompress_limits(tmp_path: Path, workers: int):
+    compressed_file = compress(tmp_path, GZIP_SUFFIX)
+
+    with use_limits(Limits(max_decompressed_size=1000)):
+        with pytest.raises(DecompressedSizeLimitExceeded):
+            compressed_file.recompress(
+                compression_algorithm=GZIP_SUFFIX,
+                to_algorithm=XZ_SUFFIX,
+                workers=workers,
+            )
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["data.gz"]
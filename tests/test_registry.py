@@ -0,0 +1,181 @@
+import gzip
+from pathlib import Path
+
+import pytest
+from conftest import COMPRESSION_EXTENSIONS
+
+from filepack.archive import Archive
+from filepack.compression import Compression
+from filepack.compressions.gzip import GzipCompression
+from filepack.compressions.registry import compressions_registry
+from filepack.registry import Capability, Registry, Signature
+
+
+class RecordingGzipCompression(GzipCompression):
+    opened: list[str] = []
+
+    def open(self, file_path, mode="r", compression_level=9):
+        self.opened.append(mode)
+        return super().open(
+            file_path=file_path, mode=mode, compression_level=compression_level
+        )
+
+
+@pytest.fixture
+def registry() -> Registry:
+    return Registry(entry_point_group="filepack.tests")
+
+
+def test_get_client_returns_cached_instance(registry: Registry):
+    registry.register(
+        name="gz", client="filepack.compressions.gzip:GzipCompression"
+    )
+
+    client = registry.get_client("gz")
+
+    assert isinstance(client, GzipCompression)
+    assert registry.get_client("gz") is client
+
+
+def test_get_client_of_unregistered_format_raises(registry: Registry):
+    with pytest.raises(KeyError):
+        registry.get_client("gz")
+
+
+def test_register_keeps_higher_priority_registration(registry: Registry):
+    registry.register(name="gz", client=GzipCompression, priority=1)
+    registry.register(name="gz", client=RecordingGzipCompression)
+
+    assert isinstance(registry.get_client("gz"), GzipCompression)
+    assert not isinstance(registry.get_client("gz"), RecordingGzipCompression)
+
+
+def test_detect_by_signature(registry: Registry):
+    registry.register(
+        name="magic",
+        client=object,
+        signatures=(Signature(magic_number=b"MAGIC", offset=4),),
+    )
+
+    assert registry.detect(b"1234MAGIC") == "magic"
+    assert registry.detect(b"MAGIC") is None
+    assert registry.header_size == 9
+
+
+def test_with_capabilities(registry: Registry):
+    registry.register(
+        name="a",
+        client=object,
+        capabilities=Capability.PARALLEL | Capability.STREAMING,
+    )
+    registry.register(name="b", client=object)
+
+    assert [
+        registration.name
+        for registration in registry.with_capabilities(Capability.PARALLEL)
+    ] == ["a"]
+
+
+def test_entry_points_are_loaded_once(
+    registry: Registry, monkeypatch: pytest.MonkeyPatch
+):
+    calls = []
+
+    class EntryPoint:
+        def load(self):
+            return lambda registry: calls.append(registry)
+
+    monkeypatch.setattr(
+        "importlib.metadata.entry_points", lambda group: [EntryPoint()]
+    )
+
+    registry.names()
+    registry.names()
+
+    assert calls == [registry]
+
+
+def test_broken_entry_point_is_skipped(
+    registry: Registry, monkeypatch: pytest.MonkeyPatch
+):
+    registry.register(name="a", client=object, signatures=(Signature(b"A"),))
+
+    class BrokenEntryPoint:
+        name = "broken"
+
+        def load(self):
+            raise ImportError("missing dependency")
+
+    class EntryPoint:
+        name = "working"
+
+        def load(self):
+            return lambda registry: registry.register(name="b", client=object)
+
+    monkeypatch.setattr(
+        "importlib.metadata.entry_points",
+        lambda group: [BrokenEntryPoint(), EntryPoint()],
+    )
+
+    with pytest.warns(RuntimeWarning, match="broken"):
+        assert registry.detect(b"A") == "a"
+    assert registry.names() == ["a", "b"]
+
+
+def test_entry_points_are_not_loaded_when_disabled(
+    registry: Registry, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("FILEPACK_DISABLE_PLUGINS", "1")
+    monkeypatch.setattr(
+        "importlib.metadata.entry_points",
+        lambda group: pytest.fail("entry points should not be loaded"),
+    )
+
+    assert registry.names() == []
+
+
+def test_registered_client_replaces_builtin_codec(
+    txt_file: Path, tmp_path: Path
+):
+    builtin = compressions_registry.get("gz")
+    assert builtin is not None
+    compressions_registry.register(
+        name="gz",
+        client=RecordingGzipCompression,
+        signatures=builtin.signatures,
+        capabilities=builtin.capabilities,
+        priority=builtin.priority + 1,
+    )
+
+    try:
+        target_path = tmp_path / "file.gz"
+        Compression(path=txt_file).compress(
+            compression_algorithm="gz", target_path=target_path
+        )
+    finally:
+        compressions_registry.unregister("gz")
+        compressions_registry.register(
+            name=builtin.name,
+            client=builtin.client,
+            signatures=builtin.signatures,
+            capabilities=builtin.capabilities,
+        )
+
+    assert RecordingGzipCompression.opened == ["wb"]
+    assert gzip.decompress(target_path.read_bytes()) == txt_file.read_bytes()
+
+
+@pytest.mark.parametrize("compression_algorithm", COMPRESSION_EXTENSIONS)
+def test_builtin_codecs_are_parallel(compression_algorithm: str):
+    assert Capability.PARALLEL in Compression.compression_capabilities(
+        compression_algorithm=compression_algorithm
+    )
+
+
+def test_archive_capabilities(archive_file: Path):
+    capabilities = Archive(path=archive_file).archive_capabilities
+
+    if archive_file.suffix == ".7z":
+        assert Capability.SOLID in capabilities
+    else:
+        assert Capability.SEEKABLE in capabilities
@@ -0,0 +1,139 @@
+import os
+from pathlib import Path
+
+import pytest
+from py7zr import SevenZipFile
+
+from filepack.archive import Archive
+from filepack.archives.exceptions import FailedToExtractArchiveMembers
+from filepack.archives.options import (
+    SevenZipFilter,
+    SevenZipOptions,
+    get_seven_zip_options,
+    use_seven_zip_options,
+)
+from filepack.archives.seven_zip import SevenZipClient
+
+
+@pytest.fixture
+def files(tmp_path: Path) -> list[Path]:
+    directory = tmp_path / "files"
+    directory.mkdir()
+    paths = []
+    for index in range(5):
+        path = directory / f"{index}.bin"
+        path.write_bytes(os.urandom(1000))
+        paths.append(path)
+    return paths
+
+
+def test_solid_block_size(files: list[Path], tmp_path: Path):
+    archive = Archive(path=tmp_path / "archive.7z")
+
+    with use_seven_zip_options(SevenZipOptions(solid_block_size=2000)):
+        archive.add_members(member_paths=files)
+
+    assert [member.block for member in archive.get_members()] == [
+        0,
+        0,
+        1,
+        1,
+        2,
+    ]
+    assert get_seven_zip_options() == SevenZipOptions()
+
+
+def test_members_of_unsolid_formats_have_no_block(
+    files: list[Path], tmp_path: Path
+):
+    archive = Archive(path=tmp_path / "archive.zip")
+    archive.add_members(member_paths=files)
+
+    assert all(member.block is None for member in archive.get_members())
+
+
+@pytest.mark.parametrize(
+    "compression_filter, method_name",
+    [
+        (SevenZipFilter.LZMA2, "LZMA2"),
+        (SevenZipFilter.ZSTD, "ZStandard"),
+        (SevenZipFilter.COPY, "COPY"),
+    ],
+)
+def test_compression_filter(
+    files: list[Path],
+    tmp_path: Path,
+    compression_filter: SevenZipFilter,
+    method_name: str,
+):
+    archive = Archive(path=tmp_path / "archive.7z")
+
+    with use_seven_zip_options(
+        SevenZipOptions(compression_filter=compression_filter)
+    ):
+        archive.add_members(member_paths=files)
+
+    with SevenZipFile(archive.path) as seven_zip:
+        assert seven_zip.archiveinfo().method_names == [method_name]
+    archive.extract_all(target_directory_path=tmp_path / "extracted")
+    for path in files:
+        assert (tmp_path / "extracted" / path.name).read_bytes() == (
+            path.read_bytes()
+        )
+
+
+def test_extract_members_decodes_every_block_once(
+    files: list[Path], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    archive = Archive(path=tmp_path / "archive.7z")
+    with use_seven_zip_options(SevenZipOptions(solid_block_size=2000)):
+        archive.add_members(member_paths=files)
+
+    extractions = []
+    extract = SevenZipFile.extract
+
+    def recording_extract(self, *args, **kwargs):
+        extractions.append(sorted(kwargs["targets"]))
+        return extract(self, *args, **kwargs)
+
+    monkeypatch.setattr(SevenZipFile, "extract", recording_extract)
+
+    archive.extract_members(
+        member_names=["0.bin", "1.bin", "4.bin"],
+        target_directory_path=tmp_path / "extracted",
+    )
+
+    assert extractions == [["0.bin", "1.bin"], ["4.bin"]]
+    assert sorted(
+        path.name for path in (tmp_path / "extracted").iterdir()
+    ) == ["0.bin", "1.bin", "4.bin"]
+
+
+def test_extract_members_missing_member(files: list[Path], tmp_path: Path):
+    archive = Archive(path=tmp_path / "archive.7z")
+    archive.add_members(member_paths=files)
+
+    with pytest.raises(FailedToExtractArchiveMembers):
+        archive.extract_members(
+            member_names=["0.bin", "missing.bin"],
+            target_directory_path=tmp_path / "extracted",
+        )
+
+
+def test_extract_members_one_by_one_from_a_solid_block(
+    files: list[Path], tmp_path: Path
+):
+    with SevenZipFile(tmp_path / "archive.7z", "w") as seven_zip:
+        for path in files:
+            seven_zip.write(path, arcname=path.name)
+
+    # the reader is rewound after every extraction, so that the next one
+    # decodes the block from its beginning
+    with SevenZipClient().open(tmp_path / "archive.7z", "r") as archive:
+        for path in reversed(files):
+            archive.extract_member(
+                member_name=path.name, target_directory_path=tmp_path / "out"
+            )
+
+    for path in files:
+        assert (tmp_path / "out" / path.name).read_bytes() == path.read_bytes()
@@ -0,0 +1,182 @@
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+from py7zr import SevenZipFile
+
+from filepack.archive import Archive
+from filepack.archives.consts import SEVEN_ZIP_SUFFIX, TAR_SUFFIX, ZIP_SUFFIX
+
+# an even timestamp, which zip archives store exactly
+MTIME = 1_700_000_000
+
+
+@pytest.fixture
+def directory(tmp_path: Path) -> Path:
+    directory = tmp_path / "build"
+    for name, content in [
+        ("bin/app", b"app" * 1000),
+        ("lib/core.so", b"core" * 1000),
+        ("README", b"readme"),
+    ]:
+        write_file(directory / name, content)
+    return directory
+
+
+def write_file(path: Path, content: bytes, mtime: int = MTIME) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    os.utime(path, (mtime, mtime))
+
+
+def archive_contents(archive: Archive, tmp_path: Path) -> dict[str, bytes]:
+    extracted = tmp_path / "extracted"
+    archive.extract_all(target_directory_path=extracted)
+    contents = {
+        path.relative_to(extracted).as_posix(): path.read_bytes()
+        for path in extracted.rglob("*")
+        if path.is_file()
+    }
+    for path in sorted(extracted.rglob("*"), reverse=True):
+        path.unlink() if path.is_file() else path.rmdir()
+    return contents
+
+
+@pytest.mark.parametrize(
+    "extension", [TAR_SUFFIX, ZIP_SUFFIX, SEVEN_ZIP_SUFFIX]
+)
+def test_sync_from(directory: Path, tmp_path: Path, extension: str):
+    archive = Archive(path=tmp_path / f"build.{extension}")
+
+    report = archive.sync_from(directory_path=directory)
+    assert report.added == ["README", "bin/app", "lib/core.so"]
+    assert not report.rewritten
+
+    assert archive.sync_from(directory_path=directory).up_to_date
+
+    write_file(directory / "bin/app", b"app2" * 1000, mtime=MTIME + 60)
+    write_file(directory / "share/doc", b"doc")
+    (directory / "README").unlink()
+
+    report = archive.sync_from(directory_path=directory)
+    assert report.added == ["share/doc"]
+    assert report.changed == ["bin/app"]
+    assert report.removed == ["README"]
+    assert report.unchanged == ["lib/core.so"]
+    assert report.rewritten
+    assert report.copied_raw == (0 if extension == SEVEN_ZIP_SUFFIX else 1)
+
+    assert archive_contents(archive, tmp_path) == {
+        "bin/app": b"app2" * 1000,
+        "lib/core.so": b"core" * 1000,
+        "share/doc": b"doc",
+    }
+
+
+@pytest.mark.parametrize(
+    "extension", [TAR_SUFFIX, ZIP_SUFFIX, SEVEN_ZIP_SUFFIX]
+)
+def test_sync_from_keeps_directory_members(
+    directory: Path, tmp_path: Path, extension: str
+):
+    archive_path = tmp_path / f"build.{extension}"
+    names = {
+        path: path.relative_to(directory).as_posix()
+        for path in sorted(directory.rglob("*"))
+    }
+    if extension == ZIP_SUFFIX:
+        with zipfile.ZipFile(archive_path, "w") as zip:
+            for path, name in names.items():
+                zip.write(path, arcname=name)
+    elif extension == TAR_SUFFIX:
+        with tarfile.open(archive_path, "w") as tar:
+            for path, name in names.items():
+                tar.add(path, arcname=name, recursive=False)
+    else:
+        with SevenZipFile(archive_path, "w") as seven_zip:
+            for path, name in names.items():
+                seven_zip.write(path, arcname=name)
+    archive = Archive(path=archive_path)
+    directory_names = {
+        member.name
+        for member in archive.get_members()
+        if member.name.rstrip("/") in ("bin", "lib")
+    }
+    assert len(directory_names) == 2
+
+    report = archive.sync_from(directory_path=directory)
+    assert report.up_to_date
+    assert not report.rewritten
+
+    write_file(directory / "README", b"readme2", mtime=MTIME + 60)
+    (directory / "lib/core.so").unlink()
+    (directory / "lib").rmdir()
+
+    report = archive.sync_from(directory_path=directory)
+    assert report.changed == ["README"]
+    assert sorted(report.removed) == sorted(
+        [name for name in directory_names if name.startswith("lib")]
+        + ["lib/core.so"]
+    )
+    assert report.rewritten
+    assert {member.name.rstrip("/") for member in archive.get_members()} == {
+        "README",
+        "bin",
+        "bin/app",
+    }
+    assert archive.sync_from(directory_path=directory).up_to_date
+
+
+def test_sync_from_appends_new_files(directory: Path, tmp_path: Path):
+    archive = Archive(path=tmp_path / "build.tar")
+    archive.sync_from(directory_path=directory)
+
+    write_file(directory / "share/doc", b"doc")
+    report = archive.sync_from(directory_path=directory)
+
+    assert report.added == ["share/doc"]
+    assert report.unchanged == ["README", "bin/app", "lib/core.so"]
+    assert not report.rewritten
+    assert len(archive.get_members()) == 4
+
+
+def test_sync_from_compares_contents(directory: Path, tmp_path: Path):
+    archive = Archive(path=tmp_path / "build.zip")
+    archive.sync_from(directory_path=directory)
+
+    # same size and modification time, but another content
+    write_file(directory / "README", b"README")
+
+    assert archive.sync_from(directory_path=directory).up_to_date
+
+    report = archive.sync_from(directory_path=directory, compare_contents=True)
+    assert report.changed == ["README"]
+    assert archive_contents(archive, tmp_path)["README"] == b"README"
+
+
+def test_sync_from_copies_zip_members_raw(directory: Path, tmp_path: Path):
+    archive = Archive(path=tmp_path / "build.zip")
+    archive.sync_from(directory_path=directory)
+    with zipfile.ZipFile(archive.path) as zip_file:
+        before = zip_file.getinfo("lib/core.so")
+
+    (directory / "README").unlink()
+    archive.sync_from(directory_path=directory)
+
+    with zipfile.ZipFile(archive.path) as zip_file:
+        assert zip_file.testzip() is None
+        after = zip_file.getinfo("lib/core.so")
+    assert (after.CRC, after.compress_size, after.date_time) == (
+        before.CRC,
+        before.compress_size,
+        before.date_time,
+    )
+
+
+def test_sync_from_missing_directory(tmp_path: Path):
+    archive = Archive(path=tmp_path / "build.zip")
+
+    with pytest.raises(Exception):
+        archive.sync_from(directory_path=tmp_path / "missing")
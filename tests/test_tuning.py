@@ -0,0 +1,141 @@
+from pathlib import Path
+
+import pytest
+
+from filepack.compression import Compression
+from filepack.compressions.models import CompressionType
+from filepack.compressions.tuning import (
+    TrialResult,
+    TuningCache,
+    TuningDecision,
+    TuningTarget,
+    choose,
+    tune,
+)
+
+# 1 MiB samples, compressed at 1000, 100, 33 and 10 MB/s
+TRIALS = [
+    TrialResult("lz4", 0, 2**20, 500_000, cpu_time=0.001),
+    TrialResult("gz", 6, 2**20, 300_000, cpu_time=0.01),
+    TrialResult("gz", 9, 2**20, 290_000, cpu_time=0.03),
+    TrialResult("xz", 6, 2**20, 200_000, cpu_time=0.1),
+]
+
+
+@pytest.fixture
+def log_file(tmp_path: Path) -> Path:
+    path = tmp_path / "service.log"
+    path.write_bytes(
+        b"".join(
+            f"2024-01-01 INFO request {index} took {index % 97}ms\n".encode()
+            for index in range(50_000)
+        )
+    )
+    return path
+
+
+@pytest.mark.parametrize(
+    "target, expected",
+    [
+        (TuningTarget.SPEED, ("lz4", 0)),
+        (TuningTarget.RATIO, ("xz", 6)),
+        (TuningTarget.BALANCED, ("xz", 6)),
+    ],
+)
+def test_choose_by_target(target: TuningTarget, expected: tuple[str, int]):
+    chosen, budget_met = choose(TRIALS, target=target, budget_mb_s=None)
+
+    assert (chosen.algorithm, chosen.level) == expected
+    assert budget_met
+
+
+def test_choose_within_budget():
+    chosen, budget_met = choose(
+        TRIALS, target=TuningTarget.RATIO, budget_mb_s=20
+    )
+
+    assert (chosen.algorithm, chosen.level) == ("gz", 9)
+    assert budget_met
+
+
+def test_choose_fastest_when_budget_is_not_met():
+    chosen, budget_met = choose(
+        TRIALS, target=TuningTarget.RATIO, budget_mb_s=10**6
+    )
+
+    assert chosen.algorithm == "lz4"
+    assert not budget_met
+
+
+def test_tune_caches_decision_per_file_class(log_file: Path, tmp_path: Path):
+    cache = TuningCache()
+    candidates = [(CompressionType.GZIP, 1), (CompressionType.XZ, 1)]
+    other_log_file = tmp_path / "other.log"
+    other_log_file.write_bytes(log_file.read_bytes()[::-1])
+
+    decision = tune(log_file, candidates=candidates, cache=cache)
+    cached_decision = tune(other_log_file, candidates=candidates, cache=cache)
+
+    assert not decision.cached
+    assert len(decision.trials) == 2
+    assert decision.file_class == ("log", "unknown")
+    assert cached_decision.cached
+    assert (cached_decision.algorithm, cached_decision.level) == (
+        decision.algorithm,
+        decision.level,
+    )
+
+
+def test_tune_does_not_reuse_decision_for_other_candidates(log_file: Path):
+    cache = TuningCache()
+
+    tune(log_file, candidates=[(CompressionType.GZIP, 1)], cache=cache)
+    decision = tune(
+        log_file, candidates=[(CompressionType.XZ, 6)], cache=cache
+    )
+
+    assert not decision.cached
+    assert (decision.algorithm, decision.level) == ("xz", 6)
+
+
+def test_tuning_cache_evicts_least_recently_used():
+    cache = TuningCache(max_entries=2)
+    decisions = [
+        TuningDecision(
+            algorithm="gz",
+            level=level,
+            target=TuningTarget.BALANCED,
+            budget_mb_s=None,
+            file_class=("log", "unknown"),
+        )
+        for level in range(3)
+    ]
+
+    cache.set(("a",), decisions[0])
+    cache.set(("b",), decisions[1])
+    cache.get(("a",))
+    cache.set(("c",), decisions[2])
+
+    assert len(cache) == 2
+    assert cache.get(("a",)) is decisions[0]
+    assert cache.get(("b",)) is None
+    assert cache.get(("c",)) is decisions[2]
+
+
+def test_auto_compress(log_file: Path):
+    original = log_file.read_bytes()
+
+    decision = Compression(path=log_file).auto_compress(
+        target="ratio",
+        candidates=[(CompressionType.LZ4, 0), (CompressionType.XZ, 6)],
+    )
+
+    assert (decision.algorithm, decision.level) == ("xz", 6)
+    assert decision.trial is not None and decision.trial.ratio > 1
+    assert decision.path == Path(f"{log_file}.xz")
+    assert "chose xz level 6 for ratio" in decision.summary()
+
+    decompressed_path = Compression(path=decision.path).decompress(
+        compression_algorithm="xz", target_path=log_file.parent / "restored"
+    )
+    assert decompressed_path.read_bytes() == original
@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+
+from filepack.utils import (
+    get_file_type_extension,
+    guess_file_type_extension,
+    read_sample,
+)
+
+
+def test_get_file_type_extension_of_archive(archive_file: Path):
+    assert get_file_type_extension(path=archive_file) == (
+        archive_file.suffix.lstrip(".")
+    )
+
+
+def test_get_file_type_extension_of_compressed_file(compressed_file: Path):
+    compressed_file, compression_algorithm = compressed_file
+    assert get_file_type_extension(path=compressed_file) == (
+        compression_algorithm
+    )
+
+
+def test_get_file_type_extension_of_empty_zip(tmp_path: Path):
+    empty_zip = tmp_path / "empty.zip"
+    empty_zip.write_bytes(b"PK\x05\x06" + b"\x00" * 18)
+
+    assert get_file_type_extension(path=empty_zip) == "zip"
+
+
+def test_get_file_type_extension_of_unsupported_file(txt_file: Path):
+    with pytest.raises(ValueError):
+        get_file_type_extension(path=txt_file)
+
+
+def test_guess_file_type_extension_of_non_archive_file(tmp_path: Path):
+    png_file = tmp_path / "image"
+    png_file.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 32)
+
+    with pytest.raises(ValueError):
+        get_file_type_extension(path=png_file)
+    assert guess_file_type_extension(path=png_file) == "png"
+
+
+def test_read_sample_of_small_file(txt_file: Path):
+    assert read_sample(path=txt_file, chunks=4, chunk_size=1024) == (
+        txt_file.read_bytes()
+    )
+
+
+def test_read_sample_spreads_chunks(tmp_path: Path):
+    path = tmp_path / "large.bin"
+    data = bytes(range(250)) * 4
+    path.write_bytes(data)
+
+    assert read_sample(path=path, chunks=3, chunk_size=10) == (
+        data[:10] + data[495:505] + data[990:]
+    )
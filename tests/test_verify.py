@@ -0,0 +1,184 @@
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+from conftest import COMPRESSION_EXTENSIONS
+from py7zr import SevenZipFile
+
+from filepack.archive import Archive
+from filepack.archives.exceptions import FailedToVerifyArchive
+from filepack.compression import Compression
+from filepack.filepack import FilePack
+
+FILES = {f"{index}.bin": os.urandom(20000) for index in range(5)}
+
+
+@pytest.fixture
+def files(tmp_path: Path) -> list[Path]:
+    directory = tmp_path / "files"
+    directory.mkdir()
+    paths = []
+    for name, content in FILES.items():
+        (directory / name).write_bytes(content)
+        paths.append(directory / name)
+    return paths
+
+
+def create_archive(archive_path: Path, files: list[Path]) -> Archive:
+    if archive_path.suffix == ".zip":
+        with zipfile.ZipFile(archive_path, "w") as zip_file:
+            for path in files:
+                zip_file.write(path, arcname=path.name)
+    elif archive_path.suffix == ".tar":
+        with tarfile.open(archive_path, "w") as tar_file:
+            for path in files:
+                tar_file.add(path, arcname=path.name)
+    else:
+        with SevenZipFile(archive_path, "w") as seven_zip:
+            for path in files:
+                seven_zip.write(path, arcname=path.name)
+    return Archive(path=archive_path)
+
+
+def flip_byte(path: Path, offset: int) -> None:
+    data = bytearray(path.read_bytes())
+    data[offset] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+@pytest.mark.parametrize("archive_extension", ["zip", "tar", "7z"])
+def test_verify_intact_archive(
+    files: list[Path], tmp_path: Path, archive_extension: str, workers: int
+):
+    archive = create_archive(tmp_path / f"archive.{archive_extension}", files)
+    progress = []
+
+    report = archive.verify(workers=workers, progress=progress.append)
+
+    assert report.intact
+    assert report.checked_members == len(FILES)
+    assert report.checked_bytes == sum(map(len, FILES.values()))
+    assert progress[-1].finished
+    assert progress[-1].bytes_done == report.checked_bytes
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_verify_zip_reports_the_first_corrupted_member(
+    files: list[Path], tmp_path: Path, workers: int
+):
+    archive = create_archive(tmp_path / "archive.zip", files)
+    with zipfile.ZipFile(archive.path) as zip_file:
+        offsets = [info.header_offset for info in zip_file.infolist()]
+    # the data of the 3rd and 4th members, past their local headers
+    flip_byte(archive.path, offsets[2] + 1000)
+    flip_byte(archive.path, offsets[3] + 1000)
+
+    report = archive.verify(workers=workers)
+
+    assert not report.intact
+    assert report.member == "2.bin"
+    assert report.checked_members == 2
+    assert "CRC" in report.error
+
+
+def test_verify_tar_header_checksum(files: list[Path], tmp_path: Path):
+    archive = create_archive(tmp_path / "archive.tar", files)
+    with tarfile.open(archive.path) as tar_file:
+        offset = tar_file.getmember("1.bin").offset
+    flip_byte(archive.path, offset + 10)
+
+    report = archive.verify()
+
+    assert report.member is None
+    assert report.offset == offset
+    assert report.checked_members == 1
+    assert "checksum" in report.error
+
+
+def test_verify_truncated_tar(files: list[Path], tmp_path: Path):
+    archive = create_archive(tmp_path / "archive.tar", files)
+    with tarfile.open(archive.path) as tar_file:
+        member = tar_file.getmember("4.bin")
+    with open(archive.path, "r+b") as archive_file:
+        archive_file.truncate(member.offset_data + 5000)
+
+    report = archive.verify()
+
+    assert report.member == "4.bin"
+    assert report.offset == 5000
+    assert report.checked_members == 4
+
+
+def test_verify_corrupted_seven_zip(files: list[Path], tmp_path: Path):
+    archive = create_archive(tmp_path / "archive.7z", files)
+    flip_byte(archive.path, 50000)
+
+    report = archive.verify(workers=4)
+
+    assert not report.intact
+    assert report.checked_members < len(FILES)
+
+
+def test_verify_missing_archive(tmp_path: Path):
+    with pytest.raises(FailedToVerifyArchive):
+        Archive(path=tmp_path / "archive.zip").verify()
+
+
+@pytest.mark.parametrize("compression_algorithm", COMPRESSION_EXTENSIONS)
+def test_verify_compressed_file(tmp_path: Path, compression_algorithm: str):
+    content = b"".join(FILES.values()) * 4
+    (tmp_path / "data").write_bytes(content)
+    compressed_file = Compression(
+        path=Compression(path=tmp_path / "data").compress(
+            compression_algorithm=compression_algorithm
+        )
+    )
+
+    report = compressed_file.verify(
+        compression_algorithm=compression_algorithm
+    )
+
+    assert report.intact
+    assert report.checked_bytes == len(content)
+
+
+@pytest.mark.parametrize("compression_algorithm", COMPRESSION_EXTENSIONS)
+@pytest.mark.parametrize("corruption", ["flipped", "truncated"])
+def test_verify_corrupted_compressed_file(
+    tmp_path: Path, compression_algorithm: str, corruption: str
+):
+    content = b"".join(FILES.values()) * 4
+    (tmp_path / "data").write_bytes(content)
+    path = Compression(path=tmp_path / "data").compress(
+        compression_algorithm=compression_algorithm
+    )
+    if corruption == "flipped":
+        flip_byte(path, path.stat().st_size // 2)
+    else:
+        path.write_bytes(path.read_bytes()[: path.stat().st_size // 2])
+
+    report = Compression(path=path).verify(
+        compression_algorithm=compression_algorithm
+    )
+
+    assert not report.intact
+    assert report.offset == report.checked_bytes < len(content)
+
+
+def test_filepack_verify(files: list[Path], tmp_path: Path):
+    create_archive(tmp_path / "archive.tar", files)
+    compressed_path = Compression(path=tmp_path / "archive.tar").compress(
+        compression_algorithm="gz"
+    )
+
+    assert (
+        FilePack(path=tmp_path / "archive.tar").verify().checked_members == 5
+    )
+    assert (
+        FilePack(path=compressed_path)
+        .verify(compression_algorithm="gz")
+        .intact
+    )
@@ -0,0 +1,250 @@
+import io
+import os
+import tarfile
+from pathlib import Path
+
+import pytest
+from conftest import COMPRESSION_EXTENSIONS
+
+from filepack import compression
+from filepack.archive import Archive
+from filepack.archives.exceptions import FailedToAddNewMemberToArchive
+from filepack.compression import Compression
+from filepack.compressions.consts import GZIP_SUFFIX, XZ_SUFFIX
+from filepack.volumes import (
+    VolumeReader,
+    VolumeWriter,
+    file_size,
+    open_volumes,
+    split_file,
+    volume_paths,
+)
+
+CONTENT = b"".join(b"line %d\n" % index for index in range(20000)) + (
+    os.urandom(50000)
+)
+VOLUME_SIZE = 40000
+
+
+@pytest.fixture
+def data_file(tmp_path: Path) -> Path:
+    path = tmp_path / "data"
+    path.write_bytes(CONTENT)
+    return path
+
+
+@pytest.fixture
+def directory(tmp_path: Path) -> Path:
+    directory = tmp_path / "directory"
+    directory.mkdir()
+    for index in range(5):
+        (directory / f"{index}.bin").write_bytes(os.urandom(30000))
+    return directory
+
+
+def names(path: Path) -> list[str]:
+    return sorted(child.name for child in path.iterdir() if child.is_file())
+
+
+def test_volume_writer(tmp_path: Path):
+    completed = []
+
+    def on_volume(path: Path) -> None:
+        # every volume is complete when reported
+        completed.append((path.name, path.stat().st_size))
+
+    with VolumeWriter(
+        path=tmp_path / "data", volume_size=VOLUME_SIZE, on_volume=on_volume
+    ) as writer:
+        for start in range(0, len(CONTENT), 7777):
+            writer.write(CONTENT[start : start + 7777])
+
+    count = -(-len(CONTENT) // VOLUME_SIZE)
+    assert [path.name for path in writer.paths] == [
+        f"data.{number:03d}" for number in range(1, count + 1)
+    ]
+    assert completed == [
+        (path.name, path.stat().st_size) for path in writer.paths
+    ]
+    assert all(size == VOLUME_SIZE for _, size in completed[:-1])
+    assert b"".join(path.read_bytes() for path in writer.paths) == CONTENT
+
+
+def test_volume_writer_removes_stale_volumes(tmp_path: Path):
+    for number in range(1, 6):
+        (tmp_path / f"data.{number:03d}").write_bytes(b"stale")
+
+    with VolumeWriter(path=tmp_path / "data", volume_size=3) as writer:
+        writer.write(b"12345")
+
+    assert names(tmp_path) == ["data.001", "data.002"]
+
+
+def test_volume_writer_without_data(tmp_path: Path):
+    with VolumeWriter(path=tmp_path / "data", volume_size=10) as writer:
+        pass
+
+    assert writer.paths == [tmp_path / "data.001"]
+    assert writer.paths[0].read_bytes() == b""
+
+
+def test_volume_reader(tmp_path: Path):
+    sizes = [1000, 0, 2500, 1, 3000]
+    paths = []
+    offset = 0
+    for number, size in enumerate(sizes, start=1):
+        paths.append(tmp_path / f"data.{number:03d}")
+        paths[-1].write_bytes(CONTENT[offset : offset + size])
+        offset += size
+    content = CONTENT[:offset]
+
+    with io.BufferedReader(VolumeReader(paths=paths), buffer_size=700) as file:
+        assert file.read() == content
+        for position in [0, 999, 1000, 3499, 3500, 3501, 5000]:
+            file.seek(position)
+            assert file.read(600) == content[position : position + 600]
+        file.seek(-10, io.SEEK_END)
+        assert file.read() == content[-10:]
+        assert file.read() == b""
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_split_file(data_file: Path, tmp_path: Path, workers: int):
+    completed = []
+
+    paths = split_file(
+        path=data_file,
+        volume_size=VOLUME_SIZE,
+        target_path=tmp_path / "split",
+        workers=workers,
+        on_volume=completed.append,
+    )
+
+    assert completed == paths == volume_paths(tmp_path / "split.001")
+    assert file_size(paths[0]) == len(CONTENT)
+    with open_volumes(paths[0]) as file:
+        assert file.read() == CONTENT
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+@pytest.mark.parametrize("compression_algorithm", COMPRESSION_EXTENSIONS)
+def test_compress_into_volumes(
+    data_file: Path,
+    tmp_path: Path,
+    compression_algorithm: str,
+    pipelined: bool,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    if pipelined:
+        monkeypatch.setattr(compression, "PIPELINE_MIN_FILE_SIZE", 0)
+    completed = []
+
+    first_volume = Compression(path=data_file).compress(
+        compression_algorithm=compression_algorithm,
+        compression_level=1,
+        volume_size=VOLUME_SIZE,
+        on_volume=completed.append,
+    )
+
+    assert first_volume == tmp_path / f"data.{compression_algorithm}.001"
+    assert completed == volume_paths(first_volume)
+    assert len(completed) > 1
+    compressed_file = Compression(path=first_volume)
+    assert compressed_file.is_compressed(compression_algorithm)
+    assert compressed_file.verify(compression_algorithm).intact
+    assert compressed_file.uncompressed_size(compression_algorithm) == len(
+        CONTENT
+    )
+    data_file.unlink()
+    decompressed_path = compressed_file.decompress(
+        compression_algorithm=compression_algorithm, in_place=True
+    )
+    assert decompressed_path == data_file
+    assert data_file.read_bytes() == CONTENT
+    assert names(tmp_path) == ["data"]
+
+
+def test_recompress_volumes(data_file: Path, tmp_path: Path):
+    first_volume = Compression(path=data_file).compress(
+        compression_algorithm=GZIP_SUFFIX, volume_size=VOLUME_SIZE
+    )
+
+    target_path = Compression(path=first_volume).recompress(
+        compression_algorithm=GZIP_SUFFIX, to_algorithm=XZ_SUFFIX
+    )
+
+    assert target_path == tmp_path / "data.xz"
+    assert (
+        Compression(path=target_path)
+        .decompress(
+            compression_algorithm=XZ_SUFFIX,
+            target_path=tmp_path / "decompressed",
+        )
+        .read_bytes()
+        == CONTENT
+    )
+
+
+@pytest.mark.parametrize("target_type", ["tar", "zip", "7z"])
+def test_convert_to_volumes(directory: Path, tmp_path: Path, target_type: str):
+    source = Archive(path=tmp_path / "source.tar")
+    source.add_members(member_paths=sorted(directory.iterdir()))
+    completed = []
+
+    target = source.convert_to(
+        target_path=tmp_path / f"target.{target_type}",
+        volume_size=VOLUME_SIZE,
+        on_volume=completed.append,
+        workers=4,
+    )
+
+    assert target.path == tmp_path / f"target.{target_type}.001"
+    assert completed == volume_paths(target.path)
+    assert all(path.stat().st_size == VOLUME_SIZE for path in completed[:-1])
+    assert target.size == sum(path.stat().st_size for path in completed)
+    assert target.verify(workers=4).checked_members == 5
+    assert sorted(member.name for member in target.get_members()) == sorted(
+        path.name for path in directory.iterdir()
+    )
+    target.extract_all(target_directory_path=tmp_path / "extracted")
+    for path in directory.iterdir():
+        assert (tmp_path / "extracted" / path.name).read_bytes() == (
+            path.read_bytes()
+        )
+
+
+@pytest.mark.parametrize("archive_type", ["tar", "zip", "7z"])
+def test_split_archive(directory: Path, tmp_path: Path, archive_type: str):
+    archive = Archive(path=tmp_path / f"archive.{archive_type}")
+    archive.add_members(member_paths=sorted(directory.iterdir()))
+
+    volumes = archive.split(volume_size=VOLUME_SIZE, workers=4)
+
+    split_archive = Archive(path=volumes[0])
+    assert split_archive.get_member_table() is None
+    assert split_archive.get_member("3.bin").size == 30000
+    split_archive.extract_member(
+        member_name="3.bin", target_directory_path=tmp_path / "extracted"
+    )
+    assert (tmp_path / "extracted/3.bin").read_bytes() == (
+        directory / "3.bin"
+    ).read_bytes()
+    assert (
+        split_archive.convert_to(target_path=tmp_path / "joined.tar")
+        .verify()
+        .checked_members
+        == 5
+    )
+
+
+def test_split_archive_is_read_only(directory: Path, tmp_path: Path):
+    with tarfile.open(tmp_path / "archive.tar", "w") as tar_file:
+        tar_file.add(directory / "0.bin", arcname="0.bin")
+    volumes = Archive(path=tmp_path / "archive.tar").split(volume_size=5000)
+    split_archive = Archive(path=volumes[0])
+
+    with pytest.raises(FailedToAddNewMemberToArchive):
+        split_archive.add_member(member_path=directory / "1.bin")
+
+    split_archive.remove_all()
+    assert names(tmp_path) == ["archive.tar"]